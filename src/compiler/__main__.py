@@ -0,0 +1,85 @@
+"""
+Compilador de línea de comandos.
+
+    python -m src.compiler programa.cpp [--backend NOMBRE] [--strict]
+    python -m src.compiler programa.cpp --compare [--backend NOMBRE ...]
+    python -m src.compiler --list-backends
+
+Compila y ejecuta el programa con el backend elegido (tree-walker por
+defecto) y escribe su salida; errores y avisos van a stderr con su fase y
+línea. Como el botón Ejecutar de la GUI, los errores semánticos son avisos
+salvo con --strict.
+--compare ejecuta el programa con varios backends (todos los que ejecutan,
+si no se nombran) y muestra si la salida coincide con la del tree-walker y
+cuánto tardó cada uno. El código de salida es 1 si la compilación o la
+ejecución fallan o, con --compare, si algún backend difiere o termina con
+error (aunque todos fallen igual).
+"""
+import argparse
+import sys
+
+from .backends import BACKENDS, DEFAULT_BACKEND
+from .compilation_unit import CompilationUnit
+from .compiler import Compiler
+
+
+def _diagnosticos(res):
+    for d in res["diagnostics"]:
+        line = f"línea {d['line']}" if d["line"] is not None else "-"
+        print(f"[{d['severity']}] {d['phase']} ({line}): {d['message']}", file=sys.stderr)
+
+
+def _tiempo(res, fase):
+    data = res["metrics"].get(fase)
+    return f"{data['time'] * 1000:10.2f}" if data else f"{'-':>10}"
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m src.compiler",
+                                     description="Compila y ejecuta un programa C++ del curso.")
+    parser.add_argument("archivo", nargs="?", help="código fuente a compilar")
+    parser.add_argument("--backend", "-b", action="append", choices=list(BACKENDS),
+                        help=f"backend a usar (por defecto {DEFAULT_BACKEND}); repetible con --compare")
+    parser.add_argument("--compare", action="store_true",
+                        help="ejecuta con varios backends y compara salida y tiempos")
+    parser.add_argument("--strict", action="store_true",
+                        help="no ejecuta si el análisis semántico encuentra errores")
+    parser.add_argument("--list-backends", action="store_true", help="lista los backends y termina")
+    args = parser.parse_args(argv)
+
+    if args.list_backends:
+        for name, backend in BACKENDS.items():
+            marca = " (por defecto)" if name == DEFAULT_BACKEND else ""
+            print(f"{name:12} {backend.description}{marca}")
+        return 0
+    if not args.archivo:
+        parser.error("falta el archivo a compilar")
+    with open(args.archivo, encoding="utf-8") as f:
+        unit = CompilationUnit(f.read())
+
+    if args.compare:
+        comparacion = Compiler().compare(unit, backends=args.backend, strict=args.strict)
+        print(f"{'backend':12} {'estado':8} {'codegen ms':>10} {'ejecución ms':>12}  salida")
+        for name, res in comparacion["results"].items():
+            if name == comparacion["reference"]:
+                veredicto = "referencia"
+            else:
+                veredicto = "DIFIERE" if name in comparacion["mismatches"] else "igual"
+            print(f"{name:12} {res['status']:8} {_tiempo(res, 'codegen')} "
+                  f"{_tiempo(res, 'execution'):>12}  {veredicto}")
+        fallaron = any(res["status"] == "error" for res in comparacion["results"].values())
+        return 1 if comparacion["mismatches"] or fallaron else 0
+
+    if args.backend and len(args.backend) > 1:
+        parser.error("sin --compare solo se puede elegir un backend")
+    res = Compiler().compile(unit, execute=True, strict=args.strict,
+                             backend=args.backend[0] if args.backend else DEFAULT_BACKEND)
+    sys.stdout.write(res["output"])
+    if res["output"] and not res["output"].endswith("\n"):
+        sys.stdout.write("\n")
+    _diagnosticos(res)
+    return 0 if res["status"] == "success" else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
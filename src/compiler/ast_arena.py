@@ -0,0 +1,468 @@
+"""
+Representación plana del AST del Parser.
+
+En lugar de un objeto por nodo, el árbol vive en columnas paralelas de enteros
+(array('i')) dentro de una sola arena; un nodo es solo un índice:
+
+    kind[i]          TREE / BLOCK / DECL / FOR / IF / SWITCH / CALL / FUNCTION /
+                     PROGRAM
+    token[i]         índice en la tabla de tokens (los tokens compartidos del
+                     Parser aparecen una sola vez)
+    left[i]/right[i] hijos de un TreeNode (NIL si no hay)
+    first_child[i]   primer hijo de un bloque, declaración o sentencia n-aria
+    next_sibling[i]  siguiente hermano dentro del mismo padre
+
+Los datos que no son enteros (valor pre-parseado de un Numero, la lista de
+variables de una declaración, qué hijo es cada campo de las sentencias
+n-arias -ForNode, IfNode, SwitchNode, CallNode, FunctionNode, ProgramNode- y
+sus datos) van en `payload`, un dict disperso índice -> dato.
+
+Todas las conversiones son iterativas, así que los árboles profundos no
+agotan el límite de recursión. La arena se puede serializar con pickle para
+guardarla en caché o enviarla a otro proceso.
+
+El Parser escribe la arena directamente (Parser.parse_arena): AstArena tiene
+la misma interfaz de construcción y consulta que ast_nodes.TreeNodes, así
+cada nodo es una fila nueva en las columnas, sin objetos intermedios. Los
+nodos se agregan de abajo hacia arriba (los hijos antes que el padre), de
+modo que descartar un parseo especulativo o una sentencia con error es
+truncar las columnas (mark/truncate). from_tree aplana un AST de objetos ya
+armado.
+
+La leen directamente, sin reconstruir objetos, el SemanticAnalyzer y
+CodeGeneratorFromTree. El Interpreter anota tipo, implementación y slot en
+cada nodo, así que construye los objetos una vez con to_tree().
+"""
+from array import array
+
+from .ast_nodes import (
+    TreeNode, BlockNode, DeclarationNode, ForNode, IfNode, SwitchNode, CallNode, FunctionNode,
+    ProgramNode, BLOCK_TOKEN,
+)
+
+NIL = -1
+TREE, BLOCK, DECL, FOR, IF, SWITCH, CALL, FUNCTION, PROGRAM = range(9)
+
+_KINDS = {BlockNode: BLOCK, DeclarationNode: DECL, ForNode: FOR, IfNode: IF, SwitchNode: SWITCH,
+          CallNode: CALL, FunctionNode: FUNCTION, ProgramNode: PROGRAM}
+_NARY = {FOR: ForNode, IF: IfNode, SWITCH: SwitchNode, CALL: CallNode, FUNCTION: FunctionNode,
+         PROGRAM: ProgramNode}
+
+
+def _is_int(value):
+    return isinstance(value, int) and not isinstance(value, bool)
+
+
+def _is_ref(value):
+    """Referencia a un hijo en el payload: un índice, NIL o una tupla de índices."""
+    if isinstance(value, tuple):
+        return all(_is_int(v) and v >= 0 for v in value)
+    return _is_int(value) and value >= NIL
+
+
+def _switch_data(data):
+    table, default = data
+    return (isinstance(table, dict) and all(isinstance(k, (int, float)) for k in table)
+            and all(_is_int(p) and p >= 0 for p in table.values())
+            and (default is None or _is_int(default) and default >= 0))
+
+
+def _function_data(data):
+    name, rtype, params = data
+    return (isinstance(name, str) and isinstance(rtype, str) and isinstance(params, list)
+            and all(isinstance(p, tuple) and len(p) == 3 and isinstance(p[0], str)
+                    and isinstance(p[1], str) for p in params))
+
+
+# Forma de los campos DATA de las sentencias n-arias que los tienen
+_DATA_CHECKS = {SWITCH: _switch_data, FUNCTION: _function_data}
+
+
+class AstArena:
+    def __init__(self):
+        self.kind = array('b')
+        self.token = array('i')
+        self.left = array('i')
+        self.right = array('i')
+        self.first_child = array('i')
+        self.next_sibling = array('i')
+        self.tokens = []
+        self.payload = {}
+        self.root = NIL
+        self._token_ids = {}  # id(token) -> índice en self.tokens
+
+    def __len__(self):
+        return len(self.kind)
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        del state['_token_ids']  # los id() no sobreviven al proceso
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._token_ids = {id(t): i for i, t in enumerate(self.tokens)}
+
+    @classmethod
+    def from_tree(cls, root):
+        """Aplana un AST de TreeNode/BlockNode/DeclarationNode en una arena nueva."""
+        arena = cls()
+        arena.root = arena.add_tree(root)
+        return arena
+
+    # ---- construcción ----
+
+    def _token_index(self, tok):
+        idx = self._token_ids.get(id(tok))
+        if idx is None:
+            idx = len(self.tokens)
+            self.tokens.append(tok)
+            self._token_ids[id(tok)] = idx
+        return idx
+
+    def _emit(self, kind, tok, value=None):
+        i = len(self.kind)
+        self.kind.append(kind)
+        self.token.append(self._token_index(tok))
+        self.left.append(NIL)
+        self.right.append(NIL)
+        self.first_child.append(NIL)
+        self.next_sibling.append(NIL)
+        if value is not None:
+            self.payload[i] = value
+        return i
+
+    def _new(self, node):
+        return self._emit(_KINDS.get(type(node), TREE), node.token, node.value)
+
+    def _chain(self, parent, indices):
+        prev = NIL
+        for c in indices:
+            if prev == NIL:
+                self.first_child[parent] = c
+            else:
+                self.next_sibling[prev] = c
+            prev = c
+
+    def _link_children(self, parent, nodes, stack):
+        indices = []
+        for child in nodes:
+            c = self._new(child)
+            indices.append(c)
+            stack.append((child, c))
+        self._chain(parent, indices)
+        return indices
+
+    @staticmethod
+    def _refs(values):
+        """Referencias del payload para valores de campo (índice, None o lista) y los hijos en orden."""
+        refs, kids = [], []
+        for value in values:
+            if isinstance(value, list):
+                refs.append(tuple(value))
+                kids.extend(value)
+            elif value is not None:
+                refs.append(value)
+                kids.append(value)
+            else:
+                refs.append(NIL)
+        return refs, kids
+
+    # ---- construcción desde el Parser (misma interfaz que ast_nodes.TreeNodes) ----
+
+    def leaf(self, token, value=None):
+        return self._emit(TREE, token, value)
+
+    def node(self, token, left=None, right=None):
+        i = self._emit(TREE, token)
+        if left is not None:
+            self.left[i] = left
+        if right is not None:
+            self.right[i] = right
+        return i
+
+    def block(self, statements):
+        i = self._emit(BLOCK, BLOCK_TOKEN)
+        self._chain(i, statements)
+        return i
+
+    def declaration(self, type_token, variables):
+        i = self._emit(DECL, type_token)
+        refs, kids = self._refs([init for _, _, init in variables])
+        self._chain(i, kids)
+        self.payload[i] = [(name, size, ref) for (name, size, _), ref in zip(variables, refs)]
+        return i
+
+    def nary(self, cls, token, fields, data=()):
+        i = self._emit(_KINDS[cls], token)
+        refs, kids = self._refs(fields)
+        self._chain(i, kids)
+        self.payload[i] = (tuple(refs), tuple(data))
+        return i
+
+    def mark(self):
+        return len(self.kind), len(self.tokens)
+
+    def truncate(self, mark):
+        """Descarta los nodos (y los tokens nuevos) agregados desde mark; ninguno anterior los referencia."""
+        nodes, tokens = mark
+        for column in (self.kind, self.token, self.left, self.right, self.first_child, self.next_sibling):
+            del column[nodes:]
+        for i in [i for i in self.payload if i >= nodes]:
+            del self.payload[i]
+        for tok in self.tokens[tokens:]:
+            del self._token_ids[id(tok)]
+        del self.tokens[tokens:]
+
+    def add_tree(self, root):
+        """Agrega el árbol `root` a la arena y devuelve el índice de su raíz."""
+        if root is None:
+            return NIL
+        top = self._new(root)
+        stack = [(root, top)]
+        while stack:
+            node, i = stack.pop()
+            if isinstance(node, BlockNode):
+                self._link_children(i, node.statements, stack)
+            elif isinstance(node, DeclarationNode):
+                # Los inicializadores se encadenan como hijos (igual que
+                # DeclarationNode.children()); el payload los referencia por índice
+                indices = iter(self._link_children(i, node.children(), stack))
+                decl_vars = []
+                for var in node.vars:
+                    init = var['init']
+                    if isinstance(init, list):
+                        ref = tuple(next(indices) for _ in init)
+                    elif init is not None:
+                        ref = next(indices)
+                    else:
+                        ref = NIL
+                    decl_vars.append((var['name'], var['size'], ref))
+                self.payload[i] = decl_vars
+            elif self.kind[i] in _NARY:
+                # Cada campo guarda el índice de su hijo (NIL si es None) o
+                # una tupla de índices si es una lista, más los campos DATA
+                indices = iter(self._link_children(i, node.children(), stack))
+                refs = []
+                for name in node.FIELDS:
+                    child = getattr(node, name)
+                    if isinstance(child, list):
+                        refs.append(tuple(next(indices) for _ in child))
+                    elif child is not None:
+                        refs.append(next(indices))
+                    else:
+                        refs.append(NIL)
+                self.payload[i] = (tuple(refs), tuple(getattr(node, d) for d in node.DATA))
+            for attr, column in (('left', self.left), ('right', self.right)):
+                child = getattr(node, attr)
+                if child is not None:
+                    c = self._new(child)
+                    column[i] = c
+                    stack.append((child, c))
+        return top
+
+    # ---- consulta ----
+
+    def token_of(self, i):
+        return self.tokens[self.token[i]]
+
+    def value_of(self, i):
+        return self.payload.get(i) if self.kind[i] == TREE else None
+
+    def left_of(self, i):
+        return self.left[i] if self.left[i] != NIL else None
+
+    def right_of(self, i):
+        return self.right[i] if self.right[i] != NIL else None
+
+    def is_tree(self, i):
+        return self.kind[i] == TREE
+
+    def variables(self, i):
+        """(nombre, tamaño, init) de cada variable de la declaración i; init como en TreeNodes."""
+        result = []
+        for name, size, ref in self.payload[i]:
+            if isinstance(ref, tuple):
+                init = list(ref)
+            else:
+                init = ref if ref != NIL else None
+            result.append((name, size, init))
+        return result
+
+    def children(self, i):
+        """Hijos directos del nodo i, en el mismo orden que TreeNode.children()."""
+        if self.kind[i] == TREE:
+            return [c for c in (self.left[i], self.right[i]) if c != NIL]
+        kids = []
+        c = self.first_child[i]
+        while c != NIL:
+            kids.append(c)
+            c = self.next_sibling[c]
+        return kids
+
+    # ---- validación ----
+
+    def validate(self):
+        """
+        Comprueba que la arena describe un árbol bien formado antes de
+        reconstruirlo: columnas del mismo largo, kinds conocidos, índices en
+        rango, payload con la forma de cada kind y cada nodo alcanzado desde
+        la raíz exactamente una vez (sin ciclos, hijos compartidos ni nodos
+        sueltos). Lanza ValueError con el primer problema encontrado.
+        """
+        n = len(self.kind)
+        columns = (self.token, self.left, self.right, self.first_child, self.next_sibling)
+        if any(len(col) != n for col in columns):
+            raise ValueError("Arena de AST corrupta: columnas de distinto largo")
+        if n and (min(self.kind) < TREE or max(self.kind) > PROGRAM):
+            raise ValueError("Arena de AST corrupta: kind desconocido")
+        if n and (min(self.token) < 0 or max(self.token) >= len(self.tokens)):
+            raise ValueError("Arena de AST corrupta: token fuera de rango")
+        for col in columns[1:]:
+            if n and (min(col) < NIL or max(col) >= n):
+                raise ValueError("Arena de AST corrupta: hijo fuera de rango")
+        if not (isinstance(self.root, int) and NIL <= self.root < n) or (self.root == NIL) != (n == 0):
+            raise ValueError("Arena de AST corrupta: raíz fuera de rango")
+        if any(not isinstance(i, int) or not 0 <= i < n for i in self.payload):
+            raise ValueError("Arena de AST corrupta: payload de un nodo inexistente")
+
+        # Mismo recorrido que to_tree(): left/right de todos los nodos y la
+        # cadena first_child/next_sibling de los que no son TreeNode. Cada
+        # nodo se marca al encolarlo, así un ciclo se detecta en vez de recorrerse
+        seen = bytearray(n)
+        stack = []
+        if n:
+            if self.next_sibling[self.root] != NIL:
+                raise ValueError("Arena de AST corrupta: la raíz tiene hermanos")
+            seen[self.root] = 1
+            stack.append(self.root)
+        while stack:
+            i = stack.pop()
+            kids = []
+            if self.kind[i] == TREE:
+                if self.first_child[i] != NIL:
+                    raise ValueError("Arena de AST corrupta: TreeNode con hijos en cadena")
+                value = self.payload.get(i)
+                if value is not None and (not isinstance(value, (int, float)) or isinstance(value, bool)):
+                    raise ValueError("Arena de AST corrupta: valor de literal no numérico")
+            else:
+                c = self.first_child[i]
+                while c != NIL:
+                    if seen[c]:
+                        raise ValueError(f"Arena de AST corrupta: el nodo {c} se alcanza más de una vez")
+                    seen[c] = 1
+                    kids.append(c)
+                    c = self.next_sibling[c]
+                self._validate_payload(i, kids)
+            for c in (self.left[i], self.right[i]):
+                if c == NIL:
+                    continue
+                if seen[c]:
+                    raise ValueError(f"Arena de AST corrupta: el nodo {c} se alcanza más de una vez")
+                if self.next_sibling[c] != NIL:
+                    raise ValueError("Arena de AST corrupta: hijo left/right con hermanos")
+                seen[c] = 1
+                kids.append(c)
+            stack.extend(kids)
+        if seen.count(1) != n:
+            raise ValueError("Arena de AST corrupta: nodos no alcanzables desde la raíz")
+
+    def _validate_payload(self, i, kids):
+        """Forma del payload de un nodo DECL o n-ario: sus referencias son, en orden, sus hijos."""
+        kind = self.kind[i]
+        if kind == BLOCK:
+            return
+        value = self.payload.get(i)
+        refs = []
+        if kind == DECL:
+            if not isinstance(value, list):
+                raise ValueError("Arena de AST corrupta: payload de declaración")
+            for var in value:
+                if not (isinstance(var, tuple) and len(var) == 3 and isinstance(var[0], str)
+                        and (var[1] is None or _is_int(var[1])) and _is_ref(var[2])):
+                    raise ValueError("Arena de AST corrupta: variable de declaración")
+                refs.append(var[2])
+        else:
+            cls = _NARY[kind]
+            if not (isinstance(value, tuple) and len(value) == 2 and isinstance(value[0], tuple)
+                    and isinstance(value[1], tuple) and len(value[0]) == len(cls.FIELDS)
+                    and len(value[1]) == len(cls.DATA)):
+                raise ValueError(f"Arena de AST corrupta: payload de {cls.__name__}")
+            refs = value[0]
+            if not _DATA_CHECKS.get(kind, lambda data: True)(value[1]):
+                raise ValueError(f"Arena de AST corrupta: datos de {cls.__name__}")
+            if not all(_is_ref(ref) for ref in refs):
+                raise ValueError(f"Arena de AST corrupta: referencias de {cls.__name__}")
+        flat = []
+        for ref in refs:
+            if isinstance(ref, tuple):
+                flat.extend(ref)
+            elif ref != NIL:
+                flat.append(ref)
+        if flat != kids:
+            raise ValueError("Arena de AST corrupta: el payload no coincide con los hijos")
+
+    # ---- reconstrucción ----
+
+    def to_tree(self, index=None):
+        """Reconstruye los objetos TreeNode del subárbol `index` (por defecto la raíz)."""
+        if index is None:
+            index = self.root
+        if index == NIL:
+            return None
+        nodes = {}
+        order = [index]
+        queued = {index}
+        pos = 0
+        while pos < len(order):
+            i = order[pos]
+            pos += 1
+            tok = self.token_of(i)
+            if self.kind[i] == BLOCK:
+                nodes[i] = BlockNode()
+            elif self.kind[i] == DECL:
+                nodes[i] = DeclarationNode(tok)
+            elif self.kind[i] in _NARY:
+                nodes[i] = _NARY[self.kind[i]](tok)
+            else:
+                nodes[i] = TreeNode(tok)
+                nodes[i].value = self.payload.get(i)
+            kids = []
+            if self.kind[i] != TREE:
+                c = self.first_child[i]
+                while c != NIL and len(kids) <= len(self.kind):
+                    kids.append(c)
+                    c = self.next_sibling[c]
+            kids.extend(c for c in (self.left[i], self.right[i]) if c != NIL)
+            for c in kids:
+                # Un ciclo (o un hijo compartido) haría crecer order sin fin
+                if c in queued:
+                    raise ValueError(f"Arena de AST corrupta: el nodo {c} se alcanza más de una vez")
+                queued.add(c)
+                order.append(c)
+
+        for i in order:
+            node = nodes[i]
+            if self.left[i] != NIL:
+                node.left = nodes[self.left[i]]
+            if self.right[i] != NIL:
+                node.right = nodes[self.right[i]]
+            if self.kind[i] == BLOCK:
+                node.statements = [nodes[c] for c in self.children(i)]
+            elif self.kind[i] == DECL:
+                for name, size, ref in self.payload[i]:
+                    if isinstance(ref, tuple):
+                        init = [nodes[c] for c in ref]
+                    else:
+                        init = nodes[ref] if ref != NIL else None
+                    node.add_var(name, size, init)
+            elif self.kind[i] in _NARY:
+                refs, data = self.payload[i]
+                for name, ref in zip(node.FIELDS, refs):
+                    if isinstance(ref, tuple):
+                        setattr(node, name, [nodes[c] for c in ref])
+                    else:
+                        setattr(node, name, nodes[ref] if ref != NIL else None)
+                for name, value in zip(node.DATA, data):
+                    setattr(node, name, value)
+        return nodes[index]
@@ -1,45 +1,132 @@
 from .lexer import Token
 
+# Tokens sintéticos compartidos. Los nodos que arma el Parser sin un token
+# propio del fuente (bloques, '=', '[]', palabras clave) apuntan todos a la
+# misma instancia en lugar de crear una por nodo; nadie modifica un token.
+BLOCK_TOKEN = Token(Token.Type.Invalido, 'BLOCK')
+ASSIGN_TOKEN = Token(Token.Type.Asign, '=')
+INDEX_TOKEN = Token(Token.Type.Index, '[]')
+INCREMENT_TOKEN = Token(Token.Type.Increment, '++')
+FOR_TOKEN = Token(Token.Type.For, 'for')
+WHILE_TOKEN = Token(Token.Type.While, 'while')
+COUT_TOKEN = Token(Token.Type.Cout, 'cout')
+RETURN_TOKEN = Token(Token.Type.Return, 'return')
+IF_TOKEN = Token(Token.Type.If, 'if')
+SWITCH_TOKEN = Token(Token.Type.Switch, 'switch')
+PROGRAM_TOKEN = Token(Token.Type.Invalido, 'PROGRAM')
+# Su línea (1) no es la del fuente; quien necesite la línea de un nodo con
+# uno de estos tokens debe tomarla de sus hijos
+SYNTHETIC_TOKENS = (BLOCK_TOKEN, ASSIGN_TOKEN, INDEX_TOKEN, INCREMENT_TOKEN, FOR_TOKEN,
+                    WHILE_TOKEN, COUT_TOKEN, RETURN_TOKEN, IF_TOKEN, SWITCH_TOKEN, PROGRAM_TOKEN)
+
+
+def linea(node, nodes=None):
+    """
+    Línea del fuente de node: la del primer token no sintético de su subárbol
+    (o None). Con nodes=arena, node es un índice de esa AstArena.
+    """
+    if nodes is None:
+        nodes = TREE_NODES
+    stack = [node]
+    while stack:
+        current = stack.pop()
+        if current is None:
+            continue
+        token = nodes.token_of(current)
+        if not any(token is t for t in SYNTHETIC_TOKENS):
+            return token.line
+        stack.extend(reversed(nodes.children(current)))
+    return None
+
+
+def postorden_operadores(raiz):
+    """
+    Nodos del árbol de operadores de raiz en post-orden, con su profundidad
+    máxima. Los operandos que no son operadores (literales, variables,
+    llamadas...) aparecen como hojas sin recorrer sus hijos.
+    """
+    nodes, depth = [], 0
+    stack = [(raiz, False, 1)]
+    while stack:
+        node, ready, level = stack.pop()
+        if ready or node.token.op is None:
+            nodes.append(node)
+            depth = max(depth, level)
+            continue
+        stack.append((node, True, level))
+        if node.right is not None:
+            stack.append((node.right, False, level + 1))
+        stack.append((node.left, False, level + 1))
+    return nodes, depth
+
+
 class TreeNode:
-    def __init__(self, token: Token):
+    __slots__ = ('token', 'left', 'right', 'value', 'ctype', 'impl', 'slot')
+
+    def __init__(self, token: Token, left=None, right=None):
         self.token = token
-        self.left = None
-        self.right = None
+        self.left = left
+        self.right = right
+        self.value = None  # Valor de un literal numérico, pre-parseado por el Parser
+        self.ctype = None  # Tipo estático ('int'/'float') asignado por TypeInference
+        self.impl = None   # Implementación especializada del operador (TypeInference)
+        self.slot = None   # Posición en el marco de su función (Resolver); None en main
 
     def __repr__(self):
         return f"TreeNode({self.token.type}, {self.token.value})"
 
+    def children(self):
+        """Hijos directos del nodo (los None se omiten)."""
+        return [n for n in (self.left, self.right) if n is not None]
+
     def print_tree(self, level=0, output_func=print):
+        # Recorrido con pila explícita: árboles muy profundos (expresiones
+        # generadas de miles de términos) no agotan el límite de recursión.
+        stack = [(self, level)]
+        while stack:
+            item = stack.pop()
+            if isinstance(item, str):
+                output_func(item)
+                continue
+            node, lvl = item
+            stack.extend(reversed(node._print_items(lvl)))
+
+    def _print_items(self, level):
+        """
+        Lo que imprime este nodo, en orden: líneas ya formateadas (str) o
+        pares (hijo, nivel) que print_tree expande después.
+        """
         indent = "  " * level
         t = self.token
         if t.type == Token.Type.Numero:
-            output_func(f"{indent}Numero: {t.value}")
+            return [f"{indent}Numero: {t.value}"]
         elif t.type == Token.Type.Ident:
-            output_func(f"{indent}Identificador: {t.value}")
+            return [f"{indent}Identificador: {t.value}"]
         elif t.type == Token.Type.ParAbre or t.type == Token.Type.ParCierra:
-            output_func(f"{indent}Parentesis: {t.value}")
-        else:
-            # Mostrar operador con recursión
-            op_map = {
-                Token.Type.Suma: "+",
-                Token.Type.Resta: "-",
-                Token.Type.Multiplica: "*",
-                Token.Type.Divide: "/",
-                Token.Type.Mod: "%"
-            }
-            op = op_map.get(t.type, t.value)
-            output_func(f"{indent}Operador: {op}")
-            if self.left:
-                output_func(f"{indent} L:")
-                self.left.print_tree(level + 2, output_func)
-            if self.right:
-                output_func(f"{indent} R:")
-                self.right.print_tree(level + 2, output_func)
+            return [f"{indent}Parentesis: {t.value}"]
+        # Mostrar operador y sus operandos
+        op_map = {
+            Token.Type.Suma: "+",
+            Token.Type.Resta: "-",
+            Token.Type.Multiplica: "*",
+            Token.Type.Divide: "/",
+            Token.Type.Mod: "%"
+        }
+        op = op_map.get(t.type, t.value)
+        items = [f"{indent}Operador: {op}"]
+        if self.left:
+            items += [f"{indent} L:", (self.left, level + 2)]
+        if self.right:
+            items += [f"{indent} R:", (self.right, level + 2)]
+        return items
 
 
 class Node:
-    def __init__(self, op=None, value=None, left=None, right=None):
+    __slots__ = ('op', 'opcode', 'value', 'left', 'right', 'eval_order', 'result')
+
+    def __init__(self, op=None, value=None, left=None, right=None, opcode=None):
         self.op = op
+        self.opcode = opcode  # opcode de operators.py correspondiente a op
         self.value = value
         self.left = left
         self.right = right
@@ -49,21 +136,42 @@ class Node:
     def is_leaf(self):
         return self.value is not None
 
+    def copy(self):
+        """Copia profunda del subárbol (iterativa: sirve para expresiones muy profundas)."""
+        root = Node()
+        stack = [(self, root)]
+        while stack:
+            src, dst = stack.pop()
+            for name in Node.__slots__:
+                setattr(dst, name, getattr(src, name))
+            for name in ('left', 'right'):
+                child = getattr(src, name)
+                if child is not None:
+                    copia = Node()
+                    setattr(dst, name, copia)
+                    stack.append((child, copia))
+        return root
+
 class BlockNode(TreeNode):
+    __slots__ = ('statements',)
+
     def __init__(self, statements=None):
-        super().__init__(Token(Token.Type.Invalido, 'BLOCK')) # Dummy token
+        super().__init__(BLOCK_TOKEN)
         self.statements = statements if statements else []
 
     def add(self, statement):
         self.statements.append(statement)
 
-    def print_tree(self, level=0, output_func=print):
+    def children(self):
+        return list(self.statements)
+
+    def _print_items(self, level):
         indent = "  " * level
-        output_func(f"{indent}Block:")
-        for stmt in self.statements:
-            stmt.print_tree(level + 1, output_func)
+        return [f"{indent}Block:"] + [(stmt, level + 1) for stmt in self.statements]
 
 class DeclarationNode(TreeNode):
+    __slots__ = ('vars',)
+
     def __init__(self, type_token, vars=None):
         super().__init__(type_token)
         self.vars = vars if vars else [] # List of (name, size_if_array, init_value)
@@ -71,8 +179,260 @@ class DeclarationNode(TreeNode):
     def add_var(self, name, size=None, init=None):
         self.vars.append({'name': name, 'size': size, 'init': init})
 
-    def print_tree(self, level=0, output_func=print):
+    def children(self):
+        kids = []
+        for var in self.vars:
+            init = var['init']
+            if isinstance(init, list):
+                kids.extend(init)
+            elif init is not None:
+                kids.append(init)
+        return kids
+
+    def _print_items(self, level):
+        indent = "  " * level
+        return [f"{indent}Declaration ({self.token.value}): {self.vars}"]
+
+
+
+
+class _NaryNode(TreeNode):
+    """
+    Base de las sentencias de control con hijos con nombre. FIELDS lista los
+    atributos que guardan un nodo (o None) o una lista de nodos; DATA los
+    atributos con datos simples. children(), la arena y la serialización se
+    guían por estos dos esquemas.
+    """
+    __slots__ = ()
+    FIELDS = ()
+    DATA = ()
+
+    def children(self):
+        kids = []
+        for name in self.FIELDS:
+            child = getattr(self, name)
+            if isinstance(child, list):
+                kids.extend(child)
+            elif child is not None:
+                kids.append(child)
+        return kids
+
+    def _field_items(self, level, header, titles):
+        indent = "  " * level
+        items = [f"{indent}{header}:"]
+        for name, title in zip(self.FIELDS, titles):
+            child = getattr(self, name)
+            if child is not None:
+                items += [f"{indent} {title}:", (child, level + 2)]
+        return items
+
+
+class ForNode(_NaryNode):
+    """for (init; cond; update) body"""
+    __slots__ = ('init', 'cond', 'update', 'body')
+    FIELDS = ('init', 'cond', 'update', 'body')
+
+    def __init__(self, token=FOR_TOKEN, init=None, cond=None, update=None, body=None):
+        super().__init__(token)
+        self.init = init
+        self.cond = cond
+        self.update = update
+        self.body = body
+
+    def _print_items(self, level):
+        return self._field_items(level, "For", ("Init", "Cond", "Update", "Body"))
+
+
+class IfNode(_NaryNode):
+    """if (cond) then_branch [else else_branch]; un 'else if' es un IfNode en else_branch."""
+    __slots__ = ('cond', 'then_branch', 'else_branch')
+    FIELDS = ('cond', 'then_branch', 'else_branch')
+
+    def __init__(self, token=IF_TOKEN, cond=None, then_branch=None, else_branch=None):
+        super().__init__(token)
+        self.cond = cond
+        self.then_branch = then_branch
+        self.else_branch = else_branch
+
+    def _print_items(self, level):
+        return self._field_items(level, "If", ("Cond", "Then", "Else"))
+
+
+class SwitchNode(_NaryNode):
+    """
+    switch (subject) { case v: ... default: ... }
+
+    Las sentencias de todos los casos van en una sola lista `body`, en orden
+    de fuente; `table` lleva cada valor de case a la posición de su primera
+    sentencia en body y `default` es la posición del default (o None). Así el
+    Interpreter salta directo al caso en O(1) y el fall-through es seguir
+    ejecutando body hasta un break.
+    """
+    __slots__ = ('subject', 'body', 'table', 'default')
+    FIELDS = ('subject', 'body')
+    DATA = ('table', 'default')
+
+    def __init__(self, token=SWITCH_TOKEN, subject=None, body=None, table=None, default=None):
+        super().__init__(token)
+        self.subject = subject
+        self.body = body if body is not None else []
+        self.table = table if table is not None else {}
+        self.default = default
+
+    def add_case(self, value):
+        """Etiqueta la próxima sentencia de body con `value`. False si el valor ya existía."""
+        if value in self.table:
+            return False
+        self.table[value] = len(self.body)
+        return True
+
+    def add_default(self):
+        if self.default is not None:
+            return False
+        self.default = len(self.body)
+        return True
+
+    def _print_items(self, level):
+        indent = "  " * level
+        labels = {}
+        for value, pos in self.table.items():
+            labels.setdefault(pos, []).append(f"{indent} Case {value}:")
+        if self.default is not None:
+            labels.setdefault(self.default, []).append(f"{indent} Default:")
+        items = [f"{indent}Switch:", f"{indent} Subject:", (self.subject, level + 2)]
+        for pos, stmt in enumerate(self.body):
+            items += labels.get(pos, [])
+            items.append((stmt, level + 2))
+        # Etiquetas al final del switch, sin sentencias detrás
+        items += labels.get(len(self.body), [])
+        return items
+
+
+class CallNode(_NaryNode):
+    """nombre(args...): token es el identificador de la función."""
+    __slots__ = ('args',)
+    FIELDS = ('args',)
+
+    def __init__(self, token, args=None):
+        super().__init__(token)
+        self.args = args if args is not None else []
+
+    def _print_items(self, level):
+        indent = "  " * level
+        return [f"{indent}Call {self.token.value}:"] + [(arg, level + 1) for arg in self.args]
+
+
+class FunctionNode(_NaryNode):
+    """
+    tipo nombre(params) body. params es una lista de (tipo, nombre, es_arreglo);
+    token es el identificador de la función. frame_size lo calcula el
+    Resolver: cuántos slots necesita un marco de la función.
+    """
+    __slots__ = ('name', 'rtype', 'params', 'body', 'frame_size')
+    FIELDS = ('body',)
+    DATA = ('name', 'rtype', 'params')
+
+    def __init__(self, token, name=None, rtype=None, params=None, body=None):
+        super().__init__(token)
+        self.name = name if name is not None else token.value
+        self.rtype = rtype
+        self.params = params if params is not None else []
+        self.body = body
+        self.frame_size = None
+
+    def _print_items(self, level):
+        indent = "  " * level
+        params = ", ".join(f"{t} {n}{'[]' if arr else ''}" for t, n, arr in self.params)
+        return [f"{indent}Function {self.rtype} {self.name}({params}):", (self.body, level + 1)]
+
+
+class ProgramNode(_NaryNode):
+    """Programa con funciones además de main: functions y el bloque de main."""
+    __slots__ = ('functions', 'main')
+    FIELDS = ('functions', 'main')
+
+    def __init__(self, token=PROGRAM_TOKEN, functions=None, main=None):
+        super().__init__(token)
+        self.functions = functions if functions is not None else []
+        self.main = main
+
+    def _print_items(self, level):
         indent = "  " * level
-        output_func(f"{indent}Declaration ({self.token.value}): {self.vars}")
+        return ([f"{indent}Program:"] + [(f, level + 1) for f in self.functions]
+                + [f"{indent} Main:", (self.main, level + 2)])
+
+
+class TreeNodes:
+    """
+    Constructor y lector del AST como objetos. AstArena tiene la misma
+    interfaz con índices en lugar de nodos, así el Parser arma cualquiera de
+    los dos sin pasar por el otro y las pasadas que leen el AST (el análisis
+    semántico, el generador de código) aceptan ambos.
+
+    Los nodos se arman de abajo hacia arriba: cada constructor recibe sus
+    hijos ya terminados y ningún nodo cambia después de creado.
+    """
+
+    # ---- construcción ----
+
+    def leaf(self, token, value=None):
+        node = TreeNode(token)
+        node.value = value
+        return node
+
+    def node(self, token, left=None, right=None):
+        return TreeNode(token, left, right)
+
+    def block(self, statements):
+        return BlockNode(statements)
+
+    def declaration(self, type_token, variables):
+        """variables: lista de (nombre, tamaño, init); init es un nodo, una lista de nodos o None."""
+        node = DeclarationNode(type_token)
+        for name, size, init in variables:
+            node.add_var(name, size, init)
+        return node
+
+    def nary(self, cls, token, fields, data=()):
+        """Sentencia n-aria cls con los valores de cls.FIELDS y cls.DATA, en ese orden."""
+        node = cls(token)
+        for name, value in zip(cls.FIELDS, fields):
+            setattr(node, name, value)
+        for name, value in zip(cls.DATA, data):
+            setattr(node, name, value)
+        return node
+
+    def mark(self):
+        """Marca para descartar lo construido desde aquí (los objetos sueltos los libera Python)."""
+        return None
+
+    def truncate(self, mark):
+        pass
+
+    # ---- consulta ----
+
+    def token_of(self, node):
+        return node.token
+
+    def left_of(self, node):
+        return node.left
+
+    def right_of(self, node):
+        return node.right
+
+    def value_of(self, node):
+        return node.value
+
+    def is_tree(self, node):
+        """True si node es un TreeNode simple (no un bloque, declaración o sentencia n-aria)."""
+        return type(node) is TreeNode
+
+    def children(self, node):
+        return node.children()
+
+    def variables(self, node):
+        """(nombre, tamaño, init) de cada variable de una declaración."""
+        return [(var['name'], var['size'], var['init']) for var in node.vars]
 
 
+TREE_NODES = TreeNodes()
@@ -1,15 +1,73 @@
+import re
+from collections import namedtuple
+from functools import lru_cache
+
 from .ast_nodes import Node
+from .operators import OPCODES, SYMBOLS, PRECEDENCE, NEG, REAL_OPS
+
+_NUMERO = re.compile(r'(?:\d+\.?\d*|\.\d+)\Z')
+_PAR_ABRE = -1  # marca de '(' en la pila de operadores del shunting-yard
+
+
+class ExpresionCompilada(namedtuple('ExpresionCompilada', [
+        'tokens', 'rpn', 'ast', 'identificadores', 'codigo_intermedio', 'resultado', 'error'])):
+    """
+    Forma compilada e inmutable de una expresión: tokens, RPN y plantilla del
+    AST (ya evaluada) como tuplas/nodos que no se vuelven a modificar, el
+    resultado final y, si falló alguna fase, el mensaje de error. La misma
+    instancia se comparte entre todas las llamadas con esa expresión, así que
+    quien use compilar() no debe modificar `ast`; analizar() entrega una copia.
+    """
+    __slots__ = ()
+
+    @property
+    def derivaciones(self):
+        """Texto de derivaciones, construido solo cuando se pide (y memoizado)."""
+        if self.ast is None:
+            return ()
+        return _derivaciones(self.ast)
+
+
+def normalizar(expr: str) -> str:
+    """Clave de la caché: espacios colapsados, ya que tokenize los ignora."""
+    return " ".join(expr.split())
+
+
+@lru_cache(maxsize=1024)
+def _compilar(normalizada: str) -> ExpresionCompilada:
+    a = Automata()
+    tokens = rpn = ast = None
+    resultado = error = None
+    try:
+        tokens = a.tokenize(normalizada)
+        if not tokens:
+            error = "No se encontraron tokens válidos."
+        else:
+            rpn = a.to_rpn(tokens)
+            ast = a.rpn_to_ast(rpn)
+    except Exception as e:
+        error = f"Error durante tokenización, RPN o AST: {e}"
+        rpn = ast = None
+    if ast is not None:
+        # La plantilla se anota (result/eval_order) aquí, antes de publicarse
+        # en la caché; después nadie la vuelve a escribir.
+        try:
+            a.evaluate_and_assign_order(ast, [0])
+            resultado = ast.result
+        except Exception as e:
+            error = f"Error durante la evaluación: {e}"
+    return ExpresionCompilada(
+        tuple(tokens or ()), tuple(rpn) if rpn is not None else None, ast,
+        tuple(a.identificadores), tuple(a.codigo_intermedio), resultado, error)
+
+
+@lru_cache(maxsize=1024)
+def _derivaciones(ast):
+    return tuple(Automata().derivaciones(ast))
+
 
 class Automata:
     def __init__(self):
-        self.operators = {
-            'u-': (5, 'right'),
-            '^': (4, 'right'),
-            '*': (3, 'left'),
-            '/': (3, 'left'),
-            '+': (2, 'left'),
-            '-': (2, 'left'),
-        }
         self.derivations = []
         self.identificadores = []
         self.codigo_intermedio = []
@@ -55,165 +113,194 @@ class Automata:
                 while i < n and (expr[i].isdigit() or expr[i] == '.'):
                     num += expr[i]
                     i += 1
+                # Se valida aquí, una vez, para que las fases siguientes no
+                # tengan que intentar float() sobre cada token
+                if not _NUMERO.match(num):
+                    raise ValueError(f"Token desconocido: {num}")
                 tokens.append(num)
                 continue
-            if c in '+*/^()':
+            if c in '+*/^%()':
                 tokens.append(c)
                 i += 1
                 continue
             if c == '-':
                 prev = tokens[-1] if tokens else None
-                if prev is None or prev in ('(', '+', '-', '*', '/', '^'):
+                # Es unario al inicio, tras '(' o tras cualquier otro operador
+                if prev is None or prev == '(' or prev in OPCODES:
                     tokens.append('u-')
                 else:
                     tokens.append('-')
                 i += 1
                 continue
-            if c == '%':
-                tokens.append('%')
-                i += 1
-                continue
             i += 1
         return tokens
 
     def is_number(self, tok):
-        try:
-            float(tok)
-            return True
-        except:
-            return False
+        return isinstance(tok, str) and _NUMERO.match(tok) is not None
 
     def to_rpn(self, tokens):
         output = []
-        stack = []
+        stack = []  # opcodes pendientes; _PAR_ABRE marca un '('
         for tok in tokens:
-            if self.is_number(tok):
-                output.append(tok)
-            elif isinstance(tok, str) and tok.isidentifier():
-                output.append(tok)
-            elif tok in self.operators:
-                p_tok, assoc = self.operators[tok]
-                while stack:
-                    top = stack[-1]
-                    if top in self.operators:
-                        p_top, _ = self.operators[top]
-                        if (assoc == 'left' and p_tok <= p_top) or (
-                            assoc == 'right' and p_tok < p_top):
-                            output.append(stack.pop())
-                            continue
+            code = OPCODES.get(tok)
+            if code is not None:
+                p_tok, right_assoc = PRECEDENCE[code]
+                while stack and stack[-1] != _PAR_ABRE:
+                    p_top = PRECEDENCE[stack[-1]][0]
+                    if p_tok < p_top or (p_tok == p_top and not right_assoc):
+                        output.append(SYMBOLS[stack.pop()])
+                        continue
                     break
-                stack.append(tok)
+                stack.append(code)
             elif tok == '(':
-                stack.append(tok)
+                stack.append(_PAR_ABRE)
             elif tok == ')':
-                while stack and stack[-1] != '(':
-                    output.append(stack.pop())
+                while stack and stack[-1] != _PAR_ABRE:
+                    output.append(SYMBOLS[stack.pop()])
                 if not stack:
                     raise ValueError("Paréntesis desbalanceados: falta '('")
                 stack.pop()
+            elif isinstance(tok, str) and (tok.isidentifier() or self.is_number(tok)):
+                output.append(tok)
             else:
                 raise ValueError(f"Token desconocido: {tok}")
         while stack:
             top = stack.pop()
-            if top in ('(', ')'):
+            if top == _PAR_ABRE:
                 raise ValueError("Paréntesis desbalanceados")
-            output.append(top)
+            output.append(SYMBOLS[top])
         return output
 
     def rpn_to_ast(self, rpn):
         stack = []
-        self.derivations = []
         for tok in rpn:
-            if self.is_number(tok) or (isinstance(tok, str) and tok.isidentifier()):
-                node = Node(value=tok)
-                stack.append(node)
-                self.derivations.append(f"Terminal -> {tok}")
-            elif tok == 'u-':
+            code = OPCODES.get(tok)
+            if code is None:
+                stack.append(Node(value=tok))
+            elif code == NEG:
                 if not stack:
                     raise ValueError("Operador unario sin operando")
                 child = stack.pop()
-                node = Node(op='u-', left=child)
-                stack.append(node)
-                self.derivations.append(f"Unary Expression -> u- {self.subexpr_text(child)}")
+                stack.append(Node(op='u-', left=child, opcode=NEG))
             else:
                 if len(stack) < 2:
                     raise ValueError(f"Operador binario '{tok}' sin suficientes operandos")
                 right = stack.pop()
                 left = stack.pop()
-                node = Node(op=tok, left=left, right=right)
-                stack.append(node)
-                self.derivations.append(
-                    f"Binary Expression -> {self.subexpr_text(left)} {tok} {self.subexpr_text(right)}"
-                )
+                stack.append(Node(op=tok, left=left, right=right, opcode=code))
         if len(stack) != 1:
             raise ValueError("Expresión inválida: sobran operandos")
         return stack[0]
 
+    def derivaciones(self, ast):
+        """
+        Derivaciones en el orden en que rpn_to_ast crea los nodos (post-orden).
+        Se generan aparte para no pagar el texto cuando nadie lo usa. El
+        texto de cada subexpresión se arma una sola vez a partir del de sus
+        hijos, con un recorrido iterativo.
+        """
+        out = []
+        texto = {}
+        for node in self._postorden(ast):
+            if node.is_leaf():
+                texto[node] = str(node.value)
+                out.append(f"Terminal -> {node.value}")
+            elif node.opcode == NEG:
+                hijo = texto.pop(node.left)
+                texto[node] = f"-({hijo})"
+                out.append(f"Unary Expression -> u- {hijo}")
+            else:
+                der = texto.pop(node.right)
+                izq = texto.pop(node.left)
+                texto[node] = f"({izq} {node.op} {der})"
+                out.append(f"Binary Expression -> {izq} {node.op} {der}")
+        return out
+
+    def _postorden(self, node):
+        """Nodos en post-orden (izquierdo, derecho, nodo) sin recursión."""
+        orden = []
+        stack = [node]
+        while stack:
+            n = stack.pop()
+            orden.append(n)
+            if n.left is not None:
+                stack.append(n.left)
+            if n.right is not None:
+                stack.append(n.right)
+        orden.reverse()
+        return orden
+
     def subexpr_text(self, node):
-        if node.is_leaf():
-            return str(node.value)
-        if node.op == 'u-':
-            child = self.subexpr_text(node.left)
-            return f"-({child})"
-        L = self.subexpr_text(node.left)
-        R = self.subexpr_text(node.right)
-        return f"({L} {node.op} {R})"
+        partes = []
+        stack = [node]
+        while stack:
+            n = stack.pop()
+            if isinstance(n, str):
+                partes.append(n)
+            elif n.is_leaf():
+                partes.append(str(n.value))
+            elif n.opcode == NEG:
+                stack.extend((")", n.left, "-("))
+            else:
+                stack.extend((")", n.right, f" {n.op} ", n.left, "("))
+        return "".join(partes)
 
     def evaluate_and_assign_order(self, node, counter):
-        if node.is_leaf():
-            try:
-                node.result = float(node.value)
-            except ValueError:
-                node.result = None
-            return
-        if node.op == 'u-':
-            self.evaluate_and_assign_order(node.left, counter)
-            node.result = -node.left.result if node.left.result is not None else None
-        else:
-            self.evaluate_and_assign_order(node.left, counter)
-            self.evaluate_and_assign_order(node.right, counter)
-            if node.left.result is None or node.right.result is None:
-                node.result = None
+        for n in self._postorden(node):
+            if n.is_leaf():
+                # Los números ya fueron validados en tokenize; un identificador no tiene valor
+                n.result = None if n.value.isidentifier() else float(n.value)
+                continue
+            if n.opcode == NEG:
+                n.result = -n.left.result if n.left.result is not None else None
+            elif n.left.result is None or n.right.result is None:
+                n.result = None
             else:
-                if node.op == '+':
-                    node.result = node.left.result + node.right.result
-                elif node.op == '-':
-                    node.result = node.left.result - node.right.result
-                elif node.op == '*':
-                    node.result = node.left.result * node.right.result
-                elif node.op == '/':
-                    if node.right.result == 0:
-                        raise ValueError("División por cero")
-                    node.result = node.left.result / node.right.result
-                elif node.op == '^':
-                    if node.left.result < 0 and not node.right.result.is_integer():
-                        raise ValueError("Potencia de base negativa con exponente no entero")
-                    node.result = node.left.result**node.right.result
-                elif node.op == '%':
-                    node.result = node.left.result % node.right.result
-        counter[0] += 1
-        node.eval_order = counter[0]
-
-    def analizar(self, expr: str):
-        try:
-            tokens = self.tokenize(expr)
-            if not tokens:
-                return {"error": "No se encontraron tokens válidos."}
-            rpn = self.to_rpn(tokens)
-            ast = self.rpn_to_ast(rpn)
-        except Exception as e:
-            return {"error": f"Error durante tokenización, RPN o AST: {e}"}
-        try:
-            counter = [0]
-            self.evaluate_and_assign_order(ast, counter)
-        except Exception as e:
-            return {"error": f"Error durante la evaluación: {e}"}
-        return {
-            'tokens': tokens,
-            'rpn': rpn,
-            'ast': ast,
-            'final_result': ast.result,
+                n.result = REAL_OPS[n.opcode](n.left.result, n.right.result)
+            counter[0] += 1
+            n.eval_order = counter[0]
+
+    def compilar(self, expr: str) -> ExpresionCompilada:
+        """Compilación memoizada (LRU) por expresión normalizada."""
+        return _compilar(normalizar(expr))
+
+    def analizar(self, expr: str, derivaciones: bool = True):
+        """
+        Analiza expr reutilizando su forma compilada si ya se vio antes.
+        Con derivaciones=False no se construye (ni se devuelve) el texto de
+        derivaciones. res['ast'] es una copia propia de la plantilla
+        compartida: el llamador puede modificarla sin afectar otras llamadas.
+        """
+        c = self.compilar(expr)
+        self.identificadores = list(c.identificadores)
+        self.codigo_intermedio = list(c.codigo_intermedio)
+        if c.error:
+            return {"error": c.error}
+        res = {
+            'tokens': list(c.tokens),
+            'rpn': list(c.rpn),
+            'ast': c.ast.copy(),
+            'final_result': c.resultado,
             'identificadores': self.identificadores,
             'codigo_intermedio': self.codigo_intermedio,
-            'derivations': self.derivations
         }
+        if derivaciones:
+            self.derivations = list(c.derivaciones)
+            res['derivations'] = self.derivations
+        return res
+
+    def compilar_lote(self, expr: str):
+        """
+        Compila expr una sola vez en un EvaluadorVectorizado (NumPy) que se
+        puede evaluar sobre muchas asignaciones de variables:
+            ev = automata.compilar_lote("x / (y - 1)")
+            res = ev.evaluar({'x': xs, 'y': ys})  # res.valores, res.division_por_cero
+        """
+        from .vectorizado import EvaluadorVectorizado
+        c = self.compilar(expr)
+        if c.rpn is None:
+            raise ValueError(c.error)
+        return EvaluadorVectorizado(c.rpn)
+
+    def evaluar_lote(self, expr: str, columnas):
+        return self.compilar_lote(expr).evaluar(columnas)
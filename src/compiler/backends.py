@@ -0,0 +1,176 @@
+"""
+Registro de backends: qué hace el Compiler con el AST anotado.
+
+Cada backend recibe la CompilationUnit ya analizada y, en prepare(), genera
+su programa: el propio AST (tree-walker, el Interpreter de siempre), closures
+de Python (closures), instrucciones de una máquina de pila (bytecode), código
+fuente de Python compilado (python) o el fichero de código objeto del
+generador (object). El programa se guarda en la unidad, así que ejecutar
+varias veces, o comparar backends sobre el mismo texto, no repite el trabajo.
+
+Todos cumplen el mismo contrato con el Compiler: prepare(unit) devuelve el
+programa o lanza un error (fase codegen), execute(program, output_callback,
+metrics) lo ejecuta y anota sus métricas (fase execution), y los errores en tiempo
+de ejecución llegan como RuntimeError("Error Semántico en línea N: ...").
+Los backends que no ejecutan (executes = False) entregan como salida el
+código generado (render).
+
+Para agregar uno: una subclase de Backend con name único y
+register_backend(MiBackend()).
+"""
+from .bytecode_vm import BytecodeCompiler
+from .closure_compiler import ClosureCompiler
+from .interpreter import Interpreter
+from .transpiler import PythonTranspiler
+
+DEFAULT_BACKEND = "tree-walker"
+
+
+class Backend:
+    name = None
+    description = ""
+    compiles = True   # tiene fase codegen (el tree-walker ejecuta el AST directamente)
+    executes = True   # False: la salida es el código generado, no una ejecución
+
+    def program(self, unit):
+        """El programa de este backend para unit, generado una sola vez."""
+        return unit.artifact(f"backend:{self.name}", lambda: self.prepare(unit))
+
+    def prepare(self, unit):
+        raise NotImplementedError
+
+    def codegen_metrics(self, program):
+        """Datos de la fase codegen además del tiempo (tamaño del programa...)."""
+        return {}
+
+    def execute(self, program, output_callback, metrics):
+        """Ejecuta program; anota en metrics los datos de la fase, aunque falle."""
+        program.run(output_callback)
+
+    def render(self, program):
+        """Salida de un backend que no ejecuta: el código que generó."""
+        return ""
+
+    def warnings(self, program):
+        """Avisos sobre lo que el backend no pudo traducir."""
+        return []
+
+
+class _MeteredInterpreter(Interpreter):
+    """Interpreter que cuenta pasos (nodos visitados) y el pico de variables vivas."""
+
+    def __init__(self, output_callback):
+        super().__init__(output_callback)
+        self.steps = 0
+        self.peak_environment = len(self.environment)
+
+    def _contar(self):
+        self.steps += 1
+        if len(self.environment) > self.peak_environment:
+            self.peak_environment = len(self.environment)
+
+    def visit(self, node):
+        self._contar()
+        return Interpreter.visit(self, node)
+
+    def _generador(self, node):
+        # Nodos con llamadas: se ejecutan en la pila explícita, no por visit
+        self._contar()
+        return Interpreter._generador(self, node)
+
+
+class TreeWalkerBackend(Backend):
+    name = "tree-walker"
+    description = "Interpreter: recorre el AST anotado (referencia)"
+    compiles = False
+
+    def prepare(self, unit):
+        return unit.typed_ast
+
+    def execute(self, program, output_callback, metrics):
+        interpreter = _MeteredInterpreter(output_callback=output_callback)
+        try:
+            interpreter.interpret(program, annotate=False)
+        finally:
+            metrics["steps"] = interpreter.steps
+            metrics["peak_environment"] = interpreter.peak_environment
+
+
+class ClosureBackend(Backend):
+    name = "closures"
+    description = "Traduce cada nodo a una closure de Python una sola vez"
+
+    def prepare(self, unit):
+        return ClosureCompiler().compile(unit.typed_ast)
+
+
+class BytecodeBackend(Backend):
+    name = "bytecode"
+    description = "Compila a instrucciones de una máquina de pila"
+
+    def prepare(self, unit):
+        return BytecodeCompiler().compile(unit.typed_ast)
+
+    def codegen_metrics(self, program):
+        return {"instructions": len(program.code)}
+
+
+class PythonBackend(Backend):
+    name = "python"
+    description = "Transpila a código fuente de Python y lo compila"
+
+    def prepare(self, unit):
+        return PythonTranspiler().compile(unit.typed_ast)
+
+    def codegen_metrics(self, program):
+        return {"source_lines": program.source.count("\n")}
+
+
+class ObjectBackend(Backend):
+    name = "object"
+    description = "Genera el código objeto (.CODE ... END); no ejecuta"
+    executes = False
+
+    def prepare(self, unit):
+        return unit.object_code
+
+    def render(self, program):
+        return program
+
+    def codegen_metrics(self, program):
+        return {"instructions": program.count("\n")}
+
+    def warnings(self, program):
+        # El generador traduce expresiones aritméticas; el resto queda marcado
+        if "UNKNOWN_OP" in program:
+            return ["el código objeto solo traduce expresiones aritméticas; "
+                    "las sentencias quedaron como UNKNOWN_OP"]
+        return []
+
+
+BACKENDS = {}
+
+
+def register_backend(backend):
+    """Registra (o reemplaza) un backend por su nombre."""
+    if not backend.name:
+        raise ValueError("Un backend necesita un nombre")
+    BACKENDS[backend.name] = backend
+    return backend
+
+
+def get_backend(name):
+    try:
+        return BACKENDS[name]
+    except KeyError:
+        raise ValueError(f"Backend desconocido '{name}'. Disponibles: {', '.join(BACKENDS)}") from None
+
+
+def available_backends(executable=False):
+    """Nombres registrados, en orden; con executable=True solo los que ejecutan."""
+    return [name for name, b in BACKENDS.items() if b.executes or not executable]
+
+
+for _backend in (TreeWalkerBackend(), ClosureBackend(), BytecodeBackend(), PythonBackend(),
+                 ObjectBackend()):
+    register_backend(_backend)
@@ -0,0 +1,587 @@
+"""
+Backend de bytecode: el AST se compila a instrucciones de una máquina de pila.
+
+BytecodeCompiler recorre el AST una vez y emite una lista plana de
+instrucciones (opcode, argumento) para main y todas las funciones, con una
+tabla paralela de líneas del fuente. La VM las ejecuta en un solo ciclo, sin
+recursión de Python: los saltos resuelven if, ciclos, break, continue y el
+switch (salto directo por tabla), y las llamadas guardan en una pila propia el
+marco y la instrucción de retorno.
+
+La semántica es la del Interpreter: variables de main en un diccionario con
+ámbitos de bloque por shallow binding (ENTER_SCOPE / EXIT_SCOPE; break y
+continue cierran los ámbitos que abandonan antes de saltar), variables de
+las funciones en marcos indexados por los slots del Resolver, y los errores
+se informan con la línea de la sentencia que los produjo.
+"""
+from .ast_nodes import (
+    BlockNode, DeclarationNode, ForNode, IfNode, SwitchNode, CallNode, ProgramNode, linea,
+    postorden_operadores,
+)
+from .closure_compiler import con_linea, declara_en_ambito
+from .interpreter import DesbordamientoPila, Interpreter
+from .lexer import Token
+from .resolver import Resolver
+from .type_inference import coerce
+from . import operators as ops
+
+_UNBOUND = object()
+
+(CONST, LOAD_ENV, LOAD_SLOT, STORE_ENV, STORE_SLOT, DECLARE_ENV, DECLARE_SLOT, BINARY, NEG,
+ COERCE, POP, JUMP, JUMP_IF_FALSE, LOAD_INDEX_ENV, LOAD_INDEX_SLOT, STORE_INDEX_ENV,
+ STORE_INDEX_SLOT, MAKE_ARRAY, INC, OUT, SIZEOF_ENV, SIZEOF_VALUE, SWITCH, ENTER_SCOPE,
+ EXIT_SCOPE, CALL, RET, RET_NONE, RAISE, HALT, HALT_RETURN) = range(31)
+
+OPNAMES = ('CONST', 'LOAD_ENV', 'LOAD_SLOT', 'STORE_ENV', 'STORE_SLOT', 'DECLARE_ENV',
+           'DECLARE_SLOT', 'BINARY', 'NEG', 'COERCE', 'POP', 'JUMP', 'JUMP_IF_FALSE',
+           'LOAD_INDEX_ENV', 'LOAD_INDEX_SLOT', 'STORE_INDEX_ENV', 'STORE_INDEX_SLOT',
+           'MAKE_ARRAY', 'INC', 'OUT', 'SIZEOF_ENV', 'SIZEOF_VALUE', 'SWITCH', 'ENTER_SCOPE',
+           'EXIT_SCOPE', 'CALL', 'RET', 'RET_NONE', 'RAISE', 'HALT', 'HALT_RETURN')
+
+
+def _tamano(value):
+    """sizeof de un valor sin arreglo declarado, como en el Interpreter."""
+    if isinstance(value, int):
+        return 4
+    if isinstance(value, float):
+        return 8
+    if isinstance(value, str):
+        return len(value)
+    return 4
+
+
+class _Ciclo:
+    """Destinos de break/continue del ciclo o switch que se está compilando."""
+    __slots__ = ('scopes', 'breaks', 'continues', 'es_switch')
+
+    def __init__(self, scopes, es_switch=False):
+        self.scopes = scopes    # ámbitos abiertos al entrar (los que sobreviven a un break)
+        self.breaks = []        # saltos a completar con el final
+        self.continues = []     # saltos a completar con el punto de continue
+        self.es_switch = es_switch
+
+
+class Bytecode:
+    """Programa compilado: instrucciones y la línea del fuente de cada una."""
+
+    def __init__(self, code, lines):
+        self.code = code
+        self.lines = lines
+
+    def dump(self):
+        """Listado legible de las instrucciones (depuración y pruebas)."""
+        rows = []
+        for pc, (op, arg) in enumerate(self.code):
+            shown = '' if arg is None else f" {arg!r}"
+            rows.append(f"{pc:4d} [{self.lines[pc]}] {OPNAMES[op]}{shown}")
+        return "\n".join(rows)
+
+    def run(self, output_callback=print):
+        if output_callback is print:
+            out = lambda s: print(s, end='')
+        else:
+            out = output_callback
+        return VM(self, out).run()
+
+
+class BytecodeCompiler:
+    def compile(self, ast):
+        """Compila el AST (anotado por TypeInference) a un Bytecode."""
+        self.code = []
+        self.lines = []
+        self._line = None
+        self._loops = []
+        self._scopes = 0
+        self._en_funcion = False
+        self._funciones = {}
+        self._funcion = None
+        self._llamadas = []  # (pc de CALL, nombre): la dirección se completa al final
+        funcs = []
+        if isinstance(ast, ProgramNode):
+            resolver = Resolver()
+            for func in ast.functions:
+                resolver.resolver(func)
+                self._funciones[func.name] = func
+            funcs, ast = ast.functions, ast.main
+
+        # main primero: el programa empieza en la instrucción 0
+        if isinstance(ast, BlockNode):
+            self._sentencias(ast.statements)
+        else:
+            self._sentencias([ast])
+        self._emit(HALT)
+
+        entradas = {}
+        self._en_funcion = True
+        for func in funcs:
+            self._funcion = func
+            entradas[func.name] = len(self.code)
+            self._line = linea(func)
+            self._sentencias(func.body.statements)
+            self._emit(RET_NONE)
+        for pc, name in self._llamadas:
+            func = self._funciones[name]
+            self.code[pc] = (CALL, (entradas[name], tuple(p[0] for p in func.params),
+                                    func.frame_size, func.rtype))
+        return Bytecode(self.code, self.lines)
+
+    def _emit(self, op, arg=None):
+        self.code.append((op, arg))
+        self.lines.append(self._line)
+        return len(self.code) - 1
+
+    def _patch(self, pc, target):
+        self.code[pc] = (self.code[pc][0], target)
+
+    def _necesita_ambito(self, nodes):
+        return not self._en_funcion and declara_en_ambito(nodes)
+
+    def _enter_scope(self, needed):
+        if needed:
+            self._emit(ENTER_SCOPE)
+            self._scopes += 1
+
+    def _exit_scope(self, needed):
+        if needed:
+            self._emit(EXIT_SCOPE)
+            self._scopes -= 1
+
+    # --- Sentencias ---
+    def _sentencias(self, nodes):
+        saved = self._line
+        for node in nodes:
+            line = linea(node)
+            self._line = line if line is not None else saved
+            self._sentencia(node)
+        self._line = saved
+
+    def _sentencia(self, node):
+        if node is None:
+            return
+        if isinstance(node, BlockNode):
+            scoped = self._necesita_ambito(node.statements)
+            self._enter_scope(scoped)
+            self._sentencias(node.statements)
+            self._exit_scope(scoped)
+            return
+        if node.token.op is not None or isinstance(node, CallNode):
+            self._expr(node)
+            self._emit(POP)
+            return
+        if isinstance(node, DeclarationNode):
+            self._declaracion(node)
+            return
+        if isinstance(node, IfNode):
+            self._if(node)
+            return
+        tipo = node.token.type
+        if tipo == Token.Type.While:
+            self._while(node)
+        elif isinstance(node, ForNode):
+            self._for(node)
+        elif isinstance(node, SwitchNode):
+            self._switch(node)
+        elif tipo == Token.Type.Break:
+            self._salto(es_break=True)
+        elif tipo == Token.Type.Continue:
+            self._salto(es_break=False)
+        elif tipo == Token.Type.Return:
+            self._expr(node.left)
+            if self._en_funcion:
+                self._emit(RET, self._funcion.rtype)
+            else:
+                self._emit(HALT_RETURN)
+        elif tipo == Token.Type.Cout:
+            while node is not None:
+                self._expr(node.left)
+                self._emit(OUT)
+                node = node.right
+        else:
+            self._expr(node)
+            self._emit(POP)
+
+    def _salto(self, es_break):
+        # continue atraviesa los switch hasta el ciclo que lo contiene
+        loops = self._loops if es_break else [l for l in self._loops if not l.es_switch]
+        if not loops:
+            # Un break/continue suelto termina main o la función
+            self._emit(RET_NONE if self._en_funcion else HALT)
+            return
+        loop = loops[-1]
+        for _ in range(self._scopes - loop.scopes):
+            self.code.append((EXIT_SCOPE, None))
+            self.lines.append(self._line)
+        pc = self._emit(JUMP)
+        (loop.breaks if es_break else loop.continues).append(pc)
+
+    def _declaracion(self, node):
+        ctype = node.token.value
+        for var in node.vars:
+            name, size, init = var['name'], var['size'], var['init']
+            if size is not None:
+                items = init if isinstance(init, list) else []
+                for item in items:
+                    self._expr(item)
+                self._emit(MAKE_ARRAY, (len(items), ctype))
+                self._declarar(name, var.get('slot'))
+                self._emit(CONST, size)
+                self._declarar(f"__sizeof_{name}", var.get('size_slot'))
+            elif init:
+                self._expr(init)
+                self._emit(COERCE, ctype)
+                self._declarar(name, var.get('slot'))
+            else:
+                self._emit(CONST, 0)
+                self._declarar(name, var.get('slot'))
+
+    def _declarar(self, name, slot):
+        if slot is not None:
+            self._emit(DECLARE_SLOT, slot)
+        else:
+            self._emit(DECLARE_ENV, name)
+
+    def _if(self, node):
+        fin = []
+        while isinstance(node, IfNode):
+            self._expr(node.cond)
+            siguiente = self._emit(JUMP_IF_FALSE)
+            self._sentencia(node.then_branch)
+            fin.append(self._emit(JUMP))
+            self._patch(siguiente, len(self.code))
+            node = node.else_branch
+        self._sentencia(node)
+        for pc in fin:
+            self._patch(pc, len(self.code))
+
+    def _ciclo(self, cond, cuerpo, update=None):
+        loop = _Ciclo(self._scopes)
+        inicio = len(self.code)
+        self._expr(cond)
+        salida = self._emit(JUMP_IF_FALSE)
+        self._loops.append(loop)
+        self._sentencia(cuerpo)
+        self._loops.pop()
+        continuar = len(self.code)
+        if update is not None:
+            # continue también pasa por update
+            self._expr(update)
+            self._emit(POP)
+        self._emit(JUMP, inicio)
+        fin = len(self.code)
+        self._patch(salida, fin)
+        for pc in loop.breaks:
+            self._patch(pc, fin)
+        for pc in loop.continues:
+            self._patch(pc, continuar)
+
+    def _while(self, node):
+        self._ciclo(node.left, node.right)
+
+    def _for(self, node):
+        # La variable declarada en init solo existe dentro del for
+        scoped = self._necesita_ambito([node.init, node.body])
+        self._enter_scope(scoped)
+        if isinstance(node.init, DeclarationNode):
+            self._declaracion(node.init)
+        elif node.init is not None:
+            self._expr(node.init)
+            self._emit(POP)
+        self._ciclo(node.cond, node.body, node.update)
+        self._exit_scope(scoped)
+
+    def _switch(self, node):
+        self._expr(node.subject)
+        switch = self._emit(SWITCH)
+        scoped = self._necesita_ambito(node.body)
+        loop = _Ciclo(self._scopes, es_switch=True)
+        # Un tramo de entrada por posición destino: abre el ámbito y salta al caso
+        destinos = set(node.table.values())
+        if node.default is not None:
+            destinos.add(node.default)
+        entradas = {}
+        if scoped:
+            for pos in sorted(destinos):
+                entradas[pos] = self._emit(ENTER_SCOPE)
+                self._emit(JUMP, pos)
+            self._scopes += 1
+        posiciones = []
+        self._loops.append(loop)
+        saved = self._line
+        for stmt in node.body:
+            posiciones.append(len(self.code))
+            line = linea(stmt)
+            self._line = line if line is not None else saved
+            self._sentencia(stmt)
+        self._line = saved
+        self._loops.pop()
+        posiciones.append(len(self.code))
+        self._exit_scope(scoped)
+        fin = len(self.code)
+        if scoped:
+            for pos, pc in entradas.items():
+                self._patch(pc + 1, posiciones[pos])
+        else:
+            entradas = {pos: posiciones[pos] for pos in destinos}
+        # break termina el switch; continue y return siguen hacia afuera
+        for pc in loop.breaks:
+            self._patch(pc, fin)
+        table = {value: entradas[pos] for value, pos in node.table.items()}
+        default = entradas[node.default] if node.default is not None else fin
+        self._patch(switch, (table, default))
+
+    # --- Expresiones: dejan su valor en la pila ---
+    def _expr(self, node):
+        if node is None:
+            self._emit(CONST, None)
+            return
+        if node.token.op is not None:
+            self._operador(node)
+            return
+        if isinstance(node, CallNode):
+            self._llamada(node)
+            return
+        if isinstance(node, (DeclarationNode, IfNode, ForNode, SwitchNode, BlockNode)):
+            self._sentencia(node)
+            self._emit(CONST, None)
+            return
+        tipo = node.token.type
+        if tipo == Token.Type.Asign:
+            self._asignacion(node)
+        elif tipo == Token.Type.Increment:
+            target = node.left
+            self._cargar(target)
+            self._emit(INC)
+            self._guardar(target)
+        elif tipo == Token.Type.Sizeof:
+            self._sizeof(node)
+        elif tipo == Token.Type.Cadena:
+            self._emit(CONST, node.token.value)
+        elif tipo == Token.Type.Numero:
+            value = node.value
+            if value is None:
+                value = float(node.token.value) if '.' in node.token.value else int(node.token.value)
+            self._emit(CONST, value)
+        elif tipo == Token.Type.Index:
+            self._expr(node.right)
+            ident = node.left
+            if ident.slot is not None:
+                self._emit(LOAD_INDEX_SLOT, (ident.slot, ident.token.value))
+            else:
+                self._emit(LOAD_INDEX_ENV, ident.token.value)
+        elif tipo == Token.Type.Ident:
+            self._cargar(node)
+        else:
+            self._emit(CONST, None)
+
+    def _operador(self, root):
+        # Post-orden iterativo: expresiones de miles de términos no agotan la recursión
+        nodes, _ = postorden_operadores(root)
+        for node in nodes:
+            op = node.token.op
+            if op is None:
+                self._expr(node)
+            elif op == ops.NEG:
+                self._emit(NEG)
+            else:
+                self._emit(BINARY, node.impl or ops.GENERIC_OPS[op])
+
+    def _cargar(self, ident):
+        if ident.slot is not None:
+            self._emit(LOAD_SLOT, ident.slot)
+        else:
+            self._emit(LOAD_ENV, ident.token.value)
+
+    def _guardar(self, ident):
+        if ident.slot is not None:
+            self._emit(STORE_SLOT, ident.slot)
+        else:
+            self._emit(STORE_ENV, ident.token.value)
+
+    def _asignacion(self, node):
+        self._expr(node.right)
+        self._emit(COERCE, node.ctype)
+        target = node.left
+        if target.token.type == Token.Type.Index:
+            # Primero el valor, después el índice, como en el Interpreter
+            self._expr(target.right)
+            ident = target.left
+            if ident.slot is not None:
+                self._emit(STORE_INDEX_SLOT, (ident.slot, ident.token.value))
+            else:
+                self._emit(STORE_INDEX_ENV, ident.token.value)
+        else:
+            self._guardar(target)
+
+    def _sizeof(self, node):
+        target = node.left
+        if target is None or target.token.type != Token.Type.Ident:
+            self._emit(CONST, 4)
+        elif node.slot is not None:
+            # Arreglo local de una función
+            self._emit(LOAD_SLOT, node.slot)
+            self._emit(CONST, 4)
+            self._emit(BINARY, ops.INT_OPS[ops.MUL])
+        elif target.slot is None:
+            self._emit(SIZEOF_ENV, target.token.value)
+        else:
+            self._emit(LOAD_SLOT, target.slot)
+            self._emit(SIZEOF_VALUE)
+
+    def _llamada(self, node):
+        name, args = node.token.value, node.args
+        func = self._funciones.get(name)
+        # Los errores de llamada se lanzan antes de evaluar los argumentos
+        if func is None:
+            self._emit(RAISE, (NameError, f"Función '{name}' no definida"))
+            return
+        if len(args) != len(func.params):
+            self._emit(RAISE, (TypeError, f"'{name}' espera {len(func.params)} argumento(s), "
+                                          f"se pasaron {len(args)}"))
+            return
+        for arg in args:
+            self._expr(arg)
+        self._llamadas.append((self._emit(CALL), name))
+
+
+class VM:
+    def __init__(self, program, out):
+        self.program = program
+        self.out = out
+
+    def run(self):
+        code, out = self.program.code, self.out
+        env = {'endl': '\n'}
+        undo, marks = [], []
+        stack = []
+        push, pop = stack.append, stack.pop
+        cpp_str = ops.cpp_str
+        calls = []
+        frame = None
+        pc = 0
+        try:
+            while True:
+                op, arg = code[pc]
+                pc += 1
+                if op == LOAD_SLOT:
+                    push(frame[arg])
+                elif op == CONST:
+                    push(arg)
+                elif op == BINARY:
+                    right = pop()
+                    stack[-1] = arg(stack[-1], right)
+                elif op == JUMP_IF_FALSE:
+                    if not pop():
+                        pc = arg
+                elif op == JUMP:
+                    pc = arg
+                elif op == LOAD_ENV:
+                    try:
+                        push(env[arg])
+                    except KeyError:
+                        raise NameError(f"Variable '{arg}' no definida") from None
+                elif op == STORE_SLOT:
+                    frame[arg] = stack[-1]
+                elif op == STORE_ENV:
+                    env[arg] = stack[-1]
+                elif op == POP:
+                    pop()
+                elif op == COERCE:
+                    stack[-1] = coerce(arg, stack[-1])
+                elif op == LOAD_INDEX_SLOT:
+                    arr = frame[arg[0]]
+                    if not isinstance(arr, dict):
+                        raise TypeError(f"'{arg[1]}' no es un arreglo")
+                    stack[-1] = arr.get(stack[-1], 0)
+                elif op == LOAD_INDEX_ENV:
+                    arr = env.get(arg)
+                    if not isinstance(arr, dict):
+                        raise NameError(f"Arreglo '{arg}' no definido o acceso inválido")
+                    stack[-1] = arr.get(stack[-1], 0)
+                elif op == STORE_INDEX_SLOT:
+                    index = pop()
+                    arr = frame[arg[0]]
+                    if not isinstance(arr, dict):
+                        raise TypeError(f"'{arg[1]}' no es un arreglo")
+                    arr[index] = stack[-1]
+                elif op == STORE_INDEX_ENV:
+                    index = pop()
+                    if arg not in env:
+                        env[arg] = {}
+                    arr = env[arg]
+                    if not isinstance(arr, dict):
+                        raise TypeError(f"'{arg}' no es un arreglo")
+                    arr[index] = stack[-1]
+                elif op == MAKE_ARRAY:
+                    n, ctype = arg
+                    values = stack[-n:] if n else []
+                    del stack[len(stack) - n:]
+                    push({i: coerce(ctype, v) for i, v in enumerate(values)})
+                elif op == INC:
+                    stack[-1] = stack[-1] + 1
+                elif op == OUT:
+                    out(cpp_str(pop()))
+                elif op == NEG:
+                    stack[-1] = -stack[-1]
+                elif op == DECLARE_SLOT:
+                    frame[arg] = pop()
+                elif op == DECLARE_ENV:
+                    if marks:
+                        undo.append((arg, env.get(arg, _UNBOUND)))
+                    env[arg] = pop()
+                elif op == CALL:
+                    entry, ptypes, size, rtype = arg
+                    # Los argumentos ya están en la pila, evaluados en el marco del llamador
+                    n = len(ptypes)
+                    new = [None] * size
+                    if n:
+                        values = stack[-n:]
+                        del stack[-n:]
+                        for i in range(n):
+                            new[i] = coerce(ptypes[i], values[i])
+                    # Las llamadas no usan la pila de Python; el límite es el del Interpreter
+                    if len(calls) >= Interpreter.MAX_CALL_DEPTH:
+                        raise DesbordamientoPila(self.program.lines[pc - 1])
+                    calls.append((pc, frame, rtype))
+                    frame, pc = new, entry
+                elif op == RET:
+                    pc, frame, rtype = calls.pop()
+                    stack[-1] = coerce(rtype, stack[-1])
+                elif op == RET_NONE:
+                    pc, frame, _ = calls.pop()
+                    push(None)
+                elif op == SWITCH:
+                    table, default = arg
+                    pc = table.get(pop(), default)
+                elif op == ENTER_SCOPE:
+                    marks.append(len(undo))
+                elif op == EXIT_SCOPE:
+                    mark = marks.pop()
+                    while len(undo) > mark:
+                        name, old = undo.pop()
+                        if old is _UNBOUND:
+                            env.pop(name, None)
+                        else:
+                            env[name] = old
+                elif op == SIZEOF_ENV:
+                    key = f"__sizeof_{arg}"
+                    if key in env:
+                        push(env[key] * 4)
+                    else:
+                        try:
+                            push(_tamano(env[arg]))
+                        except KeyError:
+                            raise NameError(f"Variable '{arg}' no definida") from None
+                elif op == SIZEOF_VALUE:
+                    stack[-1] = _tamano(stack[-1])
+                elif op == RAISE:
+                    raise arg[0](arg[1])
+                elif op == HALT:
+                    return
+                elif op == HALT_RETURN:
+                    out(f"\nProgram finished with exit code: {pop()}")
+                    return
+        except Exception as e:
+            error = con_linea(e, self.program.lines[pc - 1])
+            if error is e:
+                raise
+            raise error from None
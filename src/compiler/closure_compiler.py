@@ -0,0 +1,651 @@
+"""
+Backend de closures: el AST se traduce una vez a funciones de Python anidadas.
+
+Cada nodo se convierte en una closure que ya sabe qué hacer (qué operador
+aplicar, en qué slot o nombre vive la variable, qué coerción corresponde), así
+que al ejecutar no queda despacho por tipo de nodo como en el Interpreter.
+La semántica es la misma: las variables de main viven en un diccionario con
+ámbitos de bloque por shallow binding (registro de deshacer), las de las
+funciones en marcos indexados por los slots del Resolver, y las sentencias
+devuelven la señal de control de flujo (NORMAL, BREAK, CONTINUE, RETURN) en
+lugar de dejarla en un atributo.
+
+Un error en tiempo de ejecución se informa con la línea de la sentencia que
+lo produjo, como RuntimeError("Error Semántico en línea N: ...").
+"""
+import sys
+
+from .ast_nodes import (
+    BlockNode, DeclarationNode, ForNode, IfNode, SwitchNode, CallNode, ProgramNode, linea,
+    postorden_operadores,
+)
+from .interpreter import DesbordamientoPila, Interpreter, NORMAL, BREAK, CONTINUE, RETURN
+from .lexer import Token
+from .resolver import Resolver
+from .type_inference import coerce, INT, FLOAT
+from . import operators as ops
+
+_UNBOUND = object()
+
+# Más allá de esta profundidad un árbol de operadores no se traduce a closures
+# anidadas (agotaría el límite de recursión) sino a una evaluación con pila
+PROFUNDIDAD_MAXIMA = 64
+
+
+def con_linea(error, line):
+    """El error con la línea de la sentencia, salvo que ya la tenga."""
+    if "en línea" in str(error):
+        return error
+    return RuntimeError(f"Error Semántico en línea {line if line is not None else '?'}: {error}")
+
+
+def limite_recursion(marcos_por_llamada):
+    """
+    Límite de recursión de Python con lugar para Interpreter.MAX_CALL_DEPTH
+    llamadas anidadas del programa de marcos_por_llamada marcos cada una: el
+    límite de llamadas salta antes que el de Python.
+    """
+    return sys.getrecursionlimit() + Interpreter.MAX_CALL_DEPTH * marcos_por_llamada
+
+
+def _profundidad_llamadas(funciones):
+    """Nivel más profundo del AST, dentro del cuerpo de una función, en que hay una llamada."""
+    maximo = 0
+    for func in funciones:
+        stack = [(func.body, 0)]
+        while stack:
+            node, depth = stack.pop()
+            if node is None:
+                continue
+            if isinstance(node, CallNode):
+                maximo = max(maximo, depth)
+            # Un árbol de operadores más profundo que PROFUNDIDAD_MAXIMA se
+            # evalúa con pila: sus hojas no suman marcos por nivel
+            stack.extend((c, min(depth + 1, 2 * PROFUNDIDAD_MAXIMA)) for c in node.children())
+    return maximo
+
+
+def declara_en_ambito(nodes):
+    """
+    True si alguna de las sentencias nodes declara una variable en el ámbito
+    que las contiene: directamente o bajo un if/while sin llaves (los bloques,
+    for y switch anidados abren el suyo). Un ámbito sin declaraciones propias
+    no tiene nada que restaurar y se puede omitir.
+    """
+    stack = list(nodes)
+    while stack:
+        node = stack.pop()
+        if isinstance(node, DeclarationNode):
+            return True
+        if isinstance(node, IfNode):
+            stack += [node.then_branch, node.else_branch]
+        elif node is not None and node.token.type == Token.Type.While:
+            stack.append(node.right)
+    return False
+
+
+class _Estado:
+    """Estado de una ejecución; el programa compilado se puede ejecutar muchas veces."""
+    __slots__ = ('env', 'undo', 'depth', 'frame', 'ret', 'out', 'llamadas')
+
+    def __init__(self, out):
+        self.env = {'endl': '\n'}
+        self.undo = []
+        self.depth = 0
+        self.frame = None
+        self.ret = None
+        self.out = out
+        self.llamadas = 0
+
+
+def _entrar(st):
+    st.depth += 1
+    return len(st.undo)
+
+
+def _salir(st, mark):
+    st.depth -= 1
+    undo, env = st.undo, st.env
+    while len(undo) > mark:
+        name, old = undo.pop()
+        if old is _UNBOUND:
+            env.pop(name, None)
+        else:
+            env[name] = old
+
+
+def _nada(st):
+    return NORMAL
+
+
+def _ninguno(st):
+    return None
+
+
+class _Funcion:
+    __slots__ = ('node', 'cuerpo')
+
+    def __init__(self, node):
+        self.node = node
+        self.cuerpo = None  # se completa después: las funciones se llaman entre sí
+
+
+class ProgramaClosures:
+    """Resultado de ClosureCompiler.compile: main y las funciones ya traducidas."""
+
+    def __init__(self, main, marcos_por_llamada):
+        self.main = main
+        # Marcos de Python que usa cada llamada anidada (0 sin funciones)
+        self.marcos_por_llamada = marcos_por_llamada
+
+    def run(self, output_callback=print):
+        if output_callback is print:
+            out = lambda s: print(s, end='')
+        else:
+            out = output_callback
+        st = _Estado(out)
+        # Las closures se llaman entre sí con la pila de Python: el límite
+        # alcanza justo para MAX_CALL_DEPTH llamadas y se restaura al terminar
+        limit = sys.getrecursionlimit()
+        if self.marcos_por_llamada:
+            sys.setrecursionlimit(limite_recursion(self.marcos_por_llamada))
+        try:
+            signal = self.main(st)
+        finally:
+            sys.setrecursionlimit(limit)
+        if signal == RETURN:
+            out(f"\nProgram finished with exit code: {st.ret}")
+
+
+class ClosureCompiler:
+    def compile(self, ast):
+        """Traduce el AST (anotado por TypeInference) a un ProgramaClosures."""
+        self._funciones = {}
+        self._en_funcion = False
+        if isinstance(ast, ProgramNode):
+            resolver = Resolver()
+            for func in ast.functions:
+                resolver.resolver(func)
+                self._funciones[func.name] = _Funcion(func)
+            self._en_funcion = True
+            for entrada in self._funciones.values():
+                entrada.cuerpo = self._bloque(entrada.node.body, scope=False)
+            self._en_funcion = False
+            ast = ast.main
+        # El bloque de main comparte el ámbito global, como en el Interpreter
+        if isinstance(ast, BlockNode):
+            main = self._bloque(ast, scope=False)
+        else:
+            main = self._sentencias([ast])
+        marcos = 0
+        if self._funciones:
+            # Cada nivel del AST es a lo sumo dos closures anidadas
+            marcos = 2 * _profundidad_llamadas(e.node for e in self._funciones.values()) + 2
+        return ProgramaClosures(main, marcos)
+
+    # --- Sentencias: closures st -> señal ---
+    def _sentencia(self, node):
+        if node is None:
+            return _nada
+        if isinstance(node, BlockNode):
+            return self._bloque(node)
+        if node.token.op is not None or isinstance(node, CallNode):
+            return self._efecto(node)
+        if isinstance(node, DeclarationNode):
+            return self._declaracion(node)
+        if isinstance(node, IfNode):
+            return self._if(node)
+        tipo = node.token.type
+        if tipo == Token.Type.While:
+            return self._while(node)
+        if isinstance(node, ForNode):
+            return self._for(node)
+        if isinstance(node, SwitchNode):
+            return self._switch(node)
+        if tipo == Token.Type.Break:
+            return lambda st: BREAK
+        if tipo == Token.Type.Continue:
+            return lambda st: CONTINUE
+        if tipo == Token.Type.Return:
+            valor = self._expr(node.left)
+
+            def retorno(st):
+                st.ret = valor(st)
+                return RETURN
+            return retorno
+        if tipo == Token.Type.Cout:
+            return self._cout(node)
+        return self._efecto(node)
+
+    def _efecto(self, node):
+        """Sentencia que evalúa node solo por sus efectos (el valor se descarta)."""
+        if isinstance(node, DeclarationNode):
+            return self._declaracion(node)
+        expr = self._expr(node)
+
+        def efecto(st):
+            expr(st)
+            return NORMAL
+        return efecto
+
+    def _sentencias(self, nodes):
+        """Ejecuta nodes en orden hasta la primera señal; los errores llevan su línea."""
+        stmts = tuple(self._sentencia(n) for n in nodes)
+        lineas = tuple(linea(n) for n in nodes)
+
+        def sentencias(st):
+            i = 0
+            try:
+                for i, stmt in enumerate(stmts):
+                    signal = stmt(st)
+                    if signal:
+                        return signal
+            except Exception as e:
+                error = con_linea(e, lineas[i])
+                if error is e:
+                    raise
+                raise error from None
+            return NORMAL
+        return sentencias
+
+    def _necesita_ambito(self, nodes):
+        # En las funciones todo vive en slots del marco
+        return not self._en_funcion and declara_en_ambito(nodes)
+
+    def _con_ambito(self, cuerpo):
+        def con_ambito(st):
+            mark = _entrar(st)
+            try:
+                return cuerpo(st)
+            finally:
+                _salir(st, mark)
+        return con_ambito
+
+    def _bloque(self, node, scope=True):
+        cuerpo = self._sentencias(node.statements)
+        if scope and self._necesita_ambito(node.statements):
+            return self._con_ambito(cuerpo)
+        return cuerpo
+
+    def _declarar(self, name, slot):
+        """Closure (st, valor) que declara name en el ámbito actual."""
+        if slot is not None:
+            def en_marco(st, value):
+                st.frame[slot] = value
+            return en_marco
+
+        def en_env(st, value):
+            if st.depth:
+                st.undo.append((name, st.env.get(name, _UNBOUND)))
+            st.env[name] = value
+        return en_env
+
+    def _declaracion(self, node):
+        ctype = node.token.value
+        pasos = []
+        for var in node.vars:
+            name, size, init = var['name'], var['size'], var['init']
+            declarar = self._declarar(name, var.get('slot'))
+            if size is not None:
+                if isinstance(init, list):
+                    items = tuple(self._expr(item) for item in init)
+
+                    def valor(st, items=items):
+                        values = [coerce(ctype, item(st)) for item in items]
+                        return dict(enumerate(values))
+                else:
+                    def valor(st):
+                        return {}
+                pasos.append((declarar, valor))
+                pasos.append((self._declarar(f"__sizeof_{name}", var.get('size_slot')),
+                              lambda st, size=size: size))
+            elif init:
+                expr = self._expr(init)
+                pasos.append((declarar, lambda st, expr=expr: coerce(ctype, expr(st))))
+            else:
+                pasos.append((declarar, lambda st: 0))
+        pasos = tuple(pasos)
+
+        def declaracion(st):
+            for declarar, valor in pasos:
+                declarar(st, valor(st))
+            return NORMAL
+        return declaracion
+
+    def _if(self, node):
+        ramas = []
+        while isinstance(node, IfNode):
+            ramas.append((self._expr(node.cond), self._sentencia(node.then_branch)))
+            node = node.else_branch
+        ramas = tuple(ramas)
+        otro = self._sentencia(node)
+
+        def si(st):
+            for cond, rama in ramas:
+                if cond(st):
+                    return rama(st)
+            return otro(st)
+        return si
+
+    def _while(self, node):
+        cond, cuerpo = self._expr(node.left), self._sentencia(node.right)
+
+        def mientras(st):
+            while cond(st):
+                signal = cuerpo(st)
+                if signal:
+                    if signal == RETURN:
+                        return RETURN
+                    if signal == BREAK:
+                        break
+            return NORMAL
+        return mientras
+
+    def _for(self, node):
+        init, update = self._efecto(node.init), self._expr(node.update)
+        cond, cuerpo = self._expr(node.cond), self._sentencia(node.body)
+
+        def para(st):
+            init(st)
+            while cond(st):
+                signal = cuerpo(st)
+                if signal:
+                    if signal == RETURN:
+                        return RETURN
+                    if signal == BREAK:
+                        break
+                # continue también pasa por update
+                update(st)
+            return NORMAL
+        # La variable declarada en init solo existe dentro del for
+        if self._necesita_ambito([node.init, node.body]):
+            return self._con_ambito(para)
+        return para
+
+    def _switch(self, node):
+        subject, table, default = self._expr(node.subject), node.table, node.default
+        stmts = tuple(self._sentencia(n) for n in node.body)
+        lineas = tuple(linea(n) for n in node.body)
+        total = len(stmts)
+
+        def cuerpo(st, start):
+            # Salto directo por tabla; desde ahí fall-through hasta un break
+            i = start
+            try:
+                for i in range(start, total):
+                    signal = stmts[i](st)
+                    if signal:
+                        # break termina el switch; continue y return siguen hacia afuera
+                        return NORMAL if signal == BREAK else signal
+            except Exception as e:
+                error = con_linea(e, lineas[i])
+                if error is e:
+                    raise
+                raise error from None
+            return NORMAL
+
+        ambito = self._necesita_ambito(node.body)
+
+        def switch(st):
+            start = table.get(subject(st), default)
+            if start is None:
+                return NORMAL
+            if not ambito:
+                return cuerpo(st, start)
+            mark = _entrar(st)
+            try:
+                return cuerpo(st, start)
+            finally:
+                _salir(st, mark)
+        return switch
+
+    def _cout(self, node):
+        exprs = []
+        while node is not None:
+            exprs.append(self._expr(node.left))
+            node = node.right
+        exprs = tuple(exprs)
+
+        cpp_str = ops.cpp_str
+
+        def cout(st):
+            out = st.out
+            for expr in exprs:
+                out(cpp_str(expr(st)))
+            return NORMAL
+        return cout
+
+    # --- Expresiones: closures st -> valor ---
+    def _expr(self, node):
+        if node is None:
+            return _ninguno
+        op = node.token.op
+        if op is not None:
+            return self._operador(node, op)
+        if isinstance(node, CallNode):
+            return self._llamada(node)
+        if isinstance(node, (DeclarationNode, IfNode, ForNode, SwitchNode, BlockNode)):
+            stmt = self._sentencia(node)
+
+            def sentencia(st):
+                stmt(st)
+                return None
+            return sentencia
+        tipo = node.token.type
+        if tipo == Token.Type.Asign:
+            return self._asignacion(node)
+        if tipo == Token.Type.Increment:
+            return self._incremento(node)
+        if tipo == Token.Type.Sizeof:
+            return self._sizeof(node)
+        if tipo == Token.Type.Cadena:
+            value = node.token.value
+            return lambda st: value
+        if tipo == Token.Type.Numero:
+            value = node.value
+            if value is None:
+                value = float(node.token.value) if '.' in node.token.value else int(node.token.value)
+            return lambda st: value
+        if tipo == Token.Type.Index:
+            return self._indice(node)
+        if tipo == Token.Type.Ident:
+            return self._variable(node)
+        return _ninguno
+
+    def _operador(self, node, op):
+        nodes, depth = postorden_operadores(node)
+        if depth > PROFUNDIDAD_MAXIMA:
+            return self._postfijo(nodes)
+        return self._arbol(node, op)
+
+    def _arbol(self, node, op):
+        # La profundidad ya se midió en la raíz: los operadores hijos no la repiten
+        left = node.left
+        a = self._arbol(left, left.token.op) if left.token.op is not None else self._expr(left)
+        if op == ops.NEG:
+            return lambda st: -a(st)
+        right = node.right
+        b = self._arbol(right, right.token.op) if right.token.op is not None else self._expr(right)
+        impl = node.impl or ops.GENERIC_OPS[op]
+        return lambda st: impl(a(st), b(st))
+
+    def _postfijo(self, nodes):
+        """Expresión muy profunda (1+1+1+...): una sola closure con pila explícita."""
+        programa = []
+        for node in nodes:
+            op = node.token.op
+            if op is None:
+                programa.append((self._expr(node), None))
+            elif op == ops.NEG:
+                programa.append((None, None))
+            else:
+                programa.append((None, node.impl or ops.GENERIC_OPS[op]))
+        programa = tuple(programa)
+
+        def postfijo(st):
+            values = []
+            for hoja, impl in programa:
+                if hoja is not None:
+                    values.append(hoja(st))
+                elif impl is None:
+                    values[-1] = -values[-1]
+                else:
+                    right = values.pop()
+                    values[-1] = impl(values[-1], right)
+            return values[0]
+        return postfijo
+
+    def _variable(self, node):
+        slot, name = node.slot, node.token.value
+        if slot is not None:
+            return lambda st: st.frame[slot]
+
+        def variable(st):
+            try:
+                return st.env[name]
+            except KeyError:
+                raise NameError(f"Variable '{name}' no definida") from None
+        return variable
+
+    def _arreglo_local(self, ident):
+        slot, name = ident.slot, ident.token.value
+
+        def arreglo(st):
+            arr = st.frame[slot]
+            if not isinstance(arr, dict):
+                raise TypeError(f"'{name}' no es un arreglo")
+            return arr
+        return arreglo
+
+    def _indice(self, node):
+        index = self._expr(node.right)
+        if node.left.slot is not None:
+            arreglo = self._arreglo_local(node.left)
+            return lambda st: arreglo(st).get(index(st), 0)
+        name = node.left.token.value
+
+        def elemento(st):
+            i = index(st)
+            arr = st.env.get(name)
+            if isinstance(arr, dict):
+                return arr.get(i, 0)
+            raise NameError(f"Arreglo '{name}' no definido o acceso inválido")
+        return elemento
+
+    def _asignacion(self, node):
+        valor, ctype, target = self._expr(node.right), node.ctype, node.left
+        if ctype in (INT, FLOAT):
+            expr = valor
+            valor = lambda st: coerce(ctype, expr(st))
+        if target.token.type == Token.Type.Index:
+            index = self._expr(target.right)
+            if target.left.slot is not None:
+                arreglo = self._arreglo_local(target.left)
+
+                def a_local(st):
+                    val = valor(st)
+                    arreglo(st)[index(st)] = val
+                    return val
+                return a_local
+            name = target.left.token.value
+
+            def a_elemento(st):
+                val = valor(st)
+                i = index(st)
+                env = st.env
+                if name not in env:
+                    env[name] = {}
+                arr = env[name]
+                if not isinstance(arr, dict):
+                    raise TypeError(f"'{name}' no es un arreglo")
+                arr[i] = val
+                return val
+            return a_elemento
+        slot, name = target.slot, target.token.value
+        if slot is not None:
+            def a_slot(st):
+                val = st.frame[slot] = valor(st)
+                return val
+            return a_slot
+
+        def a_nombre(st):
+            val = st.env[name] = valor(st)
+            return val
+        return a_nombre
+
+    def _incremento(self, node):
+        target = node.left
+        cargar = self._variable(target)
+        slot, name = target.slot, target.token.value
+        if slot is not None:
+            def inc_slot(st):
+                val = st.frame[slot] = cargar(st) + 1
+                return val
+            return inc_slot
+
+        def inc_nombre(st):
+            val = st.env[name] = cargar(st) + 1
+            return val
+        return inc_nombre
+
+    def _sizeof(self, node):
+        target = node.left
+        if target is None or target.token.type != Token.Type.Ident:
+            # sizeof(v[0]) u otra expresión: un int
+            return lambda st: 4
+        if node.slot is not None:
+            # Arreglo local de una función
+            size_slot = node.slot
+            return lambda st: st.frame[size_slot] * 4
+        cargar, local = self._variable(target), target.slot is not None
+        clave = f"__sizeof_{target.token.value}"
+
+        def sizeof(st):
+            if not local and clave in st.env:
+                return st.env[clave] * 4
+            val = cargar(st)
+            if isinstance(val, int):
+                return 4
+            if isinstance(val, float):
+                return 8
+            if isinstance(val, str):
+                return len(val)
+            return 4
+        return sizeof
+
+    def _llamada(self, node):
+        name, args = node.token.value, node.args
+        entrada = self._funciones.get(name)
+        if entrada is None:
+            def indefinida(st):
+                raise NameError(f"Función '{name}' no definida")
+            return indefinida
+        func = entrada.node
+        params = func.params
+        if len(args) != len(params):
+            def aridad(st):
+                raise TypeError(f"'{name}' espera {len(params)} argumento(s), se pasaron {len(args)}")
+            return aridad
+        argumentos = tuple((params[i][0], self._expr(arg)) for i, arg in enumerate(args))
+        rtype, size, line = func.rtype, func.frame_size, linea(node)
+        maximo = Interpreter.MAX_CALL_DEPTH
+
+        def llamada(st):
+            if st.llamadas >= maximo:
+                raise DesbordamientoPila(line)
+            # Los argumentos se evalúan en el marco del llamador y van a los slots 0..n-1
+            frame = [None] * size
+            for i, (ptype, arg) in enumerate(argumentos):
+                frame[i] = coerce(ptype, arg(st))
+            caller, st.frame = st.frame, frame
+            st.llamadas += 1
+            try:
+                signal = entrada.cuerpo(st)
+            finally:
+                st.llamadas -= 1
+                st.frame = caller
+            # Un break/continue suelto termina la función sin valor
+            if signal == RETURN:
+                return coerce(rtype, st.ret)
+            return None
+        return llamada
@@ -1,6 +1,7 @@
 from .generador_codigo import GeneradorCodigo
 from .lexer import Token
 from .ast_nodes import TreeNode
+from .ast_arena import AstArena
 
 class CodeGeneratorFromTree:
     """
@@ -14,12 +15,26 @@ class CodeGeneratorFromTree:
 
     def generate_from_tree(self, tree_root: TreeNode, output_path="output.obj"):
         gen = GeneradorCodigo(output_path)
+        self._generate(tree_root, gen)
+        gen.close()
+        return gen.nombre_fichero
+
+    def generate_code(self, tree_root: TreeNode):
+        """Como generate_from_tree, pero devuelve el código como texto sin escribir ningún fichero."""
+        gen = GeneradorCodigo(None)
+        self._generate(tree_root, gen)
+        return gen.texto()
+
+    def _generate(self, tree_root, gen: GeneradorCodigo):
+        # tree_root también puede ser un AstArena: se emite su raíz leyendo
+        # directamente las columnas, sin reconstruir los objetos TreeNode
         gen.code()
         # recorrido post-order y emisión
-        self._emit_tree(tree_root, gen)
+        if isinstance(tree_root, AstArena):
+            self._emit_arena(tree_root, tree_root.root, gen)
+        else:
+            self._emit_tree(tree_root, gen)
         gen.end()
-        gen.close()
-        return gen.nombre_fichero
 
     def _emit_tree(self, node: TreeNode, gen: GeneradorCodigo):
         """
@@ -29,30 +44,46 @@ class CodeGeneratorFromTree:
           - si operador binario: generar left, generar right, aplicar operator
           - si unary - : generar operand y NEG
         """
-        if node is None:
-            return
-        t = node.token
-        if t.type == Token.Type.Numero:
-            gen.pushc(t.value)
-            return
-        if t.type == Token.Type.Ident:
-            gen.push(t.value)
-            # para usar el valor en expresión, hacemos LOAD
-            gen.load()
-            return
-        # operador
-        # unary minus detection: operator '-' with only left child and right is None -> unary
-        if t.type == Token.Type.Resta and (node.right is None):
-            # unary
-            self._emit_tree(node.left, gen)
-            gen.neg()
-            return
-        # binary operators: generate left then right
-        if node.left:
-            self._emit_tree(node.left, gen)
-        if node.right:
-            self._emit_tree(node.right, gen)
-        # now emit operator
+        self._emit(node, gen, lambda n: n.token, lambda n: n.left, lambda n: n.right)
+
+    def _emit_arena(self, arena: AstArena, index, gen: GeneradorCodigo):
+        """Igual que _emit_tree, pero los nodos son índices de la arena."""
+        self._emit(index, gen, arena.token_of, arena.left_of, arena.right_of)
+
+    def _emit(self, node, gen: GeneradorCodigo, token_of, left_of, right_of):
+        # Pila explícita en lugar de recursión: (nodo, hijos_ya_emitidos)
+        stack = [(node, False)]
+        while stack:
+            node, ready = stack.pop()
+            if node is None:
+                continue
+            t = token_of(node)
+            if t.type == Token.Type.Numero:
+                gen.pushc(t.value)
+                continue
+            if t.type in (Token.Type.Ident, Token.Type.Index):
+                gen.push(t.value)
+                # para usar el valor en expresión, hacemos LOAD
+                gen.load()
+                continue
+            # operador
+            # unary minus detection: operator '-' with only left child and right is None -> unary
+            left, right = left_of(node), right_of(node)
+            unary = t.type == Token.Type.Resta and right is None
+            if not ready:
+                stack.append((node, True))
+                # binary operators: generate left then right
+                if not unary and right is not None:
+                    stack.append((right, False))
+                if left is not None:
+                    stack.append((left, False))
+                continue
+            if unary:
+                gen.neg()
+                continue
+            self._emit_operator(t, gen)
+
+    def _emit_operator(self, t, gen: GeneradorCodigo):
         if t.type == Token.Type.Suma:
             gen.add()
         elif t.type == Token.Type.Resta:
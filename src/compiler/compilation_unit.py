@@ -0,0 +1,134 @@
+"""
+Unidad de compilación: un código fuente y todo lo que se deriva de él.
+
+CompilationUnit guarda el texto y calcula bajo demanda, como mucho una vez,
+cada artefacto de las fases: tokens, AST, resultado semántico (tabla de
+símbolos), AST anotado por TypeInference, código intermedio del Automata y
+código objeto. Las fases piden lo que necesitan a la unidad en lugar de volver
+a leer el texto: el Parser consume los tokens ya leídos por el Lexer, el
+Compiler, los botones de la GUI y los scripts de consola comparten el mismo
+AST, y un artefacto que falló (p. ej. un error sintáctico) vuelve a lanzar el
+mismo error sin repetir el trabajo.
+"""
+from .automata import Automata
+from .code_generator import CodeGeneratorFromTree
+from .lexer import Lexer, Token
+from .parser import Parser, ErroresSintacticos
+from .ast_nodes import BlockNode
+from .semantics import SemanticAnalyzer
+from .type_inference import TypeInference
+
+
+class CompilationUnit:
+    def __init__(self, source, obj_path=None, automata=None):
+        self.source = source
+        self.obj_path = obj_path  # si se indica, el código objeto también se escribe ahí
+        self.automata = automata  # se crea uno si hace falta el código intermedio
+        self.parser = None        # el Parser que armó el AST (backtracks, token_actual)
+        self.line_count = None    # líneas leídas por el Lexer
+        self._artefactos = {}     # nombre -> (valor, excepción)
+
+    def _obtener(self, nombre, calcular):
+        try:
+            valor, error = self._artefactos[nombre]
+        except KeyError:
+            try:
+                valor, error = calcular(), None
+            except Exception as e:
+                valor, error = None, e
+            self._artefactos[nombre] = (valor, error)
+        if error is not None:
+            raise error
+        return valor
+
+    def computed(self, nombre):
+        """True si el artefacto ya se calculó (con éxito o con error)."""
+        return nombre in self._artefactos
+
+    def artifact(self, nombre, calcular):
+        """
+        Artefacto adicional (p. ej. el programa generado por un backend):
+        calcular() se llama la primera vez y su resultado o error se guarda.
+        """
+        return self._obtener(nombre, calcular)
+
+    @property
+    def tokens(self):
+        """Todos los tokens del fuente, terminando en el de Fin."""
+        return self._obtener("tokens", self._lexear)
+
+    @property
+    def ast(self):
+        """AST del Parser; lanza ErroresSintacticos (con el AST parcial en e.ast)."""
+        return self._obtener("ast", self._parsear)
+
+    @property
+    def semantic(self):
+        """Resultado de SemanticAnalyzer.analizar: tabla, errores y usados."""
+        return self._obtener("semantic", self._analizar)
+
+    @property
+    def symbol_table(self):
+        return self.semantic["tabla"]
+
+    @property
+    def typed_ast(self):
+        """El mismo AST, anotado una vez por TypeInference (ctype / impl)."""
+        return self._obtener("typed_ast", self._anotar)
+
+    @property
+    def ir(self):
+        """Código intermedio del Automata (tokens, RPN, evaluación)."""
+        return self._obtener("ir", self._intermedio)
+
+    @property
+    def object_code(self):
+        """
+        Texto del código objeto generado desde el AST. Se guarda el contenido
+        (no una ruta), así ninguna otra unidad puede pisarlo; si la unidad
+        tiene obj_path, además se escribe en ese fichero.
+        """
+        return self._obtener("object_code", self._generar_objeto)
+
+    def _lexear(self):
+        lexer = Lexer(self.source)
+        tokens = list(lexer.tokens())
+        # El Fin lleva la línea del final del texto, como si el Parser leyera del Lexer
+        tokens.append(Token(Token.Type.Fin, "", lexer.line))
+        self.line_count = lexer.line
+        return tokens
+
+    def _parsear(self):
+        self.parser = Parser(self.tokens)
+        return self.parser.parse()
+
+    def _analizar(self):
+        # El analizador revisa las sentencias del AST de la unidad en lugar
+        # de volver a parsear el texto; con errores sintácticos usa el parcial
+        try:
+            ast = self.ast
+        except ErroresSintacticos as e:
+            ast = e.ast
+        except Exception:
+            ast = None
+        # Sin AST no hay sentencias que revisar: un bloque vacío evita reparsear
+        return SemanticAnalyzer().analizar(self.source, BlockNode() if ast is None else ast)
+
+    def _anotar(self):
+        ast = self.ast
+        TypeInference().annotate(ast)
+        return ast
+
+    def _intermedio(self):
+        if self.automata is None:
+            self.automata = Automata()
+        return self.automata.analizar(self.source.strip(), derivaciones=False)
+
+    def _generar_objeto(self):
+        declaradas = {nombre for nombre, info in self.symbol_table.todas()
+                      if info["naturaleza"] in ("variable", "arreglo")}
+        codigo = CodeGeneratorFromTree(declared_vars=declaradas).generate_code(self.ast)
+        if self.obj_path is not None:
+            with open(self.obj_path, "w", encoding="utf-8") as f:
+                f.write(codigo)
+        return codigo
@@ -1,54 +1,184 @@
-from .lexer import Lexer
-from .parser import Parser
-from .semantics import SemanticAnalyzer
-from .code_generator import CodeGenerator
+import re
+import time
+
+from .backends import DEFAULT_BACKEND, get_backend, available_backends
+from .compilation_unit import CompilationUnit
+from .parser import ErroresSintacticos
+
+_LINEA = re.compile(r"línea (\d+)")
+
 
 class Compiler:
-    def __init__(self):
-        self.semantic_analyzer = SemanticAnalyzer()
-        self.code_generator = CodeGenerator()
+    def __init__(self, metrics_callback=None):
+        # metrics_callback(fase, datos) se llama al terminar cada fase
+        self.metrics_callback = metrics_callback
 
-    def compile(self, source_code):
+    def compile(self, source_code, execute=False, backend=DEFAULT_BACKEND, strict=True):
         """
-        Compiles the given source code.
+        Compiles the given source code (a string or a CompilationUnit whose
+        already computed artifacts are reused) with the named backend (see
+        backends.available_backends(); an unknown name raises ValueError).
+        With strict=False semantic errors are reported as warnings and the
+        program is still generated and executed, like the GUI's Run button
+        (the line-based analyzer has false positives).
         Returns a dict with:
         - status: 'success' or 'error'
-        - errors: list of error strings
-        - ast: the abstract syntax tree (optional)
+        - errors: list of error strings (every syntax error found, not just the first)
+        - diagnostics: the same errors plus backend warnings, as dicts with
+          severity ('error'/'warning'), phase, line (or None) and message
+        - ast: the abstract syntax tree (partial if there were syntax errors)
         - symbol_table: the symbol table
         - output: generated code or execution result
+        - metrics: per-phase cost, phase name -> dict (always includes 'time'
+          in seconds). Phases: lexing, parsing, semantic, optimization,
+          codegen (backends that generate a program) and, with execute=True,
+          execution.
+        - backend: the backend name; artifact: the program it generated
+        - unit: the CompilationUnit holding every artifact (tokens, AST...)
         """
+        backend = get_backend(backend)
+        unit = source_code if isinstance(source_code, CompilationUnit) else CompilationUnit(source_code)
         results = {
             "status": "success",
             "errors": [],
+            "diagnostics": [],
             "ast": None,
             "symbol_table": None,
-            "output": ""
+            "output": "",
+            "metrics": {},
+            "backend": backend.name,
+            "artifact": None,
+            "unit": unit
         }
 
-        # 1. Lexical Analysis & Parsing
+        # 0. Lexical Analysis: el Parser consume estos mismos tokens
+        start = time.perf_counter()
+        tokens = unit.tokens
+        self._record(results, "lexing", start, tokens=len(tokens) - 1, lines=unit.line_count)
+
+        # 1. Parsing
+        start = time.perf_counter()
         try:
-            lexer = Lexer(source_code)
-            parser = Parser(lexer)
-            ast = parser.parse()
+            ast = unit.ast
             results["ast"] = ast
+        except ErroresSintacticos as e:
+            # Todos los errores de la pasada; el AST parcial queda disponible
+            results["ast"] = e.ast
+            self._record(results, "parsing", start, nodes=_count_nodes(e.ast) if e.ast else 0,
+                         backtracks=unit.parser.backtracks, errors=len(e.errores))
+            for msg, line in zip(e.errores, e.lineas):
+                self._error(results, "parsing", "Syntax Error: ", msg, line)
+            return results
         except Exception as e:
-            results["status"] = "error"
-            results["errors"].append(f"Syntax Error: {str(e)}")
+            self._record(results, "parsing", start, nodes=0,
+                         backtracks=unit.parser.backtracks if unit.parser else 0, errors=1)
+            self._error(results, "parsing", "Syntax Error: ", str(e))
             return results
+        self._record(results, "parsing", start, nodes=_count_nodes(ast), backtracks=unit.parser.backtracks,
+                     errors=0)
 
         # 2. Semantic Analysis
-        semantic_result = self.semantic_analyzer.analizar(source_code)
+        start = time.perf_counter()
+        semantic_result = unit.semantic
         results["symbol_table"] = semantic_result["tabla"]
-        
+        self._record(results, "semantic", start, errors=len(semantic_result["errores"]))
+
         if semantic_result["errores"]:
-            results["status"] = "error"
-            results["errors"].extend(semantic_result["errores"])
+            if strict:
+                for msg in semantic_result["errores"]:
+                    self._error(results, "semantic", "", msg)
+                return results
+            for msg in semantic_result["errores"]:
+                self._diagnostic(results, "semantic", msg, severity="warning")
+
+        # 3. Optimization: tipos estáticos y operadores especializados
+        start = time.perf_counter()
+        ast = unit.typed_ast
+        typed = specialized = 0
+        stack = [ast]
+        while stack:
+            node = stack.pop()
+            typed += node.ctype is not None
+            specialized += node.impl is not None
+            stack.extend(node.children())
+        self._record(results, "optimization", start, typed_nodes=typed, specialized_ops=specialized)
+
+        # 4. Code generation: el programa del backend (closures, bytecode, Python...)
+        start = time.perf_counter()
+        try:
+            program = backend.program(unit)
+        except Exception as e:
+            if backend.compiles:
+                self._record(results, "codegen", start)
+            self._error(results, "codegen", "Codegen Error: ", str(e))
+            return results
+        results["artifact"] = program
+        if backend.compiles:
+            self._record(results, "codegen", start, **backend.codegen_metrics(program))
+        for msg in backend.warnings(program):
+            self._diagnostic(results, "codegen", msg, severity="warning")
+        if not backend.executes:
+            results["output"] = backend.render(program)
             return results
 
-        # 3. Code Generation (Optional/Placeholder)
-        # Assuming CodeGenerator has a generate method
-        # generated_code = self.code_generator.generate(ast)
-        # results["output"] = generated_code
+        # 5. Execution (opcional)
+        if execute:
+            output = []
+            data = {}
+            start = time.perf_counter()
+            try:
+                backend.execute(program, lambda msg: output.append(str(msg)), data)
+            except Exception as e:
+                self._error(results, "execution", "Runtime Error: ", str(e))
+            results["output"] = "".join(output)
+            self._record(results, "execution", start, **data,
+                         output_bytes=len(results["output"].encode('utf-8')))
 
         return results
+
+    def compare(self, source_code, backends=None, reference=DEFAULT_BACKEND, strict=True):
+        """
+        Compiles and executes the same unit with every backend (by default all
+        that execute) and compares each one with the reference backend.
+        Returns a dict with:
+        - reference: the reference backend name
+        - results: backend name -> the compile() result
+        - mismatches: names whose status or output differ from the reference
+        """
+        unit = source_code if isinstance(source_code, CompilationUnit) else CompilationUnit(source_code)
+        names = list(backends) if backends is not None else available_backends(executable=True)
+        if reference not in names:
+            names.insert(0, reference)
+        results = {name: self.compile(unit, execute=True, backend=name, strict=strict)
+                   for name in names}
+        ref = results[reference]
+        mismatches = [name for name, res in results.items()
+                      if (res["status"], res["output"]) != (ref["status"], ref["output"])]
+        return {"reference": reference, "results": results, "mismatches": mismatches}
+
+    def _error(self, results, phase, prefix, message, line=None):
+        results["status"] = "error"
+        results["errors"].append(f"{prefix}{message}")
+        self._diagnostic(results, phase, message, line)
+
+    def _diagnostic(self, results, phase, message, line=None, severity="error"):
+        if line is None:
+            match = _LINEA.search(message)
+            line = int(match.group(1)) if match else None
+        results["diagnostics"].append({"severity": severity, "phase": phase, "line": line,
+                                       "message": message})
+
+    def _record(self, results, phase, start, **data):
+        data["time"] = time.perf_counter() - start
+        results["metrics"][phase] = data
+        if self.metrics_callback:
+            self.metrics_callback(phase, data)
+
+
+def _count_nodes(ast):
+    count, stack = 0, [ast]
+    while stack:
+        node = stack.pop()
+        count += 1
+        stack.extend(node.children())
+    return count
@@ -0,0 +1,86 @@
+"""
+Evaluación de expresiones constantes para el SemanticAnalyzer.
+
+El analizador sigue el valor conocido de cada variable a lo largo del código
+en línea recta para detectar divisiones por cero. En lugar de compilar el lado
+derecho de cada asignación con eval(), evalua_constante pliega el árbol que ya
+armó el Parser con la semántica de C++ de operators (división entera que
+trunca, módulo con el signo del dividendo). Cualquier hoja que no sea un
+literal numérico o una variable con valor conocido hace que el resultado sea
+None (desconocido), igual que una división por cero dentro de la expresión.
+
+El recorrido es iterativo, como el resto de las pasadas sobre el AST, y lee
+los nodos a través de nodes (ast_nodes.TREE_NODES o una AstArena), así sirve
+igual para el árbol de objetos que para la arena.
+"""
+from .ast_nodes import TREE_NODES
+from .lexer import Token
+from .operators import NEG, GENERIC_OPS
+
+DESCONOCIDO = None
+
+
+def numero(texto):
+    """Valor de un literal numérico ('3' -> 3, '2.5' -> 2.5); None si no lo es."""
+    try:
+        return float(texto) if '.' in texto else int(texto)
+    except (TypeError, ValueError):
+        return DESCONOCIDO
+
+
+def al_tipo(valor, tipo):
+    """valor convertido al tipo declarado: int trunca hacia cero como en C++."""
+    if valor is DESCONOCIDO:
+        return DESCONOCIDO
+    if tipo == 'int':
+        return int(valor)
+    if tipo == 'float':
+        return float(valor)
+    return DESCONOCIDO
+
+
+def evalua_constante(raiz, valor_de, nodes=TREE_NODES):
+    """
+    Valor de la expresión raiz si se conoce en tiempo de compilación, o None.
+    valor_de(nombre) da el valor conocido de una variable (o None); con
+    nodes=arena, raiz es un índice de esa AstArena.
+    """
+    values = []
+    stack = [(raiz, False)]
+    while stack:
+        node, ready = stack.pop()
+        if node is None:
+            return DESCONOCIDO
+        token = nodes.token_of(node)
+        op = token.op
+        if op is None:
+            tipo = token.type
+            if tipo == Token.Type.Numero:
+                valor = numero(token.value)
+            elif tipo == Token.Type.Ident and nodes.is_tree(node):
+                valor = valor_de(token.value)
+            else:
+                # Cadenas, llamadas, accesos a arreglos, sizeof...
+                valor = DESCONOCIDO
+            if valor is DESCONOCIDO:
+                return DESCONOCIDO
+            values.append(valor)
+        elif ready:
+            if op == NEG:
+                # El parser deja el operando del menos unario a la izquierda
+                values.append(-values.pop())
+                continue
+            right = values.pop()
+            left = values.pop()
+            try:
+                valor = GENERIC_OPS[op](left, right)
+            except ArithmeticError:
+                return DESCONOCIDO
+            # Las comparaciones de C++ dan 0 o 1
+            values.append(int(valor) if isinstance(valor, bool) else valor)
+        else:
+            stack.append((node, True))
+            if op != NEG:
+                stack.append((nodes.right_of(node), False))
+            stack.append((nodes.left_of(node), False))
+    return values[0]
@@ -2,19 +2,29 @@
 # ===========================================
 # Módulo independiente para la clase GeneradorCodigo
 # ===========================================
+import io
+
 
 class GeneradorCodigo:
     """
     Implementación en Python inspirada en la clase GeneraCodigo del PDF.
-    Genera instrucciones tipo máquina virtual en un fichero de salida.
+    Genera instrucciones tipo máquina virtual en un fichero de salida
+    (o en memoria si nombre_fichero es None; ver texto()).
     """
     def __init__(self, nombre_fichero="output.obj"):
         self.nombre_fichero = nombre_fichero
+        if nombre_fichero is None:
+            self.salida = io.StringIO()
+            return
         try:
             self.salida = open(self.nombre_fichero, "w", encoding="utf-8")
         except Exception as e:
             raise IOError(f"No se puede crear el fichero {nombre_fichero}: {e}")
 
+    def texto(self):
+        """Instrucciones emitidas hasta ahora, si el generador escribe en memoria."""
+        return self.salida.getvalue()
+
     def close(self):
         try:
             self.salida.close()
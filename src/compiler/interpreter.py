@@ -1,24 +1,89 @@
-from .ast_nodes import TreeNode, BlockNode
+from .ast_nodes import (
+    TreeNode, BlockNode, DeclarationNode, ForNode, IfNode, SwitchNode, CallNode, ProgramNode,
+)
+from .ast_arena import AstArena
 from .lexer import Token
+from .resolver import Resolver
+from .type_inference import TypeInference, coerce
+from . import operators as ops
+
+# Valor anterior de un nombre que no existía antes de declararse en un bloque
+_UNBOUND = object()
+
+# Señales de control de flujo (Interpreter.signal). Una sentencia break,
+# continue o return deja su señal y los bloques, ciclos, switch y llamadas
+# que la contienen la miran al terminar cada sentencia: el camino normal
+# solo prueba que signal sea 0
+NORMAL, BREAK, CONTINUE, RETURN = range(4)
+
+
+class DesbordamientoPila(RuntimeError):
+    """Más llamadas anidadas que Interpreter.MAX_CALL_DEPTH (el mensaje ya trae la línea)."""
+
+    def __init__(self, line):
+        super().__init__(f"Error Semántico en línea {line if line is not None else '?'}: "
+                         f"desbordamiento de pila (más de {Interpreter.MAX_CALL_DEPTH} "
+                         f"llamadas anidadas)")
 
-class ReturnException(Exception):
-    def __init__(self, value):
-        self.value = value
 
 class Interpreter:
+    # Llamadas anidadas como máximo, igual en todos los backends: una
+    # recursión sin fin termina con DesbordamientoPila y no agota la memoria
+    MAX_CALL_DEPTH = 10000
+
     def __init__(self, output_callback=print):
         self.output_callback = output_callback
         self.environment = {}  # Global variables
         self.environment['endl'] = '\n' # Support for endl
-        self.functions = {}    # Function definitions (if any, for now just main)
+        self.functions = {}    # nombre -> FunctionNode (las funciones además de main)
+        # Marco de la función en ejecución: lista indexada por los slots que
+        # anotó el Resolver (None mientras se ejecuta main, que usa environment)
+        self.frame = None
+        self._frames = {}      # nombre -> marcos libres, reutilizados entre llamadas
+        self._return_value = None
+        self.signal = NORMAL
+        # Ámbitos de bloque sobre el mismo environment: cada declaración dentro
+        # de un bloque anota (nombre, valor anterior) y al salir del bloque se
+        # restaura lo que ocultó, sin copiar el diccionario
+        self._undo = []
+        self._depth = 0
+        self._root = None
+        # Nodos (por id) que contienen una llamada: se ejecutan en la pila
+        # explícita de _ejecutar, así la recursión del programa no usa la de Python
+        self._con_llamada = set()
+        self._llamadas = 0
 
-    def interpret(self, ast):
+    def interpret(self, ast, annotate=True):
+        # annotate=False si el AST ya pasó por TypeInference (p. ej. en Compiler)
         if not ast:
             return
-        try:
+        if isinstance(ast, AstArena):
+            # Una arena (de parse_arena o cargada de la caché) se reconstruye
+            # una sola vez: los nodos guardan tipo, implementación
+            # especializada y slot, que la arena no conserva
+            ast = ast.to_tree()
+        # Resolve static types once so the hot path runs specialized operators
+        if annotate:
+            TypeInference().annotate(ast)
+        if isinstance(ast, ProgramNode):
+            resolver = Resolver()
+            for func in ast.functions:
+                resolver.resolver(func)
+                self.functions[func.name] = func
+                self._frames[func.name] = []
+                self._marcar_llamadas(func.body)
+            ast = ast.main
+        # El bloque de main comparte el ámbito de environment; los anidados tienen el suyo
+        self._root = ast
+        self._marcar_llamadas(ast)
+        if id(ast) in self._con_llamada:
+            self._ejecutar(ast)
+        else:
             self.visit(ast)
-        except ReturnException as e:
-            self.output_callback(f"\nProgram finished with exit code: {e.value}")
+        # Un break/continue fuera de un ciclo termina main igual que antes
+        signal, self.signal = self.signal, NORMAL
+        if signal == RETURN:
+            self.output_callback(f"\nProgram finished with exit code: {self._return_value}")
 
     def visit(self, node):
         if node is None:
@@ -27,28 +92,40 @@ class Interpreter:
         try:
             # Block
             if isinstance(node, BlockNode):
-                for stmt in node.statements:
-                    res = self.visit(stmt)
-                    if res == 'BREAK': # Handle break in blocks (loops/switch)
-                        return 'BREAK'
-                return None
+                if node is self._root:
+                    return self.visit_block(node)
+                mark = self._enter_scope()
+                try:
+                    return self.visit_block(node)
+                finally:
+                    self._exit_scope(mark)
     
+            # Operators: the opcode attached by the Lexer selects the handler
+            if node.token.op is not None:
+                return self.eval_operators(node)
+
+            if isinstance(node, CallNode):
+                return self.visit_call(node)
+
             # Declaration
-            from .ast_nodes import DeclarationNode
             if isinstance(node, DeclarationNode):
                 return self.visit_declaration(node)
     
             # Control Flow
-            if node.token.type == Token.Type.Ident and node.token.value == 'if':
+            if isinstance(node, IfNode):
                 return self.visit_if(node)
             if node.token.type == Token.Type.While:
                 return self.visit_while(node)
-            if node.token.type == Token.Type.For:
+            if isinstance(node, ForNode):
                 return self.visit_for(node)
-            if node.token.type == Token.Type.Switch:
+            if isinstance(node, SwitchNode):
                 return self.visit_switch(node)
             if node.token.type == Token.Type.Break:
-                return 'BREAK'
+                self.signal = BREAK
+                return None
+            if node.token.type == Token.Type.Continue:
+                self.signal = CONTINUE
+                return None
             if node.token.type == Token.Type.Return:
                 return self.visit_return(node)
     
@@ -64,16 +141,8 @@ class Interpreter:
             if node.token.type == Token.Type.Increment:
                 return self.visit_increment(node)
     
-            # Binary Operators
-            if node.token.type in (Token.Type.Suma, Token.Type.Resta, Token.Type.Multiplica, Token.Type.Divide, Token.Type.Mod):
-                return self.visit_binop(node)
-            
-            # Relational
-            if node.token.type in (Token.Type.Menor, Token.Type.Mayor, Token.Type.MenorIgual, Token.Type.MayorIgual, Token.Type.Igual, Token.Type.Diferente):
-                return self.visit_relational(node)
-    
             # Sizeof
-            if node.token.type == Token.Type.Ident and node.token.value == 'sizeof':
+            if node.token.type == Token.Type.Sizeof:
                 return self.visit_sizeof(node)
     
             # Literals & Identifiers
@@ -81,22 +150,21 @@ class Interpreter:
                 return node.token.value
     
             if node.token.type == Token.Type.Numero:
+                if node.value is not None:
+                    return node.value
                 return float(node.token.value) if '.' in node.token.value else int(node.token.value)
             
-            # Array Access (Ident '[]')
-            if node.token.type == Token.Type.Ident and node.token.value == '[]':
+            # Array Access
+            if node.token.type == Token.Type.Index:
                 return self.visit_array_access(node)
                 
             if node.token.type == Token.Type.Ident:
-                # Check if it's a type (should be handled by DeclarationNode, but just in case)
-                if node.token.value in ('int', 'float', 'char', 'string'):
-                    return None
+                if node.slot is not None:
+                    return self.frame[node.slot]
                 return self.get_value(node.token.value)
     
             return None
 
-        except ReturnException:
-            raise
         except Exception as e:
             # If the exception already has a line number message, re-raise
             if "en línea" in str(e):
@@ -105,6 +173,49 @@ class Interpreter:
             line = getattr(node.token, 'line', '?')
             raise RuntimeError(f"Error Semántico en línea {line}: {e}")
 
+    def visit_block(self, node):
+        for stmt in node.statements:
+            self.visit(stmt)
+            if self.signal:  # break/continue/return: el resto del bloque no se ejecuta
+                return None
+        return None
+
+    def _end_iteration(self):
+        """
+        Con una señal pendiente tras el cuerpo de un ciclo: consume break y
+        continue (que son de este ciclo) y devuelve True si el ciclo termina.
+        return sigue pendiente hacia la función.
+        """
+        signal = self.signal
+        if signal == RETURN:
+            return True
+        self.signal = NORMAL
+        return signal == BREAK
+
+    # --- Ámbitos de bloque ---
+    def _enter_scope(self):
+        self._depth += 1
+        return len(self._undo)
+
+    def _exit_scope(self, mark):
+        self._depth -= 1
+        undo, env = self._undo, self.environment
+        while len(undo) > mark:
+            name, old = undo.pop()
+            if old is _UNBOUND:
+                env.pop(name, None)
+            else:
+                env[name] = old
+
+    def _declare(self, name, value, slot=None):
+        if slot is not None:
+            # Local de una función: su slot en el marco
+            self.frame[slot] = value
+            return
+        if self._depth:
+            self._undo.append((name, self.environment.get(name, _UNBOUND)))
+        self.environment[name] = value
+
     def visit_declaration(self, node):
         for var in node.vars:
             name = var['name']
@@ -115,128 +226,423 @@ class Interpreter:
                 # Array declaration
                 if isinstance(init, list):
                     # Evaluate each item
-                    values = [self.visit(item) for item in init]
+                    values = [coerce(node.token.value, self.visit(item)) for item in init]
                     arr_data = {}
                     for i, v in enumerate(values):
                         arr_data[i] = v
-                    self.environment[name] = arr_data
-                    self.environment[f"__sizeof_{name}"] = size
+                    self._declare(name, arr_data, var.get('slot'))
+                    self._declare(f"__sizeof_{name}", size, var.get('size_slot'))
                 else:
-                    self.environment[name] = {}
-                    self.environment[f"__sizeof_{name}"] = size
+                    self._declare(name, {}, var.get('slot'))
+                    self._declare(f"__sizeof_{name}", size, var.get('size_slot'))
             else:
                 # Variable declaration
                 val = 0
                 if init:
-                    val = self.visit(init)
-                self.environment[name] = val
+                    val = coerce(node.token.value, self.visit(init))
+                self._declare(name, val, var.get('slot'))
 
     def visit_if(self, node):
-        condition = self.visit(node.left)
-        if condition:
-            self.visit(node.right)
+        # Cadena else-if recorrida en bucle; una señal de la rama queda en
+        # self.signal para el ciclo, switch o función que la contiene
+        while isinstance(node, IfNode):
+            if self.visit(node.cond):
+                return self.visit(node.then_branch)
+            node = node.else_branch
+        return self.visit(node)
 
     def visit_while(self, node):
         while self.visit(node.left):
-            res = self.visit(node.right)
-            if res == 'BREAK':
+            self.visit(node.right)
+            if self.signal and self._end_iteration():
                 break
 
     def visit_for(self, node):
-        init = node.left
-        n1 = node.right
-        cond = n1.left
-        n2 = n1.right
-        update = n2.left
-        body = n2.right
-
-        self.visit(init)
-        while self.visit(cond):
-            res = self.visit(body)
-            if res == 'BREAK':
-                break
-            self.visit(update)
+        # La variable declarada en init solo existe dentro del for
+        mark = self._enter_scope()
+        try:
+            self.visit(node.init)
+            while self.visit(node.cond):
+                self.visit(node.body)
+                # continue también pasa por update
+                if self.signal and self._end_iteration():
+                    break
+                self.visit(node.update)
+        finally:
+            self._exit_scope(mark)
 
     def visit_switch(self, node):
-        val = self.get_value(node.left.token.value)
-        case_node = node.right
-        # Switch logic is still basic/incomplete in parser (doesn't store case values)
-        # But for this task we focus on Bubble Sort which doesn't use switch.
-        pass
+        # Salto directo por tabla; desde ahí fall-through hasta un break
+        start = node.table.get(self.visit(node.subject), node.default)
+        if start is None:
+            return None
+        body = node.body
+        # El cuerpo del switch es un bloque
+        mark = self._enter_scope()
+        try:
+            for i in range(start, len(body)):
+                self.visit(body[i])
+                if self.signal:
+                    # break termina el switch; continue y return siguen hacia afuera
+                    if self.signal == BREAK:
+                        self.signal = NORMAL
+                    break
+        finally:
+            self._exit_scope(mark)
+        return None
 
     def visit_cout(self, node):
         current = node
         while current:
             val = self.visit(current.left)
             if self.output_callback == print:
-                print(str(val), end='')
+                print(ops.cpp_str(val), end='')
             else:
-                self.output_callback(str(val))
+                self.output_callback(ops.cpp_str(val))
             current = current.right
 
     def visit_assign(self, node):
-        val = self.visit(node.right)
+        val = coerce(node.ctype, self.visit(node.right))
         
-        if node.left.token.type == Token.Type.Ident and node.left.token.value == '[]':
+        target = node.left
+        if target.token.type == Token.Type.Index:
             # Array assignment
-            arr_name = node.left.left.token.value
-            index = self.visit(node.left.right)
-            self.set_array_value(arr_name, index, val)
+            index = self.visit(target.right)
+            if target.left.slot is not None:
+                self._local_array(target.left)[index] = val
+            else:
+                self.set_array_value(target.left.token.value, index, val)
+        elif target.slot is not None:
+            self.frame[target.slot] = val
         else:
-            var_name = node.left.token.value
-            self.set_value(var_name, val)
+            self.set_value(target.token.value, val)
         return val
 
     def visit_increment(self, node):
-        var_name = node.left.token.value
-        val = self.get_value(var_name)
-        val += 1
-        self.set_value(var_name, val)
+        target = node.left
+        val = self._load(target) + 1
+        if target.slot is not None:
+            self.frame[target.slot] = val
+        else:
+            self.set_value(target.token.value, val)
         return val
 
     def visit_binop(self, node):
-        left = self.visit(node.left)
-        right = self.visit(node.right)
-        op = node.token.type
-        
-        if op == Token.Type.Suma: return left + right
-        if op == Token.Type.Resta: return left - right
-        if op == Token.Type.Multiplica: return left * right
-        if op == Token.Type.Divide: return left / right
-        if op == Token.Type.Mod: return left % right
-        return 0
+        return self.eval_operators(node)
 
     def visit_relational(self, node):
-        left = self.visit(node.left)
-        right = self.visit(node.right)
-        op = node.token.type
-        
-        if op == Token.Type.Menor: return left < right
-        if op == Token.Type.Mayor: return left > right
-        if op == Token.Type.MenorIgual: return left <= right
-        if op == Token.Type.MayorIgual: return left >= right
-        if op == Token.Type.Igual: return left == right
-        if op == Token.Type.Diferente: return left != right
-        return False
+        return self.eval_operators(node)
+
+    def eval_operators(self, root):
+        """
+        Evaluates a tree of arithmetic/relational operators in post-order with
+        an explicit stack, so long generated chains (1+1+1+...) do not hit the
+        recursion limit. Operands that are not operators (literals, variables,
+        array accesses, sizeof...) are evaluated through visit as usual.
+        """
+        values = []
+        stack = [(root, False)]
+        while stack:
+            node, ready = stack.pop()
+            op = node.token.op
+            if op is None:
+                values.append(self.visit(node))
+            elif ready:
+                if op == ops.NEG:
+                    # Unary minus: the parser leaves the operand on the left
+                    values.append(-values.pop())
+                else:
+                    right = values.pop()
+                    left = values.pop()
+                    # node.impl was chosen by TypeInference (int-only / float-only);
+                    # nodes it could not type fall back to the runtime-checked version.
+                    impl = node.impl or ops.GENERIC_OPS[op]
+                    values.append(impl(left, right))
+            else:
+                stack.append((node, True))
+                if node.right is not None:
+                    stack.append((node.right, False))
+                stack.append((node.left, False))
+        return values[0]
 
     def visit_array_access(self, node):
-        arr_name = node.left.token.value
         index = self.visit(node.right)
-        return self.get_array_value(arr_name, index)
+        if node.left.slot is not None:
+            return self._local_array(node.left).get(index, 0)
+        return self.get_array_value(node.left.token.value, index)
+
+    def visit_call(self, node):
+        # La llamada (y todo lo que llame dentro) corre en la pila explícita
+        return self._ejecutar(node)
+
+    # --- Ejecución con pila explícita ---
+    # Las sentencias y expresiones que contienen una llamada se ejecutan como
+    # generadores: en lugar de visitar un hijo con recursión, el generador lo
+    # entrega con yield y recibe su valor. _ejecutar los apila, así que la
+    # profundidad de la recursión del programa no depende del límite de
+    # Python; lo que no contiene llamadas sigue por visit.
+
+    def _marcar_llamadas(self, root):
+        """Agrega a _con_llamada los nodos de root que contienen una llamada."""
+        order, stack = [], [root]
+        while stack:
+            node = stack.pop()
+            if node is not None:
+                order.append(node)
+                stack.extend(node.children())
+        marcados = self._con_llamada
+        for node in reversed(order):  # hijos antes que padres
+            if isinstance(node, CallNode) or any(id(c) in marcados for c in node.children()):
+                marcados.add(id(node))
+
+    def _ejecutar(self, node):
+        """Evalúa node con una pila de generadores; los errores llevan la línea como en visit."""
+        stack = [(node, self._generador(node))]
+        value = error = None
+        while stack:
+            current, gen = stack[-1]
+            try:
+                if error is None:
+                    child = gen.send(value)
+                else:
+                    child = gen.throw(error)
+                    error = None
+            except StopIteration as fin:
+                stack.pop()
+                value = fin.value
+                continue
+            except Exception as e:
+                stack.pop()
+                if "en línea" not in str(e):
+                    e = RuntimeError(f"Error Semántico en línea {getattr(current.token, 'line', '?')}: {e}")
+                if not stack:
+                    raise e
+                error = e
+                continue
+            if child is not None and id(child) in self._con_llamada:
+                stack.append((child, self._generador(child)))
+                value = None
+            else:
+                try:
+                    value = self.visit(child)
+                except Exception as e:
+                    error = e
+        return value
+
+    def _generador(self, node):
+        # Mismo despacho que visit para los nodos que pueden contener llamadas
+        if isinstance(node, BlockNode):
+            return self._g_bloque(node)
+        if node.token.op is not None:
+            return self._g_operadores(node)
+        if isinstance(node, CallNode):
+            return self._g_llamada(node)
+        if isinstance(node, DeclarationNode):
+            return self._g_declaracion(node)
+        if isinstance(node, IfNode):
+            return self._g_if(node)
+        if node.token.type == Token.Type.While:
+            return self._g_while(node)
+        if isinstance(node, ForNode):
+            return self._g_for(node)
+        if isinstance(node, SwitchNode):
+            return self._g_switch(node)
+        if node.token.type == Token.Type.Return:
+            return self._g_return(node)
+        if node.token.type == Token.Type.Cout:
+            return self._g_cout(node)
+        if node.token.type == Token.Type.Asign:
+            return self._g_assign(node)
+        if node.token.type == Token.Type.Index:
+            return self._g_array_access(node)
+        return self._g_visit(node)
+
+    def _g_visit(self, node):
+        return self.visit(node)
+        yield
+
+    def _g_sentencias(self, statements):
+        for stmt in statements:
+            yield stmt
+            if self.signal:
+                break
+
+    def _g_bloque(self, node):
+        if node is self._root:
+            yield from self._g_sentencias(node.statements)
+            return None
+        mark = self._enter_scope()
+        try:
+            yield from self._g_sentencias(node.statements)
+        finally:
+            self._exit_scope(mark)
+
+    def _g_llamada(self, node):
+        name = node.token.value
+        func = self.functions.get(name)
+        if func is None:
+            raise NameError(f"Función '{name}' no definida")
+        params = func.params
+        if len(node.args) != len(params):
+            raise TypeError(f"'{name}' espera {len(params)} argumento(s), se pasaron {len(node.args)}")
+        if self._llamadas >= self.MAX_CALL_DEPTH:
+            raise DesbordamientoPila(node.token.line)
+        # Marco reutilizado de una llamada anterior ya terminada, si lo hay
+        pool = self._frames[name]
+        frame = pool.pop() if pool else [None] * func.frame_size
+        # Los argumentos se evalúan en el marco del llamador y van directo a
+        # los slots 0..n-1 (los arreglos pasan por referencia)
+        for i, arg in enumerate(node.args):
+            frame[i] = coerce(params[i][0], (yield arg))
+        caller, self.frame = self.frame, frame
+        self._llamadas += 1
+        try:
+            yield from self._g_sentencias(func.body.statements)
+        finally:
+            self._llamadas -= 1
+            self.frame = caller
+            pool.append(frame)
+        if self.signal:
+            # Un break/continue suelto no sale de la función
+            returned, self.signal = self.signal == RETURN, NORMAL
+            if returned:
+                return coerce(func.rtype, self._return_value)
+        return None
+
+    def _g_operadores(self, root):
+        # Como eval_operators: los operandos que no son operadores se piden con yield
+        values = []
+        stack = [(root, False)]
+        while stack:
+            node, ready = stack.pop()
+            op = node.token.op
+            if op is None:
+                values.append((yield node))
+            elif ready:
+                if op == ops.NEG:
+                    values.append(-values.pop())
+                else:
+                    right = values.pop()
+                    left = values.pop()
+                    impl = node.impl or ops.GENERIC_OPS[op]
+                    values.append(impl(left, right))
+            else:
+                stack.append((node, True))
+                if node.right is not None:
+                    stack.append((node.right, False))
+                stack.append((node.left, False))
+        return values[0]
+
+    def _g_declaracion(self, node):
+        for var in node.vars:
+            name, size, init = var['name'], var['size'], var['init']
+            if size is not None:
+                arr_data = {}
+                if isinstance(init, list):
+                    for i, item in enumerate(init):
+                        arr_data[i] = coerce(node.token.value, (yield item))
+                self._declare(name, arr_data, var.get('slot'))
+                self._declare(f"__sizeof_{name}", size, var.get('size_slot'))
+            else:
+                val = 0
+                if init:
+                    val = coerce(node.token.value, (yield init))
+                self._declare(name, val, var.get('slot'))
+
+    def _g_if(self, node):
+        while isinstance(node, IfNode):
+            if (yield node.cond):
+                return (yield node.then_branch)
+            node = node.else_branch
+        return (yield node)
+
+    def _g_while(self, node):
+        while (yield node.left):
+            yield node.right
+            if self.signal and self._end_iteration():
+                break
+
+    def _g_for(self, node):
+        mark = self._enter_scope()
+        try:
+            yield node.init
+            while (yield node.cond):
+                yield node.body
+                if self.signal and self._end_iteration():
+                    break
+                yield node.update
+        finally:
+            self._exit_scope(mark)
+
+    def _g_switch(self, node):
+        start = node.table.get((yield node.subject), node.default)
+        if start is None:
+            return None
+        body = node.body
+        mark = self._enter_scope()
+        try:
+            for i in range(start, len(body)):
+                yield body[i]
+                if self.signal:
+                    if self.signal == BREAK:
+                        self.signal = NORMAL
+                    break
+        finally:
+            self._exit_scope(mark)
+        return None
+
+    def _g_return(self, node):
+        self._return_value = yield node.left
+        self.signal = RETURN
+        return None
+
+    def _g_cout(self, node):
+        current = node
+        while current:
+            val = yield current.left
+            if self.output_callback == print:
+                print(ops.cpp_str(val), end='')
+            else:
+                self.output_callback(ops.cpp_str(val))
+            current = current.right
+
+    def _g_assign(self, node):
+        val = coerce(node.ctype, (yield node.right))
+        target = node.left
+        if target.token.type == Token.Type.Index:
+            index = yield target.right
+            if target.left.slot is not None:
+                self._local_array(target.left)[index] = val
+            else:
+                self.set_array_value(target.left.token.value, index, val)
+        elif target.slot is not None:
+            self.frame[target.slot] = val
+        else:
+            self.set_value(target.token.value, val)
+        return val
+
+    def _g_array_access(self, node):
+        index = yield node.right
+        if node.left.slot is not None:
+            return self._local_array(node.left).get(index, 0)
+        return self.get_array_value(node.left.token.value, index)
 
     def visit_sizeof(self, node):
         # node.left is the expression/identifier
         
         # If it's an array access: sizeof(arr[0])
-        if node.left.token.type == Token.Type.Ident and node.left.token.value == '[]':
+        if node.left.token.type == Token.Type.Index:
              # It's an element. Assuming int array.
              return 4
 
         # We expect an identifier for array or variable
         if node.left.token.type == Token.Type.Ident:
             name = node.left.token.value
+            if node.slot is not None:
+                # Arreglo local de una función
+                return self.frame[node.slot] * 4
             # Check if it's an array
-            if f"__sizeof_{name}" in self.environment:
+            if node.left.slot is None and f"__sizeof_{name}" in self.environment:
                 # sizeof(arr) returns total bytes. Assuming int=4 bytes.
                 # But user code does: sizeof(numeros) / sizeof(numeros[0])
                 # So we should return "size * 4" or just "size" if we want to be simple?
@@ -245,7 +651,7 @@ class Interpreter:
                 return self.environment[f"__sizeof_{name}"] * 4
             
             # If it's a variable
-            val = self.get_value(name)
+            val = self._load(node.left)
             if isinstance(val, int): return 4
             if isinstance(val, float): return 8
             if isinstance(val, str): return len(val)
@@ -253,6 +659,17 @@ class Interpreter:
         return 4 # Default fallback
 
     # --- Environment Helpers ---
+    def _load(self, ident):
+        if ident.slot is not None:
+            return self.frame[ident.slot]
+        return self.get_value(ident.token.value)
+
+    def _local_array(self, ident):
+        arr = self.frame[ident.slot]
+        if not isinstance(arr, dict):
+            raise TypeError(f"'{ident.token.value}' no es un arreglo")
+        return arr
+
     def set_value(self, name, value):
         self.environment[name] = value
 
@@ -276,5 +693,8 @@ class Interpreter:
         raise NameError(f"Arreglo '{name}' no definido o acceso inválido")
 
     def visit_return(self, node):
-        val = self.visit(node.left)
-        raise ReturnException(val)
+        # Sin excepciones: el valor queda en _return_value y la señal RETURN
+        # corta los bloques y ciclos hasta la llamada (o hasta interpret, en main)
+        self._return_value = self.visit(node.left)
+        self.signal = RETURN
+        return None
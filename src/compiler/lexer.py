@@ -1,3 +1,9 @@
+import codecs
+import sys
+
+from . import operators as ops
+
+
 class Token:
     class Type:
         Numero = "Numero"
@@ -36,30 +42,153 @@ class Token:
         Cadena = "Cadena" # "string"
         Coma = "Coma" # ','
         Return = "Return"
+        Continue = "Continue"
+        If = "If"
+        Else = "Else"
+        Tipo = "Tipo"               # int, float, char, string
+        Void = "Void"
+        Sizeof = "Sizeof"
+        Using = "Using"
+        Namespace = "Namespace"
+        Index = "Indice"            # acceso v[i] (nodo sintético del Parser)
+
+    # Sin __dict__ por instancia: un programa grande genera muchos tokens
+    __slots__ = ('type', 'value', 'line', 'op')
 
-    def __init__(self, type_, value, line=1):
+    def __init__(self, type_, value, line=1, op=None):
         self.type = type_
         self.value = value
         self.line = line
+        self.op = op  # opcode de operators.py para operadores aritméticos/relacionales
 
     def __repr__(self):
         return f"Token({self.type}, {self.value}, Line:{self.line})"
 
 
+# Palabras reservadas -> tipo de token; el resto de los nombres son Ident
+KEYWORDS = {
+    'switch': Token.Type.Switch,
+    'case': Token.Type.Case,
+    'break': Token.Type.Break,
+    'continue': Token.Type.Continue,
+    'default': Token.Type.Default,
+    'for': Token.Type.For,
+    'while': Token.Type.While,
+    'cout': Token.Type.Cout,
+    'return': Token.Type.Return,
+    'if': Token.Type.If,
+    'else': Token.Type.Else,
+    'int': Token.Type.Tipo,
+    'float': Token.Type.Tipo,
+    'char': Token.Type.Tipo,
+    'string': Token.Type.Tipo,
+    'void': Token.Type.Void,
+    'sizeof': Token.Type.Sizeof,
+    'using': Token.Type.Using,
+    'namespace': Token.Type.Namespace,
+}
+
+
 class Lexer:
-    def __init__(self, origen: str):
-        self.origen = origen
+    """
+    Analizador léxico del compilador.
+
+    origen puede ser el programa como str, un stream de texto o binario (algo
+    con read(n), por ejemplo un archivo abierto) o un buffer de bytes como un
+    mmap. Salvo con str, el texto se lee por bloques de chunk_size caracteres
+    y solo se conserva en memoria la ventana que falta analizar, así que el
+    pico de memoria no depende del tamaño de la entrada. Los bytes se
+    decodifican como UTF-8.
+    """
+    CHUNK_SIZE = 1 << 16
+
+    def __init__(self, origen, chunk_size=CHUNK_SIZE):
+        if chunk_size < 1:
+            raise ValueError("chunk_size debe ser positivo")
+        self.chunk_size = chunk_size
         self.index = 0
-        self.length = len(origen)
         self.line = 1
+        self._decoder = None
+        if isinstance(origen, str):
+            self.origen = origen
+            self._read = None
+        else:
+            self.origen = ""
+            if hasattr(origen, 'read'):
+                self._read = origen.read
+            else:
+                # bytes, bytearray, mmap...: se recorre por rebanadas, sin copiarlo entero
+                pos = 0
+
+                def read(n):
+                    nonlocal pos
+                    chunk = origen[pos:pos + n]
+                    pos += len(chunk)
+                    return chunk
+                self._read = read
+        self.length = len(self.origen)
+        self._eof = self._read is None
+
+    def _fill(self):
+        """Agrega el siguiente bloque de la fuente a la ventana (o marca el fin)."""
+        # Descartar lo ya analizado antes de crecer
+        if self.index:
+            self.origen = self.origen[self.index:]
+            self.index = 0
+        # Un token más largo que la ventana la hace crecer al doble
+        size = max(self.chunk_size, len(self.origen))
+        while True:
+            chunk = self._read(size)
+            if isinstance(chunk, (bytes, bytearray)):
+                if self._decoder is None:
+                    self._decoder = codecs.getincrementaldecoder('utf-8')()
+                text = self._decoder.decode(chunk, final=not chunk)
+            else:
+                text = chunk
+            if text:
+                self.origen += text
+                break
+            if not chunk:
+                self._eof = True
+                break
+            # Bytes de un carácter multibyte incompleto: seguir leyendo
+        self.length = len(self.origen)
 
     def _peek_isdigit(self):
         # Después de haber leído ch y ya avanzado self.index, el "próximo" carácter
         # está en self.index, no en self.index + 1.
         return (self.index < self.length) and self.origen[self.index].isdigit()
 
+    def tokens(self):
+        """Genera los tokens restantes, sin incluir el de Fin."""
+        while True:
+            tok = self.next_token()
+            if tok.type == Token.Type.Fin:
+                return
+            yield tok
+
+    __iter__ = tokens
 
     def next_token(self):
+        while True:
+            if self.index >= self.chunk_size and self._read is not None:
+                # La parte ya analizada de la ventana no se vuelve a leer
+                self.origen = self.origen[self.index:]
+                self.length -= self.index
+                self.index = 0
+            start, line = self.index, self.line
+            tok = self._scan()
+            if self.index >= self.length and not self._eof:
+                # El token (o el espacio/comentario) llegó al final de la
+                # ventana y podría seguir en el próximo bloque: releerlo
+                self.index, self.line = start, line
+                self._fill()
+                continue
+            if tok is not None:
+                return tok
+
+    def _scan(self):
+        # Un token desde self.index; None si solo había un comentario o directiva
         while self.index < self.length and self.origen[self.index].isspace():
             if self.origen[self.index] == '\n':
                 self.line += 1
@@ -85,46 +214,24 @@ class Lexer:
 
         # Identificador (letras, _, seguido de alfanum o _)
         if ch.isalpha() or ch == '_':
-            ident = ch                        # <-- incluir el carácter leído
+            start = self.index - 1
             while self.index < self.length and (self.origen[self.index].isalnum() or self.origen[self.index] == '_'):
-                ident += self.origen[self.index]
                 self.index += 1
-            
-            # Palabras reservadas para el Lexer moderno
-            if ident == 'switch':
-                return Token(Token.Type.Switch, ident, self.line)
-            if ident == 'case':
-                return Token(Token.Type.Case, ident, self.line)
-            if ident == 'break':
-                return Token(Token.Type.Break, ident, self.line)
-            if ident == 'default':
-                return Token(Token.Type.Default, ident, self.line)
-            if ident == 'for':
-                return Token(Token.Type.For, ident, self.line)
-            if ident == 'while':
-                return Token(Token.Type.While, ident, self.line)
-            if ident == 'cout':
-                return Token(Token.Type.Cout, ident, self.line)
-            if ident == 'return':
-                return Token(Token.Type.Return, ident, self.line)
-            if ident == 'int': # También es bueno tener int/main si queremos parsear completo
-                return Token(Token.Type.Ident, ident, self.line) # Dejamos como Ident por compatibilidad con parser actual o cambiamos si necesario
-
-            if ident == 'sizeof':
-                return Token(Token.Type.Ident, ident, self.line) # Treat as Ident for now, Parser will handle it
-
-            return Token(Token.Type.Ident, ident, self.line)
+            # Internado: cada nombre repetido es el mismo objeto (con su hash
+            # ya calculado) en tokens, tablas de símbolos y environment
+            ident = sys.intern(self.origen[start:self.index])
+            return Token(KEYWORDS.get(ident, Token.Type.Ident), ident, self.line)
 
         # ya avanzamos self.index en 1 arriba; ahora devolvemos tokens según ch
         if ch == '+':
             if self.index < self.length and self.origen[self.index] == '+':
                 self.index += 1
                 return Token(Token.Type.Increment, "++", self.line)
-            return Token(Token.Type.Suma, ch, self.line)
+            return Token(Token.Type.Suma, ch, self.line, ops.ADD)
         if ch == '-':
-            return Token(Token.Type.Resta, ch, self.line)
+            return Token(Token.Type.Resta, ch, self.line, ops.SUB)
         if ch == '*':
-            return Token(Token.Type.Multiplica, ch, self.line)
+            return Token(Token.Type.Multiplica, ch, self.line, ops.MUL)
         if ch == '/':
             # Check for comment //
             if self.index < self.length and self.origen[self.index] == '/':
@@ -132,10 +239,10 @@ class Lexer:
                 while self.index < self.length and self.origen[self.index] != '\n':
                     if self.origen[self.index] == '\n': self.line += 1
                     self.index += 1
-                return self.next_token() # Recursively call to get next real token
-            return Token(Token.Type.Divide, ch, self.line)
+                return None
+            return Token(Token.Type.Divide, ch, self.line, ops.DIV)
         if ch == '%':
-            return Token(Token.Type.Mod, ch, self.line)
+            return Token(Token.Type.Mod, ch, self.line, ops.MOD)
         if ch == '(':
             return Token(Token.Type.ParAbre, ch, self.line)
         if ch == ')':
@@ -155,32 +262,32 @@ class Lexer:
         if ch == '=':
             if self.index < self.length and self.origen[self.index] == '=':
                 self.index += 1
-                return Token(Token.Type.Igual, "==", self.line)
+                return Token(Token.Type.Igual, "==", self.line, ops.EQ)
             return Token(Token.Type.Asign, ch, self.line)
         if ch == '<':
             if self.index < self.length and self.origen[self.index] == '=':
                 self.index += 1
-                return Token(Token.Type.MenorIgual, "<=", self.line)
+                return Token(Token.Type.MenorIgual, "<=", self.line, ops.LE)
             if self.index < self.length and self.origen[self.index] == '<':
                 self.index += 1
                 return Token(Token.Type.LeftShift, "<<", self.line)
-            return Token(Token.Type.Menor, ch, self.line)
+            return Token(Token.Type.Menor, ch, self.line, ops.LT)
         if ch == '>':
             if self.index < self.length and self.origen[self.index] == '=':
                 self.index += 1
-                return Token(Token.Type.MayorIgual, ">=", self.line)
-            return Token(Token.Type.Mayor, ch, self.line)
+                return Token(Token.Type.MayorIgual, ">=", self.line, ops.GE)
+            return Token(Token.Type.Mayor, ch, self.line, ops.GT)
         if ch == '!':
             if self.index < self.length and self.origen[self.index] == '=':
                 self.index += 1
-                return Token(Token.Type.Diferente, "!=", self.line)
+                return Token(Token.Type.Diferente, "!=", self.line, ops.NE)
             return Token(Token.Type.Invalido, ch, self.line)
 
         if ch == '#':
             # Preprocessor directive: skip until newline
             while self.index < self.length and self.origen[self.index] != '\n':
                 self.index += 1
-            return self.next_token()
+            return None
 
         if ch == '"':
             # String literal
@@ -201,6 +308,116 @@ class Lexer:
         return Token(Token.Type.Invalido, ch, self.line)
 
 
+class TokenStream:
+    """
+    Tokens del Lexer con una ventana de lookahead acotada.
+
+    Los tokens se piden al generador Lexer.tokens() recién cuando hacen falta
+    y se guardan en un buffer circular de `lookahead` lugares: peek(k) mira el
+    k-ésimo token por delante sin consumirlo (k < lookahead) y next() consume
+    uno. Al terminar la entrada se devuelve siempre el mismo token Fin.
+
+    mark()/reset()/release() permiten además un parseo especulativo: mientras
+    haya una marca abierta los tokens consumidos se registran para poder
+    volver a entregarlos.
+    """
+
+    def __init__(self, source, lookahead=16):
+        if lookahead < 1:
+            raise ValueError("lookahead debe ser positivo")
+        self._lexer = source if isinstance(source, Lexer) else None
+        self._source = source.tokens() if self._lexer else iter(source)
+        self._ring = [None] * lookahead
+        self._start = 0   # posición del próximo token en el buffer circular
+        self._count = 0   # tokens en el buffer
+        self._fin = None  # token Fin, una vez agotada la fuente
+        self._last_line = 1
+        self._log = []    # tokens consumidos con alguna marca abierta
+        self._pos = 0     # próximo token de _log a entregar (tras un reset)
+        self._marks = 0
+
+    @property
+    def lookahead(self):
+        return len(self._ring)
+
+    def _pull(self):
+        # Un token más de la fuente al buffer; False si ya no quedan
+        if self._fin is not None:
+            return False
+        tok = next(self._source, None)
+        if tok is None or tok.type == Token.Type.Fin:
+            self._finish(tok)
+            return False
+        self._last_line = tok.line
+        size = len(self._ring)
+        self._ring[(self._start + self._count) % size] = tok
+        self._count += 1
+        return True
+
+    def _finish(self, tok):
+        line = self._lexer.line if self._lexer else (tok.line if tok else self._last_line)
+        self._fin = tok or Token(Token.Type.Fin, "", line)
+
+    def peek(self, k=0):
+        """El k-ésimo token sin consumir (0 = el próximo que devolverá next())."""
+        if not 0 <= k < len(self._ring):
+            raise ValueError(f"Lookahead de {k} tokens fuera de la ventana de {len(self._ring)}")
+        pending = len(self._log) - self._pos
+        if k < pending:
+            return self._log[self._pos + k]
+        k -= pending
+        while self._count <= k:
+            if not self._pull():
+                return self._fin
+        return self._ring[(self._start + k) % len(self._ring)]
+
+    def next(self):
+        if self._pos < len(self._log):
+            tok = self._log[self._pos]
+            self._pos += 1
+            self._trim_log()
+            return tok
+        if self._count:
+            tok = self._ring[self._start]
+            self._ring[self._start] = None
+            self._start = (self._start + 1) % len(self._ring)
+            self._count -= 1
+        elif self._fin is not None:
+            tok = self._fin
+        else:
+            # Sin lookahead pendiente: directo de la fuente, sin pasar por el buffer
+            tok = next(self._source, None)
+            if tok is None or tok.type == Token.Type.Fin:
+                self._finish(tok)
+                tok = self._fin
+            else:
+                self._last_line = tok.line
+        if self._marks:
+            self._log.append(tok)
+            self._pos += 1
+        return tok
+
+    def mark(self):
+        """Marca la posición actual; se cierra con reset() o release()."""
+        self._marks += 1
+        return (self._pos, self._marks - 1)
+
+    def reset(self, mark):
+        """Vuelve a la marca: los tokens consumidos desde ella se entregan de nuevo."""
+        self._pos, self._marks = mark
+        self._trim_log()
+
+    def release(self, mark):
+        # Cierra también las marcas internas que quedaron abiertas por una excepción
+        self._marks = mark[1]
+        self._trim_log()
+
+    def _trim_log(self):
+        if not self._marks and self._pos == len(self._log):
+            self._log.clear()
+            self._pos = 0
+
+
 class LexicoSimple:
     """Analizador léxico básico según ejemplos del PDF"""
     def __init__(self, fuente, traza=False):
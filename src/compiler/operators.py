@@ -0,0 +1,94 @@
+"""
+Registro único de operadores compartido por Lexer, Parser, Automata e Interpreter.
+
+Cada operador es un opcode entero pequeño. El Lexer lo adjunta al Token
+(token.op) y el Automata al Node (node.opcode), de modo que los evaluadores
+resuelven el operador con una indexación de lista en lugar de cadenas de
+comparaciones `if op == ...`.
+"""
+import math
+import operator
+
+ADD, SUB, MUL, DIV, MOD, POW, NEG, LT, GT, LE, GE, EQ, NE = range(13)
+
+# opcode -> símbolo (el mismo texto que usa el Automata en sus tokens/RPN)
+SYMBOLS = ('+', '-', '*', '/', '%', '^', 'u-', '<', '>', '<=', '>=', '==', '!=')
+# símbolo -> opcode
+OPCODES = {sym: code for code, sym in enumerate(SYMBOLS)}
+
+ADDITIVE = frozenset((ADD, SUB))
+MULTIPLICATIVE = frozenset((MUL, DIV, MOD))
+ARITHMETIC = ADDITIVE | MULTIPLICATIVE
+RELATIONAL = frozenset((LT, GT, LE, GE, EQ, NE))
+UNARY = frozenset((NEG,))
+
+# opcode -> (precedencia, asociativo por la derecha), usado por el shunting-yard
+PRECEDENCE = (
+    (2, False), (2, False),              # + -
+    (3, False), (3, False), (3, False),  # * / %
+    (4, True),                           # ^
+    (5, True),                           # u-
+    (1, False), (1, False), (1, False), (1, False), (1, False), (1, False),
+)
+
+
+# --- Semántica de C++ ---
+def cpp_int_div(a, b):
+    """Integer division truncating toward zero, as C++ does (Python floors)."""
+    if b == 0:
+        raise ZeroDivisionError("división entera por cero")
+    q = abs(a) // abs(b)
+    return q if (a < 0) == (b < 0) else -q
+
+def cpp_int_mod(a, b):
+    """Remainder with the sign of the dividend, consistent with cpp_int_div."""
+    if b == 0:
+        raise ZeroDivisionError("módulo por cero")
+    r = abs(a) % abs(b)
+    return -r if a < 0 else r
+
+def cpp_str(value):
+    """
+    Text printed by cout: floats use C++'s default format (%g, six significant
+    digits: 3.0 -> "3", 0.1 + 0.2 -> "0.3"); everything else goes through str().
+    """
+    if isinstance(value, float):
+        return format(value, 'g')
+    return str(value)
+
+def generic_div(a, b):
+    if isinstance(a, int) and isinstance(b, int):
+        return cpp_int_div(a, b)
+    return a / b
+
+def generic_mod(a, b):
+    if isinstance(a, int) and isinstance(b, int):
+        return cpp_int_mod(a, b)
+    return math.fmod(a, b)
+
+
+# --- Semántica real del Automata (todo se evalúa como float) ---
+def real_div(a, b):
+    if b == 0:
+        raise ValueError("División por cero")
+    return a / b
+
+def real_pow(a, b):
+    if a < 0 and not float(b).is_integer():
+        raise ValueError("Potencia de base negativa con exponente no entero")
+    return a ** b
+
+
+_COMPARE = (operator.lt, operator.gt, operator.le, operator.ge, operator.eq, operator.ne)
+
+# Tablas de despacho indexadas por opcode. INT/FLOAT suponen que los tipos de
+# los operandos ya fueron demostrados por TypeInference; GENERIC los verifica
+# en tiempo de ejecución.
+INT_OPS = (operator.add, operator.sub, operator.mul, cpp_int_div, cpp_int_mod,
+           operator.pow, operator.neg) + _COMPARE
+FLOAT_OPS = (operator.add, operator.sub, operator.mul, operator.truediv, math.fmod,
+             operator.pow, operator.neg) + _COMPARE
+GENERIC_OPS = (operator.add, operator.sub, operator.mul, generic_div, generic_mod,
+               operator.pow, operator.neg) + _COMPARE
+REAL_OPS = (operator.add, operator.sub, operator.mul, real_div, operator.mod,
+            real_pow, operator.neg) + _COMPARE
@@ -1,249 +1,305 @@
-from .lexer import Lexer, Token, LexicoSimple
-from .ast_nodes import TreeNode
+import re
+
+from .lexer import Lexer, Token, TokenStream, LexicoSimple
+from .ast_nodes import (
+    ForNode, IfNode, SwitchNode, CallNode, FunctionNode, ProgramNode, ASSIGN_TOKEN, INDEX_TOKEN, INCREMENT_TOKEN,
+    WHILE_TOKEN, COUT_TOKEN, RETURN_TOKEN, FOR_TOKEN, PROGRAM_TOKEN, TREE_NODES,
+)
+from . import operators as ops
+
+
+class ErroresSintacticos(ValueError):
+    """
+    Todos los errores sintácticos encontrados en una pasada del Parser.
+    str() es el primero (el mismo mensaje que antes detenía el parseo);
+    errores tiene todos los mensajes, lineas la línea de cada uno y ast el
+    árbol parcial (sin las sentencias que fallaron; None si no se pudo
+    armar el programa).
+    """
+
+    def __init__(self, errores, lineas, ast=None):
+        super().__init__(errores[0])
+        self.errores = list(errores)
+        self.lineas = list(lineas)
+        self.ast = ast
+
 
 class Parser:
+    # Tokens que se pueden mirar por delante de token_actual sin consumirlos
+    LOOKAHEAD = 16
+    # Recuperación en modo pánico: tras un error se descartan tokens hasta
+    # un ';' (inclusive), un '}' o el comienzo de otra sentencia
+    SYNC_TYPES = (Token.Type.Switch, Token.Type.For, Token.Type.While, Token.Type.Cout,
+                  Token.Type.Return, Token.Type.Break, Token.Type.Continue, Token.Type.If,
+                  Token.Type.Tipo)
+    # Tokens con los que puede empezar una función (y el programa)
+    FUNCTION_TYPES = (Token.Type.Tipo, Token.Type.Void)
+
     def __init__(self, lexer: Lexer):
         self.lexer = lexer
-        self.token_actual = self.lexer.next_token()
+        self.tokens = TokenStream(lexer, self.LOOKAHEAD)
+        self.token_actual = self.tokens.next()
+        self.backtracks = 0  # veces que se deshizo un parseo especulativo (restore_state)
+        self.errores = []    # errores sintácticos recuperados, en orden
+        self.lineas = []     # línea de cada error
+        self._prev_line = self.token_actual.line  # línea del último token consumido
+        # Dónde se arman los nodos: objetos TreeNode (TREE_NODES) o las filas
+        # de una AstArena (parse_arena); los dos tienen la misma interfaz
+        self.nodes = TREE_NODES
+
+    def peek(self, k=1):
+        """El k-ésimo token después de token_actual (peek(0) es token_actual)."""
+        return self.token_actual if k == 0 else self.tokens.peek(k - 1)
 
     def eat(self, token_type):
         if self.token_actual.type == token_type:
-            self.token_actual = self.lexer.next_token()
+            self._prev_line = self.token_actual.line
+            self.token_actual = self.tokens.next()
+        elif token_type == Token.Type.PuntoYComa and self.token_actual.line > self._prev_line:
+            # ';' olvidado al final de la línea: se anota y se sigue como si estuviera
+            self._record_error(ValueError(
+                f"Error Sintáctico en línea {self.token_actual.line}: Se esperaba {token_type}, se encontró {self.token_actual.type} ('{self.token_actual.value}')"))
         else:
             raise ValueError(f"Error Sintáctico en línea {self.token_actual.line}: Se esperaba {token_type}, se encontró {self.token_actual.type} ('{self.token_actual.value}')")
 
     def parse(self):
         """
         Parsea:
-         - si comienza con 'int' -> parse_program() (int main() { ... })
+         - si comienza con un tipo o 'using' -> parse_program() (funciones e int main() { ... })
          - si no -> parse a single statement/expression (antes behavior)
         Devuelve el último nodo parseado (para compatibilidad).
         """
-        # Si el primer token es un identificador 'int' (programa)
-        if (self.token_actual.type == Token.Type.Ident and self.token_actual.value == 'int') or \
-           (self.token_actual.type == Token.Type.Ident and self.token_actual.value == 'using'):
-            node = self.parse_program()
+        # Si el primer token es un tipo o 'using' (programa)
+        if self.token_actual.type in self.FUNCTION_TYPES or self.token_actual.type == Token.Type.Using:
+            try:
+                node = self.parse_program()
+            except ValueError as e:
+                # Error del que no hay recuperación (p. ej. en 'int main()')
+                self._record_error(e)
+                node = None
+            if self.errores:
+                raise ErroresSintacticos(self.errores, self.lineas, node)
             if self.token_actual.type != Token.Type.Fin:
                 raise Exception("Tokens sobrantes después del parseo")
             return node
 
         # Si no, parsear una sola sentencia/expresión
         node = self.statement()
+        if self.errores:
+            raise ErroresSintacticos(self.errores, self.lineas, node)
         if self.token_actual.type != Token.Type.Fin:
             raise Exception("Tokens sobrantes después del parseo")
         return node
 
-
+    def parse_arena(self):
+        """
+        Como parse(), pero los nodos se escriben directamente en una AstArena
+        (sin armar objetos TreeNode) y se devuelve la arena con el nodo raíz
+        en arena.root. Con errores, ErroresSintacticos.ast es la arena parcial.
+        """
+        from .ast_arena import AstArena, NIL
+        arena = self.nodes = AstArena()
+        try:
+            root = self.parse()
+        except ErroresSintacticos as e:
+            arena.root = NIL if e.ast is None else e.ast
+            e.ast = arena
+            raise
+        finally:
+            self.nodes = TREE_NODES
+        arena.root = NIL if root is None else root
+        return arena
 
     def statement(self):
         """
-        statement → IDENT '=' expr | expr
+        statement → IDENT '=' expr | IDENT '[' expr ']' '=' expr | expr
         """
-        # Si comienza con identificador y luego hay '=' → asignación
-        # Si comienza con identificador
-        if self.token_actual.type == Token.Type.Ident:
-            left_token = self.token_actual
-            self.eat(Token.Type.Ident)
-            
-            # Check for Array Access: arr[x]
-            if self.token_actual.type == Token.Type.CorcheteAbre:
-                self.eat(Token.Type.CorcheteAbre)
-                index_expr = self.expr()
-                self.eat(Token.Type.CorcheteCierra)
-                
-                # Create Access Node
-                access_node = TreeNode(Token(Token.Type.Ident, '[]'))
-                access_node.left = TreeNode(left_token)
-                access_node.right = index_expr
-                
-                # Check for Assignment: arr[x] = ...
-                if self.token_actual.type == Token.Type.Asign:
-                    self.eat(Token.Type.Asign)
-                    right = self.expr()
-                    node = TreeNode(Token(Token.Type.Asign, '='))
-                    node.left = access_node
-                    node.right = right
-                    return node
-                else:
-                    # Just an expression starting with arr[x]
-                    return self._continue_expr(access_node)
-
-            if self.token_actual.type == Token.Type.Asign:  # '='
-                self.eat(Token.Type.Asign)
-                right = self.expr()
-                # Creamos un nodo de asignación con la variable a la izquierda
-                assign_token = Token(Token.Type.Asign, '=')
-                node = TreeNode(assign_token)
-                node.left = TreeNode(left_token)
-                node.right = right
-                return node
-            else:
-                # No era asignación, tratamos como expresión que empieza con un Ident
-                left_node = TreeNode(left_token)
-                return self._continue_expr(left_node)
-        else:
-            return self.expr()
+        # El lookahead decide si es una asignación antes de consumir nada
+        if self.token_actual.type == Token.Type.Ident and self._assignment_ahead() is not False:
+            return self._assignment()
+        return self.expr()
 
-        
-    def _continue_expr(self, left_node):
+    def _assignment_ahead(self):
         """
-        Continues parsing an expression starting with left_node.
-        Handles arithmetic (+, -) and relational (<, >, ==, etc.)
+        Con token_actual en un IDENT, mira hacia adelante sin consumir si la
+        sentencia es una asignación: IDENT '=' o IDENT '[' ... ']' '='.
+        Devuelve None si el índice del arreglo no entra en la ventana de lookahead.
         """
-        # First, continue arithmetic (precedence: * / % > + - > Relational)
-        # But wait, precedence is:
-        # 1. Primary (++, --)
-        # 2. Factor (*, /, %)
-        # 3. Arith (+, -)
-        # 4. Relational (<, >, ==, ...)
-        
-        # Since we already have left_node (Primary), we need to check for higher precedence?
-        # If left_node came from Ident, it's Primary.
-        # But parse_statement_full consumed Ident.
-        # If next is *, we should have parsed it as part of term?
-        # But we are in "continue".
-        # If we have "a * b", parse_statement_full ate "a".
-        # _continue_expr sees "*".
-        # It should call _continue_term?
-        # This is getting complicated because we broke the recursive descent structure.
-        # Ideally, we should reconstruct the parsing.
-        # But let's assume for now we only handle + - and Relational for statements starting with ID.
-        # (Since * / usually don't start statements unless assignment, but assignment is handled).
-        
-        # Handle arithmetic first
-        node = self._continue_arith(left_node)
-        
-        # Handle relational
-        while self.token_actual.type in (Token.Type.Menor, Token.Type.Mayor, 
-                                         Token.Type.MenorIgual, Token.Type.MayorIgual,
-                                         Token.Type.Igual, Token.Type.Diferente):
-            token = self.token_actual
-            self.eat(token.type)
-            right = self.arith_expr()
-            new_node = TreeNode(token)
-            new_node.left = node
-            new_node.right = right
-            node = new_node
-            
-        return node
+        nxt = self.peek(1).type
+        if nxt == Token.Type.Asign:
+            return True
+        if nxt != Token.Type.CorcheteAbre:
+            return False
+        depth = 0
+        for k in range(1, self.LOOKAHEAD):
+            t = self.peek(k).type
+            if t == Token.Type.CorcheteAbre:
+                depth += 1
+            elif t == Token.Type.CorcheteCierra:
+                depth -= 1
+                if depth == 0:
+                    return self.peek(k + 1).type == Token.Type.Asign
+            elif t == Token.Type.Fin:
+                return False
+        return None
+
+    def _assignment(self):
+        """
+        IDENT ['[' expr ']'] '=' expr. Si _assignment_ahead no pudo decidir y
+        resulta no ser una asignación, sigue como expresión con el acceso ya leído.
+        """
+        left_tok = self.token_actual
+        self.eat(Token.Type.Ident)
+        target = self.nodes.leaf(left_tok)
 
-    def _continue_arith(self, left_node):
-        node = left_node
-        while self.token_actual.type in (Token.Type.Suma, Token.Type.Resta):
-            token = self.token_actual
-            self.eat(token.type)
-            right = self.termino()
-            new_node = TreeNode(token)
-            new_node.left = node
-            new_node.right = right
-            node = new_node
-        return node
+        # Array Access: arr[x]
+        if self.token_actual.type == Token.Type.CorcheteAbre:
+            self.eat(Token.Type.CorcheteAbre)
+            index_expr = self.expr()
+            self.eat(Token.Type.CorcheteCierra)
+            target = self.nodes.node(INDEX_TOKEN, target, index_expr)
 
-    # expr -> arith_expr ((< > ==) arith_expr)*
-    def expr(self):
-        node = self.arith_expr()
-        while self.token_actual.type in (Token.Type.Menor, Token.Type.Mayor, 
-                                         Token.Type.MenorIgual, Token.Type.MayorIgual,
-                                         Token.Type.Igual, Token.Type.Diferente):
-            tok = self.token_actual
-            self.eat(tok.type)
-            new_node = TreeNode(tok)
-            new_node.left = node
-            new_node.right = self.arith_expr()
-            node = new_node
-        return node
+        if self.token_actual.type != Token.Type.Asign:
+            return self._continue_expr(target)
+        self.eat(Token.Type.Asign)
+        return self.nodes.node(ASSIGN_TOKEN, target, self.expr())
 
-    def arith_expr(self):
-        node = self.termino()
-        while self.token_actual.type in (Token.Type.Suma, Token.Type.Resta):
-            tok = self.token_actual
-            self.eat(tok.type)
-            new_node = TreeNode(tok)
-            new_node.left = node
-            new_node.right = self.termino()
-            node = new_node
-        return node
+    def _for_header_ahead(self):
+        """
+        Con token_actual en '(', decide con lookahead si abre la cabecera de un
+        '( ... ) for': solo ahí puede aparecer ';' dentro de los paréntesis.
+        True/False, o None si el paréntesis no se cierra dentro de la ventana.
+        """
+        depth = 1
+        for k in range(1, self.LOOKAHEAD + 1):
+            t = self.peek(k).type
+            if t == Token.Type.PuntoYComa:
+                return True
+            if t == Token.Type.ParAbre:
+                depth += 1
+            elif t == Token.Type.ParCierra:
+                depth -= 1
+                if depth == 0:
+                    return False
+            elif t == Token.Type.Fin:
+                return False
+        return None
 
-    # termino -> factor ((*|/|%) factor)*
-    def termino(self):
-        node = self.factor()
-        while self.token_actual.type in (Token.Type.Multiplica, Token.Type.Divide, Token.Type.Mod):
+    def _continue_expr(self, left_node):
+        """
+        Continues parsing an expression whose first operand (left_node) was
+        already consumed, e.g. by parse_statement_full looking for '='.
+        """
+        return self.expr(first=left_node)
+
+    # expr    -> operand (binop operand)*
+    # operand -> '-' operand | '(' expr ')' | primary
+    # Precedencias (operators.PRECEDENCE): relacionales < + - < * / % < '-' unario
+    def expr(self, first=None):
+        """
+        Parser de precedencia de operadores con pilas explícitas: ni los
+        paréntesis anidados ni los '-' encadenados consumen recursión, así que
+        expresiones generadas de miles de términos no agotan la pila.
+        """
+        operands = [] if first is None else [first]
+        operators = []  # tokens de operador pendientes; None marca un '('
+        open_parens = 0
+        expecting_operand = first is None
+        while True:
             tok = self.token_actual
-            self.eat(tok.type)
-            new_node = TreeNode(tok)
-            new_node.left = node
-            new_node.right = self.factor()
-            node = new_node
-        return node
+            if expecting_operand:
+                if tok.type == Token.Type.Resta:
+                    # unary minus (operand goes on the left, by convention)
+                    self.eat(Token.Type.Resta)
+                    operators.append(Token(Token.Type.Resta, '-', tok.line, ops.NEG))
+                elif tok.type == Token.Type.ParAbre:
+                    self.eat(Token.Type.ParAbre)
+                    operators.append(None)
+                    open_parens += 1
+                else:
+                    operands.append(self.primary())
+                    expecting_operand = False
+                continue
+            if tok.op in ops.ARITHMETIC or tok.op in ops.RELATIONAL:
+                self._reduce(operands, operators, ops.PRECEDENCE[tok.op][0])
+                self.eat(tok.type)
+                operators.append(tok)
+                expecting_operand = True
+                continue
+            if tok.type == Token.Type.ParCierra and open_parens:
+                self._reduce(operands, operators, 0)
+                operators.pop()  # el '('
+                open_parens -= 1
+                self.eat(Token.Type.ParCierra)
+                continue
+            break
+        if open_parens:
+            raise ValueError("Paréntesis desbalanceados: falta ')'")
+        self._reduce(operands, operators, 0)
+        return operands.pop()
+
+    def _reduce(self, operands, operators, min_prec):
+        """Builds nodes for pending operators with precedence >= min_prec (stops at '(')."""
+        while operators and operators[-1] is not None and ops.PRECEDENCE[operators[-1].op][0] >= min_prec:
+            tok = operators.pop()
+            if tok.op == ops.NEG:
+                node = self.nodes.node(tok, operands.pop())
+            else:
+                right = operands.pop()
+                node = self.nodes.node(tok, operands.pop(), right)
+            operands.append(node)
 
-    # factor -> ('-' factor) | primary
-    def factor(self):
-        tok = self.token_actual
-        if tok.type == Token.Type.Resta:
-            # unary minus
-            self.eat(Token.Type.Resta)
-            new_node = TreeNode(Token(Token.Type.Resta, '-'))
-            # for unary, we put operand on left (convention)
-            new_node.left = self.factor()
-            return new_node
-        return self.primary()
-
-    # primary -> Numero | Ident [++] | '(' expr ')'
+    # primary -> Numero | Ident '(' [expr (',' expr)*] ')' | Ident ['[' expr ']'] [++]
+    #          | sizeof '(' expr ')' | Cadena
     def primary(self):
         tok = self.token_actual
         
         # sizeof(expr)
-        if tok.type == Token.Type.Ident and tok.value == 'sizeof':
-            self.eat(Token.Type.Ident)
+        if tok.type == Token.Type.Sizeof:
+            self.eat(Token.Type.Sizeof)
             if self.token_actual.type != Token.Type.ParAbre:
                 raise ValueError("Se esperaba '(' después de sizeof")
             self.eat(Token.Type.ParAbre)
             node = self.expr()
             self.eat(Token.Type.ParCierra)
-            
-            sizeof_node = TreeNode(tok)
-            sizeof_node.left = node
-            return sizeof_node
+            return self.nodes.node(tok, node)
 
         if tok.type == Token.Type.Numero:
             self.eat(Token.Type.Numero)
-            return TreeNode(tok)
+            # El literal se convierte una sola vez aquí, no en cada visita del intérprete
+            return self.nodes.leaf(tok, float(tok.value) if '.' in tok.value else int(tok.value))
         if tok.type == Token.Type.Ident:
             self.eat(Token.Type.Ident)
-            node = TreeNode(tok)
-            
+
+            # Llamada a función: nombre(args...)
+            if self.token_actual.type == Token.Type.ParAbre:
+                self.eat(Token.Type.ParAbre)
+                args = []
+                while self.token_actual.type != Token.Type.ParCierra:
+                    if args:
+                        self.eat(Token.Type.Coma)
+                    args.append(self.expr())
+                self.eat(Token.Type.ParCierra)
+                return self.nodes.nary(CallNode, tok, (args,))
+
+            node = self.nodes.leaf(tok)
             # Array Access
             if self.token_actual.type == Token.Type.CorcheteAbre:
                 self.eat(Token.Type.CorcheteAbre)
                 index = self.expr()
                 self.eat(Token.Type.CorcheteCierra)
-                
-                # Node for array access
-                access_node = TreeNode(Token(Token.Type.Ident, '[]')) 
-                access_node.left = node
-                access_node.right = index
-                node = access_node
+                node = self.nodes.node(INDEX_TOKEN, node, index)
 
             # Check for postfix increment
             if self.token_actual.type == Token.Type.Increment:
                 inc_tok = self.token_actual
                 self.eat(Token.Type.Increment)
-                inc_node = TreeNode(inc_tok)
-                inc_node.left = node
-                return inc_node
+                return self.nodes.node(inc_tok, node)
             return node
         
         if tok.type == Token.Type.Cadena:
             self.eat(Token.Type.Cadena)
-            return TreeNode(tok)
-
-        if tok.type == Token.Type.ParAbre:
-            self.eat(Token.Type.ParAbre)
-            node = self.expr()
-            if self.token_actual.type != Token.Type.ParCierra:
-                raise ValueError("Paréntesis desbalanceados: falta ')'")
-            self.eat(Token.Type.ParCierra)
-            return node
+            return self.nodes.leaf(tok)
 
         raise ValueError(f"Token inesperado en primary: {tok}")
 
@@ -252,17 +308,15 @@ class Parser:
         declaration -> Type Ident [= expr] (, Ident [= expr])* ;
         If stop_at_paren is True, allows ending with ')' without consuming it, and without ';'.
         """
-        from .ast_nodes import DeclarationNode
         # Consumir tipo (int, float, etc.)
         type_token = self.token_actual
-        self.eat(Token.Type.Ident) # int, float, etc. are Idents in lexer
+        self.eat(Token.Type.Tipo) # int, float, char, string
         
         # Primer identificador
         if self.token_actual.type != Token.Type.Ident:
             raise ValueError(f"Error Sintáctico en línea {self.token_actual.line}: Se esperaba un identificador después del tipo")
         
-        decl_node = DeclarationNode(type_token)
-        
+        variables = []
         while True:
             if self.token_actual.type != Token.Type.Ident:
                  raise ValueError(f"Error Sintáctico en línea {self.token_actual.line}: Se esperaba identificador en declaración")
@@ -310,7 +364,7 @@ class Parser:
                 else:
                     init_expr = self.expr()
             
-            decl_node.add_var(var_name, size, init_expr)
+            variables.append((var_name, size, init_expr))
 
             if self.token_actual.type == Token.Type.PuntoYComa:
                 self.eat(Token.Type.PuntoYComa)
@@ -325,66 +379,244 @@ class Parser:
                  expected = "';' o ','"
                  if stop_at_paren:
                      expected += " o ')'"
-                 raise ValueError(f"Error Sintáctico en línea {self.token_actual.line}: Se esperaba {expected} en declaración, se encontró {self.token_actual.type}")
-        return decl_node
+                 error = ValueError(f"Error Sintáctico en línea {self.token_actual.line}: Se esperaba {expected} en declaración, se encontró {self.token_actual.type}")
+                 if not stop_at_paren and self.token_actual.line > self._prev_line:
+                     # ';' olvidado al final de la línea: la declaración termina ahí
+                     self._record_error(error)
+                     break
+                 raise error
+        return self.nodes.declaration(type_token, variables)
 
     def parse_program(self):
         """
-        Programa -> [using namespace std;]* 'int' 'main' '(' ')' Block
-        Devuelve el nodo del bloque (o el último statement dentro del bloque).
+        Programa -> [using namespace std;]* Funcion* 'int' 'main' '(' ')' Block Funcion*
+        Devuelve el bloque de main o, si el programa define otras funciones,
+        un ProgramNode con ellas y ese bloque.
         """
         # Consume 'using namespace ...;' if present
-        while self.token_actual.type == Token.Type.Ident and self.token_actual.value == 'using':
-            self.eat(Token.Type.Ident) # using
-            if self.token_actual.value == 'namespace':
-                self.eat(Token.Type.Ident) # namespace
+        while self.token_actual.type == Token.Type.Using:
+            self.eat(Token.Type.Using)
+            if self.token_actual.type == Token.Type.Namespace:
+                self.eat(Token.Type.Namespace)
                 self.eat(Token.Type.Ident) # std (or whatever)
                 self.eat(Token.Type.PuntoYComa)
             else:
                 raise ValueError(f"Error Sintáctico en línea {self.token_actual.line}: Se esperaba 'namespace' después de 'using'")
 
-        # Consumir 'int'
-        if not (self.token_actual.type == Token.Type.Ident and self.token_actual.value == 'int'):
-            raise ValueError(f"Error Sintáctico en línea {self.token_actual.line}: Se esperaba 'int' al inicio del programa")
-        self.eat(Token.Type.Ident)
-        
+        functions = []
+        main = None
+        vio_main = False
+        names = set()
+        while self.token_actual.type != Token.Type.Fin:
+            start = self.token_actual
+            mark = self.nodes.mark()
+            try:
+                # Consumir el tipo ('int' antes de main)
+                if self.token_actual.type not in self.FUNCTION_TYPES:
+                    if not vio_main:
+                        raise ValueError(f"Error Sintáctico en línea {self.token_actual.line}: Se esperaba 'int' al inicio del programa")
+                    raise ValueError(f"Error Sintáctico en línea {self.token_actual.line}: Se esperaba una definición de función después de main")
+                type_token = self.token_actual
+                self.eat(type_token.type)
+                if self.token_actual.type != Token.Type.Ident:
+                    raise ValueError(f"Error Sintáctico en línea {self.token_actual.line}: Se esperaba 'main' después de '{type_token.value}'")
+                name_token = self.token_actual
+                if name_token.value in names or (name_token.value == 'main' and vio_main):
+                    raise ValueError(f"Error Sintáctico en línea {name_token.line}: la función '{name_token.value}' ya fue definida")
+                if name_token.value == 'main':
+                    if type_token.value != 'int':
+                        raise ValueError(f"Error Sintáctico en línea {name_token.line}: main debe devolver 'int'")
+                    vio_main = True
+                    main = self._main_block()
+                else:
+                    names.add(name_token.value)
+                    function = self.function_definition(type_token)
+                    if function is not None:
+                        functions.append(function)
+            except ValueError as e:
+                # Como en _statement_or_recover: se anota y se sigue en la próxima función
+                self._record_error(e)
+                self.nodes.truncate(mark)
+                self._synchronize_top_level(start)
+        if not vio_main:
+            raise ValueError("Se esperaba 'int main()' en el programa")
+        if functions and main is not None:
+            return self.nodes.nary(ProgramNode, PROGRAM_TOKEN, (functions, main))
+        return main
+
+    def _at_function_header(self):
+        """token_actual empieza una función: Tipo Ident '('."""
+        return (self.token_actual.type in self.FUNCTION_TYPES and self.peek(1).type == Token.Type.Ident
+                and self.peek(2).type == Token.Type.ParAbre)
+
+    def _synchronize_header(self):
+        """
+        Tras un error en la cabecera de una función descarta tokens hasta el
+        '{' de su cuerpo (True, el cuerpo se parsea igual y sus errores se
+        siguen anotando) o hasta la próxima función o el fin (False).
+        """
+        while self.token_actual.type != Token.Type.Fin:
+            if self.token_actual.type == Token.Type.LlaveAbre:
+                return True
+            if self._at_function_header():
+                return False
+            self.eat(self.token_actual.type)
+        return False
+
+    def _synchronize_top_level(self, start):
+        """Descarta tokens, y bloques enteros, hasta la próxima función o el fin."""
+        if self.token_actual is start and start.type != Token.Type.Fin:
+            self.eat(start.type)
+        depth = 0
+        while self.token_actual.type != Token.Type.Fin:
+            if depth == 0 and self._at_function_header():
+                return
+            t = self.token_actual.type
+            self.eat(t)
+            depth = max(0, depth + (t == Token.Type.LlaveAbre) - (t == Token.Type.LlaveCierra))
+
+    def _main_block(self):
+        """'main' '(' ')' Block"""
         # Consumir 'main'
-        if not (self.token_actual.type == Token.Type.Ident and self.token_actual.value == 'main'):
-            raise ValueError("Se esperaba 'main' después de 'int'")
         self.eat(Token.Type.Ident)
+        try:
+            # Consumir '('
+            if self.token_actual.type != Token.Type.ParAbre:
+                raise ValueError(f"Error Sintáctico en línea {self.token_actual.line}: Se esperaba '(' después de 'main'")
+            self.eat(Token.Type.ParAbre)
+
+            # Consumir ')'
+            if self.token_actual.type != Token.Type.ParCierra:
+                raise ValueError(f"Error Sintáctico en línea {self.token_actual.line}: Se esperaba ')' después de '('")
+            self.eat(Token.Type.ParCierra)
 
-        # Consumir '('
+            # Esperar '{'
+            if self.token_actual.type != Token.Type.LlaveAbre:
+                raise ValueError(f"Error Sintáctico en línea {self.token_actual.line}: Se esperaba '{{' después de main()")
+        except ValueError as e:
+            self._record_error(e)
+            if not self._synchronize_header():
+                return None
+        node = self.parse_block()
+        return node
+
+    def function_definition(self, type_token):
+        """
+        Funcion -> Tipo Ident '(' [Param (',' Param)*] ')' Block
+        Param   -> Tipo Ident ['[' ']']
+        El tipo ya fue consumido; token_actual es el nombre. Un error en la
+        cabecera se anota y, si se encuentra el '{', el cuerpo se parsea igual
+        (con los parámetros leídos hasta el error); si no, devuelve None.
+        """
+        name_token = self.token_actual
+        self.eat(Token.Type.Ident)
+        params = []
+        try:
+            self._parameters(name_token, params)
+        except ValueError as e:
+            self._record_error(e)
+            if not self._synchronize_header():
+                return None
+        body = self.parse_block()
+        return self.nodes.nary(FunctionNode, name_token, (body,), (name_token.value, type_token.value, params))
+
+    def _parameters(self, name_token, params):
+        """'(' [Param (',' Param)*] ')' seguido del '{' del cuerpo; agrega cada Param a params."""
         if self.token_actual.type != Token.Type.ParAbre:
-            raise ValueError("Se esperaba '(' después de 'main'")
+            raise ValueError(f"Error Sintáctico en línea {name_token.line}: Se esperaba '(' después de '{name_token.value}'")
         self.eat(Token.Type.ParAbre)
-
-        # Consumir ')'
-        if self.token_actual.type != Token.Type.ParCierra:
-            raise ValueError("Se esperaba ')' después de '('")
+        while self.token_actual.type != Token.Type.ParCierra:
+            if params:
+                self.eat(Token.Type.Coma)
+            tipo = self.token_actual
+            if tipo.type != Token.Type.Tipo:
+                raise ValueError(f"Error Sintáctico en línea {tipo.line}: Se esperaba el tipo del parámetro, se encontró {tipo.type} ('{tipo.value}')")
+            self.eat(Token.Type.Tipo)
+            nombre = self.token_actual
+            if nombre.type != Token.Type.Ident:
+                raise ValueError(f"Error Sintáctico en línea {nombre.line}: Se esperaba el nombre del parámetro")
+            self.eat(Token.Type.Ident)
+            es_arreglo = self.token_actual.type == Token.Type.CorcheteAbre
+            if es_arreglo:
+                # Los arreglos se pasan por referencia: int v[]
+                self.eat(Token.Type.CorcheteAbre)
+                self.eat(Token.Type.CorcheteCierra)
+            params.append((tipo.value, nombre.value, es_arreglo))
         self.eat(Token.Type.ParCierra)
-
-        # Esperar '{'
         if self.token_actual.type != Token.Type.LlaveAbre:
-            raise ValueError("Se esperaba '{' después de main()")
-        node = self.parse_block()
-        return node
+            raise ValueError(f"Error Sintáctico en línea {self.token_actual.line}: Se esperaba '{{' después de {name_token.value}(...)")
 
     def parse_block(self):
         """
         Block → '{' { statement_full } '}'
         Devuelve un BlockNode con todas las sentencias.
         """
-        from .ast_nodes import BlockNode  # Import here to avoid circular dependency if any
         self.eat(Token.Type.LlaveAbre)
-        block_node = BlockNode()
+        statements = []
         # permitir bloques vacíos también
         while self.token_actual.type != Token.Type.LlaveCierra and self.token_actual.type != Token.Type.Fin:
-            stmt = self.parse_statement_full()
-            block_node.add(stmt)
+            stmt = self._statement_or_recover()
+            if stmt is not None:
+                statements.append(stmt)
         if self.token_actual.type != Token.Type.LlaveCierra:
-            raise ValueError("Falta '}' para cerrar bloque")
-        self.eat(Token.Type.LlaveCierra)
-        return block_node
+            # Fin de archivo: se anota y el bloque queda con lo que se leyó
+            self._record_error(ValueError("Falta '}' para cerrar bloque"))
+        else:
+            self.eat(Token.Type.LlaveCierra)
+        return self.nodes.block(statements)
+
+    def _statement_or_recover(self, in_switch=False):
+        """
+        parse_statement_full; si falla, anota el error, sincroniza y devuelve
+        None para que el bloque siga con la próxima sentencia.
+        """
+        start = self.token_actual
+        mark = self.nodes.mark()
+        try:
+            return self.parse_statement_full()
+        except ValueError as e:
+            self._record_error(e)
+            # Los nodos ya armados de la sentencia rota se descartan
+            self.nodes.truncate(mark)
+            self._synchronize(start, in_switch)
+            return None
+
+    def _record_error(self, e):
+        msg = str(e)
+        match = re.search(r"línea (\d+)", msg)
+        line = int(match.group(1)) if match else self.token_actual.line
+        # Un '}' faltante al final se reporta una sola vez, no una por bloque abierto
+        if self.errores and self.errores[-1] == msg and self.lineas[-1] == line:
+            return
+        self.errores.append(msg)
+        self.lineas.append(line)
+
+    def _synchronize(self, start, in_switch):
+        # Si el error no consumió nada, descartar al menos ese token
+        if self.token_actual is start and start.type != Token.Type.Fin:
+            self.eat(start.type)
+        while True:
+            tok = self.token_actual
+            if tok.type in (Token.Type.Fin, Token.Type.LlaveCierra):
+                return
+            if tok.type == Token.Type.PuntoYComa:
+                self.eat(Token.Type.PuntoYComa)
+                return
+            if tok.type == Token.Type.LlaveAbre:
+                # El bloque de la sentencia rota se descarta entero
+                depth = 0
+                while self.token_actual.type != Token.Type.Fin:
+                    t = self.token_actual.type
+                    self.eat(t)
+                    depth += (t == Token.Type.LlaveAbre) - (t == Token.Type.LlaveCierra)
+                    if depth == 0:
+                        return
+                return
+            if tok.type in self.SYNC_TYPES:
+                return
+            if in_switch and tok.type in (Token.Type.Case, Token.Type.Default):
+                return
+            self.eat(tok.type)
 
     def parse_statement_full(self):
         """
@@ -395,11 +627,11 @@ class Parser:
         Devuelve el TreeNode correspondiente.
         """
         # Declaración de variables: int x; o int x = 5;
-        if self.token_actual.type == Token.Type.Ident and self.token_actual.value in ('int', 'float', 'char', 'string'):
+        if self.token_actual.type == Token.Type.Tipo:
             return self.declaration_statement()
 
         # If
-        if self.token_actual.type == Token.Type.Ident and self.token_actual.value == 'if':
+        if self.token_actual.type == Token.Type.If:
             return self.if_statement()
 
         # Switch
@@ -412,21 +644,29 @@ class Parser:
 
         # Check for Post-Keyword For Loop: ( ... ) for
         if self.token_actual.type == Token.Type.ParAbre:
-            # Try to parse as for-header
-            state = self.save_state()
-            try:
+            header_ahead = self._for_header_ahead()
+            if header_ahead:
                 header = self.parse_for_header()
-                if self.token_actual.type == Token.Type.For:
-                    # Found: ( ... ) for
-                    self.eat(Token.Type.For)
-                    block = self.parse_block()
-                    return self.build_for_node(header, block)
-                else:
-                    # Not a for loop, backtrack
+                self.eat(Token.Type.For)
+                block = self.parse_block()
+                return self.build_for_node(header, block)
+            if header_ahead is None:
+                # Paréntesis más largos que la ventana: intentar como cabecera y retroceder
+                state = self.save_state()
+                try:
+                    header = self.parse_for_header()
+                    if self.token_actual.type == Token.Type.For:
+                        # Found: ( ... ) for
+                        self.eat(Token.Type.For)
+                        block = self.parse_block()
+                        self.release_state(state)
+                        return self.build_for_node(header, block)
+                    else:
+                        # Not a for loop, backtrack
+                        self.restore_state(state)
+                except:
+                    # Parsing header failed, backtrack
                     self.restore_state(state)
-            except:
-                # Parsing header failed, backtrack
-                self.restore_state(state)
 
         # While Loop
         if self.token_actual.type == Token.Type.While:
@@ -440,71 +680,31 @@ class Parser:
         if self.token_actual.type == Token.Type.Return:
             return self.return_statement()
 
+        # Break / Continue
+        if self.token_actual.type in (Token.Type.Break, Token.Type.Continue):
+            node = self.nodes.leaf(self.token_actual)
+            self.eat(self.token_actual.type)
+            self.eat(Token.Type.PuntoYComa)
+            return node
+
         # Asignación o expresión que comienza por IDENT
         if self.token_actual.type == Token.Type.Ident:
-            # mirar ahead: si es 'if' ya tratado; si es una variable y luego '=' -> asignación
-            left_tok = self.token_actual
-            self.eat(Token.Type.Ident)
-            
             # Handle Increment/Decrement as statement: x++;
-            if self.token_actual.type == Token.Type.Increment:
+            if self.peek(1).type == Token.Type.Increment:
+                left_tok = self.token_actual
+                self.eat(Token.Type.Ident)
                 self.eat(Token.Type.Increment)
                 if self.token_actual.type == Token.Type.PuntoYComa:
                     self.eat(Token.Type.PuntoYComa)
-                node = TreeNode(Token(Token.Type.Increment, '++'))
-                node.left = TreeNode(left_tok)
-                node.left = TreeNode(left_tok)
-                return node
+                return self.nodes.node(INCREMENT_TOKEN, self.nodes.leaf(left_tok))
 
-            # Array Assignment: arr[x] = 5;
-            if self.token_actual.type == Token.Type.CorcheteAbre:
-                self.eat(Token.Type.CorcheteAbre)
-                index_expr = self.expr()
-                self.eat(Token.Type.CorcheteCierra)
-                
-                # Now expect '='
-                if self.token_actual.type == Token.Type.Asign:
-                    self.eat(Token.Type.Asign)
-                    right = self.expr()
-                    
-                    # Build node: Assign -> left: Access(arr, index), right: value
-                    access_node = TreeNode(Token(Token.Type.Ident, '[]'))
-                    access_node.left = TreeNode(left_tok)
-                    access_node.right = index_expr
-                    
-                    node = TreeNode(Token(Token.Type.Asign, '='))
-                    node.left = access_node
-                    node.right = right
-                    
+            # Asignación: x = ...; o arr[i] = ...;
+            if self._assignment_ahead() is not False:
+                node = self._assignment()
+                if self.nodes.token_of(node) is ASSIGN_TOKEN:
+                    # Enforce semicolon
                     self.eat(Token.Type.PuntoYComa)
-                    return node
-                else:
-                     # Not assignment, maybe just access?
-                     # Reconstruct expression starting with access
-                     access_node = TreeNode(Token(Token.Type.Ident, '[]'))
-                     access_node.left = TreeNode(left_tok)
-                     access_node.right = index_expr
-                     
-                     node = self._continue_expr(access_node)
-                     if self.token_actual.type == Token.Type.PuntoYComa:
-                        self.eat(Token.Type.PuntoYComa)
-                     return node
-
-            if self.token_actual.type == Token.Type.Asign:
-                # Asignación
-                self.eat(Token.Type.Asign)
-                right = self.expr()
-                node = TreeNode(Token(Token.Type.Asign, '='))
-                node.left = TreeNode(left_tok)
-                node.right = right
-                # Enforce semicolon
-                self.eat(Token.Type.PuntoYComa)
-                return node
-            else:
-                # No era asignación; reconstruimos la expresión empezando por IDENT
-                left_node = TreeNode(left_tok)
-                node = self._continue_expr(left_node)
-                if self.token_actual.type == Token.Type.PuntoYComa:
+                elif self.token_actual.type == Token.Type.PuntoYComa:
                     self.eat(Token.Type.PuntoYComa)
                 return node
 
@@ -515,10 +715,22 @@ class Parser:
         return node
 
     def save_state(self):
-        return (self.lexer.index, self.token_actual)
+        """
+        Marca para un parseo especulativo. Toda marca se cierra con
+        restore_state (volver a ella) o release_state (el intento funcionó).
+        """
+        return (self.tokens.mark(), self.token_actual, len(self.errores), self.nodes.mark())
 
     def restore_state(self, state):
-        self.lexer.index, self.token_actual = state
+        self.backtracks += 1
+        mark, self.token_actual, errores, nodos = state
+        self.tokens.reset(mark)
+        # Los errores y los nodos del intento descartado no cuentan
+        del self.errores[errores:], self.lineas[errores:]
+        self.nodes.truncate(nodos)
+
+    def release_state(self, state):
+        self.tokens.release(state[0])
 
     def for_statement(self):
         self.eat(Token.Type.For)
@@ -537,49 +749,24 @@ class Parser:
         
         # Helper to parse expression or assignment
         def parse_expr_or_assign():
-            # Check for assignment: Ident = ...
-            state = self.save_state()
-            if self.token_actual.type == Token.Type.Ident:
-                ident = self.token_actual
-                self.eat(Token.Type.Ident)
-                
-                # Array assignment? arr[i] = ...
-                if self.token_actual.type == Token.Type.CorcheteAbre:
-                    self.eat(Token.Type.CorcheteAbre)
-                    index = self.expr()
-                    self.eat(Token.Type.CorcheteCierra)
-                    if self.token_actual.type == Token.Type.Asign:
-                        self.eat(Token.Type.Asign)
-                        val = self.expr()
-                        # Build assignment node
-                        access = TreeNode(Token(Token.Type.Ident, '[]'))
-                        access.left = TreeNode(ident)
-                        access.right = index
-                        
-                        node = TreeNode(Token(Token.Type.Asign, '='))
-                        node.left = access
-                        node.right = val
-                        return node
-                    else:
-                        # Not assignment, backtrack
-                        self.restore_state(state)
-                        return self.expr()
-
-                if self.token_actual.type == Token.Type.Asign:
-                    self.eat(Token.Type.Asign)
-                    val = self.expr()
-                    node = TreeNode(Token(Token.Type.Asign, '='))
-                    node.left = TreeNode(ident)
-                    node.right = val
-                    return node
-                else:
-                    self.restore_state(state)
-                    return self.expr()
-            else:
+            if self.token_actual.type != Token.Type.Ident:
+                return self.expr()
+            assign = self._assignment_ahead()
+            if assign:
+                return self._assignment()
+            if assign is False:
                 return self.expr()
+            # Índice más largo que la ventana: intentar la asignación y retroceder
+            state = self.save_state()
+            node = self._assignment()
+            if self.nodes.token_of(node) is ASSIGN_TOKEN:
+                self.release_state(state)
+                return node
+            self.restore_state(state)
+            return self.expr()
 
         # Part 1
-        if self.token_actual.type == Token.Type.Ident and self.token_actual.value in ('int', 'float', 'char', 'string'):
+        if self.token_actual.type == Token.Type.Tipo:
             parts.append(self.declaration_statement()) # Consumes ;
         else:
             parts.append(parse_expr_or_assign())
@@ -590,7 +777,7 @@ class Parser:
         self.eat(Token.Type.PuntoYComa)
         
         # Part 3 (Update)
-        if self.token_actual.type == Token.Type.Ident and self.token_actual.value in ('int', 'float', 'char', 'string'):
+        if self.token_actual.type == Token.Type.Tipo:
             parts.append(self.declaration_statement(stop_at_paren=True))
         else:
             parts.append(parse_expr_or_assign())
@@ -609,13 +796,11 @@ class Parser:
         
         init, cond, update = None, None, None
         
-        # Check if p1 is declaration (TreeNode with token type Ident 'int' etc)
-        # My declaration_statement returns TreeNode(type_token).
-        
+        # Check if p1 is declaration (DeclarationNode, whose token is the Tipo token)
         p1, p2, p3 = header
         
-        is_p1_decl = (p1.token.type == Token.Type.Ident and p1.token.value in ('int', 'float', 'char', 'string'))
-        is_p3_decl = (p3.token.type == Token.Type.Ident and p3.token.value in ('int', 'float', 'char', 'string'))
+        is_p1_decl = self.nodes.token_of(p1).type == Token.Type.Tipo
+        is_p3_decl = self.nodes.token_of(p3).type == Token.Type.Tipo
         
         if is_p1_decl:
             # Standard: Init, Cond, Update
@@ -628,38 +813,7 @@ class Parser:
             # This allows: for(i=0; i<5; i++) where i is declared outside
             init, cond, update = p1, p2, p3
 
-        # Build For Node
-        # ForNode -> left: Init, right: Body?
-        # We need to store Init, Cond, Update, Body.
-        # TreeNode is binary. We can chain them or use a special structure.
-        # Let's use a chain: For -> left: Init, right: Next
-        # Next -> left: Cond, right: Next2
-        # Next2 -> left: Update, right: Body
-        
-        for_node = TreeNode(Token(Token.Type.For, 'for'))
-        
-        # Structure:
-        #      For
-        #     /   \
-        #  Init    Node
-        #         /    \
-        #      Cond     Node
-        #              /    \
-        #          Update   Body
-        
-        n1 = TreeNode(Token(Token.Type.Invalido, 'ForPart2'))
-        n2 = TreeNode(Token(Token.Type.Invalido, 'ForPart3'))
-        
-        for_node.left = init
-        for_node.right = n1
-        
-        n1.left = cond
-        n1.right = n2
-        
-        n2.left = update
-        n2.right = block
-        
-        return for_node
+        return self.nodes.nary(ForNode, FOR_TOKEN, (init, cond, update, block))
 
     def while_statement(self):
         """
@@ -680,11 +834,7 @@ class Parser:
             raise ValueError("Se esperaba '{' después de while(...)")
         
         block = self.parse_block()
-        
-        while_node = TreeNode(Token(Token.Type.While, 'while'))
-        while_node.left = cond
-        while_node.right = block
-        return while_node
+        return self.nodes.node(WHILE_TOKEN, cond, block)
 
     def cout_statement(self):
         """
@@ -697,46 +847,54 @@ class Parser:
             raise ValueError("Se esperaba '<<' después de 'cout'")
         self.eat(Token.Type.LeftShift)
         
-        first_expr = self.expr()
-        
-        # Root node
-        root_cout = TreeNode(Token(Token.Type.Cout, 'cout'))
-        root_cout.left = first_expr
-        
-        current_cout = root_cout
-        
+        exprs = [self.expr()]
         # Handle chained <<
         while self.token_actual.type == Token.Type.LeftShift:
             self.eat(Token.Type.LeftShift)
-            next_expr = self.expr()
-            
-            # Create a new cout node for the next expression
-            next_cout = TreeNode(Token(Token.Type.Cout, 'cout'))
-            next_cout.left = next_expr
-            
-            # Link it to the right of the current one
-            current_cout.right = next_cout
-            current_cout = next_cout
+            exprs.append(self.expr())
         
         self.eat(Token.Type.PuntoYComa)
-        
-        return root_cout
+
+        # Un nodo cout por expresión, cada uno enlazado a la derecha del
+        # anterior; se arman desde el último para que cada nodo nazca completo
+        node = None
+        for expr in reversed(exprs):
+            node = self.nodes.node(COUT_TOKEN, expr, node)
+        return node
 
     def return_statement(self):
         self.eat(Token.Type.Return)
-        expr = self.expr()
+        # 'return;' en funciones void
+        expr = None if self.token_actual.type == Token.Type.PuntoYComa else self.expr()
         self.eat(Token.Type.PuntoYComa)
-        
-        node = TreeNode(Token(Token.Type.Return, 'return'))
-        node.left = expr
-        return node
+        return self.nodes.node(RETURN_TOKEN, expr)
 
     def if_statement(self):
         """
-        if_statement -> 'if' '(' expr ')' '{' block '}'
+        if_statement -> 'if' '(' expr ')' block [ 'else' ( if_statement | block ) ]
+        Una cadena else-if se arma en un bucle, no por recursión: se leen todas
+        las cabeceras y los IfNode se crean desde el último else.
         """
+        heads = [self._if_head()]
+        else_branch = None
+        while self.token_actual.type == Token.Type.Else:
+            self.eat(Token.Type.Else)
+            if self.token_actual.type == Token.Type.If:
+                heads.append(self._if_head())
+                continue
+            if self.token_actual.type != Token.Type.LlaveAbre:
+                raise ValueError(f"Error Sintáctico en línea {self.token_actual.line}: Se esperaba '{{' o 'if' después de 'else'")
+            else_branch = self.parse_block()
+            break
+        for if_token, cond, block in reversed(heads):
+            else_branch = self.nodes.nary(IfNode, if_token, (cond, block, else_branch))
+        return else_branch
+
+    def _if_head(self):
+        """'if' '(' expr ')' block -> (token, cond, block)"""
+        if_token = self.token_actual
         # consumir 'if'
-        self.eat(Token.Type.Ident)  # 'if'
+        self.eat(Token.Type.If)
         if self.token_actual.type != Token.Type.ParAbre:
             raise ValueError("Se esperaba '(' después de 'if'")
         self.eat(Token.Type.ParAbre)
@@ -747,69 +905,62 @@ class Parser:
         # ahora debemos ver un bloque '{' ... '}'
         if self.token_actual.type != Token.Type.LlaveAbre:
             raise ValueError("Se esperaba '{' después de la condición del if")
-        block_node = self.parse_block()
-        # construir un nodo 'if' (usaremos token Ident 'if' para representarlo)
-        if_node = TreeNode(Token(Token.Type.Ident, 'if'))
-        if_node.left = cond
-        if_node.right = block_node
-        if_node.right = block_node
-        return if_node
+        return if_token, cond, self.parse_block()
 
     def switch_statement(self):
         """
-        switch_statement -> 'switch' '(' Ident ')' '{' case_list '}'
-        case_list -> ( 'case' ':' statement 'break' ';' )*
+        switch_statement -> 'switch' '(' expr ')' '{' case_list '}'
+        case_list -> ( ('case' constante | 'default') ':' statement* )*
         """
+        switch_token = self.token_actual
         self.eat(Token.Type.Switch)
         self.eat(Token.Type.ParAbre)
-        
-        # Variable
-        if self.token_actual.type != Token.Type.Ident:
-            raise ValueError("Se esperaba una variable en el switch")
-        var_token = self.token_actual
-        self.eat(Token.Type.Ident)
-        
+        subject = self.expr()
         self.eat(Token.Type.ParCierra)
         self.eat(Token.Type.LlaveAbre)
-        
-        cases = []
-        while self.token_actual.type == Token.Type.Case:
-            self.eat(Token.Type.Case)
+
+        # Mismo esquema que SwitchNode.add_case / add_default: cada etiqueta
+        # apunta a la posición de su primera sentencia en body
+        body, table, default = [], {}, None
+        while self.token_actual.type in (Token.Type.Case, Token.Type.Default):
+            line = self.token_actual.line
+            if self.token_actual.type == Token.Type.Case:
+                self.eat(Token.Type.Case)
+                mark = self.nodes.mark()
+                value = self._case_value(self.expr(), line)
+                # La etiqueta es solo un valor: su expresión no queda en el AST
+                self.nodes.truncate(mark)
+                if value in table:
+                    raise ValueError(f"Error Sintáctico en línea {line}: valor de case duplicado: {value}")
+                table[value] = len(body)
+            else:
+                self.eat(Token.Type.Default)
+                if default is not None:
+                    raise ValueError(f"Error Sintáctico en línea {line}: más de un 'default' en el switch")
+                default = len(body)
             self.eat(Token.Type.DosPuntos)
-            stmt = self.parse_statement_full()
-            
-            if self.token_actual.type == Token.Type.Break:
-                self.eat(Token.Type.Break)
-                self.eat(Token.Type.PuntoYComa)
-            
-            # Guardamos el caso como un nodo (simplificado)
-            case_node = TreeNode(Token(Token.Type.Case, 'case'))
-            case_node.left = stmt
-            cases.append(case_node)
-            
+            # Sentencias del caso hasta la siguiente etiqueta; se agregan al
+            # final de body, sin recorrer los casos anteriores
+            while self.token_actual.type not in (Token.Type.Case, Token.Type.Default,
+                                                 Token.Type.LlaveCierra, Token.Type.Fin):
+                stmt = self._statement_or_recover(in_switch=True)
+                if stmt is not None:
+                    body.append(stmt)
+
+        if self.token_actual.type != Token.Type.LlaveCierra:
+            raise ValueError(f"Error Sintáctico en línea {self.token_actual.line}: Se esperaba 'case', 'default' o '}}' en el switch")
         self.eat(Token.Type.LlaveCierra)
-        
-        switch_node = TreeNode(Token(Token.Type.Switch, 'switch'))
-        switch_node.left = TreeNode(var_token)
-        # Usamos right para una lista de casos enlazados o similar, 
-        # por ahora solo el primer caso para no complicar TreeNode que es binario
-        # O podemos hacer un nodo especial. Para mantener compatibilidad con TreeNode binario:
-        # switch -> left: var, right: Block(cases)
-        # Block -> left: case1, right: case2...
-        
-        current = switch_node
-        for c in cases:
-            # Estrategia simple: encadenar en right
-            if current.right is None:
-                current.right = c
-            else:
-                # Buscar el último
-                last = current.right
-                while last.right:
-                    last = last.right
-                last.right = c
-                
-        return switch_node
+        return self.nodes.nary(SwitchNode, switch_token, (subject, body), (table, default))
+
+    def _case_value(self, node, line):
+        """Valor constante de una etiqueta case: un número, opcionalmente negado."""
+        nodes = self.nodes
+        left = nodes.left_of(node)
+        if nodes.token_of(node).op == ops.NEG and left is not None and nodes.token_of(left).type == Token.Type.Numero:
+            return -nodes.value_of(left)
+        if nodes.token_of(node).type == Token.Type.Numero:
+            return nodes.value_of(node)
+        raise ValueError(f"Error Sintáctico en línea {line}: el valor de un case debe ser una constante numérica")
 
 
 class SintacticoPDF:
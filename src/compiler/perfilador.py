@@ -0,0 +1,154 @@
+"""
+Perfilado por línea de fuente de programas interpretados.
+
+ProfilingInterpreter es un Interpreter cuyo visit además mide cada sentencia:
+cuántas veces se ejecutó cada línea, su tiempo acumulado (incluye lo que se
+ejecuta dentro de ella) y su tiempo propio. El Interpreter normal no cambia,
+así que perfilar no cuesta nada cuando no se usa.
+
+Los resultados se leen con hot_spots()/reporte() (tabla ordenada),
+folded_stacks() (formato "plegado" de flamegraph.pl / speedscope) y heat()
+(intensidad 0..1 por línea, para colorear el editor).
+"""
+import time
+from collections import Counter, namedtuple
+
+from .ast_nodes import BlockNode, ForNode, SwitchNode, SYNTHETIC_TOKENS
+from .ast_arena import AstArena
+from .interpreter import Interpreter
+
+LineaPerfil = namedtuple('LineaPerfil', ['linea', 'ejecuciones', 'tiempo_total', 'tiempo_propio'])
+
+_SYNTHETIC_IDS = {id(t) for t in SYNTHETIC_TOKENS}
+
+
+def statement_lines(ast):
+    """
+    id(nodo) -> línea de fuente para cada sentencia del AST. Los nodos con un
+    token sintético (línea 1 ficticia) toman la primera línea de sus hijos.
+    """
+    lines = {}
+    order = []
+    stack = [ast]
+    while stack:
+        node = stack.pop()
+        order.append(node)
+        stack.extend(node.children())
+    # Hijos antes que padres: recorrer el preorden al revés
+    for node in reversed(order):
+        if id(node.token) in _SYNTHETIC_IDS:
+            kids = [lines[id(c)] for c in node.children() if lines.get(id(c)) is not None]
+            lines[id(node)] = min(kids) if kids else None
+        else:
+            lines[id(node)] = node.token.line
+
+    statements = {}
+    roots = [ast] if not isinstance(ast, BlockNode) else []
+    for node in order:
+        if isinstance(node, BlockNode):
+            roots.extend(node.statements)
+        elif isinstance(node, ForNode):
+            roots.extend(n for n in (node.init, node.update) if n is not None)
+        elif isinstance(node, SwitchNode):
+            roots.extend(node.body)
+    for node in roots:
+        if lines.get(id(node)) is not None:
+            statements[id(node)] = lines[id(node)]
+    return statements
+
+
+class ProfilingInterpreter(Interpreter):
+    def __init__(self, output_callback=print, clock=time.perf_counter):
+        super().__init__(output_callback)
+        self.clock = clock
+        self.counts = Counter()      # línea -> ejecuciones
+        self.total_time = Counter()  # línea -> tiempo incluyendo sentencias anidadas
+        self.self_time = Counter()   # línea -> tiempo propio
+        self.folded = Counter()      # (línea, línea, ...) -> tiempo propio en esa pila
+        self._lines = {}
+        self._stack = []             # [línea, tiempo de las sentencias hijas]
+        self._active = Counter()     # línea -> marcos abiertos (for con init en su línea)
+
+    def interpret(self, ast, annotate=True):
+        if isinstance(ast, AstArena):
+            ast = ast.to_tree()
+        if ast:
+            self._lines = statement_lines(ast)
+        super().interpret(ast, annotate)
+
+    def visit(self, node):
+        line = self._lines.get(id(node))
+        if line is None:
+            return Interpreter.visit(self, node)
+        frame, start = self._abrir(line)
+        try:
+            return Interpreter.visit(self, node)
+        finally:
+            self._cerrar(line, frame, start)
+
+    def _generador(self, node):
+        # Sentencias con llamadas: se miden desde que entran a la pila
+        # explícita del Interpreter hasta que salen de ella
+        gen = Interpreter._generador(self, node)
+        line = self._lines.get(id(node))
+        if line is None:
+            return gen
+        return self._medido(line, gen)
+
+    def _medido(self, line, gen):
+        frame, start = self._abrir(line)
+        try:
+            return (yield from gen)
+        finally:
+            self._cerrar(line, frame, start)
+
+    def _abrir(self, line):
+        self.counts[line] += 1
+        frame = [line, 0.0]
+        self._stack.append(frame)
+        self._active[line] += 1
+        return frame, self.clock()
+
+    def _cerrar(self, line, frame, start):
+        elapsed = self.clock() - start
+        self._stack.pop()
+        self._active[line] -= 1
+        if not self._active[line]:
+            self.total_time[line] += elapsed
+        own = elapsed - frame[1]
+        self.self_time[line] += own
+        self.folded[tuple(f[0] for f in self._stack) + (line,)] += own
+        if self._stack:
+            self._stack[-1][1] += elapsed
+
+    def hot_spots(self):
+        """Líneas ordenadas por tiempo propio, de la más cara a la más barata."""
+        rows = [LineaPerfil(line, self.counts[line], self.total_time[line], self.self_time[line])
+                for line in self.counts]
+        rows.sort(key=lambda r: (-r.tiempo_propio, -r.ejecuciones, r.linea))
+        return rows
+
+    def reporte(self, source=None, top=20):
+        """Tabla de texto con las `top` líneas más caras (con su código si se da source)."""
+        src_lines = source.splitlines() if source else []
+        out = [f"{'Línea':>6} {'Ejecuciones':>12} {'Total (ms)':>11} {'Propio (ms)':>12}  Código"]
+        for r in self.hot_spots()[:top]:
+            code = src_lines[r.linea - 1].strip() if 0 < r.linea <= len(src_lines) else ""
+            out.append(f"{r.linea:>6} {r.ejecuciones:>12} {r.tiempo_total * 1000:>11.3f} "
+                       f"{r.tiempo_propio * 1000:>12.3f}  {code}")
+        return "\n".join(out)
+
+    def folded_stacks(self, root="main"):
+        """Líneas 'main;línea 3;línea 5 <microsegundos>' para flamegraph.pl."""
+        out = []
+        for stack, seconds in sorted(self.folded.items()):
+            frames = ";".join([root] + [f"línea {line}" for line in stack])
+            out.append(f"{frames} {int(round(seconds * 1e6))}")
+        return out
+
+    def heat(self):
+        """línea -> tiempo propio relativo a la línea más cara (0..1)."""
+        peak = max(self.self_time.values(), default=0)
+        if peak <= 0:
+            return {line: 0.0 for line in self.counts}
+        return {line: max(t, 0) / peak for line, t in self.self_time.items()}
@@ -0,0 +1,101 @@
+"""
+Resolución de las variables de cada función a slots de su marco.
+
+El Resolver recorre el cuerpo de un FunctionNode con una TablaSimbolos (un
+ámbito por bloque, por for y por switch) y anota dónde vive cada variable:
+los parámetros ocupan los slots 0..n-1 y cada local el que le da la tabla,
+reutilizado por los ámbitos hermanos. Quedan en node.slot (identificadores y
+sizeof de un arreglo local), en var['slot'] / var['size_slot'] de cada
+declaración y, el tamaño del marco, en func.frame_size. Con eso el
+Interpreter ejecuta cada llamada sobre una lista de tamaño fijo indexada por
+slot en lugar de un diccionario de nombres.
+
+El recorrido es iterativo, como el resto de las pasadas sobre el AST, y
+aplica las reglas de ámbito del Interpreter; TypeInference lo reutiliza
+(redefiniendo _declarar/_usar/_sizeof) para tipar cada uso de una variable
+con la declaración que de verdad le corresponde.
+"""
+from .ast_nodes import TreeNode, BlockNode, DeclarationNode, ForNode, SwitchNode
+from .lexer import Token
+from .symbol_table import TablaSimbolos
+
+# Nombres que no son variables de la función y se leen del entorno global
+GLOBALES = ('endl',)
+
+_SALIR = object()  # marca en la pila: cerrar el ámbito abierto
+
+
+class Resolver:
+    def resolver(self, func):
+        """Anota los slots de func (un FunctionNode) y devuelve su frame_size."""
+        tabla = TablaSimbolos()
+        for tipo, nombre, es_arreglo in func.params:
+            self._insertar(tabla, func, nombre, "parametro", tipo)
+        # El bloque del cuerpo comparte el ámbito de los parámetros
+        self._recorrer(tabla, func, func.body.statements)
+        func.frame_size = tabla.tamano_marco
+        return func.frame_size
+
+    def _recorrer(self, tabla, func, statements):
+        """
+        Recorre statements abriendo un ámbito de tabla por bloque, for y
+        switch; llama a _declarar por cada variable declarada (después de su
+        inicializador), a _usar por cada identificador y a _sizeof.
+        """
+        stack = list(reversed(statements))
+        while stack:
+            item = stack.pop()
+            if item is _SALIR:
+                tabla.salir_ambito()
+                continue
+            if isinstance(item, tuple):
+                # (tipo, variable) de una declaración, ya resuelto su inicializador
+                self._declarar(tabla, func, item[1], item[0])
+                continue
+            node = item
+            if isinstance(node, (BlockNode, ForNode, SwitchNode)):
+                tabla.entrar_ambito()
+                stack.append(_SALIR)
+            elif isinstance(node, DeclarationNode):
+                # init antes que el nombre: en 'int x = x + 1;' la x de la
+                # derecha es la del ámbito exterior, como en el Interpreter
+                for var in reversed(node.vars):
+                    stack.append((node.token.value, var))
+                    init = var['init']
+                    if isinstance(init, list):
+                        stack.extend(reversed(init))
+                    elif init is not None:
+                        stack.append(init)
+                continue
+            elif type(node) is TreeNode and node.token.type == Token.Type.Ident:
+                # Solo variables: las llamadas y funciones también llevan un token Ident
+                self._usar(tabla, func, node)
+            elif node.token.type == Token.Type.Sizeof:
+                self._sizeof(tabla, node)
+            stack.extend(reversed(node.children()))
+
+    def _insertar(self, tabla, func, nombre, naturaleza, tipo=None):
+        try:
+            return tabla.insertar(nombre, naturaleza, tipo)["direccion"]
+        except ValueError as e:
+            raise ValueError(f"{e} (función '{func.name}')") from None
+
+    def _declarar(self, tabla, func, var, tipo=None):
+        var['slot'] = self._insertar(tabla, func, var['name'], "variable", tipo)
+        if var['size'] is not None:
+            var['size_slot'] = self._insertar(tabla, func, f"__sizeof_{var['name']}", "tamano", "int")
+
+    def _sizeof(self, tabla, node):
+        # sizeof(v) de un arreglo local lee su tamaño de un slot propio
+        target = node.left
+        if target is not None and target.token.type == Token.Type.Ident:
+            entrada = tabla.buscar(f"__sizeof_{target.token.value}")
+            node.slot = entrada["direccion"] if entrada else None
+
+    def _usar(self, tabla, func, node):
+        name = node.token.value
+        entrada = tabla.buscar(name)
+        if entrada is not None:
+            node.slot = entrada["direccion"]
+        elif name not in GLOBALES:
+            raise NameError(f"Error Semántico en línea {node.token.line}: Variable '{name}' no definida en la función '{func.name}'")
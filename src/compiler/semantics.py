@@ -1,116 +1,306 @@
 import re
 from .symbol_table import TablaSimbolos
 from .lexer import Lexer, Token
-from .parser import Parser
+from .parser import Parser, ErroresSintacticos
+from .ast_nodes import TREE_NODES, linea
+from .ast_arena import AstArena, NIL
+from .constantes import evalua_constante, numero, al_tipo
+
+# Patrones compilados una sola vez: el análisis recorre el código línea por
+# línea y cada regla los reutiliza en lugar de recompilar la cadena
+_CABECERA = re.compile(r'^(int|float|string|char|void)\s+([A-Za-z_]\w*)\s*\(([^)]*)\)\s*\{?$')
+_PARAMETRO = re.compile(r'^(int|float|string|char)\s+([A-Za-z_]\w*)\s*(\[\s*\])?$')
+_DECLARACION = re.compile(r'^(int|float|string|char)\s+(.+)$')
+_DECL_ARREGLO = re.compile(r'^([A-Za-z_]\w*)\s*\[\s*(\d+)\s*\]$')
+_TIPO = re.compile(r'^(int|float|string|char|void)\b')
+_SENTENCIA = re.compile(r'^(if|switch|while|for)\b')
+_FOR_POSTERIOR = re.compile(r'^\(.*\)\s*for')
+_IDENT = re.compile(r'[A-Za-z_]\w*')
+_NOMBRE = re.compile(r'^[A-Za-z_]\w*$')
+_ACCESO_ARREGLO = re.compile(r'^([A-Za-z_]\w*)\s*\[\s*(.+)\s*\]$')
+_IF_ABRE = re.compile(r'if\s*\(')
+_IF_COND = re.compile(r'if\s*\((.*?)\)')
+_PAR_LLAVE = re.compile(r'\)\s*\{')
+_SWITCH_COND = re.compile(r'switch\s*\((.*?)\)')
+_WHILE_LLAVE = re.compile(r'while\s*\((.*?)\)\s*\{')
+_WHILE_COND = re.compile(r'while\s*\((.*?)\)')
+_WHILE_REGLA = re.compile(r'^[a-zA-Z_]\w*\s*(<|>|==|!=|<=|>=)\s*\d+$')
+_RELACIONAL = re.compile(r'[<>=!]+')
+_PARENTESIS = re.compile(r'\((.*?)\)')
+_FOR_INIT = re.compile(r'^int\s+([A-Za-z_]\w*)\s*=\s*(.*)$')
+_INCREMENTO = re.compile(r'([A-Za-z_]\w*)\s*(\+\+|--)|(\+\+|--)\s*([A-Za-z_]\w*)')
+
 
 class SemanticAnalyzer:
     def __init__(self):
         self.tabla = TablaSimbolos()
         self.errores = []
         self.usados = set()
-
-    def analizar(self, content):
+        # Valores asignados dentro de un bloque: (profundidad, entrada)
+        self._asignados = []
+        self._profundidad = 0
+
+    def analizar(self, content, ast=None):
+        """
+        ast es el AST que el Parser ya armó para content (el parcial si hubo
+        errores sintácticos), como objetos o como AstArena, que se lee sin
+        reconstruir los nodos: las asignaciones y declaraciones se revisan
+        sobre sus nodos. Si no se da, content se parsea una vez aquí.
+        """
+        if ast is None:
+            ast = self._parsear(content)
+        if isinstance(ast, AstArena):
+            self._nodos = ast
+            ast = ast.root if ast.root != NIL else None
+        else:
+            self._nodos = TREE_NODES
+        self._sentencias = self._sentencias_por_linea(ast)
         self.tabla = TablaSimbolos()
         self.errores = []
         self.usados = set()
-        
-        # 1️⃣ Procesar declaraciones (crear tabla de símbolos)
-        for line in content.splitlines():
-            line = line.strip().rstrip(';')
-            if not line or line.startswith("#include"):
-                continue
-
-            m = re.match(r'^(int|float|string|char)\s+(.+)$', line)
-            if m:
-                tipo = m.group(1)
-                declaradores = [d.strip() for d in m.group(2).split(",")]
-                for decl in declaradores:
-                    if "=" in decl:
-                        nombre, valor = [x.strip() for x in decl.split("=", 1)]
-                        try:
-                            self.tabla.insertar(nombre, "variable", tipo, valor)
-                        except ValueError as e:
-                            self.errores.append(str(e))
-                    elif "[" in decl and "]" in decl:
-                        # Validate syntax: name[size]
-                        # Strict rule: <tipo dato><nombre_arreglos><simbolo apertura><numero><simbolo cierre>
-                        m_arr = re.match(r'^([A-Za-z_]\w*)\s*\[\s*(\d+)\s*\]$', decl)
-                        if m_arr:
-                            nombre = m_arr.group(1)
-                            size = m_arr.group(2)
-                            try:
-                                # Store size in valor for now
-                                self.tabla.insertar(nombre, "arreglo", tipo, valor={"size": size})
-                            except ValueError as e:
-                                self.errores.append(str(e))
-                        else:
-                             self.errores.append(f"Error semántico: Declaración de arreglo inválida '{decl}'. Se espera 'nombre[numero]'.")
-                    else:
-                        nombre = decl
-                        try:
-                            self.tabla.insertar(nombre, "variable", tipo)
-                        except ValueError as e:
-                            self.errores.append(str(e))
+        self._asignados = []
+        self._profundidad = 0
 
-        # 2️⃣ Analizar el cuerpo del programa
+        # Una sola pasada: llaves, declaraciones y sentencias salen del mismo
+        # recorrido, así que un nombre es visible desde la línea que lo declara
         lines = content.splitlines()
+        # Llaves abiertas (línea de cada una) y las '}' sin pareja, que se
+        # reportan al final como hacía la verificación de balance
+        abiertas, sin_apertura = [], []
+        profundidad = 0
+        # Ámbitos: cada '{' abre uno y su '}' lo cierra. Una cabecera de
+        # función o de for abre el suyo (parámetros, variable del ciclo) y la
+        # '{' de su cuerpo lo adopta en lugar de abrir otro
+        self._llaves = []      # por '{' abierta: cuántos ámbitos cierra su '}'
+        self._pendientes = 0   # ámbitos de cabeceras que esperan su cuerpo
         for idx, line in enumerate(lines):
             raw = line.strip()
-            print(f"DEBUG: Processing line {idx+1}: {raw}")
+            if '{' in raw or '}' in raw:
+                for ch in raw:
+                    if ch == '{':
+                        abiertas.append(idx + 1)
+                        profundidad += 1
+                    elif ch == '}':
+                        if abiertas:
+                            abiertas.pop()
+                        else:
+                            sin_apertura.append(idx + 1)
+                        profundidad -= 1
+                self._profundidad = profundidad
+                # Lo asignado dentro de un bloque que se cierra deja de ser
+                # un valor conocido: el bloque pudo no ejecutarse o repetirse
+                while self._asignados and self._asignados[-1][0] > profundidad:
+                    self._asignados.pop()[1]["valor"] = None
             if not raw or raw.startswith("#include"):
                 continue
-            if raw in ['M', '{', '}', 'M{']:
-                continue
-            if re.match(r'^(int|float|string|char)\b', raw):
-                continue
+            # Las '}' del principio ('} else {') cierran antes de la sentencia;
+            # el resto de las llaves, después de ella (el cuerpo de una cabecera)
+            inicio = len(raw) - len(raw.lstrip('} \t'))
+            for ch in raw[:inicio]:
+                if ch == '}':
+                    self._cerrar_llave()
+            esperaban = self._pendientes
+            self._analizar_sentencia(raw, idx, lines)
+            for ch in raw[inicio:]:
+                if ch == '{':
+                    self._abrir_llave()
+                elif ch == '}':
+                    self._cerrar_llave()
+            if esperaban and self._pendientes and raw[inicio:]:
+                # Cabecera sin '{': su cuerpo era esta única sentencia
+                self._cerrar_pendientes()
+
+        # 🔍 Balance de llaves en todo el programa
+        for ln in sin_apertura:
+            self.errores.append(f"Error sintáctico: '}}' de cierre sin apertura correspondiente (línea {ln})")
+        for ln in abiertas:
+            self.errores.append(f"Error sintáctico: falta '}}' de cierre para bloque abierto en línea {ln}")
+        # Los bloques sin cerrar dejan su ámbito abierto: la tabla queda en el global
+        self._cerrar_pendientes()
+        while self._llaves:
+            self._cerrar_llave()
 
-            # === Manejo de if(...) ===
-            if raw.strip().startswith("if"):
-                self._analizar_if(raw, idx, lines)
-                continue
+        return {
+            "tabla": self.tabla,
+            "errores": self.errores,
+            "usados": list(self.usados)
+        }
 
-            # === Manejo de switch(...) ===
-            if raw.strip().startswith("switch"):
-                self._analizar_switch(raw, idx)
+    @staticmethod
+    def _parsear(content):
+        try:
+            return Parser(Lexer(content)).parse()
+        except ErroresSintacticos as e:
+            return e.ast
+        except Exception:
+            # Sin AST no hay sentencias que revisar; el error lo reporta el parser
+            return None
+
+    def _sentencias_por_linea(self, ast):
+        """
+        Asignaciones y declaraciones (las de token Tipo) del AST agrupadas por
+        su línea, en orden de fuente.
+        """
+        nodos = self._nodos
+        por_linea = {}
+        stack = [ast]
+        while stack:
+            node = stack.pop()
+            if node is None:
                 continue
+            if nodos.token_of(node).type in (Token.Type.Asign, Token.Type.Tipo):
+                por_linea.setdefault(linea(node, nodos), []).append(node)
+            stack.extend(reversed(nodos.children(node)))
+        return por_linea
 
-            # === Manejo de while(...) ===
-            if raw.strip().startswith("while"):
-                self._analizar_while(raw, idx, lines)
-                continue
+    def _analizar_sentencia(self, raw, idx, lines):
+        if raw in ['M', '{', '}', 'M{']:
+            return
+        if _TIPO.match(raw):
+            self._analizar_declaracion(raw.rstrip(';'), idx, prototipo=raw.endswith(';'))
+            return
 
-            # === Manejo de for(...) o (...)for ===
-            if raw.strip().startswith("for"):
-                self._analizar_for(raw, idx, type="standard")
-                continue
-            
-            if re.match(r"^\(.*\)\s*for", raw.strip()):
-                self._analizar_for(raw, idx, type="post")
-                continue
+        sentencia = _SENTENCIA.match(raw)
+        palabra = sentencia.group(1) if sentencia else None
+        # === Manejo de if(...) ===
+        if palabra == "if":
+            self._analizar_if(raw, idx, lines)
+            return
 
-            # === Asignaciones comunes o dentro de bloques if ===
-            if '=' in raw:
-                self._analizar_asignacion(raw, idx)
+        # === Manejo de switch(...) ===
+        if palabra == "switch":
+            self._analizar_switch(raw, idx)
+            return
 
+        # === Manejo de while(...) ===
+        if palabra == "while":
+            self._analizar_while(raw, idx, lines)
+            return
 
+        # === Manejo de for(...) o (...)for ===
+        # La variable del for vive en el ámbito del ciclo, que adopta su cuerpo
+        es_for = palabra == "for"
+        if es_for or _FOR_POSTERIOR.match(raw):
+            self._abrir_cabecera()
+            self._analizar_for(raw, idx, type="standard" if es_for else "post")
+            return
 
-        # 🔍 Verificar balance de llaves en todo el programa
-        self._verificar_llaves(content)
+        # === Asignaciones comunes o dentro de bloques if ===
+        if '=' in raw:
+            self._analizar_asignacion(raw, idx)
+        elif '++' in raw or '--' in raw:
+            self._analizar_incremento(raw)
+
+    def _abrir_cabecera(self):
+        self.tabla.entrar_ambito()
+        self._pendientes += 1
+
+    def _cerrar_pendientes(self):
+        for _ in range(self._pendientes):
+            self.tabla.salir_ambito()
+        self._pendientes = 0
+
+    def _abrir_llave(self):
+        # La '{' del cuerpo adopta los ámbitos de las cabeceras que la esperan
+        if self._pendientes:
+            self._llaves.append(self._pendientes)
+            self._pendientes = 0
+        else:
+            self.tabla.entrar_ambito()
+            self._llaves.append(1)
+
+    def _cerrar_llave(self):
+        if self._llaves:  # una '}' sin pareja ya se reporta en el balance
+            for _ in range(self._llaves.pop()):
+                self.tabla.salir_ambito()
+
+    def _analizar_declaracion(self, line, idx, prototipo=False):
+        m = _CABECERA.match(line)
+        if m:
+            # Cabecera de función: tipo nombre(params) {
+            # El nombre es global; los parámetros, del ámbito de la función
+            if m.group(2) != 'main' and not self.tabla.existe(m.group(2)):
+                self.tabla.insertar(m.group(2), "funcion", m.group(1))
+            self._abrir_cabecera()
+            for param in filter(None, (p.strip() for p in m.group(3).split(','))):
+                m_par = _PARAMETRO.match(param)
+                if not m_par:
+                    self.errores.append(f"Error semántico: parámetro inválido '{param}' en la función '{m.group(2)}'.")
+                    continue
+                naturaleza = "arreglo" if m_par.group(3) else "variable"
+                self._declarar(m_par.group(2), naturaleza, m_par.group(1))
+            if prototipo:
+                # Sin cuerpo: los parámetros no sobreviven a la declaración
+                self._pendientes -= 1
+                self.tabla.salir_ambito()
+            return
 
-        return {
-            "tabla": self.tabla,
-            "errores": self.errores,
-            "usados": list(self.usados)
-        }
+        m = _DECLARACION.match(line)
+        if not m:
+            return
+        tipo = m.group(1)
+        declaradores = [d.strip() for d in self._separar_declaradores(m.group(2))]
+        for decl in declaradores:
+            if "=" in decl:
+                nombre = decl.split("=", 1)[0].strip()
+                # Se guarda el valor del inicializador ya plegado y convertido
+                # al tipo declarado ('int z = 0.5' vale 0), no su texto
+                self._declarar(nombre, "variable", tipo, self._valor_inicial(nombre, tipo, idx))
+            elif "[" in decl and "]" in decl:
+                # Validate syntax: name[size]
+                # Strict rule: <tipo dato><nombre_arreglos><simbolo apertura><numero><simbolo cierre>
+                m_arr = _DECL_ARREGLO.match(decl)
+                if m_arr:
+                    nombre = m_arr.group(1)
+                    size = m_arr.group(2)
+                    # Store size in valor for now
+                    self._declarar(nombre, "arreglo", tipo, valor={"size": size})
+                else:
+                     self.errores.append(f"Error semántico: Declaración de arreglo inválida '{decl}'. Se espera 'nombre[numero]'.")
+            else:
+                nombre = decl
+                self._declarar(nombre, "variable", tipo)
+
+    @staticmethod
+    def _separar_declaradores(texto):
+        """Parte 'a = f(x, y), b[] = {1, 2}' en las comas que no están entre (), [] o {}."""
+        partes, nivel, inicio = [], 0, 0
+        for i, c in enumerate(texto):
+            if c in '([{':
+                nivel += 1
+            elif c in ')]}':
+                nivel -= 1
+            elif c == ',' and nivel == 0:
+                partes.append(texto[inicio:i])
+                inicio = i + 1
+        partes.append(texto[inicio:])
+        return partes
+
+    def _valor_inicial(self, nombre, tipo, idx):
+        nodos = self._nodos
+        for node in self._sentencias.get(idx + 1, ()):
+            if nodos.token_of(node).type == Token.Type.Tipo:
+                for nombre_var, _, init in nodos.variables(node):
+                    if nombre_var == nombre and init is not None and not isinstance(init, list):
+                        return al_tipo(evalua_constante(init, self._valor_conocido, nodos), tipo)
+        # Sin nodo (línea con error sintáctico): valor desconocido
+        return None
+
+    def _declarar(self, nombre, naturaleza, tipo, valor=None):
+        # Repetido en el mismo ámbito es un error; en uno interno oculta al externo
+        try:
+            self.tabla.insertar(nombre, naturaleza, tipo, valor)
+        except ValueError as e:
+            self.errores.append(str(e))
 
     def _analizar_if(self, raw, idx, lines):
         # Verificar que tenga paréntesis de apertura
-        if not re.search(r"if\s*\(", raw):
+        if not _IF_ABRE.search(raw):
             self.errores.append(f"Error sintáctico: falta '(' después de 'if' en línea {idx+1}: '{raw}'")
             return
 
         # Buscar la condición entre paréntesis (puede estar en la misma línea)
-        cond_match = re.search(r"if\s*\((.*?)\)", raw)
+        cond_match = _IF_COND.search(raw)
         if not cond_match:
             self.errores.append(f"Error sintáctico: falta ')' en condición de línea {idx+1}: '{raw}'")
             return
@@ -119,7 +309,7 @@ class SemanticAnalyzer:
 
         # Verificar que exista '{' que abra el bloque del if:
         has_open_brace = False
-        if re.search(r"\)\s*\{", raw):
+        if _PAR_LLAVE.search(raw):
             has_open_brace = True
         else:
             j = idx + 1
@@ -144,18 +334,11 @@ class SemanticAnalyzer:
                 self.errores.append(f"Error semántico: falta operador relacional en la condición '{condicion}' (línea {idx+1})")
 
         # Verificar variables dentro del if
-        variables = re.findall(r"[A-Za-z_][A-Za-z0-9_]*", condicion)
+        variables = _IDENT.findall(condicion)
         for var in variables:
             if not self.tabla.existe(var) and not var.isdigit():
                 self.errores.append(f"Error: variable '{var}' usada sin declarar en condición IF (línea {idx+1}).")
 
-        # Verificar orden (constante primero es inválido según tus reglas)
-        if not raw.strip().endswith('{'):
-            # No es necesariamente un error si la llave está abajo, pero sus ejemplos de error
-            # "switch( variable ) // No es correcto" sugieren que falta la llave o algo.
-            # Dejaremos que el parser maneje la falta de llave, aquí solo validamos la variable.
-            pass
-
     def _analizar_asignacion(self, raw, idx):
         # Evitar procesar condiciones "if(a==3)" como asignaciones
         if '==' in raw or '!=' in raw or '<=' in raw or '>=' in raw:
@@ -168,7 +351,7 @@ class SemanticAnalyzer:
 
         # Validar variable a la izquierda
         # Check for array access: arr[index]
-        m_arr_access = re.match(r'^([A-Za-z_]\w*)\s*\[\s*(.+)\s*\]$', var)
+        m_arr_access = _ACCESO_ARREGLO.match(var)
         
         if m_arr_access:
             nombre_arr = m_arr_access.group(1)
@@ -184,15 +367,14 @@ class SemanticAnalyzer:
                  return
             
             # Validate vars in index
-            vars_in_index = re.findall(r"[A-Za-z_]\w*", index_expr)
+            vars_in_index = _IDENT.findall(index_expr)
             for v in vars_in_index:
                 if not v[0].isdigit() and not self.tabla.existe(v):
                      self.errores.append(f"Error: variable '{v}' en índice de arreglo no declarada.")
             
             # We treat it as valid l-value, continue to parse right side
             
-        elif not var or not re.match(r"^[A-Za-z_][A-Za-z0-9_]*$", var):
-            print(f"DEBUG: Invalid variable name in assignment: {var}")
+        elif not var or not _NOMBRE.match(var):
             self.errores.append(f"Error: nombre de variable inválido en '{raw}'")
             return
 
@@ -200,90 +382,108 @@ class SemanticAnalyzer:
             self.errores.append(f"Error: variable '{var}' usada sin declarar.")
             return
 
-        # Guardar valor asignado si es literal (y no es arreglo)
-        if not m_arr_access:
-            try:
-                # Strip ; from expr
-                expr_clean = expr.rstrip(';')
-                valor_eval = eval(expr_clean, {}, {})
-                self.tabla.tabla[var]["valor"] = valor_eval
-            except:
-                self.tabla.tabla[var]["valor"] = None
-
-
-        # Analizar sintácticamente toda la asignación
-        lexer = Lexer(raw.strip(';'))
-        parser = Parser(lexer)
-        try:
-            tree = parser.parse()
-        except Exception as e:
-            self.errores.append(f"Error sintáctico en '{raw}': {e}")
+        # Las asignaciones de la línea, tal como las armó el Parser
+        nodos = self._nodos
+        asignaciones = [n for n in self._sentencias.get(idx + 1, ()) if nodos.token_of(n).type == Token.Type.Asign]
+        if not asignaciones:
+            # La línea no llegó al AST: su error sintáctico ya lo reporta el parser
+            if not m_arr_access:
+                self.tabla.buscar(var)["valor"] = None
             return
 
         # Verificar uso de identificadores dentro del árbol
+        # (recorridos en pre-orden con pila explícita: expresiones muy largas
+        # no agotan el límite de recursión)
+        def preorden(raiz):
+            stack = [raiz]
+            while stack:
+                n = stack.pop()
+                if n is None:
+                    continue
+                yield n
+                stack.append(nodos.right_of(n))
+                stack.append(nodos.left_of(n))
+
         def walk(n):
-            if n is None:
-                return
-            if n.token.type == Token.Type.Ident:
-                # Ignore special array access token
-                if n.token.value == '[]':
-                    pass
-                else:
-                    self.usados.add(n.token.value)
-                    if not self.tabla.existe(n.token.value):
-                        self.errores.append(f"Error: variable '{n.token.value}' usada sin declarar.")
-            walk(n.left)
-            walk(n.right)
-        walk(tree)
+            token = nodos.token_of(n)
+            if token.type == Token.Type.Ident:
+                self.usados.add(token.value)
+                if not self.tabla.existe(token.value):
+                    self.errores.append(f"Error: variable '{token.value}' usada sin declarar.")
 
         def check_div_zero(n):
-            if n is None:
-                return
-            if n.token.type == Token.Type.Divide and n.right:
-                if n.right.token.type == Token.Type.Numero:
-                    try:
-                        if float(n.right.token.value) == 0.0:
-                            self.errores.append(f"Error: división por cero en '{raw}'")
-                    except:
-                        pass
-                elif n.right.token.type == Token.Type.Ident:
-                    nombre_var = n.right.token.value
-                    info = self.tabla.buscar(nombre_var)
-                    if info and info.get("valor") is not None:
-                        try:
-                            if float(info["valor"]) == 0.0:
-                                self.errores.append(f"Error: división por cero en '{raw}' (variable '{nombre_var}' con valor 0)")
-                        except:
-                            pass
-            check_div_zero(n.left)
-            check_div_zero(n.right)
-
-        check_div_zero(tree)
-
-    def _verificar_llaves(self, content):
-        stack = []
-        for idx, line in enumerate(content.splitlines(), start=1):
-            for ch in line:
-                if ch == '{':
-                    stack.append(idx)
-                elif ch == '}':
-                    if not stack:
-                        self.errores.append(f"Error sintáctico: '}}' de cierre sin apertura correspondiente (línea {idx})")
+            right = nodos.right_of(n)
+            if nodos.token_of(n).type == Token.Type.Divide and right is not None:
+                if evalua_constante(right, self._valor_conocido, nodos) == 0:
+                    token = nodos.token_of(right)
+                    if token.type == Token.Type.Ident:
+                        self.errores.append(f"Error: división por cero en '{raw}' (variable '{token.value}' con valor 0)")
                     else:
-                        stack.pop()
-        if stack:
-            for ln in stack:
-                self.errores.append(f"Error sintáctico: falta '}}' de cierre para bloque abierto en línea {ln}")
+                        self.errores.append(f"Error: división por cero en '{raw}'")
+
+        for tree in asignaciones:
+            for n in preorden(tree):
+                walk(n)
+            for n in preorden(tree):
+                check_div_zero(n)
+            # Guardar el valor asignado si es constante (y no es arreglo)
+            destino = nodos.token_of(nodos.left_of(tree))
+            entrada = self.tabla.buscar(destino.value)
+            if destino.type == Token.Type.Ident and entrada and entrada["naturaleza"] == "variable":
+                valor = evalua_constante(nodos.right_of(tree), self._valor_conocido, nodos)
+                self._asignar(entrada, al_tipo(valor, entrada["tipo"]))
+
+    def _valor_conocido(self, nombre):
+        info = self.tabla.buscar(nombre)
+        valor = info["valor"] if info else None
+        # La variable de un for guarda el texto de su inicializador ('0')
+        if isinstance(valor, str):
+            return numero(valor)
+        return valor if isinstance(valor, (int, float)) else None
+
+    def _asignar(self, entrada, valor):
+        entrada["valor"] = valor
+        if valor is not None:
+            self._asignados.append((self._profundidad, entrada))
+
+    def _analizar_incremento(self, raw):
+        # x++ / --x cambian el valor conocido de x
+        for m in _INCREMENTO.finditer(raw):
+            nombre = m.group(1) or m.group(4)
+            info = self.tabla.buscar(nombre)
+            if info is None or info["naturaleza"] != "variable":
+                continue
+            self.usados.add(nombre)
+            valor = self._valor_conocido(nombre)
+            paso = 1 if (m.group(2) or m.group(3)) == '++' else -1
+            self._asignar(info, None if valor is None else valor + paso)
+
+    def _analizar_switch(self, raw, idx):
+        # Syntax: switch( expresion ) { ... }; la falta de llave la reporta el parser
+        match = _SWITCH_COND.search(raw)
+        if not match:
+            self.errores.append(f"Error sintáctico: Estructura switch inválida en línea {idx+1}. Faltan paréntesis.")
+            return
+
+        expr = match.group(1).strip()
+        if not expr:
+            self.errores.append(f"Error semántico: switch sin expresión en línea {idx+1}.")
+            return
+        for var in _IDENT.findall(expr):
+            if self.tabla.existe(var):
+                self.usados.add(var)
+            else:
+                self.errores.append(f"Error: variable '{var}' usada sin declarar en condición SWITCH (línea {idx+1}).")
 
     def _analizar_while(self, raw, idx, lines):
         # Syntax: while( var op const ) { ... }
-        match = re.match(r"while\s*\((.*?)\)\s*\{", raw)
+        match = _WHILE_LLAVE.match(raw)
         if not match:
             # Maybe brace is on next line? For now assume same line as per examples or handle loose.
             if "{" not in raw:
                  self.errores.append(f"Error sintáctico: Se esperaba '{{' en la línea {idx+1}.")
                  return
-            match = re.search(r"while\s*\((.*?)\)", raw)
+            match = _WHILE_COND.search(raw)
         
         if not match:
              self.errores.append(f"Error sintáctico: Estructura while inválida en línea {idx+1}.")
@@ -292,11 +492,11 @@ class SemanticAnalyzer:
         cond = match.group(1).strip()
         # Strict rule: <variable><operador><constante>
         # Regex for this: ^[a-zA-Z_]\w*\s*(<|>|==|!=|<=|>=)\s*\d+$
-        if not re.match(r"^[a-zA-Z_]\w*\s*(<|>|==|!=|<=|>=)\s*\d+$", cond):
+        if not _WHILE_REGLA.match(cond):
              self.errores.append(f"Error semántico: Condición while '{cond}' inválida en línea {idx+1}. Regla: variable operador constante.")
         else:
              # Check if variable exists
-             var_name = re.split(r"[<>=!]+", cond)[0].strip()
+             var_name = _RELACIONAL.split(cond)[0].strip()
              if not self.tabla.existe(var_name):
                  self.errores.append(f"Error semántico: Variable '{var_name}' no declarada en condición while (línea {idx+1}).")
              else:
@@ -304,7 +504,7 @@ class SemanticAnalyzer:
 
     def _analizar_for(self, raw, idx, type="standard"):
         # Extract content inside parenthesis
-        match = re.search(r"\((.*?)\)", raw)
+        match = _PARENTESIS.search(raw)
         if not match:
             self.errores.append(f"Error sintáctico: Estructura for inválida en línea {idx+1}. Faltan paréntesis.")
             return
@@ -336,7 +536,7 @@ class SemanticAnalyzer:
 
         # Validate Init: int x=0
         # Regex to parse "int var = val"
-        m_init = re.match(r"^int\s+([A-Za-z_][A-Za-z0-9_]*)\s*=\s*(.*)$", init)
+        m_init = _FOR_INIT.match(init)
         if not m_init:
              self.errores.append(f"Error sintáctico: Inicialización for incorrecta '{init}' en línea {idx+1}. Esperado: int var = val")
              return
@@ -344,23 +544,12 @@ class SemanticAnalyzer:
         var_name = m_init.group(1)
         val_expr = m_init.group(2)
         
-        # Add to symbol table (allow redeclaration for loops logic or catch error)
+        # La variable del for se declara en el ámbito del ciclo (abierto por
+        # _analizar_sentencia); puede ocultar una variable externa del mismo nombre
         try:
-            # If exists, we might want to allow if it's compatible or just warn.
-            # But TablaSimbolos raises error.
-            # Let's check existence first.
-            if self.tabla.existe(var_name):
-                # For simplicity in this script, we assume it's allowed to shadow or reuse if type matches?
-                # Or maybe we shouldn't error if it's the same type.
-                # But strict C++ would error on redeclaration in same scope.
-                # We'll assume function scope.
-                # If it exists, we assume it's fine for now to reuse, but we won't insert again to avoid error.
-                pass
-            else:
-                self.tabla.insertar(var_name, "variable", "int", val_expr)
+            self.tabla.insertar(var_name, "variable", "int", val_expr)
         except ValueError as e:
-            # Should not happen if we checked existe, but just in case
-            pass
+            self.errores.append(f"{e} (línea {idx+1})")
             
         self.usados.add(var_name)
 
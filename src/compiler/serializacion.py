@@ -0,0 +1,285 @@
+"""
+Serialización binaria y versionada del AST del Parser.
+
+El árbol se aplana primero en un AstArena (iterativo, sin recursión) y lo que
+se escribe son sus columnas, así que ni la codificación ni la decodificación
+dependen de la profundidad del árbol. Formato (enteros sin signo en varint,
+con signo en zigzag-varint):
+
+    'CAST' | versión u16 | reservado u16
+    tabla de cadenas   n, (largo, utf-8)*        tipos y valores de tokens
+    tokens             n, (tipo, valor, línea, op+1)*
+    nodos              n, raíz, kind[n] (bytes), token/left/right/
+                       first_child/next_sibling como int32 little-endian
+    payload            n, (índice de nodo, valor etiquetado)*
+
+El payload guarda datos que no son enteros: literales numéricos, la lista de
+variables de una declaración y los campos de las sentencias n-arias (ForNode,
+IfNode, SwitchNode, CallNode, FunctionNode, ProgramNode); cuáles son lo define
+el esquema (FIELDS/DATA) de cada clase de ast_nodes.
+Un archivo de otra versión del formato, truncado o dañado se rechaza con
+ValueError: antes de reconstruir objetos se valida la arena (AstArena.validate),
+así que un archivo de caché corrupto no puede colgar ni romper al compilador.
+"""
+import struct
+import sys
+from array import array
+
+from .ast_arena import AstArena
+from .lexer import Token
+from .operators import SYMBOLS
+
+MAGIC = b'CAST'
+# 2: palabras reservadas con tipo de token propio (antes Ident)
+FORMAT_VERSION = 2
+
+_HEADER = struct.Struct('<4sHH')
+_DOUBLE = struct.Struct('<d')
+_COLUMNS = ('token', 'left', 'right', 'first_child', 'next_sibling')
+
+# Etiquetas de los valores del payload
+_NONE, _INT, _FLOAT, _STR, _TUPLE, _LIST, _DICT, _TRUE, _FALSE = range(9)
+
+
+def serializar(ast):
+    """Codifica un AST (TreeNode y subclases) o un AstArena en bytes."""
+    arena = ast if isinstance(ast, AstArena) else AstArena.from_tree(ast)
+    out = bytearray(_HEADER.pack(MAGIC, FORMAT_VERSION, 0))
+
+    strings, string_ids = [], {}
+    for tok in arena.tokens:
+        for s in (tok.type, tok.value):
+            if not isinstance(s, str):
+                raise TypeError(f"Token con valor no textual: {tok!r}")
+            if s not in string_ids:
+                string_ids[s] = len(strings)
+                strings.append(s)
+
+    _uvarint(out, len(strings))
+    for s in strings:
+        data = s.encode('utf-8')
+        _uvarint(out, len(data))
+        out += data
+
+    _uvarint(out, len(arena.tokens))
+    for tok in arena.tokens:
+        _uvarint(out, string_ids[tok.type])
+        _uvarint(out, string_ids[tok.value])
+        _uvarint(out, tok.line)
+        _uvarint(out, 0 if tok.op is None else tok.op + 1)
+
+    _uvarint(out, len(arena))
+    _svarint(out, arena.root)
+    out += arena.kind.tobytes()
+    for name in _COLUMNS:
+        col = getattr(arena, name)
+        if sys.byteorder != 'little':
+            col = array('i', col)
+            col.byteswap()
+        out += col.tobytes()
+
+    _uvarint(out, len(arena.payload))
+    for index, value in arena.payload.items():
+        _uvarint(out, index)
+        _write_value(out, value)
+    return bytes(out)
+
+
+def deserializar(data, arena=False):
+    """
+    Decodifica bytes producidos por serializar(). Devuelve el árbol de
+    TreeNode (o el AstArena si arena=True).
+    """
+    r = _Reader(data)
+    magic, version, _ = _HEADER.unpack(r.take(_HEADER.size))
+    if magic != MAGIC:
+        raise ValueError("No es un AST serializado (firma inválida)")
+    if version != FORMAT_VERSION:
+        raise ValueError(f"Versión de formato de AST no soportada: {version} (se esperaba {FORMAT_VERSION})")
+
+    strings = [r.text() for _ in range(r.uvarint())]
+    tokens = []
+    for _ in range(r.uvarint()):
+        type_, value, line, op = r.string(strings), r.string(strings), r.uvarint(), r.uvarint()
+        if op > len(SYMBOLS):
+            raise ValueError(f"AST serializado corrupto: operador {op - 1}")
+        tokens.append(Token(type_, value, line, None if op == 0 else op - 1))
+
+    result = AstArena()
+    result.tokens = tokens
+    result._token_ids = {id(t): i for i, t in enumerate(tokens)}
+    n = r.uvarint()
+    result.root = r.svarint()
+    result.kind = array('b', r.take(n))
+    for name in _COLUMNS:
+        col = array('i')
+        col.frombytes(r.take(n * col.itemsize))
+        if sys.byteorder != 'little':
+            col.byteswap()
+        setattr(result, name, col)
+
+    for _ in range(r.uvarint()):
+        index = r.uvarint()
+        result.payload[index] = r.value()
+    if r.pos != len(r.data):
+        raise ValueError("AST serializado corrupto: bytes sobrantes")
+    # Un archivo dañado no debe llegar a to_tree() ni al intérprete: índices,
+    # kinds, forma del payload y que la arena sea un árbol se validan antes
+    result.validate()
+    return result if arena else result.to_tree()
+
+
+def guardar(ast, ruta):
+    """Escribe el AST serializado en disco."""
+    with open(ruta, 'wb') as f:
+        f.write(serializar(ast))
+
+
+def cargar(ruta, arena=False):
+    with open(ruta, 'rb') as f:
+        return deserializar(f.read(), arena)
+
+
+def _uvarint(out, n):
+    while n > 0x7F:
+        out.append((n & 0x7F) | 0x80)
+        n >>= 7
+    out.append(n)
+
+
+def _svarint(out, n):
+    _uvarint(out, n * 2 if n >= 0 else -n * 2 - 1)
+
+
+def _write_value(out, value):
+    # Pila explícita; los contenedores se cierran con su cantidad de elementos
+    stack = [value]
+    while stack:
+        v = stack.pop()
+        if v is None:
+            out.append(_NONE)
+        elif v is True:
+            out.append(_TRUE)
+        elif v is False:
+            out.append(_FALSE)
+        elif isinstance(v, int):
+            out.append(_INT)
+            _svarint(out, v)
+        elif isinstance(v, float):
+            out.append(_FLOAT)
+            out += _DOUBLE.pack(v)
+        elif isinstance(v, str):
+            data = v.encode('utf-8')
+            out.append(_STR)
+            _uvarint(out, len(data))
+            out += data
+        elif isinstance(v, (tuple, list)):
+            out.append(_TUPLE if isinstance(v, tuple) else _LIST)
+            _uvarint(out, len(v))
+            stack.extend(reversed(v))
+        elif isinstance(v, dict):
+            out.append(_DICT)
+            _uvarint(out, len(v))
+            for k, item in reversed(list(v.items())):
+                stack.append(item)
+                stack.append(k)
+        else:
+            raise TypeError(f"Valor no serializable en el AST: {v!r}")
+
+
+class _Reader:
+    def __init__(self, data):
+        self.data = memoryview(data)
+        self.pos = 0
+
+    def take(self, n):
+        end = self.pos + n
+        if end > len(self.data):
+            raise ValueError("AST serializado truncado")
+        chunk = self.data[self.pos:end].tobytes()
+        self.pos = end
+        return chunk
+
+    def byte(self):
+        if self.pos >= len(self.data):
+            raise ValueError("AST serializado truncado")
+        b = self.data[self.pos]
+        self.pos += 1
+        return b
+
+    def uvarint(self):
+        n = shift = 0
+        while True:
+            b = self.byte()
+            n |= (b & 0x7F) << shift
+            if b < 0x80:
+                return n
+            shift += 7
+
+    def text(self):
+        try:
+            return self.take(self.uvarint()).decode('utf-8')
+        except UnicodeDecodeError:
+            raise ValueError("AST serializado corrupto: texto no es utf-8") from None
+
+    def string(self, strings):
+        """Referencia a la tabla de cadenas."""
+        index = self.uvarint()
+        if index >= len(strings):
+            raise ValueError("AST serializado corrupto: cadena fuera de rango")
+        return strings[index]
+
+    def svarint(self):
+        n = self.uvarint()
+        return n >> 1 if not n & 1 else -((n + 1) >> 1)
+
+    def value(self):
+        # Contenedores abiertos: [tipo, restantes, elementos]
+        stack = []
+        while True:
+            tag = self.byte()
+            if tag == _NONE:
+                v = None
+            elif tag == _TRUE:
+                v = True
+            elif tag == _FALSE:
+                v = False
+            elif tag == _INT:
+                v = self.svarint()
+            elif tag == _FLOAT:
+                v = _DOUBLE.unpack(self.take(_DOUBLE.size))[0]
+            elif tag == _STR:
+                v = self.text()
+            elif tag in (_TUPLE, _LIST, _DICT):
+                count = self.uvarint()
+                stack.append([tag, count * 2 if tag == _DICT else count, []])
+                v = None
+                if stack[-1][1] > 0:
+                    continue
+            else:
+                raise ValueError(f"AST serializado corrupto: etiqueta de valor {tag}")
+
+            if tag in (_TUPLE, _LIST, _DICT):
+                v = _close(stack.pop())
+            # Cerrar los contenedores que se completaron con v
+            while stack:
+                top = stack[-1]
+                top[2].append(v)
+                top[1] -= 1
+                if top[1] > 0:
+                    break
+                v = _close(stack.pop())
+            else:
+                return v
+
+
+def _close(frame):
+    tag, _, items = frame
+    if tag == _TUPLE:
+        return tuple(items)
+    if tag == _LIST:
+        return items
+    try:
+        return dict(zip(items[0::2], items[1::2]))
+    except TypeError:
+        raise ValueError("AST serializado corrupto: clave de dict no hashable") from None
@@ -1,25 +1,100 @@
+import sys
+
+
 class TablaSimbolos:
+    """
+    Tabla de símbolos con ámbitos anidados.
+
+    Cada nombre visible apunta a una pila de declaraciones (la última es la
+    que se ve): declarar en un ámbito interno oculta la del externo y al salir
+    del ámbito vuelve a verse la anterior. Entrar a un ámbito es O(1) y salir
+    cuesta solo lo que se declaró en él; nunca se copian diccionarios.
+    Los nombres se internan (sys.intern), así que las búsquedas comparan
+    cadenas por identidad.
+
+    Cada variable recibe además un slot: su posición en el registro de
+    activación. Los ámbitos hermanos reutilizan los mismos slots y
+    tamano_marco es el máximo de slots vivos a la vez, es decir, el tamaño
+    del marco que necesita la función.
+    """
+
     def __init__(self):
-        self.tabla = {}
+        self._visibles = {}   # nombre -> [(nivel, entrada), ...]
+        self._ambitos = [[]]  # por ámbito abierto: nombres declarados en él
+        self._slots = [0]     # por ámbito abierto: próximo slot libre
+        self._todas = []      # (nombre, entrada) de cada declaración, en orden
+        self.tamano_marco = 0
+
+    @property
+    def nivel(self):
+        """Profundidad del ámbito actual (0 = global)."""
+        return len(self._ambitos) - 1
+
+    def entrar_ambito(self):
+        self._ambitos.append([])
+        self._slots.append(self._slots[-1])
+
+    def salir_ambito(self):
+        if len(self._ambitos) == 1:
+            raise RuntimeError("Error semántico: no hay un ámbito abierto para cerrar.")
+        for nombre in self._ambitos.pop():
+            pila = self._visibles[nombre]
+            pila.pop()
+            if not pila:
+                del self._visibles[nombre]
+        self._slots.pop()
 
     def insertar(self, nombre, naturaleza, tipo=None, valor=None, direccion=None):
-        if nombre in self.tabla:
+        nombre = sys.intern(nombre)
+        nivel = len(self._ambitos) - 1
+        pila = self._visibles.get(nombre)
+        if pila and pila[-1][0] == nivel:
             raise ValueError(f"Error semántico: '{nombre}' ya fue declarado.")
-        self.tabla[nombre] = {
+        if direccion is None:
+            # Slot en el marco de la función
+            direccion = self._slots[-1]
+            self._slots[-1] += 1
+            self.tamano_marco = max(self.tamano_marco, self._slots[-1])
+        entrada = {
             "naturaleza": naturaleza,
             "tipo": tipo,
             "valor": valor,
             "direccion": direccion
         }
+        if pila is None:
+            self._visibles[nombre] = [(nivel, entrada)]
+        else:
+            pila.append((nivel, entrada))
+        self._ambitos[-1].append(nombre)
+        self._todas.append((nombre, entrada))
+        return entrada
 
     def buscar(self, nombre):
-        return self.tabla.get(nombre, None)
+        """Entrada visible de nombre (la del ámbito más interno), o None."""
+        pila = self._visibles.get(nombre)
+        return pila[-1][1] if pila else None
 
     def existe(self, nombre):
-        return nombre in self.tabla
+        return nombre in self._visibles
+
+    def en_ambito_actual(self, nombre):
+        pila = self._visibles.get(nombre)
+        return bool(pila) and pila[-1][0] == len(self._ambitos) - 1
+
+    @property
+    def tabla(self):
+        """nombre -> entrada de los símbolos visibles (copia del nivel superior)."""
+        return {nombre: pila[-1][1] for nombre, pila in self._visibles.items()}
+
+    def todas(self):
+        """
+        (nombre, entrada) de cada declaración hecha, en orden, aunque su ámbito
+        ya se haya cerrado: variables de ciclos, bloques y funciones incluidas.
+        """
+        return list(self._todas)
 
     def __repr__(self):
         salida = "Tabla de Símbolos:\n"
-        for nombre, info in self.tabla.items():
+        for nombre, info in self._todas:
             salida += f"  {nombre} -> {info}\n"
         return salida
@@ -0,0 +1,647 @@
+"""
+Backend de transpilación: el AST se traduce a código fuente de Python.
+
+PythonTranspiler genera un módulo con una función de Python para main
+(_main) y una por cada función del programa (f_nombre), lo compila una vez
+con compile() y lo ejecuta con exec(). Las sentencias de control pasan a las
+de Python (if/elif/else, while, break, continue, return) y las expresiones a
+operadores infijos, así que el costo por nodo desaparece por completo.
+
+Los ámbitos se resuelven al traducir: cada declaración de main recibe su
+propio nombre de Python (d<n>_nombre), de modo que una variable que oculta a
+otra en un bloque interno no necesita registro de deshacer. Lo que main usa
+sin declarar vive en el diccionario E, como en el environment del
+Interpreter; las funciones usan los slots del Resolver (s<slot>) y reciben
+además su profundidad de llamada (_prof), que cada llamada compara con
+Interpreter.MAX_CALL_DEPTH antes de hacerse. El switch
+es un `while True` de una vuelta con un tramo `if _s <= posición` por
+sentencia (fall-through hasta un break) y un continue dentro de él sale con
+una bandera.
+
+Un error en tiempo de ejecución se informa con la línea del fuente de la
+sentencia que lo produjo, traducida desde la línea del código generado.
+"""
+import math
+import operator
+import re
+import sys
+
+from .ast_nodes import (
+    BlockNode, DeclarationNode, ForNode, IfNode, SwitchNode, CallNode, ProgramNode, linea,
+    postorden_operadores,
+)
+from .closure_compiler import con_linea, limite_recursion, PROFUNDIDAD_MAXIMA
+from .interpreter import DesbordamientoPila, Interpreter
+from .lexer import Token
+from .resolver import Resolver
+from .type_inference import coerce, INT, FLOAT
+from . import operators as ops
+
+ARCHIVO = "<transpilado>"
+
+# Implementaciones que Python ya tiene como operador infijo
+_INFIJOS = {
+    operator.add: '+', operator.sub: '-', operator.mul: '*', operator.truediv: '/',
+    operator.pow: '**', operator.lt: '<', operator.gt: '>', operator.le: '<=',
+    operator.ge: '>=', operator.eq: '==', operator.ne: '!=',
+}
+# El resto se llama por nombre desde el código generado
+_FUNCIONES = {
+    ops.cpp_int_div: '_div_int', ops.cpp_int_mod: '_mod_int',
+    ops.generic_div: '_div', ops.generic_mod: '_mod', math.fmod: '_fmod',
+}
+
+_HOJA = object()  # en un programa postfijo: tomar la próxima hoja
+
+
+def _postfijo(programa, hojas):
+    """Expresión muy profunda: evaluación con pila explícita sobre sus hojas."""
+    values = []
+    hojas = iter(hojas)
+    for impl in programa:
+        if impl is _HOJA:
+            values.append(next(hojas)())
+        elif impl is None:
+            values[-1] = -values[-1]
+        else:
+            right = values.pop()
+            values[-1] = impl(values[-1], right)
+    return values[0]
+
+
+def _literal(node):
+    """Valor de un literal numérico (pre-parseado por el Parser si está)."""
+    if node.value is not None:
+        return node.value
+    return float(node.token.value) if '.' in node.token.value else int(node.token.value)
+
+
+def _tamano(value):
+    if isinstance(value, int):
+        return 4
+    if isinstance(value, float):
+        return 8
+    if isinstance(value, str):
+        return len(value)
+    return 4
+
+
+def _no_arreglo(name):
+    raise NameError(f"Arreglo '{name}' no definido o acceso inválido")
+
+
+def _no_es_arreglo(name):
+    raise TypeError(f"'{name}' no es un arreglo")
+
+
+def _indefinida(name):
+    raise NameError(f"Variable '{name}' no definida")
+
+
+def _lanza(tipo, mensaje):
+    raise tipo(mensaje)
+
+
+def _desborde(line):
+    raise DesbordamientoPila(line)
+
+
+def _lee_global(env, name, index):
+    arr = env.get(name)
+    if isinstance(arr, dict):
+        return arr.get(index, 0)
+    return _no_arreglo(name)
+
+
+def _pon(arr, name, value, index):
+    if not isinstance(arr, dict):
+        _no_es_arreglo(name)
+    arr[index] = value
+    return value
+
+
+def _pon_global(env, name, value, index):
+    if name not in env:
+        env[name] = {}
+    return _pon(env[name], name, value, index)
+
+
+def _asigna_global(env, name, value):
+    env[name] = value
+    return value
+
+
+def _inc_global(env, name):
+    if name not in env:
+        _indefinida(name)
+    value = env[name] = env[name] + 1
+    return value
+
+
+_ENTORNO = {
+    '_postfijo': _postfijo, '_HOJA': _HOJA, '_tamano': _tamano, '_no_arreglo': _no_arreglo,
+    '_no_es_arreglo': _no_es_arreglo, '_indefinida': _indefinida, '_lanza': _lanza,
+    '_desborde': _desborde, '_lee_global': _lee_global, '_pon': _pon, '_pon_global': _pon_global,
+    '_asigna_global': _asigna_global, '_inc_global': _inc_global,
+    '_div_int': ops.cpp_int_div, '_mod_int': ops.cpp_int_mod, '_div': ops.generic_div,
+    '_mod': ops.generic_mod, '_fmod': math.fmod, '_str': ops.cpp_str,
+}
+
+_NOMBRE_PYTHON = re.compile(r"'(\w+)'")
+
+
+class ProgramaPython:
+    """Resultado de PythonTranspiler.compile: el fuente generado y su código compilado."""
+
+    def __init__(self, source, constantes, lineas, nombres, recursivo):
+        self.source = source
+        self.code = compile(source, ARCHIVO, "exec")
+        self._constantes = tuple(constantes)
+        self._lineas = lineas      # línea generada (desde 1) -> línea del fuente
+        self._nombres = nombres    # nombre de Python -> nombre del programa
+        self._recursivo = recursivo
+
+    def run(self, output_callback=print):
+        if output_callback is print:
+            out = lambda s: print(s, end='')
+        else:
+            out = output_callback
+        namespace = dict(_ENTORNO, _K=self._constantes, _out=out, E={'endl': '\n'})
+        exec(self.code, namespace)
+        # Cada llamada del programa usa un marco de Python (tres si está en
+        # una hoja de _postfijo); el límite de llamadas lo controla _prof
+        limit = sys.getrecursionlimit()
+        if self._recursivo:
+            sys.setrecursionlimit(limite_recursion(3))
+        try:
+            result = namespace['_main']()
+        except Exception as e:
+            error = con_linea(self._traducir(e), self._linea(e.__traceback__))
+            if error is e:
+                raise
+            raise error from None
+        finally:
+            sys.setrecursionlimit(limit)
+        # main devuelve (valor,) si terminó con return
+        if result is not None:
+            out(f"\nProgram finished with exit code: {result[0]}")
+
+    def _linea(self, tb):
+        line = None
+        while tb is not None:
+            if tb.tb_frame.f_code.co_filename == ARCHIVO:
+                line = self._lineas[tb.tb_lineno - 1]
+            tb = tb.tb_next
+        return line
+
+    def _traducir(self, e):
+        """Errores propios de Python con nombres generados -> los del Interpreter."""
+        if isinstance(e, KeyError):
+            # Solo E[...] se indexa sin .get: una variable de main nunca asignada
+            return NameError(f"Variable '{e.args[0]}' no definida")
+        if isinstance(e, NameError) and (isinstance(e, UnboundLocalError) or getattr(e, 'name', None)):
+            match = _NOMBRE_PYTHON.search(str(e))
+            if match and match.group(1) in self._nombres:
+                return NameError(f"Variable '{self._nombres[match.group(1)]}' no definida")
+        return e
+
+
+class _Contexto:
+    """Ciclo o switch abierto mientras se traduce su cuerpo."""
+    __slots__ = ('update', 'bandera')
+
+    def __init__(self, update=None, bandera=None):
+        self.update = update    # update de un for (continue también pasa por él)
+        self.bandera = bandera  # en un switch: variable que marca un continue pendiente
+
+
+class PythonTranspiler:
+    def compile(self, ast):
+        """Traduce el AST (anotado por TypeInference) a un ProgramaPython."""
+        self._out = []          # líneas generadas
+        self._lineas = []       # línea del fuente de cada línea generada
+        self._constantes = []
+        self._nombres = {}
+        self._ambitos = []      # main: nombre del programa -> nombre de Python, por bloque
+        self._contextos = []
+        self._indent = 0
+        self._line = None
+        self._funcion = None
+        self._en_lambda = False
+        self._contador = 0
+        self._funciones = {}
+        funcs = []
+        if isinstance(ast, ProgramNode):
+            resolver = Resolver()
+            for func in ast.functions:
+                resolver.resolver(func)
+                self._funciones[func.name] = func
+            funcs, ast = ast.functions, ast.main
+
+        for func in funcs:
+            self._funcion = func
+            self._line = linea(func)
+            params = "".join(f"s{i}, " for i in range(len(func.params))) + "_prof"
+            for i, (_, name, _) in enumerate(func.params):
+                self._nombres[f"s{i}"] = name
+            self._emit(f"def f_{func.name}({params}):")
+            self._suite(func.body.statements)
+        self._funcion = None
+
+        self._line = linea(ast)
+        self._emit("def _main():")
+        self._ambitos.append({})
+        self._suite(ast.statements if isinstance(ast, BlockNode) else [ast])
+        self._ambitos.pop()
+        source = "\n".join(self._out) + "\n"
+        return ProgramaPython(source, self._constantes, self._lineas, self._nombres, bool(funcs))
+
+    # --- Emisión ---
+    def _emit(self, text):
+        self._out.append("    " * self._indent + text)
+        self._lineas.append(self._line)
+
+    def _suite(self, nodes):
+        """Cuerpo indentado de un def/if/while; 'pass' si no genera nada."""
+        self._indent += 1
+        inicio = len(self._out)
+        saved = self._line
+        for node in nodes:
+            line = linea(node)
+            self._line = line if line is not None else saved
+            self._sentencia(node)
+        self._line = saved
+        if len(self._out) == inicio:
+            self._emit("pass")
+        self._indent -= 1
+
+    def _constante(self, value):
+        self._constantes.append(value)
+        return f"_K[{len(self._constantes) - 1}]"
+
+    def _nuevo(self, prefijo):
+        self._contador += 1
+        return f"{prefijo}{self._contador}"
+
+    # --- Nombres ---
+    def _resolver(self, name):
+        """Nombre de Python de una variable de main declarada, o None si va en E."""
+        for ambito in reversed(self._ambitos):
+            if name in ambito:
+                return ambito[name]
+        return None
+
+    def _declarar(self, name, slot):
+        if self._funcion is not None:
+            pyname = f"s{slot}"
+        else:
+            self._contador += 1
+            pyname = f"d{self._contador}_{name}"
+            self._ambitos[-1][name] = pyname
+        self._nombres[pyname] = name
+        return pyname
+
+    def _variable(self, ident):
+        """(nombre de Python, False) de una variable local, o (None, True) si vive en E."""
+        if self._funcion is not None:
+            if ident.slot is not None:
+                return f"s{ident.slot}", False
+            return None, True
+        pyname = self._resolver(ident.token.value)
+        return pyname, pyname is None
+
+    def _cargar(self, ident):
+        pyname, en_env = self._variable(ident)
+        return f"E[{ident.token.value!r}]" if en_env else pyname
+
+    # --- Sentencias ---
+    def _sentencia(self, node):
+        if node is None:
+            return
+        if isinstance(node, BlockNode):
+            if self._funcion is None:
+                self._ambitos.append({})
+            for stmt in node.statements:
+                saved = self._line
+                line = linea(stmt)
+                self._line = line if line is not None else saved
+                self._sentencia(stmt)
+                self._line = saved
+            if self._funcion is None:
+                self._ambitos.pop()
+            return
+        if node.token.op is not None or isinstance(node, CallNode):
+            self._emit(self._expr(node))
+            return
+        if isinstance(node, DeclarationNode):
+            self._declaracion(node)
+            return
+        if isinstance(node, IfNode):
+            self._if(node)
+            return
+        tipo = node.token.type
+        if tipo == Token.Type.While:
+            self._emit(f"while {self._expr(node.left)}:")
+            self._contextos.append(_Contexto())
+            self._suite([node.right])
+            self._contextos.pop()
+        elif isinstance(node, ForNode):
+            self._for(node)
+        elif isinstance(node, SwitchNode):
+            self._switch(node)
+        elif tipo == Token.Type.Break:
+            # Un break suelto termina main o la función
+            self._emit("break" if self._contextos else "return None")
+        elif tipo == Token.Type.Continue:
+            self._continue(len(self._contextos))
+        elif tipo == Token.Type.Return:
+            value = self._expr(node.left)
+            if self._funcion is None:
+                self._emit(f"return ({value},)")
+            else:
+                self._emit(f"return {self._coercion(self._funcion.rtype, value, node.left)}")
+        elif tipo == Token.Type.Cout:
+            while node is not None:
+                self._emit(f"_out(_str({self._expr(node.left)}))")
+                node = node.right
+        elif tipo == Token.Type.Asign:
+            self._asignacion(node)
+        elif tipo == Token.Type.Increment:
+            self._incremento(node)
+        else:
+            self._emit(self._expr(node))
+
+    def _continue(self, nivel):
+        """continue del contexto nivel-1 (o de la función/main si no hay ninguno)."""
+        if nivel == 0:
+            # Un continue suelto termina main o la función
+            self._emit("return None")
+            return
+        contexto = self._contextos[nivel - 1]
+        if contexto.bandera is not None:
+            # Atraviesa el switch: sale de su ciclo y lo retoma el de afuera
+            self._emit(f"{contexto.bandera} = True")
+            self._emit("break")
+            return
+        if contexto.update is not None:
+            self._sentencia(contexto.update)
+        self._emit("continue")
+
+    def _declaracion(self, node):
+        ctype = node.token.value
+        for var in node.vars:
+            name, size, init = var['name'], var['size'], var['init']
+            # El inicializador se traduce antes de declarar: en 'int x = x + 1;'
+            # la x de la derecha es la del ámbito exterior
+            if size is not None:
+                items = init if isinstance(init, list) else []
+                pares = ", ".join(f"{i}: {self._coercion(ctype, self._expr(item), item)}"
+                                  for i, item in enumerate(items))
+                self._emit(f"{self._declarar(name, var.get('slot'))} = {{{pares}}}")
+                self._emit(f"{self._declarar(f'__sizeof_{name}', var.get('size_slot'))} = {size!r}")
+            elif init:
+                value = self._coercion(ctype, self._expr(init), init)
+                self._emit(f"{self._declarar(name, var.get('slot'))} = {value}")
+            else:
+                self._emit(f"{self._declarar(name, var.get('slot'))} = 0")
+
+    def _if(self, node):
+        palabra = "if"
+        while isinstance(node, IfNode):
+            self._emit(f"{palabra} {self._expr(node.cond)}:")
+            self._suite([node.then_branch])
+            palabra = "elif"
+            node = node.else_branch
+        if node is not None:
+            self._emit("else:")
+            self._suite([node])
+
+    def _for(self, node):
+        # La variable declarada en init solo existe dentro del for
+        if self._funcion is None:
+            self._ambitos.append({})
+        self._sentencia(node.init)
+        self._emit(f"while {self._expr(node.cond)}:")
+        self._contextos.append(_Contexto(update=node.update))
+        self._suite([node.body, node.update] if node.update is not None else [node.body])
+        self._contextos.pop()
+        if self._funcion is None:
+            self._ambitos.pop()
+
+    def _switch(self, node):
+        inicio, bandera = self._nuevo("_s"), self._nuevo("_c")
+        tabla = self._constante(node.table)
+        self._emit(f"{inicio} = {tabla}.get({self._expr(node.subject)}, {node.default!r})")
+        self._emit(f"if {inicio} is not None:")
+        self._indent += 1
+        self._emit(f"{bandera} = False")
+        self._emit("while True:")
+        self._indent += 1
+        if self._funcion is None:
+            self._ambitos.append({})
+        self._contextos.append(_Contexto(bandera=bandera))
+        # Salto directo por tabla; desde ahí fall-through hasta un break
+        for pos, stmt in enumerate(node.body):
+            saved = self._line
+            line = linea(stmt)
+            self._line = line if line is not None else saved
+            self._emit(f"if {inicio} <= {pos}:")
+            self._suite([stmt])
+            self._line = saved
+        self._contextos.pop()
+        if self._funcion is None:
+            self._ambitos.pop()
+        self._emit("break")
+        self._indent -= 1
+        # continue sigue hacia afuera
+        self._emit(f"if {bandera}:")
+        self._indent += 1
+        self._continue(len(self._contextos))
+        self._indent -= 2
+
+    # --- Expresiones: texto de Python ---
+    def _expr(self, node):
+        if node is None:
+            return "None"
+        op = node.token.op
+        if op is not None:
+            return self._operador(node)
+        if isinstance(node, CallNode):
+            return self._llamada(node)
+        tipo = node.token.type
+        if tipo == Token.Type.Asign:
+            return self._asignacion_expr(node)
+        if tipo == Token.Type.Increment:
+            return self._incremento_expr(node)
+        if tipo == Token.Type.Sizeof:
+            return self._sizeof(node)
+        if tipo == Token.Type.Cadena:
+            return repr(node.token.value)
+        if tipo == Token.Type.Numero:
+            return repr(_literal(node))
+        if tipo == Token.Type.Index:
+            return self._indice(node)
+        if tipo == Token.Type.Ident:
+            return self._cargar(node)
+        if isinstance(node, (DeclarationNode, IfNode, ForNode, SwitchNode, BlockNode)):
+            raise ValueError(f"línea {linea(node)}: sentencia usada como expresión, "
+                             "no soportada por el backend python")
+        return "None"
+
+    def _operador(self, root):
+        nodes, depth = postorden_operadores(root)
+        if depth > PROFUNDIDAD_MAXIMA:
+            return self._postfijo(nodes)
+        # Post-orden con pila de textos: cada operador envuelve a sus operandos
+        values = []
+        for node in nodes:
+            op = node.token.op
+            if op is None:
+                values.append(self._expr(node))
+            elif op == ops.NEG:
+                values[-1] = f"(-{values[-1]})"
+            else:
+                right = values.pop()
+                values[-1] = self._binaria(node.impl or ops.GENERIC_OPS[op], values[-1], right)
+        return values[0]
+
+    def _binaria(self, impl, left, right):
+        infijo = _INFIJOS.get(impl)
+        if infijo is not None:
+            return f"({left} {infijo} {right})"
+        nombre = _FUNCIONES.get(impl) or self._constante(impl)
+        return f"{nombre}({left}, {right})"
+
+    def _postfijo(self, nodes):
+        # Miles de términos anidados no caben en el compilador de Python:
+        # las hojas van como lambdas y el árbol se evalúa con pila explícita
+        programa, hojas = [], []
+        saved, self._en_lambda = self._en_lambda, True
+        for node in nodes:
+            op = node.token.op
+            if op is None:
+                programa.append(_HOJA)
+                hojas.append(f"lambda: {self._expr(node)}")
+            elif op == ops.NEG:
+                programa.append(None)
+            else:
+                programa.append(node.impl or ops.GENERIC_OPS[op])
+        self._en_lambda = saved
+        return f"_postfijo({self._constante(tuple(programa))}, ({', '.join(hojas)},))"
+
+    def _coercion(self, ctype, value, node=None):
+        """Texto que aplica coerce(ctype, ...) a value."""
+        if ctype not in (INT, FLOAT):
+            return value
+        if node is not None and node.token.type == Token.Type.Numero and node.token.op is None:
+            # Literal: se convierte al traducir
+            return repr(coerce(ctype, _literal(node)))
+        if ctype == INT:
+            return f"(int(_t) if isinstance(_t := {value}, float) else _t)"
+        return f"(float(_t) if isinstance(_t := {value}, int) else _t)"
+
+    def _indice(self, node):
+        index = self._expr(node.right)
+        ident = node.left
+        name = ident.token.value
+        pyname, en_env = self._variable(ident)
+        if en_env:
+            return f"_lee_global(E, {name!r}, {index})"
+        falla = "_no_es_arreglo" if self._funcion is not None else "_no_arreglo"
+        return f"({pyname}.get({index}, 0) if type({pyname}) is dict else {falla}({name!r}))"
+
+    def _local_en_lambda(self, node):
+        if self._en_lambda:
+            raise ValueError(f"línea {linea(node)}: asignación dentro de una expresión demasiado "
+                             "profunda, no soportada por el backend python")
+
+    def _asignacion(self, node):
+        """Asignación como sentencia."""
+        value = self._coercion(node.ctype, self._expr(node.right), node.right)
+        target = node.left
+        if target.token.type == Token.Type.Index:
+            ident = target.left
+            name = ident.token.value
+            pyname, en_env = self._variable(ident)
+            index = self._expr(target.right)
+            if en_env:
+                self._emit(f"_pon_global(E, {name!r}, {value}, {index})")
+            else:
+                self._emit(f"if type({pyname}) is not dict: _no_es_arreglo({name!r})")
+                self._emit(f"{pyname}[{index}] = {value}")
+            return
+        pyname, en_env = self._variable(target)
+        if en_env:
+            self._emit(f"E[{target.token.value!r}] = {value}")
+        else:
+            self._emit(f"{pyname} = {value}")
+
+    def _asignacion_expr(self, node):
+        value = self._coercion(node.ctype, self._expr(node.right), node.right)
+        target = node.left
+        if target.token.type == Token.Type.Index:
+            ident = target.left
+            name = ident.token.value
+            pyname, en_env = self._variable(ident)
+            index = self._expr(target.right)
+            if en_env:
+                return f"_pon_global(E, {name!r}, {value}, {index})"
+            return f"_pon({pyname}, {name!r}, {value}, {index})"
+        pyname, en_env = self._variable(target)
+        if en_env:
+            return f"_asigna_global(E, {target.token.value!r}, {value})"
+        self._local_en_lambda(node)
+        return f"({pyname} := {value})"
+
+    def _incremento(self, node):
+        target = node.left
+        if target.token.type != Token.Type.Ident:
+            self._emit(f"_indefinida({target.token.value!r})")
+            return
+        pyname, en_env = self._variable(target)
+        if en_env:
+            self._emit(f"_inc_global(E, {target.token.value!r})")
+        else:
+            self._emit(f"{pyname} = {pyname} + 1")
+
+    def _incremento_expr(self, node):
+        target = node.left
+        if target.token.type != Token.Type.Ident:
+            return f"_indefinida({target.token.value!r})"
+        pyname, en_env = self._variable(target)
+        if en_env:
+            return f"_inc_global(E, {target.token.value!r})"
+        self._local_en_lambda(node)
+        return f"({pyname} := {pyname} + 1)"
+
+    def _sizeof(self, node):
+        target = node.left
+        if target is None or target.token.type != Token.Type.Ident:
+            return "4"
+        if self._funcion is not None:
+            if node.slot is not None:
+                # Arreglo local de una función
+                return f"(s{node.slot} * 4)"
+            return f"_tamano({self._cargar(target)})"
+        size = self._resolver(f"__sizeof_{target.token.value}")
+        if size is not None:
+            return f"({size} * 4)"
+        return f"_tamano({self._cargar(target)})"
+
+    def _llamada(self, node):
+        name, args = node.token.value, node.args
+        func = self._funciones.get(name)
+        # Los errores de llamada se lanzan antes de evaluar los argumentos
+        if func is None:
+            return f"_lanza(NameError, {f'Función {name!r} no definida'!r})"
+        params = func.params
+        if len(args) != len(params):
+            mensaje = f"'{name}' espera {len(params)} argumento(s), se pasaron {len(args)}"
+            return f"_lanza(TypeError, {mensaje!r})"
+        values = "".join(self._coercion(params[i][0], self._expr(arg), arg) + ", "
+                         for i, arg in enumerate(args))
+        if self._funcion is None:
+            # Desde main: la primera llamada nunca supera el límite
+            return f"f_{name}({values}1)"
+        return (f"(f_{name}({values}_prof + 1) if _prof < {Interpreter.MAX_CALL_DEPTH} "
+                f"else _desborde({linea(node)!r}))")
@@ -0,0 +1,126 @@
+from .ast_nodes import BlockNode, DeclarationNode, CallNode, FunctionNode, ProgramNode
+from .lexer import Token
+from .resolver import Resolver
+from .symbol_table import TablaSimbolos
+from .operators import ARITHMETIC, RELATIONAL, NEG, INT_OPS, FLOAT_OPS, GENERIC_OPS
+
+INT = 'int'
+FLOAT = 'float'
+
+
+def coerce(ctype, value):
+    """Conversion applied when storing into a variable of static type ctype."""
+    if ctype == INT and isinstance(value, float):
+        return int(value)  # int() truncates toward zero, like C++
+    if ctype == FLOAT and isinstance(value, int):
+        return float(value)
+    return value
+
+
+class TypeInference:
+    """
+    Static pass over the Parser AST. Uses the DeclarationNode types to give
+    every expression node a ctype ('int', 'float' or None when unknown) and
+    chooses, for each arithmetic node, the specialized implementation stored
+    in node.impl. The Interpreter then calls node.impl directly instead of
+    dispatching on the operator and on the runtime types of the operands.
+    """
+
+    def __init__(self):
+        self.return_types = {}  # función -> tipo de retorno ('int'/'float' o None)
+
+    def annotate(self, ast):
+        if ast is None:
+            return ast
+        self.return_types = {}
+        # Every variable use gets the type of the declaration it resolves to,
+        # with the same scopes as the Interpreter (function, block, for, switch)
+        tipos = _TiposDeclarados()
+        if isinstance(ast, ProgramNode):
+            for func in ast.functions:
+                self.return_types[func.name] = func.rtype if func.rtype in (INT, FLOAT) else None
+                tipos.resolver(func)
+            tipos.resolver_main(ast.main)
+        else:
+            tipos.resolver_main(ast)
+
+        # Post-order with an explicit stack: children are typed before parents
+        stack = [(ast, False)]
+        while stack:
+            node, visited = stack.pop()
+            if visited:
+                self._type_node(node)
+                continue
+            stack.append((node, True))
+            for child in node.children():
+                stack.append((child, False))
+        return ast
+
+    def _type_node(self, node):
+        if isinstance(node, (BlockNode, DeclarationNode, FunctionNode, ProgramNode)):
+            return
+        if isinstance(node, CallNode):
+            node.ctype = self.return_types.get(node.token.value)
+            return
+        t = node.token
+        if t.type == Token.Type.Numero:
+            node.ctype = FLOAT if '.' in t.value else INT
+        elif t.type == Token.Type.Ident:
+            pass  # ya tipado por _TiposDeclarados
+        elif t.type == Token.Type.Index:
+            node.ctype = node.left.ctype
+        elif t.type == Token.Type.Sizeof:
+            node.ctype = INT
+        elif t.op == NEG:
+            # Unary minus keeps the type of its operand
+            node.ctype = node.left.ctype
+        elif t.op in ARITHMETIC:
+            lt, rt = node.left.ctype, node.right.ctype
+            if lt == INT and rt == INT:
+                node.ctype = INT
+                node.impl = INT_OPS[t.op]
+            elif lt in (INT, FLOAT) and rt in (INT, FLOAT):
+                node.ctype = FLOAT
+                node.impl = FLOAT_OPS[t.op]
+            else:
+                node.impl = GENERIC_OPS[t.op]
+        elif t.op in RELATIONAL:
+            node.ctype = INT
+        elif t.type in (Token.Type.Asign, Token.Type.Increment):
+            node.ctype = node.left.ctype
+
+
+class _TiposDeclarados(Resolver):
+    """
+    Recorrido del Resolver que, en lugar de slots, deja en node.ctype de cada
+    identificador el tipo de la declaración visible en ese punto (None si no
+    es int/float o la variable no está declarada).
+    """
+
+    def resolver(self, func):
+        tabla = TablaSimbolos()
+        for tipo, nombre, _ in func.params:
+            self._declarar(tabla, func, {'name': nombre}, tipo)
+        self._recorrer(tabla, func, func.body.statements)
+
+    def resolver_main(self, raiz):
+        if raiz is not None:
+            self._recorrer(TablaSimbolos(), None, [raiz])
+
+    def _declarar(self, tabla, func, var, tipo=None):
+        tipo = tipo if tipo in (INT, FLOAT) else None
+        if tabla.en_ambito_actual(var['name']):
+            # Redeclaración en el mismo ámbito (la informa el análisis
+            # semántico): con tipos distintos la variable queda sin tipo
+            entrada = tabla.buscar(var['name'])
+            if entrada['tipo'] != tipo:
+                entrada['tipo'] = None
+            return
+        tabla.insertar(var['name'], "variable", tipo)
+
+    def _usar(self, tabla, func, node):
+        entrada = tabla.buscar(node.token.value)
+        node.ctype = entrada['tipo'] if entrada is not None else None
+
+    def _sizeof(self, tabla, node):
+        pass
@@ -0,0 +1,123 @@
+"""
+Evaluación vectorizada (NumPy) de expresiones del Automata.
+
+La RPN de una expresión se compila una sola vez en una lista de pasos y luego
+se evalúa sobre columnas de valores de variables: cada operación procesa
+todas las filas a la vez. Los errores por fila (división por cero, potencia
+de base negativa con exponente no entero) no lanzan excepción; se reportan
+como máscaras booleanas y la fila correspondiente queda en NaN.
+
+NumPy es una dependencia opcional: solo se importa al usar este módulo.
+"""
+from collections import namedtuple
+
+from .operators import OPCODES, ADD, SUB, MUL, DIV, MOD, POW, NEG, LT, GT, LE, GE, EQ, NE
+
+ResultadoLote = namedtuple('ResultadoLote', ['valores', 'division_por_cero', 'error'])
+
+_CONST, _VAR, _OP = range(3)
+
+
+def _numpy():
+    try:
+        import numpy
+    except ImportError as e:
+        raise ImportError("La evaluación por lotes requiere NumPy (pip install numpy)") from e
+    return numpy
+
+
+class EvaluadorVectorizado:
+    """
+    Compila una RPN (lista de tokens como la devuelve Automata.to_rpn) en un
+    programa de pila y la evalúa sobre columnas: evaluar({'x': [...], ...}).
+    """
+
+    def __init__(self, rpn):
+        self.np = _numpy()
+        self.rpn = list(rpn)
+        self.pasos = []
+        self.variables = []
+        profundidad = 0
+        for tok in self.rpn:
+            code = OPCODES.get(tok)
+            if code is None:
+                if tok.isidentifier():
+                    self.pasos.append((_VAR, tok))
+                    if tok not in self.variables:
+                        self.variables.append(tok)
+                else:
+                    self.pasos.append((_CONST, float(tok)))
+                profundidad += 1
+            else:
+                aridad = 1 if code == NEG else 2
+                if profundidad < aridad:
+                    raise ValueError(f"Operador '{tok}' sin suficientes operandos")
+                profundidad -= aridad - 1
+                self.pasos.append((_OP, code))
+        if profundidad != 1:
+            raise ValueError("Expresión inválida: sobran operandos")
+
+    def evaluar(self, columnas):
+        """
+        columnas: dict nombre -> array (o escalar) con los valores de cada
+        variable. Todas las columnas se combinan con broadcasting.
+        Devuelve ResultadoLote(valores, division_por_cero, error).
+        """
+        np = self.np
+        faltantes = [v for v in self.variables if v not in columnas]
+        if faltantes:
+            raise ValueError(f"Faltan columnas para las variables: {', '.join(faltantes)}")
+
+        datos = [np.asarray(columnas[v], dtype=float) for v in self.variables]
+        forma = np.broadcast_shapes(*(d.shape for d in datos)) if datos else ()
+        datos = {v: np.broadcast_to(d, forma) for v, d in zip(self.variables, datos)}
+
+        div_cero = np.zeros(forma, dtype=bool)
+        error = np.zeros(forma, dtype=bool)
+        pila = []
+        with np.errstate(all='ignore'):
+            for clase, arg in self.pasos:
+                if clase == _CONST:
+                    pila.append(arg)
+                    continue
+                if clase == _VAR:
+                    pila.append(datos[arg])
+                    continue
+                if arg == NEG:
+                    pila.append(np.negative(pila.pop()))
+                    continue
+                der = pila.pop()
+                izq = pila.pop()
+                if arg in (DIV, MOD):
+                    cero = np.broadcast_to(np.asarray(der) == 0, forma)
+                    seguro = np.where(cero, 1.0, der)
+                    res = np.divide(izq, seguro) if arg == DIV else np.mod(izq, seguro)
+                    res = np.where(cero, np.nan, res)
+                    div_cero |= cero
+                elif arg == POW:
+                    izq_a, der_a = np.asarray(izq), np.asarray(der)
+                    cero = np.broadcast_to((izq_a == 0) & (der_a < 0), forma)
+                    invalida = np.broadcast_to((izq_a < 0) & (der_a != np.floor(der_a)), forma)
+                    res = np.where(cero | invalida, np.nan, np.power(izq_a, der_a))
+                    div_cero |= cero
+                    error |= invalida
+                else:
+                    res = _BINARIOS[arg](np, izq, der)
+                pila.append(res)
+
+        valores = np.broadcast_to(np.asarray(pila.pop(), dtype=float), forma).copy()
+        error |= div_cero
+        return ResultadoLote(valores, div_cero, error)
+
+
+_BINARIOS = {
+    ADD: lambda np, a, b: np.add(a, b),
+    SUB: lambda np, a, b: np.subtract(a, b),
+    MUL: lambda np, a, b: np.multiply(a, b),
+    LT: lambda np, a, b: np.less(a, b).astype(float),
+    GT: lambda np, a, b: np.greater(a, b).astype(float),
+    LE: lambda np, a, b: np.less_equal(a, b).astype(float),
+    GE: lambda np, a, b: np.greater_equal(a, b).astype(float),
+    EQ: lambda np, a, b: np.equal(a, b).astype(float),
+    NE: lambda np, a, b: np.not_equal(a, b).astype(float),
+}
@@ -2,19 +2,25 @@ import tkinter as tk
 from tkinter import filedialog, messagebox, scrolledtext
 import re
 import os
-from src.compiler.lexer import Lexer, Token
-from src.compiler.parser import Parser, SintacticoPDF
+from src.compiler.parser import SintacticoPDF, ErroresSintacticos
 from src.compiler.automata import Automata
-from src.compiler.code_generator import CodeGeneratorFromTree
-from src.compiler.symbol_table import TablaSimbolos
-from src.compiler.semantics import SemanticAnalyzer
+from src.compiler.compilation_unit import CompilationUnit
+from src.compiler.backends import BACKENDS, DEFAULT_BACKEND, get_backend
+from src.gui.widgets import LineNumberGutter, OutputConsole
 import tkinter.ttk as ttk
 
 class CompiladorGUI:
+    OUTPUT_MAX_LINES = 200000
+
     def __init__(self, master):
         self.master = master
         master.title("Compilador C++ - Diseño Premium")
         self.automata = Automata()
+        # Unidad de compilación del texto actual: los botones comparten sus
+        # tokens, AST y tabla mientras el texto no cambie
+        self._unidad = None
+        # Backend con el que Ejecutar corre el programa (menú Backend)
+        self.backend = tk.StringVar(master, value=DEFAULT_BACKEND)
         
         # Configuración de Estilo
         style = ttk.Style()
@@ -64,21 +70,22 @@ class CompiladorGUI:
         main_pane.add(self.text_frame, weight=3) # Editor gets more space by default
         
         # Line Numbers & Text Area
-        self.line_numbers = tk.Text(self.text_frame, width=4, padx=3, takefocus=0, border=0, 
-                                   background=bg_color, foreground="#888888", state='disabled', font=("Consolas", 12))
-        self.line_numbers.pack(side=tk.LEFT, fill=tk.Y)
-        
         self.text_area = scrolledtext.ScrolledText(self.text_frame, wrap=tk.NONE, undo=True,
                                                    bg=text_bg, fg=text_fg, insertbackground="white",
                                                    font=("Consolas", 12))
+        # El gutter solo dibuja las líneas visibles y se actualiza por lotes
+        self.line_numbers = LineNumberGutter(self.text_frame, self.text_area, font=("Consolas", 12),
+                                             foreground="#888888", background=bg_color)
+        self.line_numbers.pack(side=tk.LEFT, fill=tk.Y)
         self.text_area.pack(side=tk.RIGHT, fill=tk.BOTH, expand=True)
 
         self.text_area.vbar.config(command=self.sync_scroll)
-        self.line_numbers.config(yscrollcommand=self.text_area.vbar.set)
+        self.text_area.config(yscrollcommand=self.on_text_scroll)
         
         self.text_area.bind('<KeyRelease>', self.update_line_numbers)
         self.text_area.bind('<MouseWheel>', self.sync_scroll_wheel)
         self.text_area.bind('<Button-1>', self.update_line_numbers)
+        self.text_area.bind('<Configure>', self.update_line_numbers)
         
         self.update_line_numbers()
 
@@ -86,9 +93,10 @@ class CompiladorGUI:
         self.output_frame = ttk.Frame(main_pane)
         main_pane.add(self.output_frame, weight=1)
         
-        self.output_area = scrolledtext.ScrolledText(self.output_frame, wrap=tk.WORD, 
-                                                     bg="#000000", fg="#00ff00",
-                                                     font=("Consolas", 11))
+        # Consola virtualizada: guarda las últimas OUTPUT_MAX_LINES líneas y
+        # solo muestra las que entran en pantalla
+        self.output_area = OutputConsole(self.output_frame, max_lines=self.OUTPUT_MAX_LINES,
+                                         font=("Consolas", 11), bg="#000000", fg="#00ff00")
         self.output_area.pack(fill=tk.BOTH, expand=True)
 
 
@@ -100,6 +108,7 @@ class CompiladorGUI:
         archivo_menu = tk.Menu(menu_bar, tearoff=0)
         archivo_menu.add_command(label="Abrir", accelerator="Ctrl+A", command=self.abrir_archivo)
         archivo_menu.add_command(label="Guardar", accelerator="Ctrl+G", command=self.guardar_archivo)
+        archivo_menu.add_command(label="Guardar salida...", command=self.guardar_salida)
         archivo_menu.add_command(label="Limpiar", accelerator="Ctrl+P", command=self.limpiar)
         archivo_menu.add_separator()
         archivo_menu.add_command(label="Salir", accelerator="Ctrl+Q", command=master.quit)
@@ -108,7 +117,17 @@ class CompiladorGUI:
         # Compilador (Legacy)
         compilador_menu = tk.Menu(menu_bar, tearoff=0)
         compilador_menu.add_command(label="Ejecutar", accelerator="F5", command=self.run_code)
+        compilador_menu.add_command(label="Ejecutar con perfilado", accelerator="F6",
+                                    command=lambda: self.run_code(perfilar=True))
         menu_bar.add_cascade(label="Compilador", menu=compilador_menu)
+
+        # Backend de ejecución
+        backend_menu = tk.Menu(menu_bar, tearoff=0)
+        for name, backend in BACKENDS.items():
+            if backend.executes:
+                backend_menu.add_radiobutton(label=f"{name} — {backend.description}", value=name,
+                                             variable=self.backend)
+        menu_bar.add_cascade(label="Backend", menu=backend_menu)
         
         # Ayuda
         ayuda_menu = tk.Menu(menu_bar, tearoff=0)
@@ -134,31 +153,23 @@ class CompiladorGUI:
         master.bind("<Alt-s>", lambda e: self.analisis_sintactico())
         master.bind("<Control-s>", lambda e: self.analisis_semantico())
         master.bind("<F5>", lambda e: self.run_code())
+        master.bind("<F6>", lambda e: self.run_code(perfilar=True))
 
     # --- Funciones GUI ---
     def sync_scroll(self, *args):
         self.text_area.yview(*args)
-        self.line_numbers.yview(*args)
+
+    def on_text_scroll(self, first, last):
+        # yscrollcommand del editor: mover la barra y redibujar el gutter
+        self.text_area.vbar.set(first, last)
+        self.line_numbers.schedule()
 
     def sync_scroll_wheel(self, event):
         self.text_area.yview_scroll(int(-1*(event.delta/120)), "units")
-        self.line_numbers.yview_scroll(int(-1*(event.delta/120)), "units")
         return "break"
 
     def update_line_numbers(self, event=None):
-        line_count = self.text_area.get('1.0', tk.END).count('\n')
-        if line_count is None:
-            line_count = 1
-        else:
-            line_count += 1 # El último salto de línea
-        
-        line_numbers_string = "\n".join(str(i) for i in range(1, line_count))
-        self.line_numbers.config(state='normal')
-        self.line_numbers.delete('1.0', tk.END)
-        self.line_numbers.insert('1.0', line_numbers_string)
-        self.line_numbers.config(state='disabled')
-        # Sincronizar vista
-        self.line_numbers.yview_moveto(self.text_area.yview()[0])
+        self.line_numbers.schedule()
 
     def abrir_archivo(self):
         file_path = filedialog.askopenfilename(filetypes=[("Text files", "*.txt *.c *.cpp *.py"), ("All files", "*.*")])
@@ -175,31 +186,41 @@ class CompiladorGUI:
                 f.write(self.text_area.get(1.0, tk.END))
             messagebox.showinfo("Guardar", f"Archivo guardado: {file_path}")
 
+    def guardar_salida(self):
+        """Guarda en disco todo lo que se escribió en la consola de salida."""
+        file_path = filedialog.asksaveasfilename(defaultextension=".log",
+                                                 filetypes=[("Log", "*.log *.txt"), ("All files", "*.*")])
+        if file_path:
+            self.output_area.save(file_path)
+            messagebox.showinfo("Guardar salida", f"Salida guardada: {file_path}")
+
     def limpiar(self):
         self.text_area.delete(1.0, tk.END)
         self.output_area.delete(1.0, tk.END)
 
+    def unidad(self):
+        """CompilationUnit del texto del editor (la misma mientras no se edite)."""
+        content = self.text_area.get(1.0, tk.END).strip()
+        if self._unidad is None or self._unidad.source != content:
+            # El botón de código intermedio deja el código objeto en output.obj
+            self._unidad = CompilationUnit(content, obj_path="output.obj", automata=self.automata)
+        return self._unidad
+
     def analisis_lexico(self):
-        expr = self.text_area.get(1.0, tk.END).strip()
-        if not expr:
+        unidad = self.unidad()
+        if not unidad.source:
             messagebox.showinfo("Léxico", "Texto vacío.")
             return
-        lexer = Lexer(expr)
-        tokens = []
         try:
-            while True:
-                t = lexer.next_token()
-                tokens.append(t)
-                if t.type == Token.Type.Fin:
-                    break
+            tokens = unidad.tokens
         except Exception as e:
             messagebox.showerror("Error Léxico", str(e))
             return
-        # Mostrar tokens en output_area
+        # La consola acumula los tokens y los dibuja por lotes
         self.output_area.delete(1.0, tk.END)
         self.output_area.insert(tk.END, "Tokens leídos (tipo, valor):\n")
-        for tk_ in tokens:
-            self.output_area.insert(tk.END, f"  - {tk_}\n")
+        for t in tokens:
+            self.output_area.insert(tk.END, f"  - {t}\n")
 
     def analisis_sintactico(self):
         # Implementación del análisis sintáctico siguiendo la metodología y formato
@@ -228,13 +249,12 @@ class CompiladorGUI:
 
 
     def analisis_semantico(self):
-        content = self.text_area.get(1.0, tk.END).strip()
-        if not content:
+        unidad = self.unidad()
+        if not unidad.source:
             messagebox.showinfo("Semántico", "No hay código para analizar.")
             return
 
-        analyzer = SemanticAnalyzer()
-        res = analyzer.analizar(content)
+        res = unidad.semantic
         
         tabla = res["tabla"]
         errores = res["errores"]
@@ -261,14 +281,13 @@ class CompiladorGUI:
          - resultados del Automata (tokens, RPN, evaluacion)
          - genera archivo .obj con instrucciones (usando CodeGeneratorFromTree y Parser)
         """
-        content = self.text_area.get(1.0, tk.END)
-        expr = content.strip()
-        if not expr:
+        unidad = self.unidad()
+        if not unidad.source:
             messagebox.showinfo("Código Intermedio", "No hay expresión para generar código.")
             return
 
         # 1) obtener resultados del automata tradicional
-        res = self.automata.analizar(expr)
+        res = unidad.ir
         self.output_area.delete(1.0, tk.END)
         if "error" in res:
             self.output_area.insert(tk.END, f"Error: {res['error']}\n")
@@ -284,10 +303,8 @@ class CompiladorGUI:
             self.output_area.insert(tk.END, f"  {line}\n")
 
         # 2) construir árbol con Parser (para la actividad 1.1) y generar árbol textual
-        lexer = Lexer(expr)
-        parser = Parser(lexer)
         try:
-            tree = parser.parse()
+            tree = unidad.ast
         except Exception as e:
             self.output_area.insert(tk.END, f"\nError parseando para generar código: {e}\n")
             return
@@ -295,69 +312,87 @@ class CompiladorGUI:
         self.output_area.insert(tk.END, "\n=== Árbol Sintáctico (Parser) ===\n")
         tree.print_tree(output_func=lambda s: self.output_area.insert(tk.END, s + "\n"))
 
-        # 3) detectar variables declaradas (simplemente como en semántico)
-        declared = set()
-        for line in content.splitlines():
-            line = line.strip().rstrip(';')
-            m = re.match(r'^(int|float)\s+([A-Za-z_][A-Za-z0-9_]*)$', line)
-            if m:
-                declared.add(m.group(2))
-            m2 = re.match(r'^char\s+([A-Za-z_][A-Za-z0-9_]*)\s*\[.*\]$', line)
-            if m2:
-                declared.add(m2.group(1))
-
-        # 4) Generar código objeto
-        cg = CodeGeneratorFromTree(declared_vars=declared)
-        outfile = cg.generate_from_tree(tree, output_path="output.obj")
-        self.output_area.insert(tk.END, f"\nCódigo objeto generado en: {outfile}\n")
-        # mostrar contenido del fichero generado
-        if os.path.exists(outfile):
-            self.output_area.insert(tk.END, "\nContenido de output.obj:\n")
-            with open(outfile, 'r', encoding='utf-8') as f:
-                for ln in f:
-                    self.output_area.insert(tk.END, ln)
-        else:
-            self.output_area.insert(tk.END, "No se encontró el fichero de salida.\n")
+        # 3) Generar código objeto (las variables declaradas salen de la tabla de símbolos)
+        codigo = unidad.object_code
+        self.output_area.insert(tk.END, f"\nCódigo objeto generado en: {unidad.obj_path}\n")
+        self.output_area.insert(tk.END, f"\nContenido de {unidad.obj_path}:\n")
+        self.output_area.insert(tk.END, codigo)
 
     def highlight_error(self, line_num):
         """Resalta la línea del error en el editor"""
+        self.highlight_errors([line_num])
+
+    def highlight_errors(self, line_nums):
+        """Resalta todas las líneas con errores (p. ej. los sintácticos de una pasada)"""
         self.text_area.tag_remove("error", "1.0", tk.END)
-        self.text_area.tag_add("error", f"{line_num}.0", f"{line_num}.end")
+        for line_num in line_nums:
+            self.text_area.tag_add("error", f"{line_num}.0", f"{line_num}.end")
         self.text_area.tag_config("error", background="#ffcccc", foreground="red")
-        self.text_area.see(f"{line_num}.0")
-
-    def run_code(self):
+        self.text_area.tag_raise("error")  # por encima del coloreado de perfil
+        if line_nums:
+            self.text_area.see(f"{line_nums[0]}.0")
+
+    # Fondo de las líneas perfiladas, de la más fría a la más caliente
+    HEAT_COLORS = ("#2d2a1e", "#4a3b12", "#6b4a0c", "#8c3a0a", "#b02a0a")
+
+    def highlight_heat(self, heat):
+        """Colorea cada línea del editor según su intensidad (0..1) en el perfil."""
+        for i in range(len(self.HEAT_COLORS)):
+            self.text_area.tag_remove(f"heat{i}", "1.0", tk.END)
+        for line_num, level in heat.items():
+            i = min(int(level * len(self.HEAT_COLORS)), len(self.HEAT_COLORS) - 1)
+            self.text_area.tag_add(f"heat{i}", f"{line_num}.0", f"{line_num}.end")
+        for i, color in enumerate(self.HEAT_COLORS):
+            self.text_area.tag_config(f"heat{i}", background=color)
+
+    def run_code(self, perfilar=False):
         """
-        Ejecuta el código usando el Intérprete.
+        Ejecuta el código con el backend elegido en el menú Backend. Con
+        perfilar=True usa el ProfilingInterpreter, muestra las líneas más
+        costosas y las colorea.
         """
-        from src.compiler.interpreter import Interpreter
+        from src.compiler.perfilador import ProfilingInterpreter
         
-        content = self.text_area.get(1.0, tk.END).strip()
+        unidad = self.unidad()
+        content = unidad.source
         if not content:
             messagebox.showinfo("Ejecutar", "No hay código para ejecutar.")
             return
 
         self.output_area.delete(1.0, tk.END)
-        self.output_area.insert(tk.END, "=== Ejecución ===\n")
+        backend = get_backend(self.backend.get())
+        titulo = "perfilado" if perfilar else backend.name
+        self.output_area.insert(tk.END, f"=== Ejecución ({titulo}) ===\n")
         
         # Limpiar resaltado previo
         self.text_area.tag_remove("error", "1.0", tk.END)
+        self.highlight_heat({})
 
         def gui_print(msg):
             self.output_area.insert(tk.END, str(msg))
             self.output_area.see(tk.END)
 
         try:
-            # 1. Parsear
-            lexer = Lexer(content)
-            parser = Parser(lexer)
-            ast = parser.parse()
-            
-            # 2. Interpretar
-            interpreter = Interpreter(output_callback=gui_print)
-            interpreter.interpret(ast)
-            
+            # 1. Parsear y anotar tipos (o reutilizar el AST de la unidad)
+            ast = unidad.typed_ast
+
+            # 2. Ejecutar: el programa del backend se genera una vez por texto
+            if perfilar:
+                interpreter = ProfilingInterpreter(output_callback=gui_print)
+                interpreter.interpret(ast, annotate=False)
+            else:
+                backend.execute(backend.program(unidad), gui_print, {})
+
             self.output_area.insert(tk.END, "\n=== Fin de Ejecución ===\n")
+            if perfilar:
+                self.output_area.insert(tk.END, "\n=== Perfil por línea ===\n")
+                self.output_area.insert(tk.END, interpreter.reporte(content) + "\n")
+                self.highlight_heat(interpreter.heat())
+        except ErroresSintacticos as e:
+            self.output_area.insert(tk.END, f"\n{len(e.errores)} error(es) sintáctico(s):\n")
+            for msg in e.errores:
+                self.output_area.insert(tk.END, f"  - {msg}\n")
+            self.highlight_errors(e.lineas)
         except Exception as e:
             # Error de sintaxis (ValueError) o Semántico (RuntimeError)
             msg = str(e)
@@ -0,0 +1,259 @@
+import os
+import shutil
+import tempfile
+import tkinter as tk
+import tkinter.font as tkfont
+import tkinter.ttk as ttk
+from collections import deque
+from itertools import islice
+
+
+class LineNumberGutter(tk.Canvas):
+    """
+    Números de línea para un tk.Text.
+
+    Solo se dibujan las líneas visibles: el costo de cada actualización
+    depende del alto de la ventana, no del largo del archivo. La cantidad de
+    líneas se le pide al widget (index('end-1c')) en vez de copiar el texto,
+    los ítems del canvas se reutilizan (solo se crean los que faltan) y las
+    ráfagas de teclas o de scroll se agrupan en un único redibujado.
+    """
+    DELAY_MS = 15  # ventana para agrupar eventos seguidos
+    PAD = 4
+
+    def __init__(self, master, text_widget, font, foreground="#888888", background="#2b2b2b"):
+        super().__init__(master, highlightthickness=0, bd=0, takefocus=0, background=background)
+        self.text = text_widget
+        self.font = tkfont.Font(font=font)
+        self.foreground = foreground
+        self.line_count = 0
+        self._digits = 0
+        self._items = []     # ítems de texto del canvas, uno por línea visible
+        self._pending = None
+        self._resize(1)
+
+    def schedule(self, event=None):
+        """Pide un redibujado; varias llamadas seguidas producen uno solo."""
+        if self._pending is None:
+            self._pending = self.after(self.DELAY_MS, self.redraw)
+
+    def _resize(self, digits):
+        self._digits = digits
+        self.config(width=self.font.measure("9" * max(digits, 2)) + 2 * self.PAD)
+
+    def redraw(self):
+        self._pending = None
+        self.line_count = int(self.text.index('end-1c').split('.')[0])
+        digits = len(str(self.line_count))
+        if digits != self._digits:
+            self._resize(digits)
+        x = int(self['width']) - self.PAD
+
+        shown = 0
+        line = int(self.text.index('@0,0').split('.')[0])
+        while line <= self.line_count:
+            info = self.text.dlineinfo(f"{line}.0")
+            if info is None:  # por debajo del borde inferior
+                break
+            y = info[1]
+            if shown < len(self._items):
+                item = self._items[shown]
+                self.itemconfigure(item, text=str(line), state='normal')
+                self.coords(item, x, y)
+            else:
+                self._items.append(self.create_text(x, y, anchor='ne', text=str(line),
+                                                    font=self.font, fill=self.foreground))
+            shown += 1
+            line += 1
+        for item in self._items[shown:]:
+            self.itemconfigure(item, state='hidden')
+
+
+class OutputBuffer:
+    """
+    Salida de la consola: las últimas max_lines líneas en un buffer circular
+    en memoria (lo que se puede ver) y, si spool=True, el log completo en un
+    archivo temporal (lo que se guarda con save()). La última línea puede
+    estar incompleta, como cuando cout escribe de a fragmentos.
+    """
+
+    def __init__(self, max_lines=100000, spool=True):
+        if max_lines < 1:
+            raise ValueError("max_lines debe ser positivo")
+        self.max_lines = max_lines
+        self._lines = deque(maxlen=max_lines)  # líneas completas
+        self._tail = ""                        # línea en curso, sin '\n'
+        self._fragments = []                   # lo escrito después de _tail, aún sin unir
+        self.dropped = 0                       # líneas completas que ya no están en memoria
+        self._spool = tempfile.TemporaryFile('w+', encoding='utf-8') if spool else None
+
+    def write(self, text):
+        if not text:
+            return
+        if self._spool is not None:
+            self._spool.write(text)
+        parts = text.split('\n')
+        if len(parts) == 1:
+            # Sin '\n' solo se acumula: concatenar cada fragmento a _tail
+            # copiaría la línea entera en cada escritura (cuadrático)
+            self._fragments.append(text)
+            return
+        parts[0] = self._current_tail() + parts[0]
+        self._tail = parts.pop()
+        overflow = len(self._lines) + len(parts) - self.max_lines
+        if overflow > 0:
+            self.dropped += overflow
+        self._lines.extend(parts)
+
+    def _current_tail(self):
+        """La línea en curso, uniendo (una sola vez) los fragmentos pendientes."""
+        if self._fragments:
+            self._fragments.insert(0, self._tail)
+            self._tail = "".join(self._fragments)
+            self._fragments.clear()
+        return self._tail
+
+    def clear(self):
+        self._lines.clear()
+        self._tail = ""
+        self._fragments.clear()
+        self.dropped = 0
+        if self._spool is not None:
+            self._spool.seek(0)
+            self._spool.truncate()
+
+    def __len__(self):
+        """Líneas en memoria, contando la incompleta."""
+        return len(self._lines) + (1 if self._tail or self._fragments else 0)
+
+    @property
+    def total_lines(self):
+        return self.dropped + len(self)
+
+    def lines(self, start, count):
+        """Hasta count líneas desde la start-ésima de las que están en memoria."""
+        start = max(start, 0)
+        out = list(islice(self._lines, start, start + count))
+        tail = self._current_tail()
+        if tail and len(out) < count and start + len(out) == len(self._lines):
+            out.append(tail)
+        return out
+
+    def save(self, path):
+        """Escribe todo lo que se escribió desde el último clear() en path."""
+        with open(path, 'w', encoding='utf-8') as f:
+            if self._spool is None:
+                f.write("\n".join(self.lines(0, len(self))))
+                return
+            self._spool.flush()
+            self._spool.seek(0)
+            shutil.copyfileobj(self._spool, f)
+            self._spool.seek(0, os.SEEK_END)
+
+    def close(self):
+        if self._spool is not None:
+            self._spool.close()
+            self._spool = None
+
+
+class OutputConsole(ttk.Frame):
+    """
+    Consola de salida virtualizada.
+
+    Lo escrito va a un OutputBuffer y el tk.Text solo contiene las líneas que
+    entran en la ventana; la barra de desplazamiento recorre el buffer. Las
+    escrituras se acumulan y se muestran juntas cada FLUSH_MS, así que un
+    programa que escribe cientos de miles de líneas no bloquea la interfaz.
+    Acepta insert(tk.END, texto), delete(1.0, tk.END) y see(tk.END) como el
+    ScrolledText al que reemplaza.
+    """
+    FLUSH_MS = 50
+
+    def __init__(self, master, max_lines=100000, font=("Consolas", 11), **text_options):
+        super().__init__(master)
+        self.buffer = OutputBuffer(max_lines)
+        self.font = tkfont.Font(font=font)
+        self.text = tk.Text(self, wrap=tk.NONE, font=self.font, state='disabled', **text_options)
+        self.vbar = ttk.Scrollbar(self, orient=tk.VERTICAL, command=self._on_scrollbar)
+        self.xbar = ttk.Scrollbar(self, orient=tk.HORIZONTAL, command=self.text.xview)
+        self.text.config(xscrollcommand=self.xbar.set)
+        self.vbar.pack(side=tk.RIGHT, fill=tk.Y)
+        self.xbar.pack(side=tk.BOTTOM, fill=tk.X)
+        self.text.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        self.text.bind('<MouseWheel>', self._on_wheel)
+        self.text.bind('<Button-4>', lambda e: self._scroll_lines(-3))
+        self.text.bind('<Button-5>', lambda e: self._scroll_lines(3))
+        self.text.bind('<Configure>', lambda e: self._render())
+        self.top = 0          # primera línea visible (índice en el buffer)
+        self.follow = True    # pegado al final mientras llega salida
+        self._pending = None
+        self._dropped = 0     # buffer.dropped en el último render
+
+    # --- API compatible con el ScrolledText anterior ---
+    def insert(self, index, text):
+        self.buffer.write(str(text))
+        if self._pending is None:
+            self._pending = self.after(self.FLUSH_MS, self._flush)
+
+    def delete(self, start=None, end=None):
+        self.buffer.clear()
+        self.top = self._dropped = 0
+        self.follow = True
+        self._render()
+
+    def see(self, index):
+        self.follow = True
+        if self._pending is None:
+            self._pending = self.after(self.FLUSH_MS, self._flush)
+
+    def save(self, path):
+        self.buffer.save(path)
+
+    def destroy(self):
+        self.buffer.close()
+        super().destroy()
+
+    # --- Vista ---
+    def _rows(self):
+        return max(1, self.text.winfo_height() // self.font.metrics('linespace'))
+
+    def _flush(self):
+        self._pending = None
+        self._render()
+
+    def _render(self):
+        rows = self._rows()
+        total = len(self.buffer)
+        # Las líneas que salieron del buffer desplazan la vista hacia arriba
+        self.top -= self.buffer.dropped - self._dropped
+        self._dropped = self.buffer.dropped
+        if self.follow:
+            self.top = max(0, total - rows)
+        self.top = max(0, min(self.top, max(0, total - rows)))
+        self.text.config(state='normal')
+        self.text.delete('1.0', tk.END)
+        self.text.insert('1.0', "\n".join(self.buffer.lines(self.top, rows)))
+        self.text.config(state='disabled')
+        if total:
+            self.vbar.set(self.top / total, min(1.0, (self.top + rows) / total))
+        else:
+            self.vbar.set(0.0, 1.0)
+
+    def _scroll_lines(self, n):
+        rows = self._rows()
+        self.top += n
+        self.follow = self.top >= len(self.buffer) - rows
+        self._render()
+        return "break"
+
+    def _on_wheel(self, event):
+        return self._scroll_lines(-3 if event.delta > 0 else 3)
+
+    def _on_scrollbar(self, action, amount, unit=None):
+        rows = self._rows()
+        if action == 'moveto':
+            self.top = int(float(amount) * len(self.buffer))
+            self.follow = self.top >= len(self.buffer) - rows
+            self._render()
+        else:
+            self._scroll_lines(int(amount) * (rows if unit == 'pages' else 1))
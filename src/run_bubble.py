@@ -4,8 +4,7 @@ import os
 # Add src to path
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
-from compiler.lexer import Lexer, Token
-from compiler.parser import Parser
+from compiler.compilation_unit import CompilationUnit
 from compiler.interpreter import Interpreter
 
 def run_test():
@@ -24,25 +23,22 @@ def run_test():
     print(source_code)
     print("-------------------")
 
+    # Tokens y AST salen de la misma unidad: el Parser no vuelve a leer el texto
+    unit = CompilationUnit(source_code)
+
     print("\n[0] Token Debugging...")
-    lexer = Lexer(source_code)
-    while True:
-        token = lexer.next_token()
+    for token in unit.tokens:
         print(token)
-        if token.type == Token.Type.Fin:
-            break
 
     print("\n[1] Lexical Analysis & Parsing...")
     try:
-        lexer = Lexer(source_code)
-        parser = Parser(lexer)
-        ast = parser.parse()
+        ast = unit.ast
         print("Parsing successful!")
     except Exception as e:
         print(f"Parsing Failed: {e}")
         # Print current token if possible (accessing internal state)
         try:
-            print(f"Current Token in Parser: {parser.token_actual}")
+            print(f"Current Token in Parser: {unit.parser.token_actual}")
         except:
             pass
         import traceback
@@ -4,8 +4,7 @@ import os
 # Add src to path
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
-from compiler.lexer import Lexer
-from compiler.parser import Parser
+from compiler.compilation_unit import CompilationUnit
 from compiler.interpreter import Interpreter
 
 def run_test():
@@ -21,9 +20,7 @@ def run_test():
 
     print("\n[1] Lexical Analysis & Parsing...")
     try:
-        lexer = Lexer(source_code)
-        parser = Parser(lexer)
-        ast = parser.parse()
+        ast = CompilationUnit(source_code).ast
         print("Parsing successful!")
     except Exception as e:
         print(f"Parsing Failed: {e}")
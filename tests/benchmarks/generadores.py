@@ -0,0 +1,89 @@
+"""
+Generadores de programas C++ parametrizados para los benchmarks.
+
+Cada generador recibe un tamaño n y devuelve el código fuente completo
+(int main() { ... }). expresion_larga además sirve de entrada directa para el
+Automata y para CodeGeneratorFromTree.
+"""
+
+
+def bubble_sort(n):
+    """Ordena un arreglo de n elementos en orden inverso (peor caso)."""
+    valores = ", ".join(str(n - i) for i in range(n))
+    return f"""int main() {{
+    int numeros[] = {{{valores}}};
+    int n = sizeof(numeros) / sizeof(numeros[0]);
+    for (int i = 0; i < n - 1; i++) {{
+        for (int j = 0; j < n - i - 1; j++) {{
+            if (numeros[j] > numeros[j + 1]) {{
+                int temporal = numeros[j];
+                numeros[j] = numeros[j + 1];
+                numeros[j + 1] = temporal;
+            }}
+        }}
+    }}
+    for (int i = 0; i < n; i++) {{
+        cout << numeros[i] << " ";
+    }}
+}}"""
+
+
+def anidamiento(n):
+    """n niveles de while/if anidados alrededor de un contador."""
+    abre, cierra = [], []
+    for k in range(n):
+        sangria = "    " * (k + 1)
+        if k % 2 == 0:
+            abre.append(f"{sangria}int c{k} = 0;\n{sangria}while (c{k} < 1) {{\n{sangria}    c{k}++;")
+        else:
+            abre.append(f"{sangria}if (c{k - 1} == 1) {{")
+        cierra.append(f"{sangria}}}")
+    cuerpo = "    " * (n + 1) + "total = total + 1;"
+    return ("int main() {\n    int total = 0;\n" + "\n".join(abre) + "\n" + cuerpo + "\n"
+            + "\n".join(reversed(cierra)) + "\n    cout << total;\n}")
+
+
+def expresion(n):
+    """Expresión aritmética de n términos con precedencias y paréntesis mezclados."""
+    ops = ("+", "-", "*", "+", "/")
+    partes = []
+    for k in range(n):
+        termino = f"({k % 9 + 1} * x)" if k % 4 == 3 else str(k % 9 + 1)
+        partes.append(termino if k == 0 else f"{ops[k % len(ops)]} {termino}")
+    return " ".join(partes)
+
+
+def expresion_larga(n):
+    return f"int main() {{\n    float x = 2;\n    float r = 0;\n    r = {expresion(n)};\n    cout << r;\n}}"
+
+
+def declaraciones(n):
+    """n declaraciones con inicialización y una suma final de todas."""
+    decl = "\n".join(f"    int v{k} = {k} + 1;" for k in range(n))
+    suma = " + ".join(f"v{k}" for k in range(min(n, 200)))
+    return f"int main() {{\n{decl}\n    int total = {suma};\n    cout << total;\n}}"
+
+
+def switch_grande(n):
+    """switch de n casos evaluado para cada valor 0..n-1."""
+    casos = "\n".join(f"            case {k}: total = total + {k}; break;" for k in range(n))
+    return f"""int main() {{
+    int total = 0;
+    for (int i = 0; i < {n}; i++) {{
+        switch (i) {{
+{casos}
+            default: total = total - 1;
+        }}
+    }}
+    cout << total;
+}}"""
+
+
+# nombre -> (generador, tamaño por defecto, tamaño rápido)
+WORKLOADS = {
+    "bubble_sort": (bubble_sort, 60, 12),
+    "anidamiento": (anidamiento, 60, 8),
+    "expresion": (expresion_larga, 2000, 100),
+    "declaraciones": (declaraciones, 1500, 50),
+    "switch": (switch_grande, 400, 20),
+}
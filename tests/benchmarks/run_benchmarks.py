@@ -0,0 +1,287 @@
+"""
+Benchmarks por etapa del compilador sobre programas generados.
+
+Para cada workload de generadores.py mide por separado Lexer, Parser,
+SemanticAnalyzer, Interpreter, Automata y CodeGeneratorFromTree: el mejor
+tiempo de varias repeticiones, el throughput (unidades procesadas por
+segundo) y el pico de memoria con tracemalloc (en una corrida aparte, para no
+inflar los tiempos).
+
+Uso:
+    python tests/benchmarks/run_benchmarks.py --save         # guarda la baseline de esta máquina
+    python tests/benchmarks/run_benchmarks.py                # corre y compara con esa baseline
+    python tests/benchmarks/run_benchmarks.py --quick        # tamaños chicos (humo)
+    python tests/benchmarks/run_benchmarks.py --tolerance 0.5 --only bubble_sort,switch
+
+Los tiempos absolutos solo valen en la máquina donde se midieron, así que la
+baseline no se versiona: baseline.json es local (está en .gitignore) y se
+crea con --save antes de empezar a cambiar código. Sin baseline, o si la
+baseline se guardó en otra máquina u otra versión de Python, no se compara.
+Cada corrida mide además una carga de calibración fija (Python puro) y los
+tiempos se comparan relativos a ella, para que una máquina más cargada o más
+lenta en ese momento no parezca una regresión.
+
+Sale con código 1 si alguna medición empeoró más que la tolerancia respecto
+de la baseline.
+"""
+import argparse
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(os.path.abspath(os.path.join(HERE, '..', '..', 'src')))
+sys.path.append(HERE)
+
+from compiler.lexer import Lexer, Token
+from compiler.parser import Parser
+from compiler.semantics import SemanticAnalyzer
+from compiler.interpreter import Interpreter
+from compiler import automata as automata_mod
+from compiler.automata import Automata
+from compiler.code_generator import CodeGeneratorFromTree
+from generadores import WORKLOADS, expresion
+
+BASELINE = os.path.join(HERE, 'baseline.json')
+# 2: baseline local con host y tiempo de calibración
+FORMAT_VERSION = 2
+
+
+class _StepCounter(Interpreter):
+    def __init__(self):
+        super().__init__(output_callback=lambda msg: None)
+        self.steps = 0
+
+    def visit(self, node):
+        self.steps += 1
+        return Interpreter.visit(self, node)
+
+    def _generador(self, node):
+        self.steps += 1
+        return Interpreter._generador(self, node)
+
+
+def _count_tokens(source):
+    lexer, n = Lexer(source), 0
+    while lexer.next_token().type != Token.Type.Fin:
+        n += 1
+    return n
+
+
+def _count_nodes(ast):
+    n, stack = 0, [ast]
+    while stack:
+        node = stack.pop()
+        n += 1
+        stack.extend(node.children())
+    return n
+
+
+def _stages(name, source, size):
+    """
+    Etapas a medir para un workload: nombre -> (función sin argumentos,
+    unidades que procesa, nombre de la unidad).
+    """
+    ast = Parser(Lexer(source)).parse()
+    counter = _StepCounter()
+    counter.interpret(Parser(Lexer(source)).parse())
+
+    def lex():
+        lexer = Lexer(source)
+        while lexer.next_token().type != Token.Type.Fin:
+            pass
+
+    def semantic():
+        SemanticAnalyzer().analizar(source)
+
+    def run():
+        Interpreter(output_callback=lambda msg: None).interpret(Parser(Lexer(source)).parse())
+
+    stages = {
+        "Lexer": (lex, _count_tokens(source), "tokens"),
+        "Parser": (lambda: Parser(Lexer(source)).parse(), _count_nodes(ast), "nodos"),
+        "SemanticAnalyzer": (semantic, source.count("\n") + 1, "líneas"),
+        "Interpreter": (run, counter.steps, "pasos"),
+    }
+    if name == "expresion":
+        expr = expresion(size)
+        tree = Parser(Lexer(f"r = {expr}")).parse().right
+        out = os.path.join(tempfile.gettempdir(), "bench_codegen.obj")
+        automata = Automata()
+
+        def analizar():
+            # Sin la caché de compilación: se mide el análisis completo
+            automata_mod._compilar.cache_clear()
+            automata.analizar(expr, derivaciones=False)
+
+        stages["Automata"] = (analizar, len(automata.tokenize(expr)), "tokens")
+        stages["CodeGeneratorFromTree"] = (lambda: CodeGeneratorFromTree().generate_from_tree(tree, out),
+                                           _count_nodes(tree), "nodos")
+    return stages
+
+
+def _calibration_workload():
+    # Lo que hacen las etapas: llamadas, atributos, dicts y listas de Python
+    env, items = {}, []
+    for i in range(20000):
+        key = f"v{i % 97}"
+        env[key] = env.get(key, 0) + i
+        items.append((key, i & 7))
+    items.sort()
+    return len(items)
+
+
+def calibrate(repeat=5):
+    """Segundos (mejor de `repeat`) de una carga fija: la escala de tiempos de esta corrida."""
+    return _measure(_calibration_workload, repeat, memory=False)[0]
+
+
+def _measure(fn, repeat, memory=True):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    if not memory:
+        return best, None
+    tracemalloc.start()
+    try:
+        fn()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return best, peak
+
+
+def run_benchmarks(quick=False, repeat=3, only=None, log=print):
+    """Devuelve {'workload/etapa': {time, peak_kb, units, unit, throughput, size}}."""
+    results = {}
+    for name, (generator, size, quick_size) in WORKLOADS.items():
+        if only and name not in only:
+            continue
+        n = quick_size if quick else size
+        source = generator(n)
+        for stage, (fn, units, unit) in _stages(name, source, n).items():
+            key = f"{name}/{stage}"
+            try:
+                seconds, peak = _measure(fn, repeat)
+            except Exception as e:
+                results[key] = {"error": f"{type(e).__name__}: {e}", "size": n}
+                log(f"{key:<36} ERROR {results[key]['error']}")
+                continue
+            results[key] = {
+                "time": seconds,
+                "peak_kb": peak / 1024,
+                "units": units,
+                "unit": unit,
+                "throughput": units / seconds if seconds > 0 else float("inf"),
+                "size": n,
+            }
+            log(f"{key:<36} {seconds * 1000:>10.2f} ms {units / max(seconds, 1e-12):>14,.0f} {unit}/s"
+                f" {peak / 1024:>10.1f} KiB")
+    return results
+
+
+def compare(results, baseline, tolerance=0.25, calibration=None):
+    """
+    Lista de regresiones (clave, métrica, baseline, actual): tiempo o pico de
+    memoria más de `tolerance` por encima de la baseline, o una etapa que
+    antes funcionaba y ahora falla. Solo se comparan mediciones del mismo tamaño.
+    Si se pasa la calibración de esta corrida y la baseline tiene la suya, los
+    tiempos actuales se llevan a la escala de la baseline antes de comparar.
+    """
+    scale = 1.0
+    if calibration and baseline.get("calibration"):
+        scale = baseline["calibration"] / calibration
+    regressions = []
+    for key, base in baseline.get("results", {}).items():
+        cur = results.get(key)
+        if cur is None or cur.get("size") != base.get("size"):
+            continue
+        if "error" in cur and "error" not in base:
+            regressions.append((key, "error", None, cur["error"]))
+            continue
+        if "error" in cur or "error" in base:
+            continue
+        for metric, factor in (("time", scale), ("peak_kb", 1.0)):
+            value = cur[metric] * factor
+            if value > base[metric] * (1 + tolerance):
+                regressions.append((key, metric, base[metric], value))
+    return regressions
+
+
+def _host():
+    return {"host": platform.node(), "python": platform.python_version(), "machine": platform.machine()}
+
+
+def foreign_baseline(baseline):
+    """Motivo por el que la baseline no es de esta máquina (None si lo es)."""
+    for field, value in _host().items():
+        if baseline.get(field) != value:
+            return f"{field} {baseline.get(field)!r} != {value!r}"
+    return None
+
+
+def save_baseline(results, path=BASELINE, calibration=None):
+    data = dict(_host(), version=FORMAT_VERSION, calibration=calibration, results=results)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=2, sort_keys=True)
+
+
+def load_baseline(path=BASELINE):
+    with open(path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    if data.get("version") != FORMAT_VERSION:
+        raise ValueError(f"Baseline con versión {data.get('version')}, se esperaba {FORMAT_VERSION}")
+    return data
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Benchmarks por etapa del compilador")
+    ap.add_argument("--quick", action="store_true", help="tamaños chicos, para probar el harness")
+    ap.add_argument("--repeat", type=int, default=3)
+    ap.add_argument("--only", help="workloads separados por coma")
+    ap.add_argument("--baseline", default=BASELINE)
+    ap.add_argument("--save", action="store_true", help="guardar los resultados como baseline")
+    ap.add_argument("--tolerance", type=float, default=0.25)
+    ap.add_argument("--json", help="escribir también los resultados en este archivo")
+    args = ap.parse_args(argv)
+
+    only = set(args.only.split(",")) if args.only else None
+    calibration = calibrate()
+    results = run_benchmarks(quick=args.quick, repeat=args.repeat, only=only)
+    if args.json:
+        save_baseline(results, args.json, calibration)
+    if args.save:
+        save_baseline(results, args.baseline, calibration)
+        print(f"Baseline de esta máquina guardada en {args.baseline}")
+        return 0
+    if not os.path.exists(args.baseline):
+        print("Sin baseline local para comparar (use --save en esta máquina antes de los cambios)")
+        return 0
+    try:
+        baseline = load_baseline(args.baseline)
+    except ValueError as e:
+        print(f"{e}; no se compara (vuelva a guardarla con --save)")
+        return 0
+    otra = foreign_baseline(baseline)
+    if otra:
+        print(f"La baseline es de otra máquina ({otra}); no se compara (use --save)")
+        return 0
+    regressions = compare(results, baseline, args.tolerance, calibration)
+    for key, metric, base, cur in regressions:
+        if metric == "error":
+            print(f"REGRESIÓN {key}: ahora falla ({cur})")
+        else:
+            print(f"REGRESIÓN {key} {metric}: {base:.4g} -> {cur:.4g} (+{(cur / base - 1) * 100:.0f}%)")
+    if not regressions:
+        print(f"Sin regresiones (tolerancia {args.tolerance:.0%})")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,164 @@
+"""
+Pruebas diferenciales entre backends.
+
+Ejecuta cada programa con todos los backends que ejecutan (tree-walker,
+closures, bytecode, python...) y compara su estado y su salida con la del
+tree-walker, que es la referencia. Por cada programa muestra el tiempo de
+codegen y de ejecución de cada backend (el mejor de --repeat corridas) y, al
+final, el total por backend y su aceleración respecto de la referencia.
+
+Programas: los .cpp y bubble_sort*.txt de tests/, cada CASO de tests/data/*.txt,
+los workloads de tests/benchmarks/generadores.py (tamaño rápido) y los casos
+de RECURSION (recursión profunda y desbordamiento de pila), o los archivos que
+se pasen como argumento.
+
+Uso:
+    python tests/run_differential.py                       # todos los programas
+    python tests/run_differential.py prog.cpp otro.cpp     # solo estos archivos
+    python tests/run_differential.py --repeat 5 --backend closures --backend bytecode
+
+Como el botón Ejecutar de la GUI, los errores semánticos son avisos (salvo
+con --strict). Sale con código 1 si algún backend difiere de la referencia.
+"""
+import argparse
+import glob
+import os
+import sys
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(os.path.abspath(os.path.join(HERE, '..', 'src')))
+sys.path.append(os.path.join(HERE, 'benchmarks'))
+
+from compiler.backends import DEFAULT_BACKEND, available_backends
+from compiler.compilation_unit import CompilationUnit
+from compiler.compiler import Compiler
+from compiler.interpreter import Interpreter
+from generadores import WORKLOADS
+
+_DOWN = """int down(int n) {
+    if (n == 0) { return 0; }
+    return 1 + down(n - 1);
+}
+int main() {
+    cout << down(%d);
+}"""
+
+# Recursión más profunda que el límite de Python y justo en el de llamadas
+RECURSION = {
+    "recursion(3000)": _DOWN % 3000,
+    "recursion(límite)": _DOWN % (Interpreter.MAX_CALL_DEPTH - 1),
+    "desbordamiento": _DOWN % Interpreter.MAX_CALL_DEPTH,
+}
+
+
+def _casos(path):
+    """Los CASO de un archivo de tests/data, como en verify_arrays.py."""
+    with open(path, encoding='utf-8') as f:
+        bloques = f.read().split('// CASO')
+    for bloque in bloques[1:]:
+        lineas = bloque.strip().splitlines()
+        codigo, en_codigo = [], False
+        for linea in lineas:
+            if "int main()" in linea:
+                en_codigo = True
+            if "// SALIDA ESPERADA:" in linea:
+                en_codigo = False
+            if en_codigo:
+                codigo.append(linea.replace('/*', '').replace('*/', ''))
+        if codigo:
+            yield f"{os.path.basename(path)} CASO {lineas[0].strip()}", "\n".join(codigo).strip()
+
+
+def programas(archivos=None):
+    """(nombre, código) de cada programa a comparar."""
+    if archivos:
+        for path in archivos:
+            with open(path, encoding='utf-8') as f:
+                yield os.path.basename(path), f.read()
+        return
+    for path in sorted(glob.glob(os.path.join(HERE, '*.cpp'))
+                       + glob.glob(os.path.join(HERE, 'bubble_sort*.txt'))):
+        with open(path, encoding='utf-8') as f:
+            yield os.path.basename(path), f.read()
+    for path in sorted(glob.glob(os.path.join(HERE, 'data', '*.txt'))):
+        yield from _casos(path)
+    for nombre, (generador, _, rapido) in WORKLOADS.items():
+        yield f"{nombre}({rapido})", generador(rapido)
+    yield from RECURSION.items()
+
+
+def comparar(codigo, backends=None, repeat=1, strict=False):
+    """
+    compare() del Compiler repetido: cada corrida usa una CompilationUnit
+    nueva (para medir también el codegen) y se queda con el mejor tiempo de
+    cada fase. Devuelve la comparación de la primera corrida con
+    res["best"] = {"codegen": s, "execution": s} en cada resultado.
+    """
+    comparacion = None
+    for _ in range(max(1, repeat)):
+        actual = Compiler().compare(CompilationUnit(codigo), backends=backends, strict=strict)
+        if comparacion is None:
+            comparacion = actual
+            for res in comparacion["results"].values():
+                res["best"] = {}
+        for name, res in actual["results"].items():
+            best = comparacion["results"][name]["best"]
+            for fase in ("codegen", "execution"):
+                if fase in res["metrics"]:
+                    t = res["metrics"][fase]["time"]
+                    best[fase] = min(best.get(fase, t), t)
+    return comparacion
+
+
+def _ms(segundos):
+    return f"{segundos * 1000:9.2f}" if segundos is not None else f"{'-':>9}"
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compara la salida y el tiempo de todos los backends.")
+    parser.add_argument("archivos", nargs="*", help="programas a comparar (por defecto, los de tests/)")
+    parser.add_argument("--backend", "-b", action="append", choices=available_backends(executable=True),
+                        help="backend a comparar con la referencia (repetible; por defecto todos)")
+    parser.add_argument("--repeat", type=int, default=1, help="corridas por programa (mejor tiempo)")
+    parser.add_argument("--strict", action="store_true",
+                        help="no ejecuta si el análisis semántico encuentra errores")
+    args = parser.parse_args(argv)
+
+    totales = {}   # backend -> segundos de ejecución
+    diferencias = []
+    for nombre, codigo in programas(args.archivos):
+        comparacion = comparar(codigo, args.backend, args.repeat, args.strict)
+        print(f"\n== {nombre}")
+        print(f"   {'backend':12} {'estado':8} {'codegen ms':>10} {'ejec. ms':>9}  veredicto")
+        for name, res in comparacion["results"].items():
+            if name == comparacion["reference"]:
+                veredicto = "referencia"
+            elif name in comparacion["mismatches"]:
+                veredicto = "DIFIERE"
+                diferencias.append((nombre, name, res, comparacion["results"][comparacion["reference"]]))
+            else:
+                veredicto = "igual"
+            ejecucion = res["best"].get("execution")
+            if ejecucion is not None:
+                totales[name] = totales.get(name, 0.0) + ejecucion
+            print(f"   {name:12} {res['status']:8} {_ms(res['best'].get('codegen')):>10} "
+                  f"{_ms(ejecucion)}  {veredicto}")
+
+    print(f"\n{'='*20} Totales de ejecución {'='*20}")
+    referencia = totales.get(DEFAULT_BACKEND)
+    for name, total in totales.items():
+        aceleracion = f"x{referencia / total:.2f}" if referencia and total else "-"
+        print(f"   {name:12} {_ms(total)} ms  {aceleracion}")
+
+    for nombre, name, res, ref in diferencias:
+        print(f"\nDIFIERE {nombre} [{name}]")
+        print(f"   referencia: {ref['status']} {ref['output']!r} {ref['errors']}")
+        print(f"   {name}: {res['status']} {res['output']!r} {res['errors']}")
+    if diferencias:
+        return 1
+    print("\nSUCCESS: todos los backends coinciden con la referencia")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -5,8 +5,7 @@ import glob
 # Add src to path
 sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src'))
 
-from compiler.lexer import Lexer
-from compiler.parser import Parser
+from compiler.compilation_unit import CompilationUnit
 from compiler.interpreter import Interpreter
 
 def run_test(file_path):
@@ -24,9 +23,7 @@ def run_test(file_path):
 
     print("\n[1] Parsing...")
     try:
-        lexer = Lexer(source_code)
-        parser = Parser(lexer)
-        ast = parser.parse()
+        ast = CompilationUnit(source_code).ast
         print("Parsing successful!")
     except Exception as e:
         print(f"Parsing Failed: {e}")
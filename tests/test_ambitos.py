@@ -0,0 +1,159 @@
+import sys
+import os
+
+# Add src to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+from compiler.symbol_table import TablaSimbolos
+from compiler.lexer import Lexer
+from compiler.parser import Parser
+from compiler.interpreter import Interpreter
+from compiler.semantics import SemanticAnalyzer
+
+
+def test_shadowing_and_restore():
+    tabla = TablaSimbolos()
+    tabla.insertar("x", "variable", "int", 1)
+    tabla.entrar_ambito()
+    assert tabla.nivel == 1 and not tabla.en_ambito_actual("x")
+    tabla.insertar("x", "variable", "float", 2.5)
+    tabla.insertar("y", "variable", "int", 3)
+    assert tabla.buscar("x")["valor"] == 2.5
+    tabla.salir_ambito()
+    assert tabla.buscar("x")["valor"] == 1
+    assert not tabla.existe("y") and tabla.buscar("y") is None
+    try:
+        tabla.salir_ambito()
+        assert False, "no hay ámbito que cerrar"
+    except RuntimeError:
+        pass
+
+
+def test_redeclaration_only_in_same_scope():
+    tabla = TablaSimbolos()
+    tabla.insertar("i", "variable", "int")
+    try:
+        tabla.insertar("i", "variable", "int")
+        assert False, "redeclaración en el mismo ámbito"
+    except ValueError as e:
+        assert "'i' ya fue declarado" in str(e)
+    tabla.entrar_ambito()
+    tabla.insertar("i", "variable", "int")
+
+
+def test_slots_reused_by_sibling_scopes():
+    tabla = TablaSimbolos()
+    a = tabla.insertar("a", "variable", "int")
+    for _ in range(2):
+        tabla.entrar_ambito()
+        b = tabla.insertar("b", "variable", "int")
+        c = tabla.insertar("c", "variable", "int")
+        tabla.salir_ambito()
+        assert (a["direccion"], b["direccion"], c["direccion"]) == (0, 1, 2)
+    assert tabla.tamano_marco == 3
+    # Los nombres quedan internados
+    nombre = "".join(["va", "lor"])
+    tabla.insertar(nombre, "variable", "int")
+    assert next(n for n in tabla.tabla if n == "valor") is sys.intern("valor")
+
+
+def run(code):
+    output = []
+    interp = Interpreter(output_callback=output.append)
+    interp.interpret(Parser(Lexer(code)).parse())
+    return "".join(str(o) for o in output), interp
+
+
+def test_interpreter_block_scopes():
+    out, interp = run("""int main() {
+    int x = 1;
+    if (x == 1) {
+        int x = 5;
+        int tmp = x * 2;
+        cout << x << tmp;
+    }
+    for (int i = 0; i < 2; i++) { int x = i; }
+    cout << x;
+}""")
+    assert out == "5101"
+    assert interp.environment["x"] == 1
+    assert "tmp" not in interp.environment and "i" not in interp.environment
+    # Asignar (sin declarar) dentro del bloque sigue modificando la externa
+    out, _ = run("int main() {\n int s = 0;\n while (s < 3) { s = s + 1; }\n cout << s;\n}")
+    assert out == "3"
+
+
+def test_sequential_for_loops_pass_semantics():
+    code = """int main() {
+    for (int i = 0; i < 3; i++) {
+        cout << i;
+    }
+    for (int i = 0; i < 2; i++) { cout << i; }
+}"""
+    resultado = SemanticAnalyzer().analizar(code)
+    assert resultado["errores"] == []
+
+
+def test_function_locals_and_block_scopes_in_semantics():
+    # Los locales de una función no son visibles en main
+    code = """int sq(int x) {
+    int r = x * x;
+    return r;
+}
+int main() {
+    r = 5;
+    cout << r;
+}"""
+    resultado = SemanticAnalyzer().analizar(code)
+    assert "Error: variable 'r' usada sin declarar." in resultado["errores"]
+    # Bloques hermanos con la misma variable y una declaración que oculta a la externa
+    code = """int main() {
+    int x = 1;
+    if (x == 1) {
+        int t = 2;
+        int x = 3;
+    }
+    if (x == 1) {
+        int t = 4;
+    } else {
+        int t = 5;
+    }
+    for (int i = 0; i < 2; i++) {
+        int t = i;
+    }
+    cout << x;
+}"""
+    resultado = SemanticAnalyzer().analizar(code)
+    assert resultado["errores"] == []
+    # Redeclarar en el mismo ámbito sigue siendo un error
+    resultado = SemanticAnalyzer().analizar("int main() {\n int a = 1;\n int a = 2;\n}")
+    assert resultado["errores"] == ["Error semántico: 'a' ya fue declarado."]
+
+
+def test_all_declarations_are_recorded():
+    code = """int f(int a) {
+    int b = a;
+    return b;
+}
+int main() {
+    int n = 3;
+    for (int i = 0; i < n; i++) {
+        int t = i;
+    }
+}"""
+    tabla = SemanticAnalyzer().analizar(code)["tabla"]
+    # Al final solo queda visible lo global; todas() conserva cada declaración
+    assert list(tabla.tabla) == ["f"]
+    assert [nombre for nombre, _ in tabla.todas()] == ["f", "a", "b", "n", "i", "t"]
+    assert "t -> " in repr(tabla)
+
+
+if __name__ == "__main__":
+    test_shadowing_and_restore()
+    test_redeclaration_only_in_same_scope()
+    test_slots_reused_by_sibling_scopes()
+    test_interpreter_block_scopes()
+    test_sequential_for_loops_pass_semantics()
+    test_function_locals_and_block_scopes_in_semantics()
+    test_all_declarations_are_recorded()
+    print("SUCCESS: Scoped symbol table verified!")
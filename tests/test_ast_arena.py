@@ -0,0 +1,148 @@
+import sys
+import os
+import pickle
+import tempfile
+
+# Add src to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+from compiler import ast_nodes
+from compiler.lexer import Lexer
+from compiler.parser import Parser, ErroresSintacticos
+from compiler.semantics import SemanticAnalyzer
+from compiler.interpreter import Interpreter
+from compiler.code_generator import CodeGeneratorFromTree
+from compiler.ast_arena import AstArena, BLOCK, DECL, NIL
+
+BUBBLE = os.path.join(os.path.dirname(__file__), 'bubble_sort_cpp.txt')
+
+
+def dump(ast):
+    lines = []
+    ast.print_tree(output_func=lines.append)
+    return lines
+
+
+def run(ast):
+    output = []
+    Interpreter(output_callback=output.append).interpret(ast)
+    return "".join(output)
+
+
+def test_roundtrip_preserves_program():
+    with open(BUBBLE, 'r', encoding='utf-8') as f:
+        code = f.read()
+    tree = Parser(Lexer(code)).parse()
+    arena = Parser(Lexer(code)).parse_arena()
+    assert arena.kind[arena.root] == BLOCK
+    assert dump(arena.to_tree()) == dump(tree)
+    assert run(arena) == run(tree)
+
+
+def test_arena_columns_and_shared_tokens():
+    arena = Parser(Lexer("int main() {\nint a[] = {1, 2}, b;\na[0] = 3;\na[1] = 4;\n}")).parse_arena()
+    decl = arena.first_child[arena.root]
+    assert arena.kind[decl] == DECL
+    (a_name, a_size, a_init), (b_name, b_size, b_init) = arena.payload[decl]
+    assert (a_name, a_size, b_name, b_init) == ('a', 2, 'b', NIL)
+    assert [arena.value_of(i) for i in a_init] == [1, 2]
+    assert arena.children(decl) == list(a_init)
+    # Los dos '=' sintetizados por el Parser comparten una sola entrada
+    assert sum(1 for t in arena.tokens if t.value == '=') == 1
+
+
+def test_pickle_and_code_generation_from_arena():
+    tree = Parser(Lexer("x = (a + 3) * - b")).parse()
+    arena = pickle.loads(pickle.dumps(AstArena.from_tree(tree.right)))
+    assert len(arena) == 6
+    cg = CodeGeneratorFromTree()
+    with tempfile.TemporaryDirectory() as tmp:
+        with open(cg.generate_from_tree(tree.right, os.path.join(tmp, "t.obj"))) as f:
+            esperado = f.read()
+        with open(cg.generate_from_tree(arena, os.path.join(tmp, "a.obj"))) as f:
+            assert f.read() == esperado
+
+
+PROGRAMA = """int doble(int x) {
+    return x * 2;
+}
+int main() {
+    int v[] = {3, -1, 4};
+    float r = 2.5;
+    for (int i = 0; i < 3; i++) {
+        switch (v[i]) {
+            case -1: cout << "menos " << i; break;
+            case 3: cout << doble(v[i]) << " ";
+            default: r = r * -i;
+        }
+        if (i == 0) { r = r + 1; } else if (i == 1) { r = r - 0.5; } else { break; }
+    }
+    (i++; i < 2; int i = 0) for { cout << (r + i); }
+    cout << sizeof(v);
+}"""
+
+
+def test_parser_emits_arena_without_tree_nodes():
+    llamadas = []
+    original = ast_nodes.TreeNode.__init__
+
+    def contar(self, token, *hijos):
+        llamadas.append(token)
+        original(self, token, *hijos)
+    ast_nodes.TreeNode.__init__ = contar
+    try:
+        arena = Parser(Lexer(PROGRAMA)).parse_arena()
+    finally:
+        ast_nodes.TreeNode.__init__ = original
+    assert llamadas == []
+    arena.validate()
+    tree = Parser(Lexer(PROGRAMA)).parse()
+    assert dump(arena.to_tree()) == dump(tree)
+    assert run(arena) == run(tree)
+    assert len(arena) == len(AstArena.from_tree(tree))
+
+
+def test_arena_discards_failed_and_speculative_nodes():
+    # El paréntesis largo se intenta como cabecera de '( ... ) for' y se
+    # descarta; las sentencias con error tampoco dejan filas sueltas
+    largo = " + ".join(["x"] * 20)
+    code = f"int main() {{\n int x = 1;\n ({largo});\n x = (1 + ;\n switch (x) {{ case 1: x = 2; }}\n}}"
+    parser = Parser(Lexer(code))
+    try:
+        parser.parse_arena()
+        assert False, "se esperaba un error sintáctico"
+    except ErroresSintacticos as e:
+        arena = e.ast
+    assert parser.backtracks == 1 and len(parser.errores) == 1
+    arena.validate()
+    assert len(arena.children(arena.root)) == 3
+    assert parser.nodes is ast_nodes.TREE_NODES
+
+
+def test_semantic_pass_reads_the_arena():
+    code = "int main() {\n int a = 0;\n int z = a;\n int x = 1;\n x = 5 / z;\n y = x;\n}"
+    arena = Parser(Lexer(code)).parse_arena()
+    errores = SemanticAnalyzer().analizar(code, arena)["errores"]
+    assert errores == SemanticAnalyzer().analizar(code)["errores"] == [
+        "Error: división por cero en 'x = 5 / z;' (variable 'z' con valor 0)",
+        "Error: variable 'y' usada sin declarar."]
+
+
+def test_deep_tree_roundtrip():
+    n = 20000
+    tree = Parser(Lexer("x = " + " + ".join(["1"] * n))).parse()
+    arena = AstArena.from_tree(tree)
+    assert len(arena) == 2 * n + 1
+    copia = arena.to_tree()
+    assert AstArena.from_tree(copia).token == arena.token
+
+
+if __name__ == "__main__":
+    test_roundtrip_preserves_program()
+    test_arena_columns_and_shared_tokens()
+    test_pickle_and_code_generation_from_arena()
+    test_parser_emits_arena_without_tree_nodes()
+    test_arena_discards_failed_and_speculative_nodes()
+    test_semantic_pass_reads_the_arena()
+    test_deep_tree_roundtrip()
+    print("SUCCESS: AST arena verified!")
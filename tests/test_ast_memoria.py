@@ -0,0 +1,79 @@
+import sys
+import os
+import tracemalloc
+
+# Add src to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+from compiler.lexer import Lexer, Token
+from compiler.parser import Parser
+from compiler.ast_nodes import TreeNode, BlockNode, DeclarationNode, Node, BLOCK_TOKEN, ASSIGN_TOKEN
+from compiler.interpreter import Interpreter
+
+
+def programa(n):
+    body = "\n".join(f"int v{i} = {i} + {i} * 2;\nv{i} = v{i} - 1;" for i in range(n))
+    return "int main() {\n" + body + "\n}"
+
+
+def contar_nodos(ast):
+    n, stack = 0, [ast]
+    while stack:
+        node = stack.pop()
+        n += 1
+        stack.extend(node.children())
+    return n
+
+
+def medir_bytes_por_nodo(n=3000):
+    """Memoria asignada al parsear (tokens + nodos + listas) dividida entre los nodos del AST."""
+    src = programa(n)
+    tracemalloc.start()
+    try:
+        ast = Parser(Lexer(src)).parse()
+        usados, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    nodos = contar_nodos(ast)
+    return nodos, usados / nodos
+
+
+def test_nodes_and_tokens_have_no_instance_dict():
+    for obj in (Token(Token.Type.Numero, '1'), TreeNode(BLOCK_TOKEN), BlockNode(),
+                DeclarationNode(Token(Token.Type.Tipo, 'int')), Node('+')):
+        assert not hasattr(obj, '__dict__'), type(obj).__name__
+
+
+def test_synthetic_tokens_are_shared():
+    ast = Parser(Lexer("int main() {\nint x = 0;\nx = 1;\nx = 2;\n}")).parse()
+    asignaciones = [s for s in ast.statements if s.token.type == Token.Type.Asign]
+    assert len(asignaciones) == 2
+    assert all(s.token is ASSIGN_TOKEN for s in asignaciones)
+    assert ast.token is BLOCK_TOKEN and BlockNode().token is BLOCK_TOKEN
+
+
+def test_memory_per_node_budget():
+    nodos, por_nodo = medir_bytes_por_nodo(500)
+    assert nodos == 500 * 11 + 1
+    # Con __dict__ por instancia rondaba los 300 bytes por nodo
+    assert por_nodo < 260, por_nodo
+
+
+def test_slotted_tree_still_runs():
+    out = []
+    ast = Parser(Lexer(programa(3)[:-1] + "cout << v2;\n}")).parse()
+    Interpreter(output_callback=out.append).interpret(ast)
+    assert "".join(out) == "5"
+    lines = []
+    ast.print_tree(output_func=lines.append)
+    assert lines[0] == "Block:"
+
+
+if __name__ == "__main__":
+    test_nodes_and_tokens_have_no_instance_dict()
+    test_synthetic_tokens_are_shared()
+    test_memory_per_node_budget()
+    test_slotted_tree_still_runs()
+    nodos, por_nodo = medir_bytes_por_nodo()
+    print(f"{nodos} nodos, {por_nodo:.1f} bytes/nodo")
+    print("SUCCESS: compact AST verified!")
@@ -0,0 +1,65 @@
+import sys
+import os
+
+# Add src to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+from compiler import automata as automata_mod
+from compiler.automata import Automata
+
+
+def test_compile_is_memoized_on_normalized_expression():
+    a = Automata()
+    c1 = a.compilar("  3 *  (x + 1)")
+    c2 = a.compilar("3 * (x + 1)   ")
+    assert c1 is c2
+    assert c1.rpn == ('3', 'x', '1', '+', '*')
+    assert isinstance(c1.tokens, tuple)
+    # Identifiers separated by spaces must not be merged by normalization
+    assert a.compilar("a b").tokens == ('a', 'b')
+
+
+def test_derivations_only_built_on_request():
+    automata_mod._derivaciones.cache_clear()
+    res = Automata().analizar("1 + 2 * 7", derivaciones=False)
+    assert 'derivations' not in res
+    assert res['final_result'] == 15.0
+    assert automata_mod._derivaciones.cache_info().currsize == 0
+
+    res = Automata().analizar("1 + 2 * 7")
+    assert res['derivations'] == [
+        "Terminal -> 1",
+        "Terminal -> 2",
+        "Terminal -> 7",
+        "Binary Expression -> 2 * 7",
+        "Binary Expression -> 1 + (2 * 7)",
+    ]
+
+
+def test_errors_are_cached_too():
+    a = Automata()
+    assert a.analizar("5 / 0")["error"] == "Error durante la evaluación: División por cero"
+    assert a.analizar("5 / 0")["error"] == "Error durante la evaluación: División por cero"
+    assert a.analizar("   ")["error"] == "No se encontraron tokens válidos."
+
+
+def test_returned_ast_is_not_shared():
+    a = Automata()
+    res = a.analizar("2 * (x + 3)")
+    ast = res['ast']
+    assert ast.op == '*' and ast.right.left.value == 'x' and ast.result is None
+    ast.right.left.value = '99'
+    ast.left = None
+    otra = a.analizar("2 * (x + 3)")
+    assert otra['ast'] is not ast and otra['ast'].left.value == '2'
+    assert otra['ast'].right.left.value == 'x'
+    assert a.compilar("2 * (x + 3)").ast.right.left.value == 'x'
+    assert otra['ast'].right.eval_order == 1 and otra['ast'].eval_order == 2
+
+
+if __name__ == "__main__":
+    test_compile_is_memoized_on_normalized_expression()
+    test_derivations_only_built_on_request()
+    test_errors_are_cached_too()
+    test_returned_ast_is_not_shared()
+    print("SUCCESS: Automata compile cache verified!")
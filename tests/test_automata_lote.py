@@ -0,0 +1,58 @@
+import sys
+import os
+
+# Add src to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+from compiler.automata import Automata
+
+try:
+    import numpy as np
+except ImportError:  # NumPy es opcional
+    np = None
+
+
+def test_batch_matches_scalar_evaluation():
+    if np is None:
+        print("SKIP: NumPy no instalado")
+        return
+    automata = Automata()
+    ev = automata.compilar_lote("(x + 2) * y - x / 4 ^ 2")
+    xs = np.array([1.0, -3.0, 8.0, 0.5])
+    ys = np.array([2.0, 0.0, -1.5, 10.0])
+    res = ev.evaluar({'x': xs, 'y': ys})
+    for i in range(len(xs)):
+        esperado = Automata().analizar(f"({xs[i]} + 2) * {ys[i]} - {xs[i]} / 4 ^ 2")['final_result']
+        assert abs(res.valores[i] - esperado) < 1e-9
+    assert not res.division_por_cero.any()
+
+
+def test_division_by_zero_is_masked_per_row():
+    if np is None:
+        print("SKIP: NumPy no instalado")
+        return
+    res = Automata().evaluar_lote("10 / (y - 1) + x % y", {'x': [4, 5, 6], 'y': [2, 1, 0]})
+    assert res.division_por_cero.tolist() == [False, True, True]
+    assert res.valores[0] == 10.0
+    assert np.isnan(res.valores[1]) and np.isnan(res.valores[2])
+
+
+def test_scalar_columns_broadcast_and_invalid_power():
+    if np is None:
+        print("SKIP: NumPy no instalado")
+        return
+    res = Automata().evaluar_lote("x ^ y", {'x': [-8, 4], 'y': 0.5})
+    assert res.error.tolist() == [True, False]
+    assert res.valores[1] == 2.0
+    try:
+        Automata().evaluar_lote("x + z", {'x': [1]})
+        assert False, "debió fallar por columna faltante"
+    except ValueError:
+        pass
+
+
+if __name__ == "__main__":
+    test_batch_matches_scalar_evaluation()
+    test_division_by_zero_is_masked_per_row()
+    test_scalar_columns_broadcast_and_invalid_power()
+    print("SUCCESS: batch evaluation verified!")
@@ -0,0 +1,273 @@
+import sys
+import os
+import io
+import tempfile
+from contextlib import redirect_stdout, redirect_stderr
+
+# Add src to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+from compiler.backends import (BACKENDS, DEFAULT_BACKEND, Backend, available_backends,
+                               get_backend, register_backend)
+from compiler.compilation_unit import CompilationUnit
+from compiler.compiler import Compiler
+from compiler.__main__ import main as cli
+
+EJECUTAN = ["tree-walker", "closures", "bytecode", "python"]
+
+FUNCIONES = """int fib(int n) {
+    if (n < 2) {
+        return n;
+    }
+    return fib(n - 1) + fib(n - 2);
+}
+
+void intercambiar(int v[], int i, int j) {
+    int t = v[i];
+    v[i] = v[j];
+    v[j] = t;
+}
+
+float mitad(int x) { return x / 2.0; }
+
+int main() {
+    int datos[] = {9, 4, 7, 1};
+    int n = sizeof(datos) / sizeof(datos[0]);
+    for (int i = 0; i < n - 1; i++) {
+        for (int j = 0; j < n - i - 1; j++) {
+            if (datos[j] > datos[j + 1]) {
+                intercambiar(datos, j, j + 1);
+            }
+        }
+    }
+    for (int k = 0; k < n; k++) {
+        cout << datos[k] << " ";
+    }
+    cout << fib(12) << " " << mitad(3) << endl;
+}"""
+
+CONTROL = """int main() {
+    int total = 0;
+    for (int i = 0; i < 10; i++) {
+        switch (i % 4) {
+            case 0: total = total + 1;
+            case 1: total = total + 10; break;
+            case 2: continue;
+            default: total = total + 100;
+        }
+        total = total + 1000;
+    }
+    cout << total << endl;
+    int x = 1;
+    if (1) {
+        int x = 5;
+        cout << x << sizeof(x);
+    }
+    cout << x << endl;
+    float f = 7;
+    int g = 7.9;
+    cout << f << " " << g << " " << 7 / 2 << " " << -7 % 3 << endl;
+    int w = 0;
+    while (w < 100) {
+        w++;
+        for (int a = 0; a < 5; a++) {
+            if (a == 3) { break; }
+            w = w + a;
+        }
+        if (w > 30) { return w; }
+    }
+    cout << "no llega";
+}"""
+
+ERROR = """int main() {
+    int v[3] = {1, 2, 3};
+    cout << v[1];
+    cout << v[2] / 0;
+}"""
+
+
+def run_all(source):
+    # strict=False: el analizador semántico por líneas rechaza programas válidos
+    comparacion = Compiler().compare(source, strict=False)
+    assert list(comparacion["results"]) == EJECUTAN
+    return comparacion
+
+
+def test_backends_agree_on_functions_and_arrays():
+    comparacion = run_all(FUNCIONES)
+    assert comparacion["mismatches"] == []
+    for res in comparacion["results"].values():
+        assert res["status"] == "success", res["errors"]
+        assert res["output"] == "1 4 7 9 144 1.5\n"
+
+
+def test_backends_agree_on_control_flow_and_scopes():
+    comparacion = run_all(CONTROL)
+    assert comparacion["mismatches"] == []
+    out = comparacion["results"][DEFAULT_BACKEND]["output"]
+    assert out.startswith("8263\n541\n7 7 3 -1\n")
+    assert out.endswith("Program finished with exit code: 32")
+
+
+def test_deep_expression_in_every_backend():
+    # Más profundo que el límite de recursión: ningún backend puede recursar
+    N = 20000
+    comparacion = run_all("int main() {\nint x = 0;\nx = " + " + ".join(["1"] * N) + ";\ncout << x;\n}")
+    assert comparacion["mismatches"] == []
+    assert all(res["output"] == str(N) for res in comparacion["results"].values())
+
+
+def test_deep_recursion_and_stack_overflow():
+    down = "int down(int n) {\n if (n == 0) { return 0; }\n return 1 + down(n - 1);\n}\n" \
+           "int main() {\n cout << down(%d);\n}"
+    limite = sys.getrecursionlimit()
+    comparacion = run_all(down % 3000)
+    assert comparacion["mismatches"] == []
+    assert all(res["output"] == "3000" for res in comparacion["results"].values())
+    # Una recursión sin fin termina igual en todos: desbordamiento en la línea de la llamada
+    comparacion = run_all("void f(int n) {\n f(n + 1);\n}\nint main() {\n cout << 1;\n f(0);\n}")
+    assert comparacion["mismatches"] == []
+    for res in comparacion["results"].values():
+        assert res["output"] == "1"
+        assert res["diagnostics"][-1]["line"] == 2
+        assert "desbordamiento de pila" in res["errors"][0]
+    assert sys.getrecursionlimit() == limite
+
+
+def test_runtime_error_status_and_line():
+    comparacion = run_all(ERROR)
+    assert comparacion["mismatches"] == []
+    for name, res in comparacion["results"].items():
+        assert res["status"] == "error"
+        assert res["output"] == "2"
+        assert res["errors"] == ["Runtime Error: Error Semántico en línea 4: división entera por cero"], name
+        (diag,) = res["diagnostics"]
+        assert diag["severity"] == "error" and diag["phase"] == "execution" and diag["line"] == 4
+
+
+def test_codegen_phase_only_for_compiling_backends():
+    unit = CompilationUnit(FUNCIONES)
+    for name in EJECUTAN:
+        res = Compiler().compile(unit, execute=True, backend=name, strict=False)
+        phases = list(res["metrics"])
+        assert res["backend"] == name and res["artifact"] is not None
+        expected = ["lexing", "parsing", "semantic", "optimization", "execution"]
+        if BACKENDS[name].compiles:
+            expected.insert(4, "codegen")
+        assert phases == expected, name
+    # El programa de cada backend se genera una sola vez por unidad
+    res = Compiler().compile(unit, backend="bytecode", strict=False)
+    assert res["artifact"] is unit.artifact("backend:bytecode", None)
+    assert res["metrics"]["codegen"]["instructions"] > 0
+
+
+def test_semantic_errors_strict_and_not_strict():
+    source = "int main() {\ny = 4;\ncout << y;\n}"
+    strict = Compiler().compile(source, execute=True, backend="closures")
+    assert strict["status"] == "error" and strict["output"] == ""
+    assert strict["diagnostics"][0]["phase"] == "semantic"
+    relajado = Compiler().compile(source, execute=True, backend="closures", strict=False)
+    assert relajado["status"] == "success" and relajado["output"] == "4"
+    assert [d["severity"] for d in relajado["diagnostics"]] == ["warning"]
+
+
+def test_object_backend_emits_code():
+    with tempfile.TemporaryDirectory() as tmp:
+        unit = CompilationUnit("x = a * 3 + b", obj_path=os.path.join(tmp, "salida.obj"))
+        res = Compiler().compile(unit, execute=True, backend="object", strict=False)
+        assert res["status"] == "success", res["errors"]
+        assert res["artifact"] == res["output"] == unit.object_code
+        with open(unit.obj_path, encoding="utf-8") as f:
+            assert f.read() == res["output"]
+        lines = res["output"].splitlines()
+        assert lines[0] == ".CODE" and lines[-1] == "END"
+        assert "MUL" in lines and "ADD" in lines
+        assert "execution" not in res["metrics"] and res["metrics"]["codegen"]["instructions"] == len(lines)
+        # La asignación no se traduce: queda marcada y se avisa
+        codegen = [d for d in res["diagnostics"] if d["phase"] == "codegen"]
+        assert "# UNKNOWN_OP =" in lines
+        assert [d["severity"] for d in codegen] == ["warning"]
+
+
+def test_registry():
+    assert available_backends() == EJECUTAN + ["object"]
+    assert available_backends(executable=True) == EJECUTAN
+    try:
+        get_backend("llvm")
+        assert False, "debería fallar"
+    except ValueError as e:
+        assert "llvm" in str(e) and "bytecode" in str(e)
+    try:
+        Compiler().compile("int main() {}", backend="llvm")
+        assert False, "debería fallar"
+    except ValueError:
+        pass
+
+    class Eco(Backend):
+        name = "eco"
+        compiles = False
+
+        def prepare(self, unit):
+            return unit.source
+
+        def execute(self, program, output_callback, metrics):
+            output_callback(str(len(program)))
+            metrics["chars"] = len(program)
+
+    register_backend(Eco())
+    try:
+        res = Compiler().compile("int main() {}", execute=True, backend="eco")
+        assert res["output"] == "13" and res["metrics"]["execution"]["chars"] == 13
+    finally:
+        del BACKENDS["eco"]
+
+
+def test_cli():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "prog.cpp")
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(ERROR)
+        out, err = io.StringIO(), io.StringIO()
+        with redirect_stdout(out), redirect_stderr(err):
+            code = cli([path, "--backend", "bytecode"])
+        assert code == 1
+        assert out.getvalue() == "2\n"
+        assert "[error] execution (línea 4)" in err.getvalue()
+
+        out = io.StringIO()
+        with redirect_stdout(out):
+            code = cli([path, "--compare"])
+        # Todos coinciden, pero con error: la comparación no es un éxito
+        assert code == 1
+        lines = out.getvalue().splitlines()
+        assert len(lines) == 1 + len(EJECUTAN)
+        assert "referencia" in lines[1] and all("igual" in l for l in lines[2:])
+        assert all(l.split()[1] == "error" for l in lines[1:])
+
+        with open(path, "w", encoding="utf-8") as f:
+            f.write("int main() {\n    cout << 6 * 7;\n}")
+        with redirect_stdout(io.StringIO()):
+            assert cli([path, "--compare"]) == 0
+        with open(path, "w", encoding="utf-8") as f:
+            f.write("int main() {\n    int x = 1\n}")
+        with redirect_stdout(io.StringIO()), redirect_stderr(io.StringIO()):
+            assert cli([path, "--compare"]) == 1
+
+        out = io.StringIO()
+        with redirect_stdout(out):
+            assert cli(["--list-backends"]) == 0
+        assert [l.split()[0] for l in out.getvalue().splitlines()] == available_backends()
+
+
+if __name__ == "__main__":
+    test_backends_agree_on_functions_and_arrays()
+    test_backends_agree_on_control_flow_and_scopes()
+    test_deep_expression_in_every_backend()
+    test_deep_recursion_and_stack_overflow()
+    test_runtime_error_status_and_line()
+    test_codegen_phase_only_for_compiling_backends()
+    test_semantic_errors_strict_and_not_strict()
+    test_object_backend_emits_code()
+    test_registry()
+    test_cli()
+    print("SUCCESS: All backend tests passed")
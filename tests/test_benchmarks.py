@@ -0,0 +1,79 @@
+import sys
+import os
+import io
+import json
+import tempfile
+from contextlib import redirect_stdout
+
+# Add src and the benchmark harness to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), 'benchmarks')))
+
+import run_benchmarks as bench
+from run_benchmarks import run_benchmarks, compare
+from generadores import WORKLOADS
+
+
+def test_quick_run_covers_every_stage():
+    results = run_benchmarks(quick=True, repeat=1, log=lambda msg: None)
+    assert {k.split("/")[0] for k in results} == set(WORKLOADS)
+    etapas = {k.split("/")[1] for k in results}
+    assert etapas == {"Lexer", "Parser", "SemanticAnalyzer", "Interpreter", "Automata", "CodeGeneratorFromTree"}
+    for key, r in results.items():
+        if "error" not in r:
+            assert r["time"] > 0 and r["units"] > 0 and r["peak_kb"] >= 0, key
+
+
+def test_compare_flags_regressions():
+    base = {"results": {
+        "a/Parser": {"time": 1.0, "peak_kb": 10.0, "size": 5},
+        "b/Parser": {"time": 1.0, "peak_kb": 10.0, "size": 5},
+        "c/Parser": {"time": 1.0, "peak_kb": 10.0, "size": 5},
+        "d/Parser": {"time": 1.0, "peak_kb": 10.0, "size": 99},
+    }}
+    current = {
+        "a/Parser": {"time": 1.2, "peak_kb": 10.0, "size": 5},
+        "b/Parser": {"time": 2.0, "peak_kb": 30.0, "size": 5},
+        "c/Parser": {"error": "ValueError: x", "size": 5},
+        "d/Parser": {"time": 50.0, "peak_kb": 10.0, "size": 5},
+    }
+    regs = compare(current, base, tolerance=0.25)
+    assert [(k, m) for k, m, _, _ in regs] == [("b/Parser", "time"), ("b/Parser", "peak_kb"), ("c/Parser", "error")]
+
+
+def test_times_are_compared_relative_to_calibration():
+    base = {"calibration": 0.01, "results": {"a/Parser": {"time": 1.0, "peak_kb": 10.0, "size": 5}}}
+    current = {"a/Parser": {"time": 1.8, "peak_kb": 10.0, "size": 5}}
+    # La máquina está el doble de lenta (calibración 0.02): 1.8 s equivalen a 0.9 s
+    assert compare(current, base, tolerance=0.25, calibration=0.02) == []
+    assert [m for _, m, _, _ in compare(current, base, tolerance=0.25, calibration=0.01)] == ["time"]
+
+
+def test_baseline_is_local_to_the_machine():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "baseline.json")
+        args = ["--quick", "--repeat", "1", "--only", "switch", "--baseline", path]
+        out = io.StringIO()
+        with redirect_stdout(out):
+            assert bench.main(args) == 0
+        assert "Sin baseline local" in out.getvalue()
+        with redirect_stdout(io.StringIO()):
+            assert bench.main(args + ["--save"]) == 0
+        baseline = bench.load_baseline(path)
+        assert bench.foreign_baseline(baseline) is None and baseline["calibration"] > 0
+        # Una baseline de otra máquina no se usa como gate
+        baseline["host"] = "otra-maquina"
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(baseline, f)
+        out = io.StringIO()
+        with redirect_stdout(out):
+            assert bench.main(args) == 0
+        assert "otra máquina" in out.getvalue() and "REGRESIÓN" not in out.getvalue()
+
+
+if __name__ == "__main__":
+    test_quick_run_covers_every_stage()
+    test_compare_flags_regressions()
+    test_times_are_compared_relative_to_calibration()
+    test_baseline_is_local_to_the_machine()
+    print("SUCCESS: benchmark harness verified!")
@@ -0,0 +1,127 @@
+import sys
+import os
+import tempfile
+
+# Add src to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+from compiler import compilation_unit
+from compiler.compilation_unit import CompilationUnit
+from compiler.compiler import Compiler
+from compiler.parser import Parser, ErroresSintacticos
+from compiler.lexer import Token
+
+PROGRAMA = """int main() {
+    int a = 6;
+    int b = a * 7;
+    cout << b;
+}"""
+
+
+class _Contador:
+    """Cuenta las llamadas a un método de clase mientras está instalado."""
+
+    def __init__(self, cls, nombre):
+        self.cls, self.nombre, self.llamadas = cls, nombre, 0
+        self.original = getattr(cls, nombre)
+
+    def __enter__(self):
+        original = self.original
+
+        def envoltura(*args, **kwargs):
+            self.llamadas += 1
+            return original(*args, **kwargs)
+        setattr(self.cls, self.nombre, envoltura)
+        return self
+
+    def __exit__(self, *exc):
+        setattr(self.cls, self.nombre, self.original)
+
+
+def test_artifacts_are_lazy_and_computed_once():
+    unit = CompilationUnit(PROGRAMA)
+    assert not unit.computed("tokens") and not unit.computed("ast")
+    with _Contador(compilation_unit.Lexer, "next_token") as lex, _Contador(Parser, "parse") as parse:
+        ast = unit.ast
+        # El Parser consume los tokens de la unidad: el texto se lee una sola vez
+        leidos = lex.llamadas
+        assert leidos == len(unit.tokens)
+        assert unit.tokens[-1].type == Token.Type.Fin and unit.line_count == 5
+        assert unit.ast is ast and unit.typed_ast is ast
+        unit.symbol_table
+        # 'b' es local de main: su ámbito ya se cerró, pero queda registrada
+        assert dict(unit.symbol_table.todas())["b"]["tipo"] == "int"
+        assert parse.llamadas == 1 and lex.llamadas == leidos
+    assert ast.statements[1].vars[0]['init'].ctype == "int"
+
+
+def test_errors_are_cached():
+    unit = CompilationUnit("int main() {\nint x = ;\n}")
+    with _Contador(Parser, "parse") as parse:
+        for _ in range(2):
+            try:
+                unit.ast
+                assert False
+            except ErroresSintacticos as e:
+                assert e.lineas == [2]
+        assert parse.llamadas == 1
+
+
+def test_compiler_reuses_the_unit():
+    unit = CompilationUnit(PROGRAMA)
+    ast = unit.ast
+    with _Contador(Parser, "parse") as parse:
+        res = Compiler().compile(unit, execute=True)
+    assert parse.llamadas == 0
+    assert res["status"] == "success" and res["output"] == "42"
+    assert res["unit"] is unit and res["ast"] is ast
+    assert res["metrics"]["lexing"]["tokens"] == len(unit.tokens) - 1
+    assert res["symbol_table"] is unit.symbol_table
+
+
+def test_semantic_pass_reuses_the_ast():
+    # Las asignaciones ya no se vuelven a parsear línea por línea
+    code = "int main() {\n int x = 1;\n int y = 2;\n x = 0;\n y = 5 / x;\n x = y + 1; y = 3 / x;\n}"
+    with _Contador(Parser, "parse") as parse:
+        res = Compiler().compile(code, execute=False, strict=False)
+        assert parse.llamadas == 1
+    assert [d["message"] for d in res["diagnostics"]] == [
+        "Error: división por cero en 'y = 5 / x;' (variable 'x' con valor 0)"]
+    # Con errores sintácticos el análisis usa el AST parcial
+    unit = CompilationUnit("int main() {\n int x = 0;\n int y = ;\n y = 5 / x;\n}")
+    with _Contador(Parser, "parse") as parse:
+        errores = unit.semantic["errores"]
+        assert parse.llamadas == 1
+    assert errores == ["Error: división por cero en 'y = 5 / x;' (variable 'x' con valor 0)"]
+
+
+def test_ir_and_object_code():
+    esperado = [".CODE", "PUSHA", "a", "LOAD", "PUSHC", "3", "PUSHC", "4", "ADD", "MUL", "END"]
+    with tempfile.TemporaryDirectory() as tmp:
+        ruta = os.path.join(tmp, "salida.obj")
+        unit = CompilationUnit("a * (3 + 4)", obj_path=ruta)
+        assert unit.ir["rpn"]
+        codigo = unit.object_code
+        assert unit.object_code is codigo and codigo.split() == esperado
+        with open(ruta, encoding="utf-8") as f:
+            assert f.read() == codigo
+        # Sin obj_path no se escribe nada (tampoco en el directorio actual) y
+        # cada unidad guarda su propio código
+        cwd = os.getcwd()
+        os.chdir(tmp)
+        try:
+            otra = CompilationUnit("b - 1")
+            assert otra.object_code.split()[1:3] == ["PUSHA", "b"]
+            assert os.listdir(tmp) == ["salida.obj"]
+        finally:
+            os.chdir(cwd)
+        assert unit.object_code.split() == esperado
+
+
+if __name__ == "__main__":
+    test_artifacts_are_lazy_and_computed_once()
+    test_errors_are_cached()
+    test_compiler_reuses_the_unit()
+    test_semantic_pass_reuses_the_ast()
+    test_ir_and_object_code()
+    print("SUCCESS: CompilationUnit artifacts verified!")
@@ -0,0 +1,57 @@
+import sys
+import os
+
+# Add src to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+from compiler.compiler import Compiler
+
+PROGRAMA = """int main() {
+    int s = 0;
+    int i = 0;
+    while (i < 10) {
+        s = s + i;
+        i++;
+    }
+    cout << s;
+}"""
+
+
+def test_metrics_for_every_phase():
+    phases = []
+    res = Compiler(metrics_callback=lambda phase, data: phases.append((phase, data))).compile(PROGRAMA, execute=True)
+    assert res["status"] == "success", res["errors"]
+    assert res["output"] == "45"
+    m = res["metrics"]
+    assert [p for p, _ in phases] == ["lexing", "parsing", "semantic", "optimization", "execution"]
+    assert all(m[p] is d for p, d in phases)
+    assert all(d["time"] >= 0 for d in m.values())
+    assert m["lexing"]["tokens"] == 37 and m["lexing"]["lines"] == 9
+    assert m["parsing"]["nodes"] > 10 and m["parsing"]["backtracks"] == 0
+    assert m["semantic"]["errors"] == 0
+    assert m["optimization"]["specialized_ops"] == 1  # s + i (int + int)
+    assert m["execution"]["steps"] > 10 * 5
+    assert m["execution"]["peak_environment"] == 3  # endl, s, i
+    assert m["execution"]["output_bytes"] == 2
+
+
+def test_backtracks_and_partial_metrics_on_error():
+    # '(' al inicio de sentencia: el lookahead ve que no es un "( ... ) for"
+    res = Compiler().compile("int main() {\nint x = 0;\n(x + 1);\n}")
+    assert res["metrics"]["parsing"]["backtracks"] == 0
+    # Solo si el paréntesis no entra en la ventana se intenta como cabecera y se deshace
+    largo = " + ".join(["x"] * 20)
+    res = Compiler().compile(f"int main() {{\nint x = 0;\n({largo});\n}}")
+    assert res["status"] == "success"
+    assert res["metrics"]["parsing"]["backtracks"] == 1
+    res = Compiler().compile("int main() {\nint x = ;\n}")
+    assert res["status"] == "error"
+    assert set(res["metrics"]) == {"lexing", "parsing"}
+    # Sin execute no se ejecuta el programa
+    assert "execution" not in Compiler().compile(PROGRAMA)["metrics"]
+
+
+if __name__ == "__main__":
+    test_metrics_for_every_phase()
+    test_backtracks_and_partial_metrics_on_error()
+    print("SUCCESS: compiler metrics verified!")
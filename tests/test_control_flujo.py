@@ -0,0 +1,94 @@
+import sys
+import os
+
+# Add src to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+from compiler.lexer import Lexer, Token
+from compiler.parser import Parser
+from compiler.interpreter import Interpreter, NORMAL
+
+
+def run(code):
+    output = []
+    interp = Interpreter(output_callback=output.append)
+    interp.interpret(Parser(Lexer(code)).parse())
+    assert interp.signal == NORMAL
+    return "".join(str(o) for o in output)
+
+
+def test_continue_in_loops():
+    assert [t.type for t in Lexer("continue;")] == [Token.Type.Continue, Token.Type.PuntoYComa]
+    # En el for, continue pasa por la actualización
+    assert run("""int main() {
+    for (int i = 0; i < 6; i++) {
+        if (i % 2 == 0) { continue; }
+        cout << i;
+    }
+    int j = 0;
+    while (j < 5) {
+        j++;
+        if (j == 3) { continue; }
+        cout << j;
+    }
+}""") == "1351245"
+
+
+def test_break_and_continue_through_switch():
+    # break sale solo del switch; continue sigue hasta el for que lo contiene
+    assert run("""int main() {
+    for (int i = 0; i < 4; i++) {
+        switch (i) {
+            case 1: continue;
+            case 2: cout << "b"; break;
+            default: cout << "d";
+        }
+        cout << i;
+    }
+}""") == "d0b2d3"
+
+
+def test_nested_loops_and_return():
+    assert run("""int primero(int v[], int n) {
+    for (int i = 0; i < n; i++) {
+        int j = 0;
+        while (1 == 1) {
+            if (j == 2) { break; }
+            j++;
+        }
+        if (v[i] > j) { return v[i]; }
+    }
+    return 0;
+}
+int main() {
+    int v[] = {1, 2, 7, 9};
+    cout << primero(v, 4);
+    for (int i = 0; i < 3; i++) {
+        for (int k = 0; k < 3; k++) {
+            if (k == 1) { break; }
+            cout << i << k;
+        }
+    }
+    return 5;
+    cout << "no";
+}""") == "7001020\nProgram finished with exit code: 5"
+
+
+def test_values_are_not_signals():
+    # Antes un "BREAK" como sentencia se confundía con la señal de break
+    assert run("""int main() {
+    int i = 0;
+    while (i < 3) {
+        "BREAK";
+        i++;
+    }
+    cout << i;
+}""") == "3"
+
+
+if __name__ == "__main__":
+    test_continue_in_loops()
+    test_break_and_continue_through_switch()
+    test_nested_loops_and_return()
+    test_values_are_not_signals()
+    print("SUCCESS: Control flow signals verified!")
@@ -0,0 +1,69 @@
+import sys
+import os
+import tempfile
+
+# Add src to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+from compiler.lexer import Lexer
+from compiler.parser import Parser
+from compiler.interpreter import Interpreter
+from compiler.automata import Automata
+from compiler.code_generator import CodeGeneratorFromTree
+
+# Mucho más profundo que el límite de recursión por defecto (1000)
+N = 20000
+
+
+def run(code):
+    output = []
+    ast = Parser(Lexer("int main() {\n" + code + "\n}")).parse()
+    Interpreter(output_callback=output.append).interpret(ast)
+    return "".join(output), ast
+
+
+def test_long_chain_parses_and_evaluates():
+    out, ast = run("int x = 0; x = " + " + ".join(["1"] * N) + "; cout << x;")
+    assert out == str(N)
+
+
+def test_print_tree_deeper_than_recursion_limit():
+    # La sangría crece con la profundidad: basta con superar el límite
+    depth = sys.getrecursionlimit() * 3
+    ast = Parser(Lexer("x = " + " + ".join(["1"] * depth))).parse()
+    lines = []
+    ast.print_tree(output_func=lines.append)
+    assert sum(1 for l in lines if l.strip() == "Numero: 1") == depth
+    assert lines[0] == "Operador: ="
+
+
+def test_deep_parentheses_and_unary_minus():
+    out, _ = run("int x = " + "(" * N + "2" + ")" * N + " * 3; cout << x;")
+    assert out == "6"
+    out, _ = run("int y = " + "- " * (N + 1) + "5; cout << y;")
+    assert out == "-5"
+
+
+def test_deep_tree_object_code():
+    ast = Parser(Lexer("x = " + " - ".join(["1"] * N))).parse()
+    with tempfile.TemporaryDirectory() as tmp:
+        path = CodeGeneratorFromTree().generate_from_tree(ast.right, os.path.join(tmp, "deep.obj"))
+        with open(path) as f:
+            assert f.read().count("PUSHC 1") == N
+
+
+def test_automata_deep_expression():
+    res = Automata().analizar(" + ".join(["2"] * N), derivaciones=False)
+    assert "error" not in res
+    assert res['final_result'] == 2.0 * N
+    res = Automata().analizar("(" * N + "1 - 4" + ")" * N, derivaciones=False)
+    assert res['final_result'] == -3.0
+
+
+if __name__ == "__main__":
+    test_long_chain_parses_and_evaluates()
+    test_print_tree_deeper_than_recursion_limit()
+    test_deep_parentheses_and_unary_minus()
+    test_deep_tree_object_code()
+    test_automata_deep_expression()
+    print("SUCCESS: deep expressions verified!")
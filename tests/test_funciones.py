@@ -0,0 +1,188 @@
+import sys
+import os
+
+# Add src to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+from compiler.lexer import Lexer
+from compiler.parser import Parser
+from compiler.interpreter import Interpreter, DesbordamientoPila
+from compiler.compiler import Compiler
+from compiler.ast_nodes import ProgramNode, FunctionNode, CallNode
+from compiler.serializacion import serializar, deserializar
+
+PROGRAMA = """#include <iostream>
+using namespace std;
+
+int fib(int n) {
+    if (n < 2) {
+        return n;
+    }
+    return fib(n - 1) + fib(n - 2);
+}
+
+void intercambiar(int v[], int i, int j) {
+    int t = v[i];
+    v[i] = v[j];
+    v[j] = t;
+}
+
+int particion(int v[], int bajo, int alto) {
+    int pivote = v[alto];
+    int i = bajo - 1;
+    for (int j = bajo; j < alto; j++) {
+        if (v[j] <= pivote) {
+            i++;
+            intercambiar(v, i, j);
+        }
+    }
+    intercambiar(v, i + 1, alto);
+    return i + 1;
+}
+
+void quicksort(int v[], int bajo, int alto) {
+    if (bajo < alto) {
+        int p = particion(v, bajo, alto);
+        quicksort(v, bajo, p - 1);
+        quicksort(v, p + 1, alto);
+    }
+}
+
+int main() {
+    int datos[] = {9, 4, 7, 1, 8, 2};
+    int n = sizeof(datos) / sizeof(datos[0]);
+    quicksort(datos, 0, n - 1);
+    for (int k = 0; k < n; k++) {
+        cout << datos[k] << " ";
+    }
+    cout << fib(12);
+    return 0;
+}"""
+
+
+def run(code):
+    output = []
+    interp = Interpreter(output_callback=output.append)
+    interp.interpret(Parser(Lexer(code)).parse())
+    return "".join(str(o) for o in output), interp
+
+
+def test_recursion_and_array_parameters():
+    out, interp = run(PROGRAMA)
+    assert out == "1 2 4 7 8 9 144\nProgram finished with exit code: 0"
+    # Las variables de las funciones viven en sus marcos, no en environment
+    assert not {"pivote", "bajo", "t", "p"} & set(interp.environment)
+    # Un marco libre por nivel de recursión alcanzado, reutilizados entre llamadas
+    fib = interp.functions["fib"]
+    assert fib.frame_size == 1
+    assert 1 <= len(interp._frames["fib"]) <= 12
+    assert all(len(frame) == fib.frame_size for frame in interp._frames["fib"])
+
+
+def test_resolver_slots():
+    ast = Parser(Lexer(PROGRAMA)).parse()
+    assert isinstance(ast, ProgramNode) and [f.name for f in ast.functions] == [
+        "fib", "intercambiar", "particion", "quicksort"]
+    Interpreter(output_callback=lambda s: None).interpret(ast)
+    particion = ast.functions[2]
+    assert particion.params == [("int", "v", True), ("int", "bajo", False), ("int", "alto", False)]
+    # v, bajo, alto, pivote, i y la j del for
+    assert particion.frame_size == 6
+    pivote = particion.body.statements[0]
+    assert pivote.vars[0]['slot'] == 3
+
+
+def test_early_return_from_loops():
+    code = """int buscar(int v[], int n, int x) {
+    int i = 0;
+    while (i < n) {
+        for (int k = 0; k < 1; k++) {
+            if (v[i] == x) { return i; }
+        }
+        i++;
+    }
+    return -1;
+}
+float mitad(int x) { return x / 2.0; }
+void nada() { return; }
+int main() {
+    int v[] = {5, 8, 13};
+    nada();
+    cout << buscar(v, 3, 13) << buscar(v, 3, 4) << mitad(3);
+    int j = 0;
+    while (j < 10) {
+        if (j == 2) { return j; }
+        j++;
+    }
+    cout << "no llega";
+}"""
+    out, _ = run(code)
+    assert out == "2-11.5\nProgram finished with exit code: 2"
+
+
+def test_errors():
+    for code, esperado in (
+        ("int f(int a) { return b; }\nint main() { cout << f(1); }", "Variable 'b' no definida"),
+        ("int f(int a) { return a; }\nint main() { cout << f(1, 2); }", "espera 1 argumento"),
+        ("int main() { cout << g(1); }", "Función 'g' no definida"),
+    ):
+        try:
+            run(code)
+            assert False, code
+        except Exception as e:
+            assert esperado in str(e), str(e)
+    try:
+        Parser(Lexer("int f() { return 1; }\nint f() { return 2; }\nint main() { }")).parse()
+        assert False
+    except ValueError as e:
+        assert "ya fue definida" in str(e)
+
+
+def test_deep_recursion_without_python_stack():
+    code = """int down(int n) {
+    if (n == 0) { return 0; }
+    return 1 + down(n - 1);
+}
+int main() {
+    cout << down(%d);
+}"""
+    # Las llamadas corren en una pila explícita: el límite de Python no cambia
+    limite = sys.getrecursionlimit()
+    out, _ = run(code % 3000)
+    assert out == "3000" and sys.getrecursionlimit() == limite
+    # main llama a down(n) y esa cadena suma n + 1 llamadas anidadas
+    out, _ = run(code % (Interpreter.MAX_CALL_DEPTH - 1))
+    assert out == str(Interpreter.MAX_CALL_DEPTH - 1)
+    try:
+        run(code % Interpreter.MAX_CALL_DEPTH)
+        assert False, "debería desbordar"
+    except DesbordamientoPila as e:
+        assert str(e).startswith("Error Semántico en línea 3: desbordamiento de pila")
+    assert sys.getrecursionlimit() == limite
+
+
+def test_serialization_and_compiler():
+    ast = Parser(Lexer(PROGRAMA)).parse()
+    copia = deserializar(serializar(ast))
+    assert isinstance(copia.functions[0], FunctionNode)
+    assert isinstance(copia.functions[0].body.statements[1].left.left, CallNode)
+    assert run_ast(copia) == run_ast(ast)
+    res = Compiler().compile(PROGRAMA, execute=True)
+    assert res["status"] == "success", res["errors"]
+    assert res["output"].startswith("1 2 4 7 8 9 144")
+
+
+def run_ast(ast):
+    output = []
+    Interpreter(output_callback=output.append).interpret(ast)
+    return "".join(str(o) for o in output)
+
+
+if __name__ == "__main__":
+    test_recursion_and_array_parameters()
+    test_resolver_slots()
+    test_early_return_from_loops()
+    test_errors()
+    test_deep_recursion_without_python_stack()
+    test_serialization_and_compiler()
+    print("SUCCESS: User-defined functions verified!")
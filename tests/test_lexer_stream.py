@@ -0,0 +1,104 @@
+import sys
+import os
+import io
+import mmap
+import tempfile
+import tracemalloc
+
+# Add src to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+from compiler.lexer import Lexer, Token
+from compiler.parser import Parser
+from compiler.interpreter import Interpreter
+
+BUBBLE = os.path.join(os.path.dirname(__file__), 'bubble_sort_cpp.txt')
+
+PROGRAMA = """#include <iostream>
+// comentario con acentos: año, línea
+int main() {
+    int v[] = {3, 10, 7};
+    float r = 2.75;
+    for (i = 0; i < 3; i++) {
+        cout << "valor: " << v[i] << "\\n";
+    }
+    if (r >= 2.5 && r != 3) { cout << "cadena
+de dos líneas"; }
+}"""
+
+
+def tokens(lexer):
+    return [(t.type, t.value, t.line, t.op) for t in lexer.tokens()]
+
+
+def test_chunks_match_str_lexer():
+    with open(BUBBLE, 'r', encoding='utf-8') as f:
+        bubble = f.read()
+    for code in (PROGRAMA, bubble):
+        esperado = tokens(Lexer(code))
+        for size in range(1, 8):
+            assert tokens(Lexer(io.StringIO(code), chunk_size=size)) == esperado, size
+            # bytes: los caracteres multibyte también pueden quedar partidos
+            assert tokens(Lexer(io.BytesIO(code.encode('utf-8')), chunk_size=size)) == esperado, size
+
+
+def test_string_straddles_chunks():
+    cadena = "x" * 50 + " ñ " + "y" * 50
+    code = f'cout << "{cadena}";'
+    for size in (1, 3, 7, 16):
+        toks = list(Lexer(io.StringIO(code), chunk_size=size))
+        assert [t.type for t in toks] == [Token.Type.Cout, Token.Type.LeftShift,
+                                          Token.Type.Cadena, Token.Type.PuntoYComa]
+        assert toks[2].value == cadena
+
+
+def test_mmap_input_parses_and_runs():
+    with tempfile.TemporaryDirectory() as tmp:
+        ruta = os.path.join(tmp, "prog.cpp")
+        with open(ruta, 'w', encoding='utf-8') as f:
+            f.write("int main() {\n" + "// nada\n" * 5000 + "  int x = 4;\n  cout << x * 2;\n}")
+        with open(ruta, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            ast = Parser(Lexer(mm, chunk_size=64)).parse()
+    output = []
+    Interpreter(output_callback=output.append).interpret(ast)
+    assert "".join(str(o) for o in output) == "8"
+
+
+class _Generado:
+    """Stream de texto que genera n sentencias sin tenerlas todas en memoria."""
+
+    def __init__(self, n):
+        self.n, self.k, self.pendiente = n, 0, ""
+
+    def read(self, size):
+        while len(self.pendiente) < size and self.k < self.n:
+            self.pendiente += f"total = total + {self.k} * 2; // paso {self.k}\n"
+            self.k += 1
+        out, self.pendiente = self.pendiente[:size], self.pendiente[size:]
+        return out
+
+
+def _peak(n):
+    tracemalloc.start()
+    try:
+        count = sum(1 for _ in Lexer(_Generado(n), chunk_size=4096))
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return count, peak
+
+
+def test_peak_memory_is_flat():
+    count_small, peak_small = _peak(500)
+    count_big, peak_big = _peak(10000)
+    assert count_big == 20 * count_small == 500 * 8 * 20
+    # 20 veces más entrada (~330 KB) sin que crezca la ventana del lexer
+    assert peak_big < 2 * peak_small + 64 * 1024, (peak_small, peak_big)
+
+
+if __name__ == "__main__":
+    test_chunks_match_str_lexer()
+    test_string_straddles_chunks()
+    test_mmap_input_parses_and_runs()
+    test_peak_memory_is_flat()
+    print("SUCCESS: Streaming lexer verified!")
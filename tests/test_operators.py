@@ -0,0 +1,52 @@
+import sys
+import os
+
+# Add src to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+from compiler import operators as ops
+from compiler.lexer import Lexer, Token
+from compiler.parser import Parser
+from compiler.automata import Automata
+
+
+def test_lexer_attaches_opcodes():
+    lexer = Lexer("a + b <= c % 2")
+    codes = []
+    while True:
+        t = lexer.next_token()
+        if t.type == Token.Type.Fin:
+            break
+        codes.append(t.op)
+    assert codes == [None, ops.ADD, None, ops.LE, None, ops.MOD, None]
+
+
+def test_parser_marks_unary_minus():
+    ast = Parser(Lexer("x = -y")).parse()
+    assert ast.right.token.op == ops.NEG
+    assert ast.right.right is None
+
+
+def test_tables_cover_every_opcode():
+    for table in (ops.INT_OPS, ops.FLOAT_OPS, ops.GENERIC_OPS, ops.REAL_OPS):
+        assert len(table) == len(ops.SYMBOLS)
+    assert len(ops.PRECEDENCE) == len(ops.SYMBOLS)
+    assert ops.GENERIC_OPS[ops.DIV](-7, 2) == -3
+    assert ops.GENERIC_OPS[ops.DIV](-7.0, 2) == -3.5
+
+
+def test_automata_uses_registry():
+    res = Automata().analizar("7 % 3 + - -2 ^ 2")
+    assert res['rpn'] == ['7', '3', '%', '2', 'u-', 'u-', '2', '^', '+']
+    assert res['final_result'] == 5.0
+    assert res['ast'].opcode == ops.ADD
+    assert "error" in Automata().analizar("1.2.3 + 1")
+    assert Automata().analizar("4 / 0")["error"].endswith("División por cero")
+
+
+if __name__ == "__main__":
+    test_lexer_attaches_opcodes()
+    test_parser_marks_unary_minus()
+    test_tables_cover_every_opcode()
+    test_automata_uses_registry()
+    print("SUCCESS: operator registry verified!")
@@ -0,0 +1,50 @@
+import sys
+import os
+
+# Add src to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+from compiler.lexer import Lexer, Token, KEYWORDS
+from compiler.parser import Parser
+from compiler.interpreter import Interpreter
+from compiler.ast_nodes import INDEX_TOKEN
+
+
+def test_keywords_have_their_own_types():
+    code = " ".join(KEYWORDS) + " main iff intx _sizeof"
+    toks = list(Lexer(code))
+    assert [t.type for t in toks[:len(KEYWORDS)]] == list(KEYWORDS.values())
+    assert all(t.type == Token.Type.Ident for t in toks[len(KEYWORDS):])
+    tipos = [t.value for t in Lexer("int float char string void") if t.type == Token.Type.Tipo]
+    assert tipos == ["int", "float", "char", "string"]
+
+
+def test_identifiers_are_interned():
+    toks = [t for t in Lexer("contador = contador + 1; cont" + "ador++;") if t.type == Token.Type.Ident]
+    assert len(toks) == 3
+    assert toks[0].value is toks[1].value is toks[2].value
+    assert toks[0].value is sys.intern("".join(["conta", "dor"]))
+
+
+def test_programs_parse_with_keyword_tokens():
+    code = """using namespace std;
+void doble(int v[], int n) {
+    for (int i = 0; i < n; i++) { v[i] = v[i] * 2; }
+}
+int main() {
+    int v[] = {1, 2, 3};
+    doble(v, sizeof(v) / sizeof(v[0]));
+    if (v[2] == 5) { cout << "no"; } else if (v[2] == 6) { cout << v[0] + v[1] + v[2]; } else { cout << "no"; }
+}"""
+    ast = Parser(Lexer(code)).parse()
+    assert INDEX_TOKEN.type == Token.Type.Index
+    output = []
+    Interpreter(output_callback=output.append).interpret(ast)
+    assert "".join(output) == "12"
+
+
+if __name__ == "__main__":
+    test_keywords_have_their_own_types()
+    test_identifiers_are_interned()
+    test_programs_parse_with_keyword_tokens()
+    print("SUCCESS: Keyword tokens and interned identifiers verified!")
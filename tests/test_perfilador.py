@@ -0,0 +1,96 @@
+import sys
+import os
+import itertools
+
+# Add src to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+from compiler.lexer import Lexer
+from compiler.parser import Parser
+from compiler.interpreter import Interpreter
+from compiler.perfilador import ProfilingInterpreter
+
+PROGRAMA = """int main() {
+    int s = 0;
+    for (int i = 0; i < 50; i++) {
+        s = s + i;
+        if (i == 3) {
+            cout << s;
+        }
+    }
+    return 0;
+}"""
+
+
+def perfilar(code):
+    # Reloj falso: cada lectura avanza 1 unidad, así los tiempos son exactos
+    output = []
+    ticks = itertools.count()
+    prof = ProfilingInterpreter(output_callback=output.append, clock=lambda: next(ticks))
+    prof.interpret(Parser(Lexer(code)).parse())
+    return prof, "".join(output)
+
+
+def test_counts_per_source_line():
+    prof, out = perfilar(PROGRAMA)
+    assert out.startswith("6")
+    assert prof.counts[2] == 1
+    assert prof.counts[4] == 50 and prof.counts[5] == 50 and prof.counts[6] == 1
+    # La sentencia for, su init y sus 50 updates están en la línea 3
+    assert prof.counts[3] == 52
+    assert prof.counts[9] == 1
+
+
+def test_total_and_self_time_are_consistent():
+    prof, _ = perfilar(PROGRAMA)
+    for row in prof.hot_spots():
+        assert 0 <= row.tiempo_propio <= row.tiempo_total
+    hot = prof.hot_spots()[0]
+    assert hot.linea == 3
+    # El for contiene todo lo demás salvo las líneas 2 y 9
+    inner = sum(prof.self_time[l] for l in (3, 4, 5, 6))
+    assert prof.total_time[3] == inner
+    assert set(prof.heat()) == {2, 3, 4, 5, 6, 9} and prof.heat()[3] == 1.0
+
+
+def test_folded_stacks_and_report():
+    prof, _ = perfilar(PROGRAMA)
+    folded = prof.folded_stacks()
+    assert "main;línea 3;línea 5;línea 6 " in "\n".join(folded)
+    total = sum(int(l.rsplit(" ", 1)[1]) for l in folded)
+    assert total == sum(prof.self_time.values()) * 10**6  # microsegundos
+    report = prof.reporte(PROGRAMA).splitlines()
+    assert report[1].split()[0] == "3" and report[1].endswith("for (int i = 0; i < 50; i++) {")
+
+
+def test_recursive_functions_are_profiled():
+    code = """int fib(int n) {
+    if (n < 2) {
+        return n;
+    }
+    return fib(n - 1) + fib(n - 2);
+}
+int main() {
+    cout << fib(6);
+}"""
+    prof, out = perfilar(code)
+    assert out == "8"
+    # fib(6) hace 25 llamadas: 13 terminan en la línea 3 y 12 en la 5
+    assert prof.counts[2] == 25 and prof.counts[3] == 13 and prof.counts[5] == 12
+    assert prof.counts[8] == 1
+    assert prof.total_time[8] == sum(prof.self_time.values())
+    assert "main;línea 8;línea 5;línea 5;línea 2 " in "\n".join(prof.folded_stacks())
+
+
+def test_plain_interpreter_is_untouched():
+    assert Interpreter.visit is not ProfilingInterpreter.visit
+    assert not hasattr(Interpreter(), 'counts')
+
+
+if __name__ == "__main__":
+    test_counts_per_source_line()
+    test_total_and_self_time_are_consistent()
+    test_folded_stacks_and_report()
+    test_recursive_functions_are_profiled()
+    test_plain_interpreter_is_untouched()
+    print("SUCCESS: line profiler verified!")
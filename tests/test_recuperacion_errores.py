@@ -0,0 +1,107 @@
+import sys
+import os
+
+# Add src to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+from compiler.lexer import Lexer
+from compiler.parser import Parser, ErroresSintacticos
+from compiler.compiler import Compiler
+from compiler.interpreter import Interpreter
+
+
+def parse_errors(code):
+    try:
+        Parser(Lexer(code)).parse()
+    except ErroresSintacticos as e:
+        return e
+    assert False, "se esperaban errores sintácticos"
+
+
+def test_all_missing_semicolons_in_one_pass():
+    # Diez asignaciones sin ';': cada error se detecta en el token siguiente
+    lines = [f"    x = x + {k}" for k in range(10)]
+    code = "int main() {\n    int x = 0;\n" + "\n".join(lines) + "\n    cout << x;\n}"
+    e = parse_errors(code)
+    assert len(e.errores) == 10
+    assert e.lineas == list(range(4, 14))
+    assert all("Se esperaba PuntoYComa" in msg for msg in e.errores)
+    # Compatible con quien esperaba un ValueError con el primer error
+    assert isinstance(e, ValueError) and str(e) == e.errores[0]
+    assert "línea 4" in str(e)
+
+
+def test_partial_ast_keeps_valid_statements():
+    code = """int main() {
+    int x = 1;
+    int y = ;
+    while x < 3) { x = x + 1; }
+    for (int i = 0; i < 2; i++) {
+        switch (i) { case 0: x = ; break; case 1: x = x + 10; }
+    }
+    cout << x;
+}"""
+    e = parse_errors(code)
+    assert e.lineas == [3, 4, 6]
+    assert "después de 'while'" in e.errores[1]
+    # Las sentencias correctas quedan en el AST parcial y se pueden ejecutar
+    output = []
+    Interpreter(output_callback=output.append).interpret(e.ast)
+    assert "".join(str(o) for o in output) == "11"
+
+
+def test_missing_brace_reported_once():
+    e = parse_errors("int main() {\n    int x = 1;\n    if (x == 1) {\n        x = 2;\n")
+    assert e.errores == ["Falta '}' para cerrar bloque"]
+    assert e.ast is not None and len(e.ast.statements) == 2
+
+
+def test_speculative_errors_are_discarded():
+    # El paréntesis largo se intenta como "( ... ) for" y se descarta sin dejar errores
+    largo = " + ".join(["x"] * 20)
+    parser = Parser(Lexer(f"int main() {{\n int x = 1;\n ({largo});\n}}"))
+    parser.parse()
+    assert parser.backtracks == 1 and parser.errores == []
+
+
+def test_function_header_errors_keep_collecting():
+    # La cabecera rota de f no corta el parseo: su cuerpo, g y main se siguen revisando
+    code = """int f(int a {
+    return a;
+}
+int g(int b) {
+    int c = b
+    return c;
+}
+int main() {
+    int x = f(1)
+    cout << x + g(2);
+}"""
+    e = parse_errors(code)
+    assert e.lineas == [1, 6, 10]
+    assert "Se esperaba Coma" in e.errores[0]
+    assert [f.name for f in e.ast.functions] == ["f", "g"] and e.ast.main is not None
+    # Sin '{' la función se descarta hasta la próxima; lo mismo con una función repetida
+    e = parse_errors("int h(int a)\n    return a;\n}\nint f() { return 1; }\n"
+                     "int f() { return 2; }\nint main( {\n int x = 1\n cout << x;\n}")
+    assert e.lineas == [2, 5, 6, 8]
+    assert "ya fue definida" in e.errores[1] and "después de '('" in e.errores[2]
+
+
+def test_compiler_reports_every_error():
+    res = Compiler().compile("int main() {\nint x = 0\nx = 1\ncout << x;\n}")
+    assert res["status"] == "error"
+    assert len(res["errors"]) == 2
+    assert all(msg.startswith("Syntax Error: ") for msg in res["errors"])
+    assert res["metrics"]["parsing"]["errors"] == 2
+    assert res["ast"] is not None
+
+
+if __name__ == "__main__":
+    test_all_missing_semicolons_in_one_pass()
+    test_partial_ast_keeps_valid_statements()
+    test_missing_brace_reported_once()
+    test_speculative_errors_are_discarded()
+    test_function_header_errors_keep_collecting()
+    test_compiler_reports_every_error()
+    print("SUCCESS: Syntax error recovery verified!")
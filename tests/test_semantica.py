@@ -0,0 +1,116 @@
+import sys
+import os
+import io
+import contextlib
+import time
+
+# Add src to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+from compiler.semantics import SemanticAnalyzer
+from compiler.compiler import Compiler
+from compiler.constantes import evalua_constante
+from compiler.lexer import Lexer
+from compiler.parser import Parser
+
+
+def analizar(code):
+    salida = io.StringIO()
+    with contextlib.redirect_stdout(salida):
+        res = SemanticAnalyzer().analizar(code)
+    # Sin trazas de depuración en la salida estándar
+    assert salida.getvalue() == ""
+    return res["errores"]
+
+
+def test_switch_is_checked():
+    code = """int main() {
+    int op = 2;
+    switch (op) {
+        case 1: cout << "uno"; break;
+        default: cout << "otro";
+    }
+}"""
+    assert analizar(code) == []
+    errores = analizar("int main() {\n switch (nada) {\n default: cout << 1;\n }\n}")
+    assert errores == ["Error: variable 'nada' usada sin declarar en condición SWITCH (línea 2)."]
+    res = Compiler().compile(code, execute=True)
+    assert res["status"] == "success", res["errors"]
+    assert res["output"].startswith("otro")
+
+
+def test_declarations_visible_from_their_line():
+    errores = analizar("int main() {\n x = 3;\n int x = 1;\n}")
+    assert errores == ["Error: variable 'x' usada sin declarar."]
+    assert analizar("int main() {\n int x = 1;\n x = 3;\n}") == []
+
+
+def test_brace_balance_in_same_scan():
+    errores = analizar("int main() {\n int x = 1;\n}\n}\nint f() {\n")
+    assert errores == [
+        "Error sintáctico: '}' de cierre sin apertura correspondiente (línea 4)",
+        "Error sintáctico: falta '}' de cierre para bloque abierto en línea 5",
+    ]
+
+
+def test_linear_time():
+    def medir(n):
+        code = "int main() {\n" + "".join(
+            f"    int v{i} = {i};\n    if (v{i} > 0) {{\n        cout << v{i};\n    }}\n" for i in range(n)) + "}"
+        inicio = time.perf_counter()
+        assert analizar(code) == []
+        return time.perf_counter() - inicio
+    medir(50)
+    chico, grande = medir(200), medir(1600)
+    # 8 veces más líneas: lejos del costo cuadrático (64x)
+    assert grande < chico * 24, (chico, grande)
+
+
+def test_constant_evaluator():
+    def valor(expr, **conocidos):
+        return evalua_constante(Parser(Lexer(f"r = {expr}")).parse().right, conocidos.get)
+    assert valor("7 / 2 - 3") == 0  # división entera de C++, no 0.5
+    assert valor("-7 % 3") == -1
+    assert valor("(a + 1.5) * 2", a=1) == 5.0
+    assert valor("a * 2", b=1) is None
+    assert valor("1 / 0") is None
+    assert valor("v[0] + 1") is None
+
+
+def test_division_by_zero_tracking():
+    def div(cuerpo):
+        return analizar("int main() {\n int x = 1;\n int y = 1;\n" + cuerpo + "\n}")
+    assert div(" x = 2 - 2;\n y = 5 / x;") == [
+        "Error: división por cero en 'y = 5 / x;' (variable 'x' con valor 0)"]
+    assert div(" x = 7 / 2 - 3;\n y = 5 / (x * 4);") == ["Error: división por cero en 'y = 5 / (x * 4);'"]
+    # El incremento cambia el valor conocido
+    assert div(" x = 0;\n x++;\n y = 5 / x;") == []
+    # Lo asignado dentro de un bloque deja de conocerse al cerrarlo
+    assert len(div(" if (y > 0) {\n x = 0;\n y = 3 / x;\n }\n y = 5 / x;")) == 1
+    # Nada del código del alumno se ejecuta como Python
+    assert div(" x = __import__(1);") == ["Error: variable '__import__' usada sin declarar."]
+
+
+def test_declaration_initializers_are_folded():
+    def div(cuerpo):
+        return analizar("int main() {\n int x = 1;\n int a = 0;\n" + cuerpo + "\n x = 5 / z;\n}")
+    esperado = ["Error: división por cero en 'x = 5 / z;' (variable 'z' con valor 0)"]
+    assert div(" int z = a;") == esperado
+    assert div(" int z = 2 - 2;") == esperado
+    # int trunca el inicializador; float lo conserva
+    assert div(" int z = 0.5;") == esperado
+    assert div(" float z = 0.5;") == []
+    assert div(" int y = 1, z = y - 1;") == esperado
+    # La asignación también se convierte al tipo de la variable
+    assert div(" int z = 1;\n z = 0.5;") == esperado
+
+
+if __name__ == "__main__":
+    test_switch_is_checked()
+    test_declarations_visible_from_their_line()
+    test_brace_balance_in_same_scan()
+    test_linear_time()
+    test_constant_evaluator()
+    test_division_by_zero_tracking()
+    test_declaration_initializers_are_folded()
+    print("SUCCESS: Semantic analysis and constant tracking verified!")
@@ -0,0 +1,145 @@
+import sys
+import os
+import pickle
+import tempfile
+
+# Add src to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+from compiler.lexer import Lexer
+from compiler.parser import Parser
+from compiler.interpreter import Interpreter
+from compiler.ast_nodes import SwitchNode
+from compiler.ast_arena import AstArena, DECL
+from compiler import serializacion
+from compiler.serializacion import serializar, deserializar, guardar, cargar
+
+BUBBLE = os.path.join(os.path.dirname(__file__), 'bubble_sort_cpp.txt')
+
+PROGRAMA = """int main() {
+    float r = 2.5;
+    int v[] = {3, -1, 4};
+    for (int i = 0; i < 3; i++) {
+        switch (v[i]) {
+            case -1: cout << "menos "; break;
+            case 3: cout << "tres ";
+            default: cout << r * i << " ";
+        }
+        if (i == 0) { r = r + 1; } else if (i == 1) { r = r - 0.5; } else { break; }
+    }
+}"""
+
+
+def dump(ast):
+    lines = []
+    ast.print_tree(output_func=lines.append)
+    return lines
+
+
+def run(ast):
+    output = []
+    Interpreter(output_callback=output.append).interpret(ast)
+    return "".join(output)
+
+
+def test_roundtrip_every_node_class():
+    with open(BUBBLE, 'r', encoding='utf-8') as f:
+        bubble = f.read()
+    for code in (PROGRAMA, bubble):
+        ast = Parser(Lexer(code)).parse()
+        copia = deserializar(serializar(ast))
+        assert dump(copia) == dump(ast)
+        assert run(copia) == run(Parser(Lexer(code)).parse())
+    switch = deserializar(serializar(Parser(Lexer(PROGRAMA)).parse())).statements[2].body.statements[0]
+    assert isinstance(switch, SwitchNode) and switch.table == {-1: 0, 3: 2}
+
+
+def test_tokens_lines_and_values_survive():
+    ast = Parser(Lexer(PROGRAMA)).parse()
+    arena = deserializar(serializar(ast), arena=True)
+    orig = AstArena.from_tree(ast)
+    assert [(t.type, t.value, t.line, t.op) for t in arena.tokens] == \
+           [(t.type, t.value, t.line, t.op) for t in orig.tokens]
+    assert arena.payload == orig.payload
+    # Más compacto que pickle del árbol de objetos
+    assert len(serializar(ast)) < len(pickle.dumps(ast))
+
+
+def test_deep_tree_and_disk_cache():
+    n = 20000
+    ast = Parser(Lexer("x = " + " * ".join(["2"] * n))).parse()
+    with tempfile.TemporaryDirectory() as tmp:
+        ruta = os.path.join(tmp, "prog.ast")
+        guardar(ast, ruta)
+        arena = cargar(ruta, arena=True)
+    assert len(arena) == 2 * n + 1
+
+
+def test_rejects_bad_input():
+    data = serializar(Parser(Lexer("x = 1 + 2")).parse())
+    otra_version = data[:4] + (serializacion.FORMAT_VERSION + 1).to_bytes(2, 'little') + data[6:]
+    for malo, msg in ((b'NOPE' + data[4:], "firma"), (otra_version, "Versión"),
+                      (data[:-3], "truncado"), (data + b'\0', "sobrantes")):
+        try:
+            deserializar(malo)
+            assert False, msg
+        except ValueError as e:
+            assert msg in str(e), str(e)
+
+
+def test_corrupted_bytes_raise_value_error():
+    # Cada byte cambiado por otros valores: o se decodifica o es ValueError,
+    # nunca IndexError/KeyError/TypeError ni un to_tree() que no termina
+    code = "int f(int a) {\n    return a * 2;\n}\nint main() {\n    int v[2] = {1, 2};\n" \
+           "    switch (v[0]) { case 1: cout << f(v[1]); break; default: cout << 0; }\n}"
+    data = serializar(Parser(Lexer(code)).parse())
+    rechazados = 0
+    for pos in range(len(data)):
+        for valor in (0, 1, 0x7F, 0xFF, data[pos] ^ 0x01):
+            malo = bytearray(data)
+            malo[pos] = valor
+            try:
+                deserializar(bytes(malo))
+            except ValueError:
+                rechazados += 1
+    assert rechazados > len(data)
+
+
+def test_cycles_and_shared_children_are_rejected():
+    ast = Parser(Lexer("int main() {\n    int x = 1 + 2 * 3;\n    cout << x;\n}")).parse()
+    arena = AstArena.from_tree(ast)
+    suma = next(i for i in range(len(arena)) if arena.token_of(i).value == '+')
+    casos = (('left', arena.left[suma], suma),                   # ciclo: el hijo apunta a su padre
+             ('right', suma, arena.left[suma]),                  # hijo compartido
+             ('next_sibling', arena.first_child[arena.root], arena.first_child[arena.root]))
+    for columna, nodo, destino in casos:
+        copia = deserializar(serializar(arena), arena=True)
+        getattr(copia, columna)[nodo] = destino
+        for paso in (copia.validate, copia.to_tree, lambda: deserializar(serializar(copia))):
+            try:
+                paso()
+                assert False, columna
+            except ValueError as e:
+                assert "corrupt" in str(e), str(e)
+    # kind inexistente y payload con otra forma
+    copia = deserializar(serializar(arena), arena=True)
+    copia.kind[0] = 42
+    bad_payload = deserializar(serializar(arena), arena=True)
+    decl = next(i for i in range(len(arena)) if arena.kind[i] == DECL)
+    bad_payload.payload[decl] = [('x', None, 99)]
+    for malo in (copia, bad_payload):
+        try:
+            malo.validate()
+            assert False
+        except ValueError as e:
+            assert "corrupt" in str(e), str(e)
+
+
+if __name__ == "__main__":
+    test_roundtrip_every_node_class()
+    test_tokens_lines_and_values_survive()
+    test_deep_tree_and_disk_cache()
+    test_rejects_bad_input()
+    test_corrupted_bytes_raise_value_error()
+    test_cycles_and_shared_children_are_rejected()
+    print("SUCCESS: AST serialization verified!")
@@ -0,0 +1,109 @@
+import sys
+import os
+
+# Add src to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+from compiler.lexer import Lexer, Token, TokenStream
+from compiler.parser import Parser
+from compiler.interpreter import Interpreter
+
+BUBBLE = os.path.join(os.path.dirname(__file__), 'bubble_sort_cpp.txt')
+
+
+class _Contador:
+    """Iterable de tokens que cuenta cuántos se pidieron."""
+
+    def __init__(self, code):
+        self.tokens = list(Lexer(code))
+        self.pedidos = 0
+
+    def __iter__(self):
+        for tok in self.tokens:
+            self.pedidos += 1
+            yield tok
+
+
+def test_peek_is_lazy_and_bounded():
+    fuente = _Contador("a = b + 1; c = 2;")
+    stream = TokenStream(fuente, lookahead=4)
+    assert fuente.pedidos == 0
+    assert stream.peek(2).type == Token.Type.Ident and stream.peek(2).value == "b"
+    assert fuente.pedidos == 3
+    assert stream.next().value == "a" and stream.peek(0).type == Token.Type.Asign
+    try:
+        stream.peek(4)
+        assert False, "peek fuera de la ventana"
+    except ValueError:
+        pass
+    valores = [stream.next().value for _ in range(9)]
+    assert valores == ["=", "b", "+", "1", ";", "c", "=", "2", ";"]
+    # Agotada la fuente se repite el mismo Fin
+    fin = stream.next()
+    assert fin.type == Token.Type.Fin and stream.next() is fin and stream.peek(3) is fin
+
+
+def test_mark_reset_replays_tokens():
+    stream = TokenStream(Lexer("x = ( 1 + 2 ) * 3"), lookahead=2)
+    stream.next()
+    mark = stream.mark()
+    assert [stream.next().value for _ in range(4)] == ["=", "(", "1", "+"]
+    stream.reset(mark)
+    assert stream.peek(1).value == "("
+    assert [stream.next().value for _ in range(7)] == ["=", "(", "1", "+", "2", ")", "*"]
+    stream2 = TokenStream(Lexer("a b c d"), lookahead=2)
+    outer = stream2.mark()
+    stream2.next()
+    inner = stream2.mark()
+    stream2.next()
+    stream2.reset(inner)
+    assert stream2.next().value == "b"
+    stream2.reset(outer)
+    assert [stream2.next().value for _ in range(4)] == ["a", "b", "c", "d"]
+
+
+def run(ast):
+    output = []
+    Interpreter(output_callback=output.append).interpret(ast)
+    return "".join(str(o) for o in output)
+
+
+def test_parser_decides_without_backtracking():
+    with open(BUBBLE, 'r', encoding='utf-8') as f:
+        bubble = f.read()
+    programas = {
+        bubble: None,
+        "int main() {\n int v[] = {5, 6, 7};\n int s = 0;\n"
+        " for (i = 0; i < 3; i++) { v[i] = v[i] * 2; }\n"
+        " (int j = 0; j < 3; j++) for { s = s + v[j]; }\n"
+        " (s + 1);\n cout << s;\n}": "36",
+        "int main() {\n int v[] = {1, 2};\n for (v[0] = 0; v[0] < 3; v[0] = v[0] + 1) { v[1] = v[1] + 1; }\n"
+        " cout << v[1];\n}": "5",
+    }
+    for code, esperado in programas.items():
+        parser = Parser(Lexer(code))
+        ast = parser.parse()
+        assert parser.backtracks == 0, code
+        if esperado is not None:
+            assert run(ast) == esperado
+
+
+def test_long_index_falls_back_to_backtracking():
+    # El índice no entra en la ventana: se decide intentando y retrocediendo
+    indice = " + ".join(["0"] * Parser.LOOKAHEAD)
+    code = f"int main() {{\n int v[] = {{1, 2}};\n for (v[{indice}] = 0; v[0] < 3; v[0] = v[0] + 1) {{ }}\n cout << v[0];\n}}"
+    parser = Parser(Lexer(code))
+    assert run(parser.parse()) == "3"
+    assert parser.backtracks == 0
+    code = f"int main() {{\n int v[] = {{1, 2}};\n for (i = 0; i < 2; v[{indice}]) {{ i++; }}\n cout << i;\n}}"
+    parser = Parser(Lexer(code))
+    assert run(parser.parse()) == "2"
+    assert parser.backtracks == 1
+
+
+if __name__ == "__main__":
+    test_peek_is_lazy_and_bounded()
+    test_mark_reset_replays_tokens()
+    test_parser_decides_without_backtracking()
+    test_long_index_falls_back_to_backtracking()
+    print("SUCCESS: Token stream lookahead verified!")
@@ -0,0 +1,134 @@
+import sys
+import os
+
+# Add src to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+from compiler.lexer import Lexer
+from compiler.parser import Parser
+from compiler.interpreter import Interpreter
+from compiler.compiler import Compiler
+from compiler.operators import INT_OPS, FLOAT_OPS, ADD, DIV, cpp_int_div, cpp_int_mod, cpp_str
+
+
+def run(code):
+    output = []
+    ast = Parser(Lexer(code)).parse()
+    interpreter = Interpreter(output_callback=output.append)
+    interpreter.interpret(ast)
+    return "".join(output), interpreter, ast
+
+
+def test_cpp_integer_division_truncates_toward_zero():
+    assert cpp_int_div(7, 2) == 3
+    assert cpp_int_div(-7, 2) == -3
+    assert cpp_int_div(7, -2) == -3
+    assert cpp_int_mod(-7, 2) == -1
+    assert cpp_int_mod(7, -2) == 1
+
+
+def test_int_program_uses_int_semantics():
+    code = """int main() {
+    int a = 7;
+    int b = -2;
+    int q = a / b;
+    int r = a % b;
+    float f = 7;
+    float g = f / 2;
+    int t = 9.9;
+    cout << q << " " << r << " " << g << " " << t;
+}"""
+    out, interp, _ = run(code)
+    assert out.startswith("-3 1 3.5 9"), out
+    assert interp.environment['t'] == 9
+    assert isinstance(interp.environment['f'], float)
+
+
+def test_operator_specialization_is_annotated():
+    code = """int main() {
+    int a = 1;
+    float x = 2.5;
+    a = a + 1;
+    x = x / a;
+}"""
+    _, _, ast = run(code)
+    int_assign, float_assign = ast.statements[2], ast.statements[3]
+    assert int_assign.right.impl is INT_OPS[ADD]
+    assert float_assign.right.impl is FLOAT_OPS[DIV]
+
+
+def test_literals_are_parsed_once():
+    ast = Parser(Lexer("x = 3 + 2.5")).parse()
+    assert ast.right.left.value == 3
+    assert ast.right.right.value == 2.5
+
+
+def test_unary_minus():
+    out, _, _ = run("""int main() {
+    int a = 4;
+    cout << -a + 1;
+}""")
+    assert out.startswith("-3"), out
+
+
+def test_cout_formats_floats_like_cpp():
+    assert cpp_str(3.0) == "3" and cpp_str(0.1 + 0.2) == "0.3" and cpp_str(3.14159265) == "3.14159"
+    assert cpp_str(1e20) == "1e+20" and cpp_str(7) == "7" and cpp_str("hola") == "hola"
+    # Un float inicializado con un entero se imprime como en C++ (y como antes de coerce)
+    out, interp, _ = run("""int main() {
+    float b = 3;
+    cout << b << " " << b / 2 << " " << 2.0 * 5;
+}""")
+    assert out.startswith("3 1.5 10"), out
+    assert isinstance(interp.environment['b'], float)
+
+
+def outputs(code):
+    comparacion = Compiler().compare(code, strict=False)
+    return {res["output"] for res in comparacion["results"].values()}
+
+
+def test_parameter_and_local_with_same_name_keep_their_types():
+    # 'a' es float en scale e int en main: la asignación de main trunca
+    code = """float scale(float a) {
+    a = a * 2;
+    return a;
+}
+int main() {
+    int a = 7;
+    a = a * 1.5;
+    cout << a << " " << scale(1.25);
+}"""
+    assert outputs(code) == {"10 2.5"}
+
+
+def test_shadowed_variables_use_their_own_declaration():
+    # La x interna es float; fuera de su bloque (y del for) x vuelve a ser int
+    code = """int main() {
+    int x = 1;
+    if (1) {
+        float x = 0;
+        x = 2.5;
+        cout << x << " ";
+    }
+    x = 2.5;
+    cout << x << " ";
+    for (float x = 0.5; x < 1; x = x + 1) {
+        cout << x << " ";
+    }
+    x = 7.9;
+    cout << x;
+}"""
+    assert outputs(code) == {"2.5 2 0.5 7"}
+
+
+if __name__ == "__main__":
+    test_cpp_integer_division_truncates_toward_zero()
+    test_int_program_uses_int_semantics()
+    test_operator_specialization_is_annotated()
+    test_literals_are_parsed_once()
+    test_unary_minus()
+    test_cout_formats_floats_like_cpp()
+    test_parameter_and_local_with_same_name_keep_their_types()
+    test_shadowed_variables_use_their_own_declaration()
+    print("SUCCESS: type inference verified!")
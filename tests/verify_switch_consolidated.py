@@ -4,20 +4,17 @@ import os
 # Ensure we can import from current directory (project root)
 sys.path.append(os.getcwd())
 
-from src.compiler.parser import Parser
-from src.compiler.lexer import Lexer
-from src.compiler.semantics import SemanticAnalyzer
+from src.compiler.compilation_unit import CompilationUnit
 
 def run_test_content(content, name, expect_semantic_error=False):
     print(f"--- Testing {name} ---")
     
     # Syntax Check
     print("[SYNTAX CHECK]")
+    unit = CompilationUnit(content)
     syntax_error = False
     try:
-        lexer = Lexer(content)
-        parser = Parser(lexer)
-        parser.parse()
+        unit.ast
         print("Syntax: OK")
     except Exception as e:
         print(f"Syntax Error: {e}")
@@ -25,8 +22,7 @@ def run_test_content(content, name, expect_semantic_error=False):
 
     # Semantic Check
     print("[SEMANTIC CHECK]")
-    analyzer = SemanticAnalyzer()
-    res = analyzer.analizar(content)
+    res = unit.semantic
     errores = res["errores"]
     
     if errores: